@@ -72,6 +72,8 @@ CREATE TABLE IF NOT EXISTS scheduled_templates (
     description TEXT,
     recurrence TEXT NOT NULL,
     anchor_date TEXT NOT NULL,
+    next_due TEXT,
+    dtstart TEXT,
     created_at TEXT NOT NULL DEFAULT (datetime('now'))
 );
 
@@ -127,6 +129,16 @@ def _migrate_scheduled_templates(conn: sqlite3.Connection) -> None:
         conn.execute("CREATE INDEX IF NOT EXISTS idx_scheduled_templates_anchor ON scheduled_templates(anchor_date)")
     except sqlite3.OperationalError:
         pass
+    # next_due is materialized from anchor_date + recurrence (shared.events_agent.compute_next_due;
+    # fill_template_next_due fills rows without it); dtstart is where the rule starts (COUNT, day
+    # of month), anchor_date the last occurrence
+    for column in ("next_due", "dtstart"):
+        try:
+            conn.execute(f"ALTER TABLE scheduled_templates ADD COLUMN {column} TEXT")
+        except sqlite3.OperationalError:
+            pass  # Column already exists
+    conn.execute("UPDATE scheduled_templates SET dtstart = anchor_date WHERE dtstart IS NULL")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_scheduled_templates_next_due ON scheduled_templates(next_due)")
     conn.commit()
 
 
@@ -194,7 +194,7 @@ class TodoCreate(BaseModel):
 class ScheduledTemplateCreate(BaseModel):
     title: str
     description: str = ""
-    recurrence: str  # YEARLY, MONTHLY, or WEEKLY
+    recurrence: str  # YEARLY, MONTHLY, WEEKLY or an RRULE (e.g. FREQ=MONTHLY;BYMONTHDAY=-1)
     anchor_date: str  # yyyy-mm-dd (last occurrence or base date)
 
 
@@ -236,27 +236,16 @@ def create_event(e: EventCreate):
 
 
 @app.get("/api/events/duplicates")
-def list_event_duplicates():
-    """Find dashboard events that are likely duplicates (same date + similar title)."""
+def list_event_duplicates(window_days: int = 0):
+    """Find dashboard events that are likely duplicates: similar titles (shared.event_dedupe) on the
+    same date, or within window_days of each other."""
+    from shared.event_dedupe import find_duplicates
     conn = get_conn()
     rows = conn.execute(
         "SELECT id, date, title, description, event_type FROM events ORDER BY date ASC, id ASC"
     ).fetchall()
     conn.close()
-    # Normalize title for grouping: lowercase, collapse whitespace
-    def _norm(t):
-        return " ".join((t or "").lower().split()).strip()[:100]
-
-    by_key = {}  # (date[:10], normalized_title) -> [events]
-    for r in rows:
-        ev = {"id": r[0], "date": r[1], "title": r[2], "description": r[3], "event_type": r[4]}
-        key = (str(ev["date"] or "")[:10], _norm(ev["title"]))
-        if not key[0] or not key[1]:
-            continue
-        by_key.setdefault(key, []).append(ev)
-    # Only groups with 2+ events
-    duplicates = [v for v in by_key.values() if len(v) >= 2]
-    return {"duplicates": duplicates}
+    return {"duplicates": find_duplicates((dict(r) for r in rows), window_days=max(0, window_days))}
 
 
 @app.post("/api/events/merge")
@@ -331,6 +320,8 @@ def create_event_in_calendar(id: int):
                 rrule = "RRULE:" + rrule
             body["recurrence"] = [rrule]
         event = service.events().insert(calendarId="primary", body=body).execute()
+        from shared.calendar_mirror import record_event
+        record_event(event, service=service)
         try:
             from shared.user_actions import log_action
             from shared.chat import get_woody_db_path
@@ -361,58 +352,63 @@ def list_requires_scheduling(days: int = 14):
 
 
 @app.get("/api/events/calendar")
-def list_calendar_events():
-    """Fetch Google Calendar events for the next 2 days (today + tomorrow)."""
-    from datetime import datetime, timedelta
-    try:
-        from googleapiclient.discovery import build
-    except ImportError:
-        return []
-    from shared.google_tokens import get_credentials
-    creds, err = get_credentials()
-    if err:
-        return []
+def list_calendar_events(response: Response):
+    """Google Calendar events for the next 2 days (today + tomorrow), from the local mirror.
+    X-Calendar-Synced-At carries the last successful sync (see /api/events/calendar/status)."""
+    from datetime import date, timedelta
     try:
-        service = build("calendar", "v3", credentials=creds)
-        now = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
-        end = now + timedelta(days=2)
-        time_min = now.isoformat() + "Z"
-        time_max = end.isoformat() + "Z"
-        events = service.events().list(
-            calendarId="primary",
-            timeMin=time_min,
-            timeMax=time_max,
-            singleEvents=True,
-            orderBy="startTime",
-        ).execute()
-        items = events.get("items", [])
-        out = []
-        for e in items:
-            start = e.get("start", {})
-            dt = start.get("dateTime") or start.get("date", "")
-            date_str = dt[:10] if len(dt) >= 10 else ""
-            if not date_str:
-                continue
-            out.append({
+        from shared import calendar_mirror
+        status = calendar_mirror.mirror_status()
+        if not status["synced"]:
+            from shared.google_tokens import get_credentials
+            _, err = get_credentials()
+            if err:
+                return []
+            status = calendar_mirror.ensure_synced()
+        response.headers["X-Calendar-Synced-At"] = status["last_sync_at"] or ""
+        today = date.today()
+        return [
+            {
                 "id": None,
-                "date": date_str,
-                "title": e.get("summary", "(no title)"),
-                "description": e.get("description", "") or "",
+                "date": e["date"],
+                "title": e["title"],
+                "description": e["description"],
                 "event_type": "calendar",
                 "source": "google",
-            })
-        return out
+            }
+            for e in calendar_mirror.get_events_for_dates(today, today + timedelta(days=1))
+        ]
     except Exception:
         return []
 
 
+@app.get("/api/events/calendar/status")
+def calendar_mirror_status():
+    """Freshness of the local Google Calendar mirror: last sync, age, stale flag, last error."""
+    try:
+        from shared.calendar_mirror import format_age, mirror_status
+        status = mirror_status()
+        return {**status, "age": format_age(status["age_seconds"])}
+    except Exception as e:
+        return {"synced": False, "error": str(e)}
+
+
+@app.post("/api/events/calendar/sync")
+def calendar_sync_now():
+    """Queue an incremental Google Calendar sync now (normally every CALENDAR_SYNC_INTERVAL_MINUTES)."""
+    return _enqueue_job("calendar_sync", "Calendar sync queued.")
+
+
 # --- Scheduled templates (recurring: bills, inspections, birthdays) ---
 
 @app.get("/api/scheduled-templates")
 def list_scheduled_templates():
+    from shared.events_agent import fill_template_next_due
     conn = get_conn()
+    if fill_template_next_due(conn):
+        conn.commit()
     rows = conn.execute(
-        "SELECT id, title, description, recurrence, anchor_date, created_at FROM scheduled_templates ORDER BY anchor_date ASC",
+        "SELECT id, title, description, recurrence, anchor_date, dtstart, next_due, created_at FROM scheduled_templates ORDER BY anchor_date ASC",
         (),
     ).fetchall()
     conn.close()
@@ -421,14 +417,22 @@ def list_scheduled_templates():
 
 @app.post("/api/scheduled-templates")
 def create_scheduled_template(t: ScheduledTemplateCreate):
+    from shared.events_agent import compute_next_due
+    from shared.recurrence import parse_rule
+    recurrence = t.recurrence.strip().upper()
+    try:
+        parse_rule(recurrence)
+    except ValueError as e:
+        from fastapi import HTTPException
+        raise HTTPException(status_code=400, detail=str(e))
     conn = get_conn()
     cur = conn.execute(
-        "INSERT INTO scheduled_templates (title, description, recurrence, anchor_date) VALUES (?, ?, ?, ?)",
-        (t.title, t.description, t.recurrence.upper(), t.anchor_date[:10]),
+        "INSERT INTO scheduled_templates (title, description, recurrence, anchor_date, dtstart, next_due) VALUES (?, ?, ?, ?, ?, ?)",
+        (t.title, t.description, recurrence, t.anchor_date[:10], t.anchor_date[:10], compute_next_due(t.anchor_date, recurrence) or ""),
     )
     conn.commit()
     row = conn.execute(
-        "SELECT id, title, description, recurrence, anchor_date, created_at FROM scheduled_templates WHERE id = ?",
+        "SELECT id, title, description, recurrence, anchor_date, dtstart, next_due, created_at FROM scheduled_templates WHERE id = ?",
         (cur.lastrowid,),
     ).fetchone()
     conn.close()
@@ -451,13 +455,13 @@ def schedule_template_now(id: int, date_str: Optional[str] = None):
     from datetime import date
     conn = get_conn()
     row = conn.execute(
-        "SELECT id, title, description, recurrence, anchor_date FROM scheduled_templates WHERE id = ?",
+        "SELECT id, title, description, recurrence, anchor_date, dtstart FROM scheduled_templates WHERE id = ?",
         (id,),
     ).fetchone()
     conn.close()
     if not row:
         return {"ok": False, "error": "Template not found"}
-    tid, title, desc, recurrence, anchor = row[0], row[1], row[2], row[3], row[4]
+    tid, title, desc, recurrence, dtstart = row[0], row[1], row[2], row[3], row[5]
     schedule_date = (date_str or date.today().isoformat())[:10]
     ev_id = create_event(
         date_str=schedule_date,
@@ -468,7 +472,11 @@ def schedule_template_now(id: int, date_str: Optional[str] = None):
     if not ev_id:
         return {"ok": False, "error": "Failed to create event"}
     conn = get_conn()
-    conn.execute("UPDATE scheduled_templates SET anchor_date = ? WHERE id = ?", (schedule_date, id))
+    from shared.events_agent import compute_next_due
+    conn.execute(
+        "UPDATE scheduled_templates SET anchor_date = ?, next_due = ? WHERE id = ?",
+        (schedule_date, compute_next_due(schedule_date, recurrence, dtstart) or "", id),
+    )
     conn.commit()
     conn.close()
     return {"ok": True, "event_id": ev_id}
@@ -906,27 +914,8 @@ def communications_status():
 
 @app.post("/api/communications/run")
 def communications_run_now():
-    """Manually trigger COMMUNICATIONS agent: scan inbox, feed contacts + events agents."""
-    try:
-        from shared.communications_agent import run_communications_agent
-        result = run_communications_agent()
-        if result.get("error"):
-            return {"ok": False, "message": result["error"]}
-        circle = result.get("circle_proposals", 0)
-        events = result.get("event_proposals", 0)
-        parts = []
-        if circle:
-            parts.append(f"{circle} circle proposal(s)")
-        if events:
-            parts.append(f"{events} event suggestion(s)")
-        return {
-            "ok": True,
-            "circle_proposals": circle,
-            "event_proposals": events,
-            "message": f"Scanned inbox. Proposed: {', '.join(parts)}" if parts else "Nothing to propose.",
-        }
-    except Exception as e:
-        return {"ok": False, "message": str(e)}
+    """Queue the COMMUNICATIONS agent (scan inbox, feed contacts + events agents). Poll /api/job-queue/{job_id}."""
+    return _enqueue_job("communications_agent", "Inbox scan queued.")
 
 
 # --- Health ---
@@ -1204,22 +1193,12 @@ def memory_agent_reject(proposal_id: str):
 
 @app.post("/api/memory-agent/proposals/approve-all")
 def memory_agent_approve_all():
-    """Approve all pending memory agent proposals."""
+    """Approve all pending memory agent proposals (one transaction, batched memory writes)."""
     try:
         from shared.db_path import get_woody_db_path
-        from shared.memory_agent import list_pending_proposals, resolve_proposal, commit_proposal
+        from shared.memory_agent import resolve_proposals
         db_path = _ensure_woody_db(get_woody_db_path())
-        proposals = list_pending_proposals(db_path)
-        results = []
-        for p in proposals:
-            pid = p.get("id")
-            if not pid:
-                continue
-            if resolve_proposal(db_path, pid, "approved"):
-                ok, msg = commit_proposal(db_path, pid)
-                results.append({"id": pid, "ok": ok, "message": msg})
-            else:
-                results.append({"id": pid, "ok": False, "message": "Already resolved."})
+        results = resolve_proposals(db_path, "approved")
         return {"ok": True, "results": results, "count": len(results)}
     except Exception as e:
         return {"ok": False, "message": str(e)}
@@ -1230,50 +1209,70 @@ def memory_agent_reject_all():
     """Reject all pending memory agent proposals."""
     try:
         from shared.db_path import get_woody_db_path
-        from shared.memory_agent import list_pending_proposals, resolve_proposal, get_proposal
-        from shared.user_actions import log_action
+        from shared.memory_agent import resolve_proposals
         db_path = _ensure_woody_db(get_woody_db_path())
-        proposals = list_pending_proposals(db_path)
-        results = []
-        for p in proposals:
-            pid = p.get("id")
-            if not pid:
-                continue
-            prop = get_proposal(db_path, pid)
-            ok = resolve_proposal(db_path, pid, "rejected")
-            if ok and prop and prop.get("action_type") == "event_suggestion":
-                payload = prop.get("payload", {})
-                log_action("event_rejected", proposal_id=pid, title=payload.get("title"), event_date=(payload.get("date") or "")[:10], source=payload.get("description", "")[:100], db_path=db_path)
-            results.append({"id": pid, "ok": ok})
+        results = [{"id": r["id"], "ok": r["ok"]} for r in resolve_proposals(db_path, "rejected")]
         return {"ok": True, "results": results, "count": len(results)}
     except Exception as e:
         return {"ok": False, "message": str(e)}
 
 
-@app.post("/api/memory-agent/run")
-def memory_agent_run_now():
-    """Manually trigger the memory agent to propose changes (normally runs nightly)."""
+def _enqueue_job(kind: str, message: str) -> dict:
+    """Queue a background job for Woody's worker and return its id immediately."""
     try:
         from shared.db_path import get_woody_db_path
-        from shared.memory_agent import run_memory_agent
-        db_path = _ensure_woody_db(get_woody_db_path())
-        summary = run_memory_agent(db_path)
-        return {"ok": True, "summary": summary}
+        from shared.job_queue import enqueue
+        job_id = enqueue(_ensure_woody_db(get_woody_db_path()), kind, priority=10, unique=True)
+        return {"ok": True, "job_id": job_id, "message": message}
     except Exception as e:
         return {"ok": False, "message": str(e)}
 
 
+@app.post("/api/memory-agent/run")
+def memory_agent_run_now():
+    """Queue the memory agent to propose changes now (normally runs nightly). Poll /api/job-queue/{job_id}."""
+    return _enqueue_job("memory_agent_run", "Memory agent queued.")
+
+
 @app.post("/api/events-agent/run")
 def events_agent_run_now():
-    """Manually trigger the EVENTS agent to propose event→memory changes (also runs as part of Memory Agent)."""
+    """Queue the EVENTS agent to propose event→memory changes (also runs as part of Memory Agent)."""
+    return _enqueue_job("events_agent_run", "EVENTS agent queued.")
+
+
+@app.get("/api/job-queue")
+def job_queue_overview(status: Optional[str] = None, limit: int = 50):
+    """Background job queue: counts by status, oldest waiting job, recent jobs."""
     try:
         from shared.db_path import get_woody_db_path
-        from shared.events_agent import run_events_agent
+        from shared.job_queue import list_jobs, queue_stats
         db_path = _ensure_woody_db(get_woody_db_path())
-        summary = run_events_agent(db_path)
-        return {"ok": True, "summary": summary}
+        return {**queue_stats(db_path), "jobs": list_jobs(db_path, status=status, limit=limit)}
     except Exception as e:
-        return {"ok": False, "message": str(e)}
+        return {"counts": {}, "jobs": [], "error": str(e)}
+
+
+@app.get("/api/retention")
+def retention_overview():
+    """History tables under retention: live rows, archived rows, days kept."""
+    try:
+        from shared.db_path import get_woody_db_path
+        from shared.retention import retention_stats
+        return {"tables": retention_stats(_ensure_woody_db(get_woody_db_path()))}
+    except Exception as e:
+        return {"tables": [], "error": str(e)}
+
+
+@app.get("/api/job-queue/{job_id}")
+def job_queue_get(job_id: int):
+    """One queued job: status (queued/leased/done/failed), attempts, result or error."""
+    try:
+        from shared.db_path import get_woody_db_path
+        from shared.job_queue import get_job
+        job = get_job(_ensure_woody_db(get_woody_db_path()), job_id)
+        return job or {"id": job_id, "status": "unknown", "error": "Job not found"}
+    except Exception as e:
+        return {"id": job_id, "status": "unknown", "error": str(e)}
 
 
 # --- Contacts ---
@@ -1774,6 +1773,94 @@ def get_otel_traces(limit: int = 30):
     return {"spans": buffer.get_spans(limit=limit)}
 
 
+# --- LLM usage ---
+
+
+@app.get("/api/usage/prompt-cache")
+def usage_prompt_cache(days: int = 7):
+    """Prompt-cache hit ratio and average latency of cached vs uncached OpenAI calls."""
+    try:
+        from shared.usage_metrics import get_prompt_cache_stats
+        return get_prompt_cache_stats(days=days)
+    except Exception as e:
+        return {"calls": 0, "error": str(e)}
+
+
+@app.get("/api/usage/summary")
+def usage_summary(days: int = 7):
+    """Agent turn totals: tokens, wall time split into LLM vs tool time, avg prompt size per component."""
+    try:
+        from shared.usage_metrics import get_usage_summary
+        return get_usage_summary(days=days)
+    except Exception as e:
+        return {"turns": 0, "error": str(e)}
+
+
+@app.get("/api/usage/chats")
+def usage_by_chat(days: int = 7):
+    """Tokens and latency per Telegram chat."""
+    try:
+        from shared.usage_metrics import get_usage_by_chat
+        return {"chats": get_usage_by_chat(days=days)}
+    except Exception as e:
+        return {"chats": [], "error": str(e)}
+
+
+@app.get("/api/usage/tools")
+def usage_by_tool(days: int = 7):
+    """Call count, latency, prefetch hits and errors per tool."""
+    try:
+        from shared.usage_metrics import get_usage_by_tool
+        return {"tools": get_usage_by_tool(days=days)}
+    except Exception as e:
+        return {"tools": [], "error": str(e)}
+
+
+@app.get("/api/usage/daily")
+def usage_daily(days: int = 30):
+    """Per-day turns, tokens and latency, for comparing before/after an optimization."""
+    try:
+        from shared.usage_metrics import get_usage_daily
+        return {"days": get_usage_daily(days=days)}
+    except Exception as e:
+        return {"days": [], "error": str(e)}
+
+
+@app.get("/api/jobs")
+def jobs_list():
+    """Woody's scheduled background jobs: schedule, next run, last run, average duration."""
+    try:
+        from shared.db_path import get_woody_db_path
+        from shared.job_runs import list_jobs
+        return {"jobs": list_jobs(_ensure_woody_db(get_woody_db_path()))}
+    except Exception as e:
+        return {"jobs": [], "error": str(e)}
+
+
+@app.get("/api/jobs/runs")
+def jobs_runs(job: Optional[str] = None, limit: int = 50):
+    """Recent job runs (newest first), optionally for one job."""
+    try:
+        from shared.db_path import get_woody_db_path
+        from shared.job_runs import list_runs
+        return {"runs": list_runs(_ensure_woody_db(get_woody_db_path()), job=job, limit=limit)}
+    except Exception as e:
+        return {"runs": [], "error": str(e)}
+
+
+@app.post("/api/jobs/{name}/run")
+def jobs_run_now(name: str):
+    """Ask Woody's scheduler to run a job now (picked up within JOB_REQUEST_POLL_SECONDS)."""
+    try:
+        from shared.db_path import get_woody_db_path
+        from shared.job_runs import request_run
+        if not request_run(_ensure_woody_db(get_woody_db_path()), name):
+            return {"ok": False, "message": f"Unknown job: {name}"}
+        return {"ok": True, "message": f"Run of {name} requested."}
+    except Exception as e:
+        return {"ok": False, "message": str(e)}
+
+
 @app.get("/", response_class=HTMLResponse)
 def index():
     index_file = STATIC_DIR / "index.html"
@@ -48,6 +48,18 @@ async function fetchJSON(path, opts = {}) {
   return res.json();
 }
 
+// "Run now" endpoints queue a job for Woody's worker; poll until it finishes.
+async function waitForJob(jobId, timeoutMs = 600000) {
+  const deadline = Date.now() + timeoutMs;
+  while (Date.now() < deadline) {
+    const job = await fetchJSON(`/api/job-queue/${jobId}`);
+    if (job.status === "done") return job.result || {};
+    if (job.status === "failed" || job.status === "unknown") throw new Error(job.error || "Job failed.");
+    await new Promise((resolve) => setTimeout(resolve, 1500));
+  }
+  throw new Error("Still running in the background. Check again later.");
+}
+
 function showForm(type) {
   if (type === "note" || type === "todo") {
     ["note", "todo"].forEach((t) => {
@@ -441,6 +453,14 @@ async function loadEvents() {
     events.push(ev);
   }
   events.sort((a, b) => (a.date || "").localeCompare(b.date || ""));
+  const syncEl = document.getElementById("calendar-sync-status");
+  if (syncEl) {
+    const sync = await fetchJSON("/api/events/calendar/status").catch(() => null);
+    syncEl.hidden = !(sync && sync.synced);
+    if (sync && sync.synced) {
+      syncEl.textContent = `Google Calendar synced ${sync.age}` + (sync.stale ? " (out of date)" : "");
+    }
+  }
   const list = document.getElementById("list-events");
   list.innerHTML = events.length
     ? events.map(renderEvent).join("")
@@ -1016,6 +1036,7 @@ function renderProposalDetails(type, payload) {
       <div class="proposal-detail-section">
         <p class="proposal-detail-label">Title:</p>
         <p class="proposal-detail-text">${escapeHtml(payload.title || "")}</p>
+        ${payload.date ? `<p class="proposal-detail-label">When:</p><p class="proposal-detail-text">${escapeHtml(payload.date)}${payload.time ? " " + escapeHtml(payload.time) : ""}</p>` : ""}
         ${payload.description ? `<p class="proposal-detail-label">From email:</p><p class="proposal-detail-text">${escapeHtml(htmlToPlainText(payload.description))}</p>` : ""}
       </div>
     `;
@@ -1152,7 +1173,7 @@ document.getElementById("btn-memory-agent-run")?.addEventListener("click", async
   try {
     const data = await fetchJSON("/api/memory-agent/run", { method: "POST" });
     if (data.ok) {
-      const s = data.summary || {};
+      const s = await waitForJob(data.job_id);
       const total = Object.values(s).reduce((a, b) => a + b, 0);
       alert(`Proposed ${total} changes: add=${s.add || 0}, remove=${s.remove || 0}, event=${s.event_memory || 0}, consolidate=${s.consolidate || 0}, promote=${s.promote || 0}`);
       loadMemoryAgentProposals();
@@ -1172,7 +1193,7 @@ document.getElementById("btn-events-agent-run")?.addEventListener("click", async
   try {
     const data = await fetchJSON("/api/events-agent/run", { method: "POST" });
     if (data.ok) {
-      const s = data.summary || {};
+      const s = await waitForJob(data.job_id);
       const events = s.event_memory || 0;
       const created = s.scheduled_created || 0;
       const parts = [];
@@ -1381,8 +1402,16 @@ document.getElementById("btn-run-communications")?.addEventListener("click", asy
   if (btn) btn.disabled = true;
   try {
     const data = await fetchJSON("/api/communications/run", { method: "POST" });
-    alert(data.ok ? data.message : "Error: " + data.message);
-    if (data.ok && (data.circle_proposals || data.event_proposals)) {
+    if (!data.ok) {
+      alert("Error: " + data.message);
+      return;
+    }
+    const r = await waitForJob(data.job_id);
+    const parts = [];
+    if (r.circle_proposals) parts.push(`${r.circle_proposals} circle proposal(s)`);
+    if (r.event_proposals) parts.push(`${r.event_proposals} event suggestion(s)`);
+    alert(parts.length ? `Scanned inbox. Proposed: ${parts.join(", ")}` : "Nothing to propose.");
+    if (r.circle_proposals || r.event_proposals) {
       loadMemoryAgentProposals();
       loadContacts();
       loadCircles();
@@ -1403,7 +1432,7 @@ async function loadScheduledTemplates() {
     list.innerHTML = Array.isArray(items) && items.length
       ? items.map((t) => `
           <li>
-            <p class="item-desc">${escapeHtml(t.title || "")} <span class="badge">${escapeHtml(t.recurrence || "")}</span> (anchor: ${t.anchor_date})</p>
+            <p class="item-desc">${escapeHtml(t.title || "")} <span class="badge">${escapeHtml(t.recurrence || "")}</span> (anchor: ${t.anchor_date}${t.next_due ? `, next: ${t.next_due}` : ""})</p>
             <div class="item-actions">
               <button class="btn btn-danger" data-delete-template="${t.id}">Remove</button>
             </div>
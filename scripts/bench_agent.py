@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+Replay benchmark for the Woody agent loop.
+
+Replays a recorded corpus of conversations (scripts/bench_corpus.jsonl) through run_agent
+against a local deterministic fake OpenAI server (tests/fake_openai.py, scripted tool calls
+included) with temp Woody/dashboard DBs and a temp memory store using the offline hash
+embedding. Reports p50/p95 per stage of the hot path (history, memory search, About Me,
+date parsing, tool schemas, tool dispatch, LLM round-trip, persistence, metrics) and
+per-turn allocations (tracemalloc). Runs fully offline; never touches live data.
+
+    python scripts/bench_agent.py --iterations 5
+    python scripts/bench_agent.py --json --max-overhead-p95-ms 150   # exit 1 on regression
+
+"overhead" is turn wall time minus the LLM round-trip: what the agent itself costs.
+"""
+
+from __future__ import annotations
+
+import argparse
+import functools
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+_root = Path(__file__).resolve().parent.parent
+for p in (str(_root), str(_root / "woody")):
+    if p not in sys.path:
+        sys.path.insert(0, p)
+
+DEFAULT_CORPUS = Path(__file__).resolve().parent / "bench_corpus.jsonl"
+
+SEED_MEMORIES = [
+    ("Friday is pizza night at the Woods'", 6),
+    ("Jack's dentist is Dr. Smith on Main Street", 5),
+    ("Emma is allergic to peanuts", 9),
+    ("The wifi password is on the fridge", 3),
+]
+SEED_ABOUT_ME = "Family of four. Prefers short answers. Mornings are busy; avoid scheduling before 9am."
+
+
+def load_corpus(path: Path) -> List[dict]:
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def _pct(values: List[float], p: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return round(ordered[min(len(ordered) - 1, int(p * len(ordered)))], 2)
+
+
+class StageTimer:
+    """Wraps module attributes so each call adds its wall time to the current turn's stage."""
+
+    def __init__(self) -> None:
+        self.samples: Dict[str, List[float]] = defaultdict(list)
+        self._turn: Dict[str, float] = {}
+        self._restore: List[tuple] = []
+
+    def wrap(self, owner: Any, attr: str, stage: str) -> None:
+        orig = getattr(owner, attr)
+
+        @functools.wraps(orig)
+        def timed(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return orig(*args, **kwargs)
+            finally:
+                self._turn[stage] = self._turn.get(stage, 0.0) + (time.perf_counter() - started) * 1000
+
+        setattr(owner, attr, timed)
+        self._restore.append((owner, attr, orig))
+
+    def begin_turn(self) -> None:
+        self._turn = {}
+
+    def end_turn(self, total_ms: float, record: bool = True) -> None:
+        if not record:
+            return
+        for stage, ms in self._turn.items():
+            self.samples[stage].append(ms)
+        self.samples["turn"].append(total_ms)
+        self.samples["overhead"].append(total_ms - self._turn.get("llm", 0.0))
+
+    def restore(self) -> None:
+        for owner, attr, orig in reversed(self._restore):
+            setattr(owner, attr, orig)
+        self._restore.clear()
+
+
+@contextmanager
+def isolated_env(workdir: Path) -> Iterator[Dict[str, Path]]:
+    """Point every DB / store the agent touches at workdir (Docker /app override included)."""
+    import app.config  # noqa: F401  (loads .env first so the overrides below win)
+    import shared.db_path
+    import shared.memory
+    from dashboard.app import db as dashboard_db
+    from shared.llm_gateway import reset_gateway
+    from woody.app.db import init_db
+
+    paths = {
+        "woody_db": workdir / "woody.db",
+        "dashboard_db": workdir / "dashboard.db",
+        "memory": workdir / "chroma",
+    }
+    env = {
+        "WOODY_DB_PATH": str(paths["woody_db"]),
+        "DASHBOARD_DB_PATH": str(paths["dashboard_db"]),
+        "MEMORY_DB_PATH": str(paths["memory"]),
+        "MEMORY_EMBEDDING": "hash",
+        "WOODY_PREFETCH": os.environ.get("WOODY_PREFETCH", ""),
+    }
+    saved_env = {k: os.environ.get(k) for k in env}
+    saved = (shared.db_path._DOCKER_DB, shared.memory.MEMORY_DB_PATH, dashboard_db.DB_PATH)
+    os.environ.update(env)
+    shared.db_path._DOCKER_DB = paths["woody_db"]
+    shared.memory.MEMORY_DB_PATH = paths["memory"]
+    dashboard_db.DB_PATH = paths["dashboard_db"]
+    try:
+        init_db(paths["woody_db"])
+        dashboard_db.init_db()
+        import sqlite3
+        conn = sqlite3.connect(str(paths["dashboard_db"]))
+        conn.execute("UPDATE about_me SET content = ? WHERE id = 1", (SEED_ABOUT_ME,))
+        conn.commit()
+        conn.close()
+        for text, weight in SEED_MEMORIES:
+            shared.memory.memory_add(text, weight=weight)
+        yield paths
+    finally:
+        shared.db_path._DOCKER_DB, shared.memory.MEMORY_DB_PATH, dashboard_db.DB_PATH = saved
+        for k, v in saved_env.items():
+            if v is None:
+                os.environ.pop(k, None)
+            else:
+                os.environ[k] = v
+        reset_gateway()
+
+
+def _instrument(timer: StageTimer) -> None:
+    import app.agent
+    import shared.about_me
+    import shared.memory
+    import shared.usage_metrics
+
+    timer.wrap(app.agent, "get_messages", "history")
+    timer.wrap(shared.memory, "memory_search", "memory")
+    timer.wrap(shared.memory, "memory_touch_on_search", "memory")
+    timer.wrap(shared.about_me, "get_about_me", "about_me")
+    timer.wrap(app.agent, "_resolve_date_phrases", "date_parse")
+    timer.wrap(app.agent, "get_openai_tools", "tool_schema")
+    timer.wrap(app.agent, "execute_tool", "tools")
+    timer.wrap(app.agent, "chat_completion", "llm")
+    timer.wrap(app.agent, "add_message", "persist")
+    timer.wrap(shared.usage_metrics.TurnMetrics, "save", "metrics")
+
+
+def run_benchmark(
+    corpus: List[dict],
+    iterations: int = 3,
+    warmup: int = 1,
+    alloc: bool = True,
+    workdir: Optional[Path] = None,
+) -> Dict[str, Any]:
+    """Replay the corpus `warmup + iterations` times; return per-stage stats (ms) and allocations (KiB)."""
+    from tests.fake_openai import FakeOpenAIServer
+
+    tmp = None
+    if workdir is None:
+        tmp = tempfile.TemporaryDirectory(prefix="woody-bench-")
+        workdir = Path(tmp.name)
+    timer = StageTimer()
+    alloc_peak: List[float] = []
+    alloc_retained: List[float] = []
+    turns = 0
+    try:
+        with FakeOpenAIServer() as server, isolated_env(workdir) as paths:
+            os.environ["OPENAI_BASE_URL"] = server.base_url
+            from shared.llm_gateway import reset_gateway
+            reset_gateway()
+            from app.agent import run_agent
+            _instrument(timer)
+
+            def replay(record: bool, trace: bool) -> int:
+                n = 0
+                for convo in corpus:
+                    for turn in convo["turns"]:
+                        server.extend(turn["llm"])
+                        if trace:
+                            tracemalloc.reset_peak()
+                            before = tracemalloc.get_traced_memory()[0]
+                        timer.begin_turn()
+                        started = time.perf_counter()
+                        run_agent(turn["user"], "sk-bench", paths["woody_db"], convo["chat_id"])
+                        timer.end_turn((time.perf_counter() - started) * 1000, record=record)
+                        if trace:
+                            current, peak = tracemalloc.get_traced_memory()
+                            alloc_peak.append((peak - before) / 1024)
+                            alloc_retained.append((current - before) / 1024)
+                        n += 1
+                return n
+
+            for _ in range(warmup):
+                replay(record=False, trace=False)
+            for _ in range(iterations):
+                turns += replay(record=True, trace=False)
+            if alloc:
+                tracemalloc.start()
+                try:
+                    replay(record=False, trace=True)
+                finally:
+                    tracemalloc.stop()
+            llm_requests = len(server.requests)
+    finally:
+        timer.restore()
+        os.environ.pop("OPENAI_BASE_URL", None)
+        if tmp is not None:
+            tmp.cleanup()
+
+    stages = {
+        stage: {
+            "count": len(vals),
+            "p50_ms": _pct(vals, 0.50),
+            "p95_ms": _pct(vals, 0.95),
+            "mean_ms": round(sum(vals) / len(vals), 2),
+        }
+        for stage, vals in sorted(timer.samples.items())
+    }
+    return {
+        "turns": turns,
+        "llm_requests": llm_requests,
+        "stages": stages,
+        "alloc_kib": {
+            "peak_p50": _pct(alloc_peak, 0.50),
+            "peak_p95": _pct(alloc_peak, 0.95),
+            "retained_p50": _pct(alloc_retained, 0.50),
+        } if alloc else None,
+    }
+
+
+def _print_report(report: Dict[str, Any]) -> None:
+    print(f"Turns measured: {report['turns']}  (fake LLM requests: {report['llm_requests']})")
+    print(f"{'stage':<12} {'count':>6} {'p50 ms':>9} {'p95 ms':>9} {'mean ms':>9}")
+    for stage, s in report["stages"].items():
+        print(f"{stage:<12} {s['count']:>6} {s['p50_ms']:>9} {s['p95_ms']:>9} {s['mean_ms']:>9}")
+    if report["alloc_kib"]:
+        a = report["alloc_kib"]
+        print(f"Allocations per turn (KiB): peak p50={a['peak_p50']} p95={a['peak_p95']}, retained p50={a['retained_p50']}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Replay benchmark for the Woody agent loop")
+    parser.add_argument("--corpus", type=Path, default=DEFAULT_CORPUS)
+    parser.add_argument("--iterations", type=int, default=5, help="Measured passes over the corpus")
+    parser.add_argument("--warmup", type=int, default=1, help="Unmeasured passes first (imports, caches)")
+    parser.add_argument("--no-alloc", action="store_true", help="Skip the tracemalloc pass")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    parser.add_argument("--max-overhead-p95-ms", type=float, default=None,
+                        help="Exit 1 if p95 non-LLM overhead per turn exceeds this")
+    args = parser.parse_args(argv)
+
+    report = run_benchmark(load_corpus(args.corpus), iterations=args.iterations, warmup=args.warmup, alloc=not args.no_alloc)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        _print_report(report)
+    budget = args.max_overhead_p95_ms
+    overhead = report["stages"].get("overhead", {}).get("p95_ms")
+    if budget is not None and overhead is not None and overhead > budget:
+        print(f"REGRESSION: overhead p95 {overhead} ms > budget {budget} ms", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Benchmark for email event extraction (shared.email_events).
+
+Builds a synthetic inbox (deterministic; default 10,000 messages): a mix of newsletters and
+receipts without events and messages mentioning meetings, bills and appointments in all the
+supported date forms. Each message has a Date header and the date it actually refers to.
+Compares the old scan (ten separate regexes per message, event always dated today) with
+the single-pass matcher: µs per message, how many messages were flagged, and how many
+suggestions land on the right day.
+
+    python scripts/bench_email_events.py
+    python scripts/bench_email_events.py --messages 50000 --json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import re
+import sys
+import time
+from datetime import date, datetime, timedelta, timezone
+from email.utils import format_datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+_root = Path(__file__).resolve().parent.parent
+if str(_root) not in sys.path:
+    sys.path.insert(0, str(_root))
+
+from shared.email_events import extract_event, parse_email_date  # noqa: E402
+
+# The per-message scan propose_events_from_emails used before the single-pass matcher
+LEGACY_PATTERNS = [
+    re.compile(r"\b(remind|reminder)\b", re.I),
+    re.compile(r"\b(todo|to-do|to do)\b", re.I),
+    re.compile(r"\b(meeting|call|call with)\b", re.I),
+    re.compile(r"\b(appointment|schedule)\b", re.I),
+    re.compile(r"\b(follow.?up|followup)\b", re.I),
+    re.compile(r"\b(deadline|due)\b", re.I),
+    re.compile(r"\b(monday|tuesday|wednesday|thursday|friday|saturday|sunday)\b", re.I),
+    re.compile(r"\b(jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\s+\d{1,2}", re.I),
+    re.compile(r"\d{1,2}/\d{1,2}(/\d{2,4})?", re.I),
+    re.compile(r"\d{4}-\d{2}-\d{2}", re.I),
+]
+
+_WEEKDAYS = ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday")
+_FILLER = [
+    "Your weekly digest is here", "Thanks for your order", "New sign-in to your account",
+    "Photos from the weekend", "Your receipt from the hardware store", "Newsletter: fall recipes",
+    "Password changed successfully", "Invitation to connect", "Shipping update for your package",
+]
+_SNIPPETS = [
+    "Lorem ipsum dolor sit amet, consectetur adipiscing elit, sed do eiusmod tempor.",
+    "We wanted to let you know about some changes to our terms and our privacy policy.",
+    "Reply to this email if you have any questions, our team is happy to help you out.",
+]
+
+
+def build_corpus(n: int, seed: int = 7) -> List[Dict[str, Any]]:
+    """n messages; ~40% mention an event. `expected` = the day the event is on (None = no event)."""
+    rng = random.Random(seed)
+    start = date(2026, 1, 5)
+    corpus = []
+    for _ in range(n):
+        sent = start + timedelta(days=rng.randrange(300))
+        header = format_datetime(datetime(sent.year, sent.month, sent.day, 9, 15, tzinfo=timezone.utc))
+        msg = {"subject": rng.choice(_FILLER), "snippet": rng.choice(_SNIPPETS), "date": header, "expected": None}
+        if rng.random() < 0.4:
+            target = sent + timedelta(days=rng.randrange(1, 7))
+            form = rng.randrange(5)
+            if form == 0:
+                when = _WEEKDAYS[target.weekday()]
+            elif form == 1:
+                when = target.strftime("%b ") + str(target.day)
+            elif form == 2:
+                when = f"{target.month}/{target.day}"
+            elif form == 3:
+                when = target.isoformat()
+            else:
+                target = sent + timedelta(days=1)
+                when = "tomorrow"
+            what = rng.choice(["Dentist appointment", "Parent-teacher meeting", "Water bill due", "Call with Sam"])
+            msg["subject"] = f"{what} {when}"
+            msg["expected"] = target.isoformat()
+        corpus.append(msg)
+    return corpus
+
+
+def _legacy(msg: Dict[str, Any]) -> Optional[str]:
+    combined = f"{msg['subject']} {msg['snippet']}"[:300]
+    for pat in LEGACY_PATTERNS:
+        if pat.search(combined):
+            return date.today().isoformat()
+    return None
+
+
+def _single_pass(msg: Dict[str, Any]) -> Optional[str]:
+    found = extract_event(f"{msg['subject']} {msg['snippet']}"[:300], sent=parse_email_date(msg["date"]))
+    return found.date if found else None
+
+
+def _measure(fn: Callable[[Dict[str, Any]], Optional[str]], corpus: List[Dict[str, Any]], repeat: int) -> Dict[str, Any]:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        results = [fn(m) for m in corpus]
+        best = min(best, time.perf_counter() - t0)
+    events = [m for m in corpus if m["expected"]]
+    return {
+        "us_per_message": round(best / len(corpus) * 1e6, 2),
+        "flagged": sum(1 for r in results if r),
+        "false_positives": sum(1 for m, r in zip(corpus, results) if r and not m["expected"]),
+        "right_day": sum(1 for m, r in zip(corpus, results) if m["expected"] and r == m["expected"]),
+        "events": len(events),
+    }
+
+
+def run_benchmark(messages: int = 10000, repeat: int = 3, seed: int = 7) -> Dict[str, Any]:
+    corpus = build_corpus(messages, seed)
+    legacy = _measure(_legacy, corpus, repeat)
+    single = _measure(_single_pass, corpus, repeat)
+    return {
+        "messages": messages,
+        "legacy": legacy,
+        "single_pass": single,
+        "speedup": round(legacy["us_per_message"] / single["us_per_message"], 2) if single["us_per_message"] else None,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark email event extraction")
+    parser.add_argument("--messages", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=3, help="Timed passes; the fastest is reported")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args(argv)
+    report = run_benchmark(args.messages, args.repeat, args.seed)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return 0
+    print(f"{report['messages']} messages")
+    for name in ("legacy", "single_pass"):
+        r = report[name]
+        print(
+            f"  {name:<12} {r['us_per_message']:>8.2f} µs/msg  flagged {r['flagged']}"
+            f" (false positives {r['false_positives']})  right day {r['right_day']}/{r['events']}"
+        )
+    print(f"  speedup      {report['speedup']}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
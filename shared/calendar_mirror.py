@@ -0,0 +1,375 @@
+"""
+Local mirror of Google Calendar events (dashboard DB).
+
+Reads used to call the Calendar API live (dashboard /api/events/calendar, Woody's
+calendar_today, the EVENTS agent via the dashboard API). Now the `calendar_sync` job keeps
+calendar_events current and every read is a local query:
+
+- The first sync lists events from CALENDAR_MIRROR_DAYS_BACK (default 30) days ago onward and
+  stores the nextSyncToken Google returns.
+- Later syncs send only that syncToken and apply the changes (cancelled events are deleted).
+- If Google answers 410 Gone (token expired or invalidated), the mirror is rebuilt with a full sync.
+- Events Woody / the dashboard create are written to the mirror right away (record_event).
+
+calendar_sync_state records when each calendar was last synced, so readers can show how
+fresh the data is (mirror_status).
+"""
+
+from __future__ import annotations
+
+import os
+import sqlite3
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+DEFAULT_CALENDAR = "primary"
+PAGE_SIZE = 2500  # Calendar API maximum
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS calendar_events (
+    calendar_id TEXT NOT NULL,
+    event_id TEXT NOT NULL,
+    summary TEXT NOT NULL DEFAULT '',
+    description TEXT NOT NULL DEFAULT '',
+    start_date TEXT NOT NULL,
+    start_utc TEXT NOT NULL,
+    end_utc TEXT NOT NULL,
+    all_day INTEGER NOT NULL DEFAULT 0,
+    start_raw TEXT NOT NULL DEFAULT '',
+    updated TEXT,
+    PRIMARY KEY (calendar_id, event_id)
+);
+CREATE INDEX IF NOT EXISTS idx_calendar_events_start ON calendar_events(calendar_id, start_utc);
+CREATE TABLE IF NOT EXISTS calendar_sync_state (
+    calendar_id TEXT PRIMARY KEY,
+    sync_token TEXT,
+    last_sync_at TEXT,
+    last_full_sync_at TEXT,
+    last_error TEXT
+);
+"""
+
+
+def _get_dashboard_db_path() -> Path:
+    default = Path(__file__).resolve().parent.parent / "dashboard" / "dashboard.db"
+    return Path(os.environ.get("DASHBOARD_DB_PATH", str(default)))
+
+
+def _days_back() -> int:
+    try:
+        return max(0, int(os.environ.get("CALENDAR_MIRROR_DAYS_BACK", "30")))
+    except ValueError:
+        return 30
+
+
+def sync_interval_minutes() -> int:
+    try:
+        return max(1, int(os.environ.get("CALENDAR_SYNC_INTERVAL_MINUTES", "10")))
+    except ValueError:
+        return 10
+
+
+def _conn(db_path: Optional[Path]) -> sqlite3.Connection:
+    path = db_path or _get_dashboard_db_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(path), timeout=30)
+    conn.row_factory = sqlite3.Row
+    conn.executescript(_SCHEMA)
+    return conn
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _iso(dt: datetime) -> str:
+    return dt.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _utc(when: Dict[str, Any]) -> str:
+    """Event start/end -> UTC ISO string; all-day dates count from midnight UTC."""
+    if when.get("dateTime"):
+        dt = datetime.fromisoformat(when["dateTime"].replace("Z", "+00:00"))
+        if dt.tzinfo is None:
+            dt = dt.replace(tzinfo=timezone.utc)
+        return _iso(dt)
+    return f"{when.get('date', '')[:10]}T00:00:00Z"
+
+
+def _row(calendar_id: str, e: Dict[str, Any]) -> Optional[tuple]:
+    start, end = e.get("start") or {}, e.get("end") or {}
+    start_raw = start.get("dateTime") or start.get("date") or ""
+    if len(start_raw) < 10:
+        return None
+    start_utc = _utc(start)
+    return (
+        calendar_id,
+        e["id"],
+        e.get("summary") or "(no title)",
+        e.get("description") or "",
+        start_raw[:10],
+        start_utc,
+        _utc(end) if end else start_utc,
+        0 if start.get("dateTime") else 1,
+        start_raw,
+        e.get("updated"),
+    )
+
+
+def _build_service():
+    from googleapiclient.discovery import build
+    from shared.google_tokens import get_credentials
+    creds, err = get_credentials()
+    if err:
+        raise RuntimeError(err)
+    return build("calendar", "v3", credentials=creds, cache_discovery=False)
+
+
+def _is_gone(e: Exception) -> bool:
+    return getattr(getattr(e, "resp", None), "status", None) == 410
+
+
+def _list_pages(service, **params):
+    """Yield (items, nextSyncToken) per page; only the last page carries the token."""
+    page_token = None
+    while True:
+        resp = service.events().list(pageToken=page_token, maxResults=PAGE_SIZE, **params).execute()
+        yield resp.get("items", []), resp.get("nextSyncToken")
+        page_token = resp.get("nextPageToken")
+        if not page_token:
+            return
+
+
+_UPSERT = """INSERT INTO calendar_events
+    (calendar_id, event_id, summary, description, start_date, start_utc, end_utc, all_day, start_raw, updated)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(calendar_id, event_id) DO UPDATE SET
+        summary = excluded.summary, description = excluded.description, start_date = excluded.start_date,
+        start_utc = excluded.start_utc, end_utc = excluded.end_utc, all_day = excluded.all_day,
+        start_raw = excluded.start_raw, updated = excluded.updated"""
+
+
+def _apply(conn: sqlite3.Connection, calendar_id: str, items: List[dict]) -> Dict[str, int]:
+    upserts, deletes = [], []
+    for e in items:
+        if not e.get("id"):
+            continue
+        row = None if e.get("status") == "cancelled" else _row(calendar_id, e)
+        if row is None:
+            deletes.append((calendar_id, e["id"]))
+        else:
+            upserts.append(row)
+    conn.executemany(_UPSERT, upserts)
+    conn.executemany("DELETE FROM calendar_events WHERE calendar_id = ? AND event_id = ?", deletes)
+    return {"upserted": len(upserts), "deleted": len(deletes)}
+
+
+def _save_state(conn: sqlite3.Connection, calendar_id: str, token: Optional[str], full: bool) -> None:
+    now = _iso(_now())
+    conn.execute(
+        """INSERT INTO calendar_sync_state (calendar_id, sync_token, last_sync_at, last_full_sync_at, last_error)
+           VALUES (?, ?, ?, ?, NULL)
+           ON CONFLICT(calendar_id) DO UPDATE SET
+               sync_token = excluded.sync_token, last_sync_at = excluded.last_sync_at, last_error = NULL,
+               last_full_sync_at = COALESCE(excluded.last_full_sync_at, calendar_sync_state.last_full_sync_at)""",
+        (calendar_id, token, now, now if full else None),
+    )
+
+
+def _full_sync(conn: sqlite3.Connection, service, calendar_id: str) -> Dict[str, Any]:
+    time_min = _iso(_now() - timedelta(days=_days_back()))
+    seen, token, stats = set(), None, {"upserted": 0, "deleted": 0}
+    for items, next_token in _list_pages(service, calendarId=calendar_id, singleEvents=True, timeMin=time_min):
+        seen.update(e["id"] for e in items if e.get("id") and e.get("status") != "cancelled")
+        with conn:
+            for k, v in _apply(conn, calendar_id, items).items():
+                stats[k] += v
+        token = next_token or token
+    with conn:
+        stale = [
+            (calendar_id, r[0])
+            for r in conn.execute("SELECT event_id FROM calendar_events WHERE calendar_id = ?", (calendar_id,))
+            if r[0] not in seen
+        ]
+        conn.executemany("DELETE FROM calendar_events WHERE calendar_id = ? AND event_id = ?", stale)
+        stats["deleted"] += len(stale)
+        _save_state(conn, calendar_id, token, full=True)
+    return {"mode": "full", **stats}
+
+
+def _incremental_sync(conn: sqlite3.Connection, service, calendar_id: str, token: str) -> Dict[str, Any]:
+    # Collect every page first: the new token is only valid once all changes are applied
+    items, next_token = [], None
+    for page, page_token in _list_pages(service, calendarId=calendar_id, singleEvents=True, syncToken=token):
+        items.extend(page)
+        next_token = page_token or next_token
+    with conn:
+        stats = _apply(conn, calendar_id, items)
+        _save_state(conn, calendar_id, next_token or token, full=False)
+    return {"mode": "incremental", **stats}
+
+
+def sync_calendar(
+    calendar_id: str = DEFAULT_CALENDAR,
+    db_path: Optional[Path] = None,
+    service=None,
+    full: bool = False,
+) -> Dict[str, Any]:
+    """
+    Bring the mirror up to date. Incremental when a syncToken is stored, full otherwise
+    (or when full=True, or when Google rejects the token with 410).
+    Returns {"mode", "upserted", "deleted"}; raises on API errors (recorded in last_error).
+    """
+    conn = _conn(db_path)
+    try:
+        row = conn.execute(
+            "SELECT sync_token FROM calendar_sync_state WHERE calendar_id = ?", (calendar_id,)
+        ).fetchone()
+        token = None if full or row is None else row["sync_token"]
+        try:
+            service = service or _build_service()
+            if token:
+                try:
+                    return _incremental_sync(conn, service, calendar_id, token)
+                except Exception as e:
+                    if not _is_gone(e):
+                        raise
+                    print(f"[CalendarMirror] Sync token for {calendar_id} expired; doing a full sync")
+            return _full_sync(conn, service, calendar_id)
+        except Exception as e:
+            with conn:
+                conn.execute(
+                    """INSERT INTO calendar_sync_state (calendar_id, last_error) VALUES (?, ?)
+                       ON CONFLICT(calendar_id) DO UPDATE SET last_error = excluded.last_error""",
+                    (calendar_id, str(e)[:500]),
+                )
+            raise
+    finally:
+        conn.close()
+
+
+def record_event(
+    event: Dict[str, Any],
+    calendar_id: str = DEFAULT_CALENDAR,
+    db_path: Optional[Path] = None,
+    service=None,
+) -> None:
+    """
+    Put an event just created through the API into the mirror, so reads see it before the
+    next scheduled sync. A recurring event is expanded into instances by Google (the mirror
+    stores instances), so that triggers a sync instead. Best effort: on failure the next
+    calendar_sync picks the event up.
+    """
+    try:
+        if event.get("recurrence"):
+            sync_calendar(calendar_id, db_path, service)
+            return
+        conn = _conn(db_path)
+        try:
+            with conn:
+                _apply(conn, calendar_id, [event])
+        finally:
+            conn.close()
+    except Exception as e:
+        print(f"[CalendarMirror] Could not add created event {event.get('id')} to the mirror: {e}")
+
+
+def mirror_status(calendar_id: str = DEFAULT_CALENDAR, db_path: Optional[Path] = None) -> Dict[str, Any]:
+    """
+    Freshness of the mirror: synced (ever), last_sync_at, age_seconds, stale (no successful
+    sync within 3 sync intervals), event count and the last error, if any.
+    """
+    row, count = None, 0
+    if (db_path or _get_dashboard_db_path()).exists():
+        conn = _conn(db_path)
+        try:
+            row = conn.execute("SELECT * FROM calendar_sync_state WHERE calendar_id = ?", (calendar_id,)).fetchone()
+            count = conn.execute(
+                "SELECT COUNT(*) FROM calendar_events WHERE calendar_id = ?", (calendar_id,)
+            ).fetchone()[0]
+        finally:
+            conn.close()
+    last = row["last_sync_at"] if row else None
+    age = None
+    if last:
+        age = int((_now() - datetime.fromisoformat(last.replace("Z", "+00:00"))).total_seconds())
+    return {
+        "calendar_id": calendar_id,
+        "synced": last is not None,
+        "last_sync_at": last,
+        "last_full_sync_at": row["last_full_sync_at"] if row else None,
+        "age_seconds": age,
+        "stale": age is None or age > 3 * sync_interval_minutes() * 60,
+        "events": count,
+        "last_error": row["last_error"] if row else None,
+    }
+
+
+def ensure_synced(calendar_id: str = DEFAULT_CALENDAR, db_path: Optional[Path] = None) -> Dict[str, Any]:
+    """Status of the mirror, syncing first if it has never been synced (first read after setup)."""
+    status = mirror_status(calendar_id, db_path)
+    if not status["synced"]:
+        sync_calendar(calendar_id, db_path)
+        status = mirror_status(calendar_id, db_path)
+    return status
+
+
+def get_events_between(
+    time_min: datetime,
+    time_max: datetime,
+    calendar_id: str = DEFAULT_CALENDAR,
+    db_path: Optional[Path] = None,
+) -> List[dict]:
+    """Mirrored events overlapping [time_min, time_max), soonest first."""
+    if not (db_path or _get_dashboard_db_path()).exists():
+        return []
+    conn = _conn(db_path)
+    try:
+        rows = conn.execute(
+            """SELECT event_id, summary, description, start_date, start_raw, start_utc, end_utc, all_day
+               FROM calendar_events
+               WHERE calendar_id = ? AND start_utc < ? AND (end_utc > ? OR start_utc >= ?)
+               ORDER BY start_utc, summary""",
+            (calendar_id, _iso(time_max), _iso(time_min), _iso(time_min)),
+        ).fetchall()
+    finally:
+        conn.close()
+    return [
+        {
+            "id": r["event_id"],
+            "date": r["start_date"],
+            "start": r["start_raw"],
+            "title": r["summary"],
+            "description": r["description"],
+            "all_day": bool(r["all_day"]),
+            "event_type": "calendar",
+            "source": "google",
+        }
+        for r in rows
+    ]
+
+
+def get_events_for_dates(
+    since: date,
+    until: date,
+    calendar_id: str = DEFAULT_CALENDAR,
+    db_path: Optional[Path] = None,
+) -> List[dict]:
+    """Mirrored events overlapping the days since..until (inclusive, UTC)."""
+    start = datetime(since.year, since.month, since.day, tzinfo=timezone.utc)
+    end = datetime(until.year, until.month, until.day, tzinfo=timezone.utc) + timedelta(days=1)
+    return get_events_between(start, end, calendar_id, db_path)
+
+
+def format_age(seconds: Optional[int]) -> str:
+    """'just now', '5 min ago', '3 h ago', 'never'."""
+    if seconds is None:
+        return "never"
+    if seconds < 60:
+        return "just now"
+    if seconds < 3600:
+        return f"{seconds // 60} min ago"
+    if seconds < 2 * 86400:
+        return f"{seconds // 3600} h ago"
+    return f"{seconds // 86400} days ago"
@@ -0,0 +1,157 @@
+"""
+Event extraction from email subject + snippet (used by the EVENTS agent).
+
+One compiled alternation finds, in a single pass over the text, event keywords (meeting,
+reminder, deadline, ...) and date/time expressions: ISO dates, m/d[/y], "Oct 20[, 2026]",
+"20 October", weekdays ("Friday", "next Tue"), today / tonight / tomorrow and times
+("3pm", "10:30 am", "at 14:00"). Dates are resolved against the email's Date header, not
+the day the agent happens to run: "Friday" in a mail sent on Wednesday Oct 14 is Oct 16.
+
+- A year-less date more than 30 days before the email rolls over to next year ("Jan 5" sent in December).
+- m/d is read US-style (month first), falling back to d/m when the month part is > 12.
+- Without any date expression the event is dated the day the email was sent.
+"""
+
+from __future__ import annotations
+
+import re
+from datetime import date, datetime, timedelta
+from email.utils import parsedate_to_datetime
+from typing import NamedTuple, Optional
+
+_MONTHS = ("jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec")
+_WEEKDAYS = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+
+_MONTH_NAME = (
+    r"(?:jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?|aug(?:ust)?"
+    r"|sep(?:t(?:ember)?)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?)"
+)
+_WEEKDAY_NAME = (
+    # Full names, plus abbreviations that aren't everyday words (no mon/wed/sat/sun)
+    r"(?:monday|tue(?:s(?:day)?)?|wednesday|thu(?:rs(?:day)?)?|fri(?:day)?|saturday|sunday)"
+)
+
+# One word-start check, then only the branches that can start with that character
+# (digit / letter, then first-letter lookaheads): most positions fail at \b and most
+# words fail on their first letter, instead of every branch being tried everywhere.
+_MATCHER = re.compile(
+    r"""
+    \b(?:
+      (?=\d)(?:
+          (?P<iso>(?P<iso_y>\d{4})-(?P<iso_m>\d{2})-(?P<iso_d>\d{2})\b)
+        | (?P<num>(?P<num_a>\d{1,2})/(?P<num_b>\d{1,2})(?:/(?P<num_y>\d{4}|\d{2}))?\b)
+        | (?P<dm>(?P<dm_d>\d{1,2})(?:st|nd|rd|th)?\s+(?:of\s+)?(?P<dm_m>""" + _MONTH_NAME + r""")\b(?:,?\s+(?P<dm_y>\d{4})\b)?)
+        | (?P<time>(?P<t_h>[01]?\d|2[0-3])(?::(?P<t_m>[0-5]\d))?\s*(?P<t_ap>[ap]\.?m\.?)(?!\w))
+      )
+    | (?=[a-z])(?:
+          (?=[adfjmnos])(?P<md>(?P<md_m>""" + _MONTH_NAME + r""")\.?\s+(?P<md_d>\d{1,2})(?:st|nd|rd|th)?\b(?:,?\s+(?P<md_y>\d{4})\b)?)
+        | (?=[mtwfsn])(?P<wd>(?:(?:next|this)\s+)?(?P<wd_name>""" + _WEEKDAY_NAME + r""")\b)
+        | (?=t)(?P<rel>(?:today|tonight|tomorrow)\b)
+        | (?=a)(?P<at>at\s+(?P<t24_h>[01]?\d|2[0-3]):(?P<t24_m>[0-5]\d)\b)
+        | (?=[rtmcasfd])(?P<kw>(?:remind(?:er)?|to-?\s?do|meeting|call(?:\s+with)?|appointment|schedule|follow.?up|followup|deadline|due)\b)
+      )
+    )
+    """,
+    re.I | re.X,
+)
+
+
+class EmailEvent(NamedTuple):
+    date: str  # yyyy-mm-dd
+    time: str  # HH:MM, or "" if the text has no time
+    matched: str  # the expression the date came from ("" = email sent date)
+
+
+_HEADER_DATE = re.compile(r"\b(\d{1,2})\s+(" + "|".join(_MONTHS) + r")[a-z]*\s+(\d{4})\b", re.I)
+
+
+def parse_email_date(header: str) -> Optional[date]:
+    """Date from an RFC 2822 Date header (Gmail/Yahoo), or an ISO-ish string; None if unparseable."""
+    h = (header or "").strip()
+    if not h:
+        return None
+    m = _HEADER_DATE.search(h[:40])  # "Wed, 14 Oct 2026 09:12:00 -0700": the sender's calendar day
+    if m:
+        parsed = _safe_date(int(m.group(3)), _MONTHS.index(m.group(2)[:3].lower()) + 1, int(m.group(1)))
+        if parsed:
+            return parsed
+    try:
+        return parsedate_to_datetime(h).date()
+    except (TypeError, ValueError, IndexError):
+        pass
+    try:
+        return datetime.fromisoformat(h.replace("Z", "+00:00")).date()
+    except ValueError:
+        return None
+
+
+def _safe_date(y: int, m: int, d: int) -> Optional[date]:
+    try:
+        return date(y, m, d)
+    except ValueError:
+        return None
+
+
+def _with_year(m: int, d: int, year: Optional[str], base: date) -> Optional[date]:
+    if year:
+        y = int(year)
+        return _safe_date(y + 2000 if y < 100 else y, m, d)
+    resolved = _safe_date(base.year, m, d)
+    if resolved and resolved < base - timedelta(days=30):
+        resolved = _safe_date(base.year + 1, m, d)
+    return resolved
+
+
+def _resolve(m: re.Match, base: date) -> Optional[date]:
+    if m.group("iso"):
+        return _safe_date(int(m.group("iso_y")), int(m.group("iso_m")), int(m.group("iso_d")))
+    if m.group("num"):
+        a, b = int(m.group("num_a")), int(m.group("num_b"))
+        month, day = (a, b) if a <= 12 else (b, a)
+        return _with_year(month, day, m.group("num_y"), base)
+    if m.group("md"):
+        return _with_year(_MONTHS.index(m.group("md_m")[:3].lower()) + 1, int(m.group("md_d")), m.group("md_y"), base)
+    if m.group("dm"):
+        return _with_year(_MONTHS.index(m.group("dm_m")[:3].lower()) + 1, int(m.group("dm_d")), m.group("dm_y"), base)
+    if m.group("wd"):
+        ahead = (_WEEKDAYS.index(m.group("wd_name")[:3].lower()) - base.weekday()) % 7 or 7
+        return base + timedelta(days=ahead)
+    if m.group("rel"):
+        return base + timedelta(days=1) if m.group("rel").lower() == "tomorrow" else base
+    return None
+
+
+def _time(m: re.Match) -> str:
+    if m.group("t24_h"):
+        return f"{int(m.group('t24_h')):02d}:{m.group('t24_m')}"
+    h = int(m.group("t_h"))
+    if h > 12:
+        return ""
+    h = h % 12 + (12 if m.group("t_ap").lower().startswith("p") else 0)
+    return f"{h:02d}:{m.group('t_m') or '00'}"
+
+
+def extract_event(text: str, sent: Optional[date] = None) -> Optional[EmailEvent]:
+    """
+    Scan text once. Returns an EmailEvent if it mentions an event keyword or a date/time,
+    dated by the first resolvable date expression (else the sent date, else today), or None.
+    """
+    base = sent or date.today()
+    found = False
+    when: Optional[date] = None
+    matched = ""
+    at = ""
+    for m in _MATCHER.finditer(text or ""):
+        found = True
+        if m.group("kw"):
+            continue
+        if m.group("time") or m.group("at"):
+            at = at or _time(m)
+        elif when is None:
+            when = _resolve(m, base)
+            matched = m.group(0) if when else ""
+        if when is not None and at:
+            break  # nothing left to learn from the rest of the text
+    if not found:
+        return None
+    return EmailEvent((when or base).isoformat(), at, matched)
@@ -0,0 +1,205 @@
+"""
+Near-duplicate detection for events ("Dentist - Jack" vs "Jack dentist appt").
+
+Titles become character-trigram signatures over their normalized words:
+- lowercase, punctuation dropped, common abbreviations expanded, filler words removed.
+- Word order doesn't matter.
+
+Two titles match when the blend of Jaccard similarity and containment (shared trigrams over
+the smaller signature) reaches the threshold. Containment lets a title match a longer
+version of itself; Jaccard keeps a lone word ("Jack") from matching everything that
+mentions it.
+
+Comparisons are blocked by date: only events whose dates are at most window_days apart are
+compared, and within a block an inverted index over each title's rarest trigrams finds the
+candidates (prefix filtering). No pair loop, so 100k events take seconds.
+
+- find_duplicates(events): groups of likely duplicates (dashboard /api/events/duplicates)
+- DuplicateIndex: incremental "is this already on the calendar?" checks (Google/dashboard
+  merge in get_all_events, scheduled-template processing)
+- titles_match(a, b): one-off checks (email suggestions vs the dashboard day)
+"""
+
+from __future__ import annotations
+
+import math
+import re
+from collections import Counter, defaultdict
+from datetime import date
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+DEFAULT_THRESHOLD = 0.7
+
+_WORD = re.compile(r"[a-z0-9]+")
+_ABBREVIATIONS = {
+    "appt": "appointment", "appts": "appointment", "apt": "appointment",
+    "mtg": "meeting", "mtgs": "meeting", "dr": "doctor", "doc": "doctor",
+    "bday": "birthday", "bdays": "birthday", "dentists": "dentist",
+}
+_STOPWORDS = frozenset(("a", "an", "the", "and", "with", "for", "at", "on", "in", "of", "to", "re", "fwd", "fw"))
+
+
+def normalize_words(title: str) -> List[str]:
+    """Lowercased words, abbreviations expanded, filler words dropped, sorted and unique."""
+    words = {_ABBREVIATIONS.get(w, w) for w in _WORD.findall((title or "").lower())}
+    return sorted(w for w in words if w not in _STOPWORDS)
+
+
+@lru_cache(maxsize=65536)  # calendars repeat titles a lot (recurring events, templates)
+def signature(title: str) -> FrozenSet[str]:
+    """Character trigrams of each normalized word, padded so word starts/ends count."""
+    grams = set()
+    for w in normalize_words(title):
+        padded = f" {w} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return frozenset(grams)
+
+
+def similarity(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    """Mean of Jaccard and containment of two signatures (0..1)."""
+    if not a or not b:
+        return 0.0
+    shared = len(a & b)
+    return _score(shared, len(a), len(b))
+
+
+def _score(shared: int, n_a: int, n_b: int) -> float:
+    return 0.5 * shared / (n_a + n_b - shared) + 0.5 * shared / min(n_a, n_b)
+
+
+def titles_match(a: str, b: str, threshold: float = DEFAULT_THRESHOLD) -> bool:
+    return similarity(signature(a), signature(b)) >= threshold
+
+
+def _day(value: Any) -> Optional[int]:
+    """yyyy-mm-dd... -> date ordinal (for window arithmetic), None if missing/invalid."""
+    try:
+        return date.fromisoformat(str(value or "")[:10]).toordinal()
+    except ValueError:
+        return None
+
+
+class DuplicateIndex:
+    """
+    Events indexed by day and trigram. find() returns the best existing match for a title
+    on a date (within window_days), scoring only events that share a trigram with it.
+    """
+
+    def __init__(self, window_days: int = 0, threshold: float = DEFAULT_THRESHOLD):
+        self.window_days = window_days
+        self.threshold = threshold
+        self._items: List[Tuple[FrozenSet[str], Any]] = []
+        self._by_day: Dict[int, Dict[str, List[int]]] = defaultdict(lambda: defaultdict(list))
+
+    def add(self, ev_date: str, title: str, item: Any = None) -> None:
+        day = _day(ev_date)
+        sig = signature(title)
+        if day is None or not sig:
+            return
+        idx = len(self._items)
+        self._items.append((sig, item if item is not None else title))
+        postings = self._by_day[day]
+        for g in sig:
+            postings[g].append(idx)
+
+    def find(self, ev_date: str, title: str) -> Optional[Any]:
+        day = _day(ev_date)
+        sig = signature(title)
+        if day is None or not sig:
+            return None
+        shared: Dict[int, int] = defaultdict(int)
+        for d in range(day - self.window_days, day + self.window_days + 1):
+            postings = self._by_day.get(d)
+            if not postings:
+                continue
+            for g in sig:
+                for idx in postings.get(g, ()):
+                    shared[idx] += 1
+        best, best_score = None, self.threshold
+        for idx, n in shared.items():
+            score = _score(n, len(sig), len(self._items[idx][0]))
+            if score >= best_score:
+                best, best_score = self._items[idx][1], score
+        return best
+
+    def __contains__(self, key: Tuple[str, str]) -> bool:
+        return self.find(*key) is not None
+
+
+def find_duplicates(
+    events: Iterable[Dict[str, Any]],
+    window_days: int = 0,
+    threshold: float = DEFAULT_THRESHOLD,
+    date_key: str = "date",
+    title_key: str = "title",
+) -> List[List[Dict[str, Any]]]:
+    """
+    Groups (2+ events each) of likely duplicates: titles that match (directly or through a
+    chain) on dates at most window_days apart. Groups and their events are in date order.
+    """
+    rows: List[Tuple[int, FrozenSet[str], Dict[str, Any]]] = []
+    for ev in events:
+        day, sig = _day(ev.get(date_key)), signature(ev.get(title_key) or "")
+        if day is not None and sig:
+            rows.append((day, sig, ev))
+    rows.sort(key=lambda r: r[0])
+
+    # Prefix filtering: a match needs Jaccard >= 2*threshold - 1 (containment is at most 1),
+    # so two matching signatures must share a trigram among their rarest
+    # len - ceil(min_jaccard * len) + 1. Only those are indexed and probed; the common
+    # trigrams that make posting lists long are skipped, and candidates are verified exactly.
+    freq: Counter = Counter(g for _, sig, _ in rows for g in sig)
+    min_jaccard = max(0.0, 2 * threshold - 1)
+    prefixes: Dict[FrozenSet[str], List[str]] = {}
+
+    def prefix(sig: FrozenSet[str]) -> List[str]:
+        p = prefixes.get(sig)
+        if p is None:
+            keep = len(sig) - math.ceil(min_jaccard * len(sig) - 1e-9) + 1
+            p = prefixes[sig] = sorted(sig, key=lambda g: (freq[g], g))[:keep]
+        return p
+
+    parent = list(range(len(rows)))
+
+    def root(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    # Sliding window over days: postings hold only events from the last window_days + 1 days.
+    # Only the first event with a given signature in the window is indexed; later ones with
+    # the same signature join its group directly.
+    postings: Dict[str, List[int]] = defaultdict(list)
+    first: Dict[FrozenSet[str], int] = {}
+    oldest = 0
+    for i, (day, sig, _) in enumerate(rows):
+        if rows[oldest][0] < day - window_days:
+            while rows[oldest][0] < day - window_days:
+                oldest += 1
+            postings, first = defaultdict(list), {}
+            for j in range(oldest, i):
+                if rows[j][1] not in first:
+                    first[rows[j][1]] = j
+                    for g in prefix(rows[j][1]):
+                        postings[g].append(j)
+        same = first.get(sig)
+        if same is not None:
+            parent[root(i)] = root(same)
+            continue
+        grams = prefix(sig)
+        candidates = {j for g in grams for j in postings.get(g, ())}
+        n_sig = len(sig)
+        for j in candidates:
+            other = rows[j][1]
+            if _score(len(sig & other), n_sig, len(other)) >= threshold:
+                parent[root(j)] = root(i)
+        first[sig] = i
+        for g in grams:
+            postings[g].append(i)
+
+    groups: Dict[int, List[Dict[str, Any]]] = defaultdict(list)
+    for i, (_, _, ev) in enumerate(rows):
+        groups[root(i)].append(ev)
+    return [g for g in groups.values() if len(g) >= 2]
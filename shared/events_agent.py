@@ -9,7 +9,6 @@ EVENTS Agent - Manages calendar events, TODOs, wishlists.
 from __future__ import annotations
 
 import os
-import re
 from datetime import date, datetime, timedelta, timezone
 from pathlib import Path
 from typing import Any, List, Optional, Tuple
@@ -36,7 +35,7 @@ def get_all_events(
     days_back: int = 7,
     days_ahead: int = 14,
 ) -> List[dict]:
-    """Unified calendar: dashboard events + Google Calendar (if available)."""
+    """Unified calendar: dashboard events + Google Calendar (local mirror, see shared.calendar_mirror)."""
     events = []
     dashboard_db = _get_dashboard_db_path()
     if dashboard_db.exists():
@@ -65,34 +64,26 @@ def get_all_events(
         except Exception:
             pass
 
-    # Add Google Calendar events if available (skip if duplicate of dashboard event)
-    dashboard_keys: set = set()
+    # Add Google Calendar events if available (skip near-duplicates of dashboard events)
+    from shared.event_dedupe import DuplicateIndex
+    seen = DuplicateIndex()
     for ev in events:
-        d, t = ev.get("date", "")[:10], _normalize_title_for_match(ev.get("title", ""))
-        if d and t:
-            dashboard_keys.add((d, t))
+        seen.add(ev.get("date", ""), ev.get("title", ""))
     try:
-        from shared.google_tokens import get_credentials
-        from shared.reminders import get_upcoming_events_from_api
-        creds, err = get_credentials()
-        if not err:
-            api_events = get_upcoming_events_from_api()
-            for e in api_events:
-                if e.get("source") == "google" or "date" in e:
-                    ev_date = e.get("date", "")[:10]
-                    ev_title = e.get("title", e.get("summary", "(no title)"))
-                    key = (ev_date, _normalize_title_for_match(ev_title))
-                    if key in dashboard_keys:
-                        continue
-                    dashboard_keys.add(key)
-                    events.append({
-                        "id": e.get("id"),
-                        "date": ev_date,
-                        "title": ev_title,
-                        "description": e.get("description", ""),
-                        "event_type": "calendar",
-                        "source": "google",
-                    })
+        from shared.calendar_mirror import get_events_for_dates
+        today = date.today()
+        for e in get_events_for_dates(today - timedelta(days=days_back), today + timedelta(days=days_ahead)):
+            if (e["date"], e["title"]) in seen:
+                continue
+            seen.add(e["date"], e["title"])
+            events.append({
+                "id": e["id"],
+                "date": e["date"],
+                "title": e["title"],
+                "description": e["description"],
+                "event_type": "calendar",
+                "source": "google",
+            })
     except Exception:
         pass
 
@@ -145,82 +136,43 @@ def capture_completed_todo(
 
 # --- Duplicate detection helpers ---
 
-def _normalize_title_for_match(title: str) -> str:
-    """Normalize title for duplicate matching: lowercase, strip, collapse spaces."""
-    if not title:
-        return ""
-    return " ".join((title or "").lower().strip().split())[:80]
-
-
 def _event_suggestion_already_proposed(db_path: Path, title: str, ev_date: str) -> bool:
-    """Check if we already have a pending event_suggestion with same/similar title and date."""
-    conn = _get_conn(db_path)
-    try:
-        import json
-        cur = conn.execute(
-            "SELECT payload FROM memory_agent_proposals WHERE status = 'pending' AND action_type = 'event_suggestion'",
-            (),
-        )
-        norm = _normalize_title_for_match(title)
-        for row in cur.fetchall():
-            try:
-                p = json.loads(row[0])
-                if p.get("date", "")[:10] == ev_date[:10]:
-                    p_title = _normalize_title_for_match(p.get("title", ""))
-                    if p_title and norm and (p_title == norm or p_title in norm or norm in p_title):
-                        return True
-            except Exception:
-                pass
-        return False
-    finally:
-        conn.close()
+    """Check if we already have a pending event_suggestion with the same normalized title and date."""
+    from shared.memory_agent import proposal_exists
+    return proposal_exists(db_path, "event_suggestion", {"title": title, "date": ev_date})
 
 
 def _event_exists_in_dashboard(title: str, ev_date: str, dashboard_db_path: Optional[Path] = None) -> bool:
-    """Check if an event with same/similar title and date already exists in dashboard."""
+    """Check if an event with same/similar title (shared.event_dedupe) and date already exists in dashboard."""
+    from shared.event_dedupe import titles_match
     db = dashboard_db_path or _get_dashboard_db_path()
     if not db.exists():
         return False
     conn = _get_conn(db)
     try:
-        norm = _normalize_title_for_match(title)
         date_str = ev_date[:10]
         rows = conn.execute(
             "SELECT title FROM events WHERE date >= ? AND date <= ?",
             (date_str, date_str),
         ).fetchall()
-        for r in rows:
-            existing = _normalize_title_for_match(r[0])
-            if existing and norm and (existing == norm or existing in norm or norm in existing):
-                return True
-        return False
+        return any(titles_match(r[0], title) for r in rows)
     finally:
         conn.close()
 
 
 # --- Email → event suggestions ---
 
-_EMAIL_EVENT_PATTERNS = [
-    re.compile(r"\b(remind|reminder)\b", re.I),
-    re.compile(r"\b(todo|to-do|to do)\b", re.I),
-    re.compile(r"\b(meeting|call|call with)\b", re.I),
-    re.compile(r"\b(appointment|schedule)\b", re.I),
-    re.compile(r"\b(follow.?up|followup)\b", re.I),
-    re.compile(r"\b(deadline|due)\b", re.I),
-    re.compile(r"\b(monday|tuesday|wednesday|thursday|friday|saturday|sunday)\b", re.I),
-    re.compile(r"\b(jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\s+\d{1,2}", re.I),
-    re.compile(r"\d{1,2}/\d{1,2}(/\d{2,4})?", re.I),
-    re.compile(r"\d{4}-\d{2}-\d{2}", re.I),
-]
-
-
 def propose_events_from_emails(
     messages: List[dict],
     woody_db_path: Optional[Path] = None,
     max_proposals: int = 10,
+    today: Optional[date] = None,
 ) -> int:
     """
     Scan inbox messages for potential events (reminders, TODOs, meetings, dates).
+    Each suggestion is dated from the date/time the message mentions, resolved against its
+    Date header (shared.email_events); messages that mention no date are dated today.
+    Skips mentioned dates that are already past, so older mail doesn't suggest past events.
     Creates event_suggestion proposals for user to approve. Skips duplicates.
     Returns count created.
     """
@@ -229,9 +181,11 @@ def propose_events_from_emails(
     if not db_path.exists():
         return 0
 
+    from shared.email_events import extract_event, parse_email_date
+    today_str = (today or date.today()).isoformat()
     proposed = 0
     seen_texts: set = set()
-    ev_date = date.today().isoformat()
+    prefs = None  # loaded on the first candidate, reused for the rest of the run
     for m in messages[:50]:
         subject = (m.get("subject") or "").strip()
         snippet = (m.get("snippet") or "").strip()
@@ -239,69 +193,50 @@ def propose_events_from_emails(
         combined = f"{subject} {snippet}"[:300]
         if not combined or len(combined) < 10:
             continue
-        for pat in _EMAIL_EVENT_PATTERNS:
-            if pat.search(combined):
-                text = f"{subject}" if subject else snippet[:100]
-                if not text:
-                    continue
-                key = text[:80].lower()
-                if key in seen_texts:
-                    break
-                seen_texts.add(key)
-                title = subject or "(From email)"
-                if _event_suggestion_already_proposed(db_path, title, ev_date):
-                    break
-                if _event_exists_in_dashboard(title, ev_date):
-                    break
-                from shared.user_actions import was_rejected_recently, get_action_counts
-                source_hint = f"From: {from_}" if from_ else ""
-                if was_rejected_recently(title, ev_date, source_hint, db_path=db_path, days=14):
-                    break
-                counts = get_action_counts(db_path=db_path, days=30)
-                cal = counts.get("calendar_added", 0)
-                todo = counts.get("todo_added", 0)
-                approved = counts.get("event_approved", 0)
-                suggested = "calendar" if cal >= todo and cal > 0 else ("todo" if todo > cal and todo > 0 else "")
-                create_proposal(
-                    db_path,
-                    "event_suggestion",
-                    {
-                        "title": title,
-                        "description": f"From: {from_}\n{snippet[:200]}",
-                        "source": "email",
-                        "date": ev_date,
-                        "suggested_action": suggested,
-                    },
-                    reason=f"Potential event from email: {text[:60]}...",
-                )
-                proposed += 1
-                if proposed >= max_proposals:
-                    return proposed
-                break
+        found = extract_event(combined, sent=parse_email_date(m.get("date", "")))
+        if found is None or (found.matched and found.date < today_str):
+            continue
+        text = f"{subject}" if subject else snippet[:100]
+        if not text:
+            continue
+        key = text[:80].lower()
+        if key in seen_texts:
+            continue
+        seen_texts.add(key)
+        title = subject or "(From email)"
+        ev_date = found.date if found.matched else today_str
+        if _event_suggestion_already_proposed(db_path, title, ev_date):
+            continue
+        if _event_exists_in_dashboard(title, ev_date):
+            continue
+        if prefs is None:
+            from shared.user_actions import load_preferences
+            prefs = load_preferences(db_path, count_days=30, rejection_days=14)
+        source_hint = f"From: {from_}" if from_ else ""
+        if prefs.was_rejected(title, source_hint):
+            continue
+        payload = {
+            "title": title,
+            "description": f"From: {from_}\n{snippet[:200]}",
+            "source": "email",
+            "date": ev_date,
+            "suggested_action": prefs.suggested_action(),
+        }
+        if found.time:
+            payload["time"] = found.time
+        create_proposal(db_path, "event_suggestion", payload, reason=f"Potential event from email: {text[:60]}...")
+        proposed += 1
+        if proposed >= max_proposals:
+            return proposed
     return proposed
 
 
 # --- Events → memories ---
 
-def _event_already_proposed(db_path: Path, event_id: Any, ev_date: str, text: str) -> bool:
-    """Check if we already have a pending event_memory proposal for this event."""
-    conn = _get_conn(db_path)
-    try:
-        import json
-        cur = conn.execute(
-            "SELECT payload FROM memory_agent_proposals WHERE status = 'pending' AND action_type = 'event_memory'",
-            (),
-        )
-        for row in cur.fetchall():
-            try:
-                p = json.loads(row[0])
-                if p.get("date") == ev_date and (p.get("event_id") == event_id or p.get("text", "").startswith(text[:50])):
-                    return True
-            except Exception:
-                pass
-        return False
-    finally:
-        conn.close()
+def _event_already_proposed(db_path: Path, ev_date: str, text: str) -> bool:
+    """Check if this event was already proposed (pending, approved or rejected), so later runs don't re-propose it."""
+    from shared.memory_agent import proposal_exists
+    return proposal_exists(db_path, "event_memory", {"date": ev_date, "text": text}, pending_only=False)
 
 
 def propose_events_for_memory(
@@ -337,7 +272,7 @@ def propose_events_for_memory(
         text = title
         if ev.get("description"):
             text += f": {ev['description'][:80]}"
-        if _event_already_proposed(db_path, ev.get("id"), ev_date, text):
+        if _event_already_proposed(db_path, ev_date, text):
             continue
         create_proposal(
             db_path,
@@ -414,22 +349,42 @@ def fulfill_wishlist_item(
 
 # --- Scheduled templates (recurring: bills, inspections, birthdays) ---
 
-def _compute_next_due(anchor_date: str, recurrence: str) -> Optional[str]:
-    """Compute next due date from anchor_date + recurrence. Returns yyyy-mm-dd or None."""
+def compute_next_due(anchor_date: str, recurrence: str, dtstart: Optional[str] = None) -> Optional[str]:
+    """
+    Next due date after anchor_date (the last occurrence) for a template's recurrence:
+    YEARLY / MONTHLY / WEEKLY or any RRULE shared.recurrence supports (e.g.
+    FREQ=MONTHLY;BYMONTHDAY=-1). The rule runs from dtstart (the template's first date,
+    default anchor_date), so COUNT counts from there and a bill on the 31st stays on the
+    31st. Plain MONTHLY/YEARLY days a month lacks fall on its last day (Jan 31 -> Feb 28).
+    Returns yyyy-mm-dd, or None if the rule is invalid or exhausted.
+    """
+    from shared.recurrence import next_occurrence, parse_rule
     try:
-        d = datetime.strptime(anchor_date[:10], "%Y-%m-%d").date()
-    except ValueError:
+        anchor = datetime.strptime(anchor_date[:10], "%Y-%m-%d")
+        start = datetime.strptime((dtstart or anchor_date)[:10], "%Y-%m-%d")
+        rule = parse_rule(recurrence)
+    except (TypeError, ValueError):
         return None
-    r = (recurrence or "").upper().strip()
-    if r == "YEARLY":
-        return (d.replace(year=d.year + 1)).isoformat()
-    if r == "MONTHLY":
-        if d.month == 12:
-            return d.replace(year=d.year + 1, month=1).isoformat()
-        return d.replace(month=d.month + 1).isoformat()
-    if r == "WEEKLY":
-        return (d + timedelta(days=7)).isoformat()
-    return None
+    nxt = next_occurrence(rule, start, anchor, clamp_month_end=True)
+    return nxt.date().isoformat() if nxt else None
+
+
+def fill_template_next_due(conn) -> int:
+    """
+    Fill scheduled_templates.next_due for rows written without it (before the column existed,
+    or by older code). '' = no further occurrence (invalid or exhausted rule), so `next_due > ''`
+    skips them. The columns themselves come from the dashboard's migration. Doesn't commit;
+    returns rows filled.
+    """
+    rows = conn.execute(
+        "SELECT id, recurrence, anchor_date, dtstart FROM scheduled_templates WHERE next_due IS NULL"
+    ).fetchall()
+    if rows:
+        conn.executemany(
+            "UPDATE scheduled_templates SET next_due = ? WHERE id = ?",
+            [(compute_next_due(r[2], r[1], r[3]) or "", r[0]) for r in rows],
+        )
+    return len(rows)
 
 
 def get_requires_scheduling(
@@ -443,30 +398,30 @@ def get_requires_scheduling(
     db = dashboard_db_path or _get_dashboard_db_path()
     if not db.exists():
         return []
-    today = date.today()
-    cutoff = (today + timedelta(days=days_ahead)).isoformat()
-    out = []
+    cutoff = (date.today() + timedelta(days=days_ahead)).isoformat()
     conn = _get_conn(db)
     try:
+        if fill_template_next_due(conn):
+            conn.commit()
         rows = conn.execute(
-            "SELECT id, title, description, recurrence, anchor_date FROM scheduled_templates",
-            (),
+            """SELECT id, title, description, recurrence, anchor_date, next_due FROM scheduled_templates
+               WHERE next_due > '' AND next_due <= ?
+               ORDER BY next_due, id""",
+            (cutoff,),
         ).fetchall()
-        for r in rows:
-            next_due = _compute_next_due(r[4], r[3])
-            if next_due and next_due <= cutoff:
-                out.append({
-                    "id": r[0],
-                    "title": r[1],
-                    "description": r[2] or "",
-                    "recurrence": r[3],
-                    "anchor_date": r[4],
-                    "next_due": next_due,
-                })
-        out.sort(key=lambda x: x.get("next_due", ""))
     finally:
         conn.close()
-    return out
+    return [
+        {
+            "id": r[0],
+            "title": r[1],
+            "description": r[2] or "",
+            "recurrence": r[3],
+            "anchor_date": r[4],
+            "next_due": r[5],
+        }
+        for r in rows
+    ]
 
 
 def process_scheduled_templates(
@@ -474,49 +429,54 @@ def process_scheduled_templates(
     woody_db_path: Optional[Path] = None,
 ) -> Tuple[int, List[dict]]:
     """
-    Process scheduled templates: create events when due, update anchor_date.
+    Process scheduled templates: create events when due, advance anchor_date / next_due.
+    All due templates are handled in one transaction: one range query for them, one for the
+    events already on their dates (near-duplicates skipped via shared.event_dedupe), then
+    batched inserts and updates.
     Returns (events_created, requires_scheduling_list).
     """
+    from shared.event_dedupe import DuplicateIndex
     db = dashboard_db_path or _get_dashboard_db_path()
     if not db.exists():
         return 0, []
     today = date.today().isoformat()
-    created = 0
     conn = _get_conn(db)
     try:
-        rows = conn.execute(
-            "SELECT id, title, description, recurrence, anchor_date FROM scheduled_templates",
-            (),
+        conn.execute("BEGIN IMMEDIATE")
+        fill_template_next_due(conn)
+        due = conn.execute(
+            """SELECT id, title, description, recurrence, next_due, dtstart FROM scheduled_templates
+               WHERE next_due > '' AND next_due <= ?""",
+            (today,),
         ).fetchall()
-        for r in rows:
-            tid, title, desc, recurrence, anchor = r[0], r[1], r[2], r[3], r[4]
-            next_due = _compute_next_due(anchor, recurrence)
-            if not next_due or next_due > today:
-                continue
-            if _event_exists_in_dashboard(title, next_due, dashboard_db_path=db):
-                conn.execute(
-                    "UPDATE scheduled_templates SET anchor_date = ? WHERE id = ?",
-                    (next_due, tid),
+        existing = DuplicateIndex()
+        if due:
+            for ev_date, ev_title in conn.execute(
+                "SELECT date, title FROM events WHERE date >= ? AND date <= ?",
+                (min(r[4] for r in due), today),
+            ):
+                existing.add(ev_date, ev_title)
+        new_events, updates = [], []
+        for tid, title, desc, recurrence, next_due, dtstart in due:
+            if (next_due, title) not in existing:
+                new_events.append(
+                    (next_due, title, (desc or "") + f" [scheduled template #{tid}]", "reminder")
                 )
-                conn.commit()
-                continue
-            ev_id = create_event(
-                date_str=next_due,
-                title=title,
-                description=(desc or "") + f" [scheduled template #{tid}]",
-                event_type="reminder",
-            )
-            if ev_id:
-                conn.execute(
-                    "UPDATE scheduled_templates SET anchor_date = ? WHERE id = ?",
-                    (next_due, tid),
-                )
-                conn.commit()
-                created += 1
+                existing.add(next_due, title)
+            updates.append((next_due, compute_next_due(next_due, recurrence, dtstart) or "", tid))
+        conn.executemany(
+            "INSERT INTO events (date, title, description, event_type) VALUES (?, ?, ?, ?)", new_events
+        )
+        conn.executemany("UPDATE scheduled_templates SET anchor_date = ?, next_due = ? WHERE id = ?", updates)
+        conn.commit()
+    except Exception:
+        if conn.in_transaction:
+            conn.rollback()
+        raise
     finally:
         conn.close()
     requires = get_requires_scheduling(days_ahead=14, dashboard_db_path=db)
-    return created, requires
+    return len(new_events), requires
 
 
 # --- Agent run ---
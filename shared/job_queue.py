@@ -0,0 +1,249 @@
+"""
+Durable job queue for heavy background work (Woody app.db, table job_queue).
+
+Producers (Woody's scheduler, dashboard "run now" buttons) enqueue a job by kind and get
+its id back immediately. Worker processes (woody/app/worker.py) lease one job at a time:
+the lease is a single IMMEDIATE transaction that picks the highest-priority runnable job,
+so two workers never get the same job. A worker heartbeats to extend its lease while the
+job runs; a job whose lease expires (worker killed) is leased again by someone else.
+Failed jobs are retried with exponential backoff up to max_attempts, except PermanentError
+(missing credentials / configuration): a retry can't fix those, so the job fails at once.
+
+Status: queued -> leased -> done | failed (leased -> queued again on retry or expired lease)
+"""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+from shared.db_path import get_woody_db_path
+
+DEFAULT_LEASE_SECONDS = 300
+RETRY_BASE_SECONDS = 30
+
+
+# Agent error messages that mean "fix the setup", not "try again later"
+_CONFIG_ERROR_HINTS = ("not connected", "not installed", "reconnect", "no email provider", "invalid_grant")
+
+
+class PermanentError(Exception):
+    """Raised by a job handler when retrying can't help; the job is failed on this attempt."""
+
+
+def error_for(message: str) -> Exception:
+    """Exception for an error an agent reported: PermanentError for credential/config problems."""
+    if any(hint in (message or "").lower() for hint in _CONFIG_ERROR_HINTS):
+        return PermanentError(message)
+    return RuntimeError(message)
+
+
+def _conn(db_path: Optional[Path]) -> sqlite3.Connection:
+    conn = sqlite3.connect(str(db_path or get_woody_db_path()), timeout=30, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def _row(r: sqlite3.Row) -> Dict[str, Any]:
+    d = dict(r)
+    for key in ("payload", "result"):
+        if d.get(key):
+            try:
+                d[key] = json.loads(d[key])
+            except ValueError:
+                pass
+    return d
+
+
+def enqueue(
+    db_path: Optional[Path],
+    kind: str,
+    payload: Optional[Dict[str, Any]] = None,
+    priority: int = 0,
+    max_attempts: int = 3,
+    delay: float = 0.0,
+    unique: bool = False,
+) -> int:
+    """
+    Add a job; higher priority runs first. Returns the job id. With unique=True, an
+    existing queued or leased job of the same kind is returned instead of adding another.
+    """
+    conn = _conn(db_path)
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        if unique:
+            row = conn.execute(
+                "SELECT id FROM job_queue WHERE kind = ? AND status IN ('queued', 'leased') ORDER BY id LIMIT 1",
+                (kind,),
+            ).fetchone()
+            if row:
+                conn.execute("COMMIT")
+                return row[0]
+        cur = conn.execute(
+            """INSERT INTO job_queue (kind, payload, priority, max_attempts, run_after)
+               VALUES (?, ?, ?, ?, ?)""",
+            (kind, json.dumps(payload or {}), int(priority), int(max_attempts), time.time() + delay),
+        )
+        conn.execute("COMMIT")
+        return cur.lastrowid
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    finally:
+        conn.close()
+
+
+def lease(
+    db_path: Optional[Path],
+    worker_id: str,
+    kinds: Optional[Sequence[str]] = None,
+    lease_seconds: float = DEFAULT_LEASE_SECONDS,
+) -> Optional[Dict[str, Any]]:
+    """Take the next runnable job for this worker, or None. Expired leases are reclaimed first."""
+    now = time.time()
+    conn = _conn(db_path)
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute(
+            """UPDATE job_queue
+               SET status = CASE WHEN attempts >= max_attempts THEN 'failed' ELSE 'queued' END,
+                   error = 'lease expired (worker ' || COALESCE(lease_owner, '?') || ' died or stalled)',
+                   finished_at = CASE WHEN attempts >= max_attempts THEN datetime('now') ELSE NULL END,
+                   lease_owner = NULL, lease_expires_at = NULL
+               WHERE status = 'leased' AND lease_expires_at < ?""",
+            (now,),
+        )
+        sql = "SELECT id FROM job_queue WHERE status = 'queued' AND run_after <= ?"
+        params: List[Any] = [now]
+        if kinds:
+            sql += f" AND kind IN ({','.join('?' * len(kinds))})"
+            params.extend(kinds)
+        row = conn.execute(sql + " ORDER BY priority DESC, id LIMIT 1", params).fetchone()
+        if row is None:
+            conn.execute("COMMIT")
+            return None
+        conn.execute(
+            """UPDATE job_queue SET status = 'leased', lease_owner = ?, lease_expires_at = ?,
+                   attempts = attempts + 1, started_at = datetime('now')
+               WHERE id = ?""",
+            (worker_id, now + lease_seconds, row[0]),
+        )
+        job = conn.execute("SELECT * FROM job_queue WHERE id = ?", (row[0],)).fetchone()
+        conn.execute("COMMIT")
+        return _row(job)
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    finally:
+        conn.close()
+
+
+def heartbeat(db_path: Optional[Path], job_id: int, worker_id: str, lease_seconds: float = DEFAULT_LEASE_SECONDS) -> bool:
+    """Extend the lease. False if this worker no longer holds it."""
+    conn = _conn(db_path)
+    try:
+        cur = conn.execute(
+            "UPDATE job_queue SET lease_expires_at = ? WHERE id = ? AND lease_owner = ? AND status = 'leased'",
+            (time.time() + lease_seconds, job_id, worker_id),
+        )
+        return cur.rowcount == 1
+    finally:
+        conn.close()
+
+
+def complete(db_path: Optional[Path], job_id: int, worker_id: str, result: Any = None) -> bool:
+    conn = _conn(db_path)
+    try:
+        cur = conn.execute(
+            """UPDATE job_queue SET status = 'done', result = ?, error = NULL, finished_at = datetime('now'),
+                   lease_owner = NULL, lease_expires_at = NULL
+               WHERE id = ? AND lease_owner = ? AND status = 'leased'""",
+            (json.dumps(result, default=str), job_id, worker_id),
+        )
+        return cur.rowcount == 1
+    finally:
+        conn.close()
+
+
+def fail(db_path: Optional[Path], job_id: int, worker_id: str, error: str, retry: bool = True) -> bool:
+    """Record a failed attempt: back to queued with backoff, or failed after max_attempts (or retry=False)."""
+    conn = _conn(db_path)
+    try:
+        cur = conn.execute(
+            """UPDATE job_queue
+               SET status = CASE WHEN attempts >= max_attempts OR NOT ? THEN 'failed' ELSE 'queued' END,
+                   run_after = ? + ? * (1 << (attempts - 1)),
+                   finished_at = CASE WHEN attempts >= max_attempts OR NOT ? THEN datetime('now') ELSE NULL END,
+                   error = ?, lease_owner = NULL, lease_expires_at = NULL
+               WHERE id = ? AND lease_owner = ? AND status = 'leased'""",
+            (int(retry), time.time(), RETRY_BASE_SECONDS, int(retry), error[:1000], job_id, worker_id),
+        )
+        return cur.rowcount == 1
+    finally:
+        conn.close()
+
+
+def get_job(db_path: Optional[Path], job_id: int) -> Optional[Dict[str, Any]]:
+    conn = _conn(db_path)
+    try:
+        row = conn.execute("SELECT * FROM job_queue WHERE id = ?", (job_id,)).fetchone()
+        return _row(row) if row else None
+    finally:
+        conn.close()
+
+
+def wait_for(db_path: Optional[Path], job_id: int, timeout: float, poll: float = 1.0) -> Dict[str, Any]:
+    """Block until the job is done or failed. Raises TimeoutError if it isn't within timeout."""
+    deadline = time.monotonic() + timeout
+    while True:
+        job = get_job(db_path, job_id)
+        if job is None:
+            raise KeyError(f"job {job_id} not found")
+        if job["status"] in ("done", "failed"):
+            return job
+        if time.monotonic() >= deadline:
+            raise TimeoutError(f"job {job_id} ({job['kind']}) still {job['status']} after {timeout:g}s")
+        time.sleep(poll)
+
+
+def list_jobs(db_path: Optional[Path] = None, status: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+    conn = _conn(db_path)
+    try:
+        sql = "SELECT * FROM job_queue"
+        params: List[Any] = []
+        if status:
+            sql += " WHERE status = ?"
+            params.append(status)
+        rows = conn.execute(sql + " ORDER BY id DESC LIMIT ?", params + [limit]).fetchall()
+        return [_row(r) for r in rows]
+    finally:
+        conn.close()
+
+
+def queue_stats(db_path: Optional[Path] = None) -> Dict[str, Any]:
+    """Counts by status and the age of the oldest runnable job."""
+    conn = _conn(db_path)
+    try:
+        counts = {r[0]: r[1] for r in conn.execute("SELECT status, COUNT(*) FROM job_queue GROUP BY status")}
+        oldest = conn.execute(
+            "SELECT MIN(run_after) FROM job_queue WHERE status = 'queued' AND run_after <= ?", (time.time(),)
+        ).fetchone()[0]
+    finally:
+        conn.close()
+    return {"counts": counts, "oldest_queued_s": round(time.time() - oldest, 1) if oldest else None}
+
+
+def prune(db_path: Optional[Path] = None, keep_days: int = 14) -> int:
+    """Delete finished jobs older than keep_days."""
+    conn = _conn(db_path)
+    try:
+        cur = conn.execute(
+            "DELETE FROM job_queue WHERE status IN ('done', 'failed') AND finished_at < datetime('now', ?)",
+            (f"-{int(keep_days)} days",),
+        )
+        return cur.rowcount
+    finally:
+        conn.close()
@@ -0,0 +1,209 @@
+"""
+Background job registry snapshot and run history (Woody app.db).
+
+Woody's in-process scheduler (woody/app/scheduler.py) writes one scheduled_jobs row per
+registered job (schedule, next run, whether it's running) and one job_runs row per run with
+its duration. The dashboard reads both, and asks for a manual run by setting
+scheduled_jobs.run_requested_at, which the scheduler picks up within
+JOB_REQUEST_POLL_SECONDS. Tables are created by woody's init_db.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from shared.db_path import get_woody_db_path
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S")
+
+
+def _conn(db_path: Optional[Path]) -> sqlite3.Connection:
+    conn = sqlite3.connect(str(db_path or get_woody_db_path()), timeout=30)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def sync_jobs(db_path: Optional[Path], jobs: Iterable[Dict[str, Any]]) -> None:
+    """Replace the registry snapshot. Each job: name, schedule, next_run_at, running."""
+    jobs = list(jobs)
+    conn = _conn(db_path)
+    try:
+        conn.executemany(
+            """INSERT INTO scheduled_jobs (name, schedule, next_run_at, running, updated_at)
+               VALUES (:name, :schedule, :next_run_at, :running, datetime('now'))
+               ON CONFLICT(name) DO UPDATE SET schedule = excluded.schedule, next_run_at = excluded.next_run_at,
+                   running = excluded.running, updated_at = excluded.updated_at""",
+            [{**j, "running": int(bool(j.get("running")))} for j in jobs],
+        )
+        names = [j["name"] for j in jobs]
+        conn.execute(
+            f"DELETE FROM scheduled_jobs WHERE name NOT IN ({','.join('?' * len(names))})" if names else "DELETE FROM scheduled_jobs",
+            names,
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def update_job(db_path: Optional[Path], name: str, next_run_at: Optional[str], running: bool) -> None:
+    conn = _conn(db_path)
+    try:
+        conn.execute(
+            "UPDATE scheduled_jobs SET next_run_at = ?, running = ?, updated_at = datetime('now') WHERE name = ?",
+            (next_run_at, int(running), name),
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def start_run(db_path: Optional[Path], job: str, trigger: str) -> int:
+    conn = _conn(db_path)
+    try:
+        cur = conn.execute(
+            "INSERT INTO job_runs (job, trigger, status, started_at) VALUES (?, ?, 'running', ?)",
+            (job, trigger, _now()),
+        )
+        conn.commit()
+        return cur.lastrowid
+    finally:
+        conn.close()
+
+
+def finish_run(
+    db_path: Optional[Path],
+    run_id: int,
+    duration_ms: int,
+    result: Any = None,
+    error: Optional[str] = None,
+) -> None:
+    conn = _conn(db_path)
+    try:
+        conn.execute(
+            """UPDATE job_runs SET status = ?, finished_at = ?, duration_ms = ?, result = ?, error = ?
+               WHERE id = ?""",
+            ("error" if error else "ok", _now(), int(duration_ms),
+             None if result is None else str(result)[:500], error and error[:500], run_id),
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def record_skipped(db_path: Optional[Path], job: str, trigger: str, reason: str) -> None:
+    """A due run that didn't start because the previous one is still going."""
+    now = _now()
+    conn = _conn(db_path)
+    try:
+        conn.execute(
+            """INSERT INTO job_runs (job, trigger, status, started_at, finished_at, duration_ms, error)
+               VALUES (?, ?, 'skipped', ?, ?, 0, ?)""",
+            (job, trigger, now, now, reason),
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def last_started(db_path: Optional[Path], job: str) -> Optional[datetime]:
+    """Start time (UTC) of the job's last real run, skipped ones excluded."""
+    conn = _conn(db_path)
+    try:
+        row = conn.execute(
+            "SELECT MAX(started_at) FROM job_runs WHERE job = ? AND status != 'skipped'", (job,)
+        ).fetchone()
+    finally:
+        conn.close()
+    if not row or not row[0]:
+        return None
+    return datetime.fromisoformat(row[0]).replace(tzinfo=timezone.utc)
+
+
+def close_interrupted(db_path: Optional[Path]) -> int:
+    """Mark runs left 'running' by a dead process as errors. Call before the scheduler starts."""
+    conn = _conn(db_path)
+    try:
+        cur = conn.execute(
+            "UPDATE job_runs SET status = 'error', finished_at = ?, error = 'interrupted (process exited)' WHERE status = 'running'",
+            (_now(),),
+        )
+        conn.execute("UPDATE scheduled_jobs SET running = 0")
+        conn.commit()
+        return cur.rowcount
+    finally:
+        conn.close()
+
+
+def request_run(db_path: Optional[Path], name: str) -> bool:
+    """Ask the scheduler to run a job now. False if no such job is registered."""
+    conn = _conn(db_path)
+    try:
+        cur = conn.execute(
+            "UPDATE scheduled_jobs SET run_requested_at = datetime('now') WHERE name = ?", (name,)
+        )
+        conn.commit()
+        return cur.rowcount == 1
+    finally:
+        conn.close()
+
+
+def pop_requests(db_path: Optional[Path]) -> List[str]:
+    """Names of jobs with a pending manual-run request; clears the requests."""
+    conn = _conn(db_path)
+    try:
+        names = [r[0] for r in conn.execute("SELECT name FROM scheduled_jobs WHERE run_requested_at IS NOT NULL")]
+        if names:
+            conn.execute("UPDATE scheduled_jobs SET run_requested_at = NULL WHERE run_requested_at IS NOT NULL")
+            conn.commit()
+        return names
+    finally:
+        conn.close()
+
+
+def list_jobs(db_path: Optional[Path] = None) -> List[Dict[str, Any]]:
+    """Registered jobs with their last run and average duration of the last 20 runs."""
+    conn = _conn(db_path)
+    try:
+        jobs = [dict(r) for r in conn.execute(
+            "SELECT name, schedule, next_run_at, running, run_requested_at, updated_at FROM scheduled_jobs ORDER BY name"
+        )]
+        for j in jobs:
+            last = conn.execute(
+                """SELECT id, trigger, status, started_at, duration_ms, result, error FROM job_runs
+                   WHERE job = ? ORDER BY id DESC LIMIT 1""",
+                (j["name"],),
+            ).fetchone()
+            j["running"] = bool(j["running"])
+            j["last_run"] = dict(last) if last else None
+            stats = conn.execute(
+                """SELECT AVG(duration_ms), MAX(duration_ms), SUM(status = 'error') FROM
+                   (SELECT duration_ms, status FROM job_runs WHERE job = ? AND status IN ('ok', 'error')
+                    ORDER BY id DESC LIMIT 20)""",
+                (j["name"],),
+            ).fetchone()
+            j["avg_duration_ms"] = round(stats[0]) if stats[0] is not None else None
+            j["max_duration_ms"] = stats[1]
+            j["recent_errors"] = stats[2] or 0
+        return jobs
+    finally:
+        conn.close()
+
+
+def list_runs(db_path: Optional[Path] = None, job: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+    conn = _conn(db_path)
+    try:
+        sql = "SELECT id, job, trigger, status, started_at, finished_at, duration_ms, result, error FROM job_runs"
+        params: list = []
+        if job:
+            sql += " WHERE job = ?"
+            params.append(job)
+        sql += " ORDER BY id DESC LIMIT ?"
+        params.append(limit)
+        return [dict(r) for r in conn.execute(sql, params)]
+    finally:
+        conn.close()
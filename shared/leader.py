@@ -0,0 +1,80 @@
+"""
+Leader lease for running Woody as several replicas (Woody app.db, table leader_lease).
+
+Scheduled work (job scheduler, reminder scheduler) and Telegram long polling must run on
+exactly one replica. Replicas compete for a named lease row: whoever holds an unexpired lease
+is the leader and renews it with a heartbeat; once it stops renewing (crash, hung, network
+share gone), another replica takes the lease after it expires. Acquire and renew are the
+same conditional UPSERT, so the check and the write happen atomically. Tables are
+created by woody's init_db; the election loop is woody/app/leader.py.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from shared.db_path import get_woody_db_path
+
+DEFAULT_LEASE_NAME = "scheduler"
+
+
+def _conn(db_path: Optional[Path]) -> sqlite3.Connection:
+    conn = sqlite3.connect(str(db_path or get_woody_db_path()), timeout=30)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def try_acquire(db_path: Optional[Path], holder: str, ttl: float, name: str = DEFAULT_LEASE_NAME) -> bool:
+    """
+    Take or renew the lease for ttl seconds. True if `holder` now holds it: the row was
+    free, expired, or already ours. False while another holder's lease is still valid.
+    """
+    now = time.time()
+    conn = _conn(db_path)
+    try:
+        cur = conn.execute(
+            """INSERT INTO leader_lease (name, holder, expires_at, acquired_at, renewed_at)
+               VALUES (?, ?, ?, datetime('now'), datetime('now'))
+               ON CONFLICT(name) DO UPDATE SET
+                   holder = excluded.holder,
+                   expires_at = excluded.expires_at,
+                   acquired_at = CASE WHEN leader_lease.holder = excluded.holder
+                                      THEN leader_lease.acquired_at ELSE excluded.acquired_at END,
+                   renewed_at = excluded.renewed_at
+               WHERE leader_lease.holder = excluded.holder OR leader_lease.expires_at < ?""",
+            (name, holder, now + ttl, now),
+        )
+        conn.commit()
+        return cur.rowcount == 1
+    finally:
+        conn.close()
+
+
+def release(db_path: Optional[Path], holder: str, name: str = DEFAULT_LEASE_NAME) -> bool:
+    """Give the lease up early (clean shutdown) so another replica can take over right away."""
+    conn = _conn(db_path)
+    try:
+        cur = conn.execute(
+            "UPDATE leader_lease SET expires_at = 0 WHERE name = ? AND holder = ?", (name, holder)
+        )
+        conn.commit()
+        return cur.rowcount == 1
+    finally:
+        conn.close()
+
+
+def current_leader(db_path: Optional[Path] = None, name: str = DEFAULT_LEASE_NAME) -> Optional[Dict[str, Any]]:
+    """The lease row (holder, acquired_at, renewed_at, expires_in_s) if it's unexpired, else None."""
+    conn = _conn(db_path)
+    try:
+        row = conn.execute("SELECT * FROM leader_lease WHERE name = ?", (name,)).fetchone()
+    finally:
+        conn.close()
+    if row is None or row["expires_at"] < time.time():
+        return None
+    d = dict(row)
+    d["expires_in_s"] = round(d.pop("expires_at") - time.time(), 1)
+    return d
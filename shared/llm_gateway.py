@@ -0,0 +1,337 @@
+"""
+LLM gateway - one pooled OpenAI client shared by Woody and the dashboard chat.
+Per-call deadlines, jittered retries on 429/5xx, optional hedging of slow requests,
+a concurrency limit, a circuit breaker with a friendly fallback, and latency histograms.
+
+Config (env):
+  OPENAI_BASE_URL                 – OpenAI-compatible endpoint (e.g. a local fake server)
+  LLM_TIMEOUT_SECONDS             – deadline for one logical call incl. retries (default 45)
+  LLM_MAX_RETRIES                 – retries after the first attempt (default 2)
+  LLM_HEDGE_AFTER_SECONDS         – send a second identical request if the first is this slow (default off)
+  LLM_MAX_CONCURRENCY             – concurrent in-flight calls per process (default 4)
+  LLM_BREAKER_THRESHOLD           – consecutive failed calls that open the breaker (default 5)
+  LLM_BREAKER_COOLDOWN_SECONDS    – how long the breaker stays open (default 30)
+"""
+
+from __future__ import annotations
+
+import bisect
+import logging
+import os
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Deque, Dict, Optional, Tuple
+
+log = logging.getLogger(__name__)
+
+FALLBACK_REPLY = "My brain (OpenAI) is taking a nap right now. Give it a minute and try again."
+
+_BACKOFF_BASE_SECONDS = 0.5
+_BACKOFF_CAP_SECONDS = 8.0
+
+
+class LLMUnavailable(Exception):
+    """Raised when the gateway gives up (breaker open, deadline hit, retries exhausted)."""
+
+
+def _env_float(key: str, default: Optional[float]) -> Optional[float]:
+    val = os.environ.get(key, "").strip()
+    if not val:
+        return default
+    try:
+        return float(val)
+    except ValueError:
+        return default
+
+
+def _env_int(key: str, default: int) -> int:
+    try:
+        return int(os.environ.get(key, str(default)))
+    except ValueError:
+        return default
+
+
+# --- Latency histogram ---
+
+class LatencyHistogram:
+    """Fixed-bucket histogram (ms) plus a window of recent samples for percentiles."""
+
+    BUCKETS_MS = (100, 250, 500, 1000, 2000, 5000, 10000, 30000)
+
+    def __init__(self, window: int = 1000) -> None:
+        self._counts = [0] * (len(self.BUCKETS_MS) + 1)
+        self._recent: Deque[float] = deque(maxlen=window)
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, ms: float) -> None:
+        with self._lock:
+            self._counts[bisect.bisect_left(self.BUCKETS_MS, ms)] += 1
+            self._recent.append(ms)
+            self._sum += ms
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            counts = list(self._counts)
+            recent = sorted(self._recent)
+            total = self._sum
+        n = sum(counts)
+        labels = [f"le_{b}" for b in self.BUCKETS_MS] + ["le_inf"]
+
+        def pct(p: float) -> Optional[float]:
+            if not recent:
+                return None
+            return round(recent[min(len(recent) - 1, int(p * len(recent)))], 1)
+
+        return {
+            "count": n,
+            "avg_ms": round(total / n, 1) if n else None,
+            "p50_ms": pct(0.50),
+            "p95_ms": pct(0.95),
+            "p99_ms": pct(0.99),
+            "buckets": dict(zip(labels, counts)),
+        }
+
+
+# --- Circuit breaker ---
+
+class CircuitBreaker:
+    """Opens after `threshold` consecutive failures; lets one probe through after `cooldown` seconds."""
+
+    def __init__(self, threshold: int, cooldown: float) -> None:
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if time.monotonic() - self._opened_at >= self.cooldown:
+                return "half_open"
+            return "open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if time.monotonic() - self._opened_at < self.cooldown or self._probing:
+                return False
+            self._probing = True
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._probing = False
+            if self._failures >= self.threshold:
+                if self._opened_at is None:
+                    log.warning("[LLM] Circuit breaker opened after %d failures", self._failures)
+                self._opened_at = time.monotonic()
+
+
+# --- Gateway ---
+
+class LLMGateway:
+    """Owns pooled clients and the resilience policy. Use get_gateway() for the shared instance."""
+
+    def __init__(
+        self,
+        timeout: float = 45.0,
+        max_retries: int = 2,
+        hedge_after: Optional[float] = None,
+        max_concurrency: int = 4,
+        breaker_threshold: int = 5,
+        breaker_cooldown: float = 30.0,
+        base_url: Optional[str] = None,
+    ) -> None:
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.hedge_after = hedge_after
+        self.base_url = base_url
+        self.breaker = CircuitBreaker(breaker_threshold, breaker_cooldown)
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._clients: Dict[Tuple[str, Optional[str]], Any] = {}
+        self._clients_lock = threading.Lock()
+        # 2 threads per slot: primary + hedge
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency * 2, thread_name_prefix="llm")
+        self.histograms: Dict[str, LatencyHistogram] = {"call": LatencyHistogram(), "attempt": LatencyHistogram()}
+        self._counters = {"calls": 0, "retries": 0, "hedges": 0, "hedge_wins": 0, "failures": 0, "rejected": 0}
+        self._counters_lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "LLMGateway":
+        return cls(
+            timeout=_env_float("LLM_TIMEOUT_SECONDS", 45.0),
+            max_retries=_env_int("LLM_MAX_RETRIES", 2),
+            hedge_after=_env_float("LLM_HEDGE_AFTER_SECONDS", None),
+            max_concurrency=max(1, _env_int("LLM_MAX_CONCURRENCY", 4)),
+            breaker_threshold=max(1, _env_int("LLM_BREAKER_THRESHOLD", 5)),
+            breaker_cooldown=_env_float("LLM_BREAKER_COOLDOWN_SECONDS", 30.0),
+            base_url=os.environ.get("OPENAI_BASE_URL", "").strip() or None,
+        )
+
+    def _count(self, key: str, n: int = 1) -> None:
+        with self._counters_lock:
+            self._counters[key] += n
+
+    def client(self, api_key: str) -> Any:
+        """Pooled client per (key, base_url). SDK retries are off; the gateway owns retry policy."""
+        key = (api_key, self.base_url)
+        with self._clients_lock:
+            if key not in self._clients:
+                from openai import OpenAI
+                self._clients[key] = OpenAI(api_key=api_key, base_url=self.base_url, max_retries=0, timeout=self.timeout)
+            return self._clients[key]
+
+    def _attempt(self, client: Any, timeout: float, kwargs: dict) -> Any:
+        started = time.perf_counter()
+        try:
+            return client.with_options(timeout=timeout).chat.completions.create(**kwargs)
+        finally:
+            self.histograms["attempt"].observe((time.perf_counter() - started) * 1000)
+
+    def _attempt_hedged(self, client: Any, deadline: float, kwargs: dict) -> Any:
+        remaining = deadline - time.monotonic()
+        primary = self._executor.submit(self._attempt, client, remaining, kwargs)
+        if self.hedge_after is None or self.hedge_after >= remaining:
+            return primary.result()
+        done, _ = wait([primary], timeout=self.hedge_after)
+        if done:
+            return primary.result()
+        self._count("hedges")
+        hedge = self._executor.submit(self._attempt, client, deadline - time.monotonic(), kwargs)
+        pending = {primary, hedge}
+        error: Optional[BaseException] = None
+        while pending:
+            done, pending = wait(pending, timeout=max(0.0, deadline - time.monotonic()), return_when=FIRST_COMPLETED)
+            if not done:
+                break
+            for f in done:
+                if f.exception() is None:
+                    if f is hedge:
+                        self._count("hedge_wins")
+                    return f.result()
+                error = f.exception()
+        if error is not None:
+            raise error
+        raise TimeoutError("LLM hedged request exceeded deadline")
+
+    @staticmethod
+    def _retry_delay(error: BaseException, attempt: int) -> Optional[float]:
+        """Seconds to wait before retrying, or None when the error is not retryable."""
+        import openai
+        status = getattr(error, "status_code", None)
+        retryable = isinstance(error, (openai.APIConnectionError, openai.APITimeoutError, TimeoutError)) or (
+            status is not None and (status == 429 or status >= 500)
+        )
+        if not retryable:
+            return None
+        response = getattr(error, "response", None)
+        retry_after = response.headers.get("retry-after") if response is not None else None
+        if retry_after:
+            try:
+                return min(float(retry_after), _BACKOFF_CAP_SECONDS)
+            except ValueError:
+                pass
+        return min(_BACKOFF_CAP_SECONDS, _BACKOFF_BASE_SECONDS * (2 ** attempt)) * random.uniform(0.5, 1.5)
+
+    def chat_completion(self, api_key: str, timeout: Optional[float] = None, **kwargs: Any) -> Any:
+        """chat.completions.create with deadline, retries, hedging and breaker. Raises LLMUnavailable."""
+        deadline = time.monotonic() + (timeout or self.timeout)
+        if not self._slots.acquire(timeout=max(0.0, deadline - time.monotonic())):
+            self._count("rejected")
+            raise LLMUnavailable("too many concurrent LLM calls")
+        if not self.breaker.allow():
+            self._slots.release()
+            self._count("rejected")
+            raise LLMUnavailable("circuit breaker open")
+        self._count("calls")
+        started = time.perf_counter()
+        client = self.client(api_key)
+        last_error: Optional[BaseException] = None
+        try:
+            for attempt in range(self.max_retries + 1):
+                if time.monotonic() >= deadline:
+                    break
+                try:
+                    response = self._attempt_hedged(client, deadline, kwargs)
+                    self.breaker.record_success()
+                    return response
+                except Exception as e:
+                    last_error = e
+                    delay = self._retry_delay(e, attempt)
+                    if delay is None:
+                        # Caller error (400, auth): upstream is healthy, don't trip the breaker
+                        self.breaker.record_success()
+                        raise
+                    if attempt >= self.max_retries or time.monotonic() + delay >= deadline:
+                        break
+                    log.info("[LLM] Attempt %d failed (%s); retrying in %.2fs", attempt + 1, e, delay)
+                    self._count("retries")
+                    time.sleep(delay)
+            self._count("failures")
+            self.breaker.record_failure()
+            raise LLMUnavailable(f"LLM call failed: {last_error or 'deadline exceeded'}") from last_error
+        finally:
+            self._slots.release()
+            self.histograms["call"].observe((time.perf_counter() - started) * 1000)
+
+    def close(self) -> None:
+        """Wait for in-flight (incl. losing hedged) requests and close pooled clients."""
+        self._executor.shutdown(wait=True)
+        with self._clients_lock:
+            for c in self._clients.values():
+                c.close()
+            self._clients.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._counters_lock:
+            counters = dict(self._counters)
+        return {
+            **counters,
+            "breaker": self.breaker.state,
+            "latency": {name: h.snapshot() for name, h in self.histograms.items()},
+        }
+
+
+_gateway: Optional[LLMGateway] = None
+_gateway_lock = threading.Lock()
+
+
+def get_gateway() -> LLMGateway:
+    """Process-wide gateway, configured from env on first use."""
+    global _gateway
+    with _gateway_lock:
+        if _gateway is None:
+            _gateway = LLMGateway.from_env()
+        return _gateway
+
+
+def reset_gateway() -> None:
+    """Drop the shared gateway (tests, or after changing LLM_* env vars)."""
+    global _gateway
+    with _gateway_lock:
+        _gateway = None
+
+
+def chat_completion(api_key: str, timeout: Optional[float] = None, **kwargs: Any) -> Any:
+    """Shortcut for get_gateway().chat_completion(...)."""
+    return get_gateway().chat_completion(api_key, timeout=timeout, **kwargs)
+
+
+def get_gateway_stats() -> Dict[str, Any]:
+    return get_gateway().stats()
@@ -1,7 +1,10 @@
 """Shared long-term memory (Chromadb). Used by Woody and Dashboard."""
 
 import os
+import re
+import time
 import uuid
+import zlib
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import List, Optional, Union
@@ -13,6 +16,50 @@ MEMORY_DB_PATH = Path(os.environ.get("MEMORY_DB_PATH", str(_default)))
 # Memory type: "short" = short-term, "long" = long-term (default)
 # Weight: 1-10, default 5. Higher = more important, boosts ranking in search
 # last_touched: ISO datetime. Refreshing a memory updates this; recently touched memories rank higher.
+# touched_at / modified_at: epoch seconds (Chroma can only range-filter numbers). touched_at follows
+# last_touched (any use, including recall on search); modified_at changes only on writes (add,
+# weight/type updates), so "changed since" queries don't pick up memories that were merely recalled.
+
+_TIME_FIELDS_MARKER = ".time_fields"  # in MEMORY_DB_PATH once older memories got touched_at/modified_at
+
+
+def _stamp(meta: dict, modified: bool = True, now: Optional[float] = None) -> dict:
+    """Set last_touched + touched_at (and modified_at for writes) on a metadata dict."""
+    now = time.time() if now is None else now
+    meta["last_touched"] = datetime.fromtimestamp(now, timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+    meta["touched_at"] = now
+    if modified:
+        meta["modified_at"] = now
+    return meta
+
+
+def _epoch(iso: Optional[str]) -> float:
+    try:
+        dt = datetime.fromisoformat((iso or "").replace("Z", "+00:00"))
+    except ValueError:
+        return 0.0
+    return (dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)).timestamp()
+
+
+def _backfill_time_fields(coll) -> None:
+    """One-time: give memories stored before touched_at/modified_at existed both fields (from last_touched)."""
+    marker = MEMORY_DB_PATH / _TIME_FIELDS_MARKER
+    if marker.exists():
+        return
+    data = coll.get(include=["metadatas"])
+    ids, metas = [], []
+    for mid, m in zip(data.get("ids") or [], data.get("metadatas") or []):
+        meta = dict(m or {})
+        if "touched_at" in meta and "modified_at" in meta:
+            continue
+        ts = _epoch(meta.get("last_touched"))
+        meta.setdefault("touched_at", ts)
+        meta.setdefault("modified_at", ts)
+        ids.append(mid)
+        metas.append(meta)
+    if ids:
+        coll.update(ids=ids, metadatas=metas)
+    marker.touch()
 
 
 def _recency_boost(last_touched: Optional[str]) -> float:
@@ -33,6 +80,52 @@ def _recency_boost(last_touched: Optional[str]) -> float:
     return 1.0
 
 
+_hash_embedding = None
+
+
+def _embedding_function():
+    """
+    MEMORY_EMBEDDING=hash: deterministic bag-of-words hashing embedding that needs no model
+    download, for offline CI and benchmarks. Default (unset): Chroma's built-in model.
+    Don't switch an existing store between the two - the vectors are not comparable.
+    """
+    global _hash_embedding
+    if os.environ.get("MEMORY_EMBEDDING", "").strip().lower() != "hash":
+        return None
+    if _hash_embedding is None:
+        from chromadb.api.types import EmbeddingFunction
+
+        class HashEmbedding(EmbeddingFunction):
+            DIM = 256
+
+            def __init__(self) -> None:
+                pass
+
+            def __call__(self, input):
+                vectors = []
+                for text in input:
+                    vec = [0.0] * self.DIM
+                    for token in re.findall(r"\w+", text.lower()):
+                        vec[zlib.crc32(token.encode()) % self.DIM] += 1.0
+                    norm = sum(v * v for v in vec) ** 0.5
+                    vectors.append([v / norm for v in vec] if norm else [1.0] + [0.0] * (self.DIM - 1))
+                return vectors
+
+            @staticmethod
+            def name() -> str:
+                return "woody_hash"
+
+            def get_config(self) -> dict:
+                return {}
+
+            @staticmethod
+            def build_from_config(config: dict) -> "HashEmbedding":
+                return HashEmbedding()
+
+        _hash_embedding = HashEmbedding()
+    return _hash_embedding
+
+
 def _get_collection():
     try:
         import chromadb
@@ -41,7 +134,13 @@ def _get_collection():
         return None
     MEMORY_DB_PATH.mkdir(parents=True, exist_ok=True)
     client = chromadb.PersistentClient(path=str(MEMORY_DB_PATH), settings=Settings(anonymized_telemetry=False))
-    return client.get_or_create_collection("memory", metadata={"hnsw:space": "cosine"})
+    ef = _embedding_function()
+    if ef is not None:
+        coll = client.get_or_create_collection("memory", metadata={"hnsw:space": "cosine"}, embedding_function=ef)
+    else:
+        coll = client.get_or_create_collection("memory", metadata={"hnsw:space": "cosine"})
+    _backfill_time_fields(coll)
+    return coll
 
 
 def memory_add(
@@ -57,7 +156,7 @@ def memory_add(
     meta = dict(metadata) if metadata else {}
     meta["weight"] = max(1, min(10, weight))
     meta["type"] = "short" if memory_type == "short" else "long"
-    meta["last_touched"] = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+    _stamp(meta)
     if "source" not in meta:
         meta["source"] = "manual"
     mem_id = str(uuid.uuid4())
@@ -65,6 +164,22 @@ def memory_add(
     return mem_id
 
 
+def _rank(ids: list, docs: list, metas: list, dists: list, n: int, use_weight: bool) -> List[tuple]:
+    """Top n (id, text, metadata) of one query's results, re-ranked by weight and recency."""
+    metas = metas or [{}] * len(docs)
+    if not use_weight or not dists:
+        return list(zip(ids, docs, metas))[:n]
+    # Re-rank: score = (1 - distance) * weight * recency_boost. Recently touched = more relevant.
+    scored = []
+    for d, m, dist, i in zip(docs, metas, dists, ids):
+        w = (m or {}).get("weight", 5)
+        boost = _recency_boost((m or {}).get("last_touched"))
+        sim = 1.0 - dist
+        scored.append((sim * w * boost, i, d, m))
+    scored.sort(key=lambda x: -x[0])
+    return [(i, d, m) for _, i, d, m in scored[:n]]
+
+
 def memory_search(
     query: str,
     n: int = 5,
@@ -73,7 +188,7 @@ def memory_search(
     with_ids: bool = False,
 ) -> Union[List[str], List[dict]]:
     """Search memory. memory_type filters to 'short' or 'long'. use_weight boosts by importance.
-    If with_ids=True, returns list of {id, text}; otherwise returns list of str (backward compatible)."""
+    If with_ids=True, returns list of {id, text, metadata}; otherwise returns list of str (backward compatible)."""
     coll = _get_collection()
     if not coll:
         return []
@@ -92,21 +207,34 @@ def memory_search(
     ids = results.get("ids", [[]])[0]  # Chromadb always returns ids
     if not docs:
         return []
-    if not use_weight or not dists:
-        items = list(zip(ids, docs))[:n]
-    else:
-        # Re-rank: score = (1 - distance) * weight * recency_boost. Recently touched = more relevant.
-        scored = []
-        for d, m, dist, i in zip(docs, metas or [{}] * len(docs), dists, ids):
-            w = (m or {}).get("weight", 5)
-            boost = _recency_boost((m or {}).get("last_touched"))
-            sim = 1.0 - dist
-            scored.append((sim * w * boost, i, d))
-        scored.sort(key=lambda x: -x[0])
-        items = [(i, d) for _, i, d in scored[:n]]
+    items = _rank(ids, docs, metas, dists, n, use_weight)
     if with_ids:
-        return [{"id": i, "text": d} for i, d in items]
-    return [d for _, d in items]
+        return [{"id": i, "text": d, "metadata": m or {}} for i, d, m in items]
+    return [d for _, d, _ in items]
+
+
+def memory_search_many(queries: List[str], n: int = 5) -> List[List[dict]]:
+    """Like memory_search(with_ids=True) for several queries in one vector-store call."""
+    coll = _get_collection()
+    if not coll or not queries:
+        return [[] for _ in queries]
+    results = coll.query(
+        query_texts=list(queries),
+        n_results=min(n * 3, 100),
+        include=["documents", "metadatas", "distances"],
+    )
+    out = []
+    for k in range(len(queries)):
+        items = _rank(
+            results["ids"][k],
+            (results.get("documents") or [[]] * len(queries))[k],
+            (results.get("metadatas") or [[]] * len(queries))[k],
+            (results.get("distances") or [[]] * len(queries))[k],
+            n,
+            True,
+        )
+        out.append([{"id": i, "text": d, "metadata": m or {}} for i, d, m in items])
+    return out
 
 
 def memory_refresh(query: str, bump_weight: bool = False) -> Optional[str]:
@@ -126,8 +254,7 @@ def memory_refresh(query: str, bump_weight: bool = False) -> Optional[str]:
     if not docs or not ids:
         return None
     doc, meta, doc_id = docs[0], (metas or [{}])[0] or {}, ids[0]
-    meta = dict(meta)
-    meta["last_touched"] = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+    meta = _stamp(dict(meta), modified=bump_weight)
     if bump_weight:
         w = meta.get("weight", 5)
         meta["weight"] = min(10, w + 1)
@@ -152,8 +279,7 @@ def memory_touch_on_search(query: str, n: int = 5) -> int:
         return 0
     touched = 0
     for doc_id, m in zip(ids, metas or [{}] * len(ids)):
-        meta = dict(m or {})
-        meta["last_touched"] = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        meta = _stamp(dict(m or {}), modified=False)
         try:
             coll.update(ids=[doc_id], metadatas=[meta])
             touched += 1
@@ -180,6 +306,31 @@ def memory_list(limit: int = 50) -> List[dict]:
         return []
 
 
+def memory_list_changed(
+    since: Optional[float] = None, before: Optional[float] = None, field: str = "modified_at"
+) -> List[dict]:
+    """Memories with since <= field <= before (epoch seconds; None = unbounded), oldest first.
+    field: modified_at (written: added, weight/type changed) or touched_at (any use, recall included).
+    The range is a Chroma where filter, so only matching memories are read.
+    Used by the memory agent to look only at memories changed since its last run."""
+    coll = _get_collection()
+    if not coll:
+        return []
+    conds = [{field: {"$gte": since if since is not None else 0}}]
+    if before is not None:
+        conds.append({field: {"$lte": before}})
+    try:
+        data = coll.get(where=conds[0] if len(conds) == 1 else {"$and": conds}, include=["documents", "metadatas"])
+    except Exception:
+        return []
+    ids = data.get("ids") or []
+    docs = data.get("documents") or []
+    metas = data.get("metadatas") or [{}] * len(docs)
+    out = [{"id": i, "text": d, "metadata": m or {}} for i, d, m in zip(ids, docs, metas)]
+    out.sort(key=lambda x: x["metadata"].get(field) or 0)
+    return out
+
+
 def memory_delete(memory_id: str) -> bool:
     """Delete a memory by id. Returns True if deleted."""
     coll = _get_collection()
@@ -207,8 +358,67 @@ def memory_update(memory_id: str, weight: Optional[int] = None, memory_type: Opt
             meta["weight"] = max(1, min(10, weight))
         if memory_type is not None:
             meta["type"] = "short" if memory_type == "short" else "long"
-        meta["last_touched"] = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        _stamp(meta)
         coll.update(ids=[memory_id], metadatas=[meta])
         return True
     except Exception:
         return False
+
+
+def memory_add_many(items: List[dict]) -> List[str]:
+    """Store several facts in one vector-store call. Each item: text, weight, memory_type,
+    optional metadata (same defaults as memory_add). Returns the new ids in order."""
+    coll = _get_collection()
+    if not coll or not items:
+        return []
+    now = time.time()
+    ids, docs, metas = [], [], []
+    for item in items:
+        meta = dict(item.get("metadata") or {})
+        meta["weight"] = max(1, min(10, item.get("weight", 5)))
+        meta["type"] = "short" if item.get("memory_type") == "short" else "long"
+        _stamp(meta, now=now)
+        meta.setdefault("source", "manual")
+        ids.append(str(uuid.uuid4()))
+        docs.append(item["text"])
+        metas.append(meta)
+    coll.add(documents=docs, ids=ids, metadatas=metas)
+    return ids
+
+
+def memory_delete_many(memory_ids: List[str]) -> int:
+    """Delete several memories in one call. Returns how many were asked for."""
+    coll = _get_collection()
+    ids = list(dict.fromkeys(i for i in memory_ids if i))
+    if not coll or not ids:
+        return 0
+    coll.delete(ids=ids)
+    return len(ids)
+
+
+def memory_update_many(updates: dict) -> int:
+    """
+    Update several memories with one read and one write. updates: {memory_id: {weight?,
+    weight_delta?, memory_type?}}. Missing ids are skipped. Returns count updated.
+    """
+    coll = _get_collection()
+    if not coll or not updates:
+        return 0
+    data = coll.get(ids=list(updates), include=["metadatas"])
+    now = time.time()
+    ids, metas = [], []
+    for mid, m in zip(data.get("ids") or [], data.get("metadatas") or []):
+        change = updates[mid]
+        meta = dict(m or {})
+        if change.get("weight") is not None:
+            meta["weight"] = max(1, min(10, change["weight"]))
+        if change.get("weight_delta"):
+            meta["weight"] = max(1, min(10, meta.get("weight", 5) + change["weight_delta"]))
+        if change.get("memory_type") is not None:
+            meta["type"] = "short" if change["memory_type"] == "short" else "long"
+        _stamp(meta, now=now)
+        ids.append(mid)
+        metas.append(meta)
+    if ids:
+        coll.update(ids=ids, metadatas=metas)
+    return len(ids)
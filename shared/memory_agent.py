@@ -9,9 +9,9 @@ from __future__ import annotations
 import json
 import os
 import uuid
-from datetime import datetime, timedelta, timezone
+from datetime import date, datetime, timedelta, timezone
 from pathlib import Path
-from typing import Any, List, Optional
+from typing import Any, Dict, List, Optional, Sequence
 
 # Paths - use shared module so Woody and dashboard always use same DB
 from shared.db_path import get_woody_db_path as _get_woody_db_path
@@ -33,27 +33,107 @@ def _get_conn(db_path: Path):
     return sqlite3.connect(str(db_path))
 
 
+def _norm(text: Any) -> str:
+    """Lowercase, collapse whitespace, cap length - for dedupe keys."""
+    return " ".join(str(text or "").lower().split())[:80]
+
+
+def proposal_dedupe_key(action_type: str, payload: dict) -> Optional[str]:
+    """
+    Identity of a proposal for duplicate detection, or None if the type isn't deduped.
+    Stored in memory_agent_proposals.dedupe_key; unique among pending proposals.
+    """
+    p = payload or {}
+    if action_type == "add":
+        key = _norm(p.get("fact"))
+    elif action_type == "remove":
+        key = _norm(p.get("query"))
+    elif action_type == "event_memory":
+        key = f"{str(p.get('date', ''))[:10]}|{_norm(str(p.get('text', ''))[:50])}"
+    elif action_type == "event_suggestion":
+        key = f"{str(p.get('date', ''))[:10]}|{_norm(p.get('title'))}"
+    elif action_type == "consolidate":
+        key = "|".join(sorted(str(i) for i in p.get("source_ids") or []))
+    elif action_type == "promote":
+        key = f"{p.get('memory_id')}|{p.get('action')}"
+    elif action_type == "circle_add":
+        key = f"{p.get('circle_id')}|{p.get('entity_type')}|{p.get('entity_id')}"
+    else:
+        return None
+    return f"{action_type}:{key}" if key.strip("|") else None
+
+
 def create_proposal(
     db_path: Path,
     action_type: str,
     payload: dict,
     reason: str = "",
 ) -> str:
-    """Store a proposal. Returns proposal id."""
+    """
+    Store a proposal. Returns proposal id. Idempotent: if an identical proposal (same
+    dedupe key) is already pending, nothing is added and that proposal's id is returned.
+    """
     pid = _proposal_id()
+    key = proposal_dedupe_key(action_type, payload)
     conn = _get_conn(db_path)
     try:
-        conn.execute(
-            """INSERT INTO memory_agent_proposals (id, action_type, status, payload, reason)
-               VALUES (?, ?, 'pending', ?, ?)""",
-            (pid, action_type, json.dumps(payload), reason),
+        cur = conn.execute(
+            """INSERT INTO memory_agent_proposals (id, action_type, status, payload, reason, dedupe_key)
+               VALUES (?, ?, 'pending', ?, ?, ?)
+               ON CONFLICT(dedupe_key) WHERE status = 'pending' AND dedupe_key IS NOT NULL DO NOTHING""",
+            (pid, action_type, json.dumps(payload), reason, key),
         )
+        if cur.rowcount == 0:
+            pid = conn.execute(
+                "SELECT id FROM memory_agent_proposals WHERE dedupe_key = ? AND status = 'pending'", (key,)
+            ).fetchone()[0]
         conn.commit()
     finally:
         conn.close()
     return pid
 
 
+def proposal_exists(db_path: Path, action_type: str, payload: dict, pending_only: bool = True) -> bool:
+    """Indexed duplicate check: is there a proposal with the same dedupe key (pending, or any status)?"""
+    key = proposal_dedupe_key(action_type, payload)
+    if key is None:
+        return False
+    sql = "SELECT 1 FROM memory_agent_proposals WHERE dedupe_key = ?"
+    if pending_only:
+        sql += " AND status = 'pending'"
+    conn = _get_conn(db_path)
+    try:
+        return conn.execute(sql + " LIMIT 1", (key,)).fetchone() is not None
+    finally:
+        conn.close()
+
+
+def backfill_dedupe_keys(conn) -> int:
+    """
+    Fill dedupe_key for rows created before the column existed (called by woody's init_db).
+    When older pending rows are duplicates of each other, only the first gets the key.
+    """
+    rows = conn.execute(
+        "SELECT id, action_type, payload, status FROM memory_agent_proposals WHERE dedupe_key IS NULL ORDER BY created_at, rowid"
+    ).fetchall()
+    taken = {r[0] for r in conn.execute(
+        "SELECT dedupe_key FROM memory_agent_proposals WHERE status = 'pending' AND dedupe_key IS NOT NULL"
+    )}
+    updates = []
+    for pid, action_type, payload, status in rows:
+        try:
+            key = proposal_dedupe_key(action_type, json.loads(payload))
+        except ValueError:
+            continue
+        if key is None or (status == "pending" and key in taken):
+            continue
+        if status == "pending":
+            taken.add(key)
+        updates.append((key, pid))
+    conn.executemany("UPDATE memory_agent_proposals SET dedupe_key = ? WHERE id = ?", updates)
+    return len(updates)
+
+
 def list_pending_proposals(db_path: Path) -> List[dict]:
     """List pending proposals."""
     conn = _get_conn(db_path)
@@ -128,18 +208,86 @@ def audit_log(db_path: Path, proposal_id: str, action: str, details: str = "") -
         conn.close()
 
 
+# --- Watermarks (incremental runs) ---
+
+def get_watermark(db_path: Path, step: str) -> Optional[Any]:
+    """Where `step` got to on its last successful run (JSON value), or None."""
+    conn = _get_conn(db_path)
+    try:
+        row = conn.execute("SELECT value FROM memory_agent_watermarks WHERE step = ?", (step,)).fetchone()
+    finally:
+        conn.close()
+    return json.loads(row[0]) if row else None
+
+
+def set_watermark(db_path: Path, step: str, value: Any) -> None:
+    conn = _get_conn(db_path)
+    try:
+        conn.execute(
+            """INSERT INTO memory_agent_watermarks (step, value, updated_at) VALUES (?, ?, datetime('now'))
+               ON CONFLICT(step) DO UPDATE SET value = excluded.value, updated_at = excluded.updated_at""",
+            (step, json.dumps(value)),
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def _stamp(m: dict, field: str) -> float:
+    return (m.get("metadata") or {}).get(field) or 0.0
+
+
+def _since(wm: dict, field: str) -> float:
+    """Watermark position; watermarks saved before the numeric fields carry an ISO last_touched."""
+    if field in wm:
+        return wm[field]
+    from shared.memory import _epoch
+    return _epoch(wm.get("last_touched"))
+
+
+def _changed_memories(
+    wm: Optional[dict], before: Optional[float] = None, field: str = "modified_at"
+) -> List[dict]:
+    """Memories with `field` at or after the watermark, minus the ones it already covers, oldest first."""
+    from shared.memory import memory_list_changed
+    if not wm:
+        return memory_list_changed(before=before, field=field)
+    seen = set(wm["ids"])
+    changed = memory_list_changed(since=_since(wm, field), before=before, field=field)
+    return [m for m in changed if m.get("id") not in seen]
+
+
+def _advance(wm: Optional[dict], done: List[dict], field: str = "modified_at") -> Optional[dict]:
+    """
+    Watermark after processing `done` (oldest first): the newest `field` value plus the ids at
+    that value, since batch writes stamp many memories with the same time.
+    """
+    if not done:
+        return wm
+    last = _stamp(done[-1], field)
+    ids = [m.get("id") for m in done if _stamp(m, field) == last]
+    if wm and _since(wm, field) == last:
+        ids = wm["ids"] + ids
+    return {field: last, "ids": ids}
+
+
 # --- Agent logic ---
 
-def run_memory_agent(woody_db_path: Optional[Path] = None) -> dict:
+def run_memory_agent(woody_db_path: Optional[Path] = None, full: bool = False) -> dict:
     """
     Run the memory agent: process pending approvals, review events, propose consolidations.
     Returns summary of proposals created. Does NOT commit - user must approve first.
+
+    Each step only looks at what changed since its watermark (see get_watermark) and moves
+    the watermark after it succeeds, so a run costs in proportion to the day's changes.
+    full=True ignores the watermarks and rescans.
     """
     db_path = woody_db_path or _get_woody_db_path()
     dashboard_db = _get_dashboard_db_path()
     summary = {"add": 0, "remove": 0, "event_memory": 0, "consolidate": 0, "promote": 0}
 
-    # 1. Process pending Woody approvals that are memory_store or memory_remove
+    # 1. Process Woody approvals (memory_store / memory_remove) created since the last run.
+    # Watermark: newest created_at seen plus the ids at that second (created_at has 1s resolution).
     try:
         import sys
         _repo = Path(__file__).resolve().parent.parent
@@ -156,6 +304,13 @@ def run_memory_agent(woody_db_path: Optional[Path] = None) -> dict:
         finally:
             for k, v in _saved.items():
                 sys.modules[k] = v
+        wm = (None if full else get_watermark(db_path, "approvals")) or {"created_at": "", "ids": []}
+        pending = [
+            p for p in pending
+            if p.get("created_at", "") > wm["created_at"]
+            or (p.get("created_at", "") == wm["created_at"] and p.get("id") not in wm["ids"])
+        ]
+        pending.sort(key=lambda p: (p.get("created_at", ""), p.get("id", "")))
         for p in pending:
             if p.get("tool_name") == "memory_store":
                 args = p.get("tool_args", {})
@@ -179,26 +334,46 @@ def run_memory_agent(woody_db_path: Optional[Path] = None) -> dict:
                         reason=f"From Woody approval {p.get('id')}",
                     )
                     summary["remove"] += 1
+        if pending:
+            last = pending[-1].get("created_at", "")
+            ids = [p.get("id") for p in pending if p.get("created_at", "") == last]
+            if last == wm["created_at"]:
+                ids = wm["ids"] + ids
+            set_watermark(db_path, "approvals", {"created_at": last, "ids": ids})
     except Exception:
         pass
 
-    # 2. Events → memories (via EVENTS agent: unified calendar + completed TODOs)
+    # 2. Events → memories (via EVENTS agent: unified calendar + completed TODOs).
+    # Watermark: the date of the last complete pass; rescan from that day (events can be added
+    # later in the day), at most 7 days back.
     try:
         from shared.events_agent import propose_events_for_memory
-        summary["event_memory"] = propose_events_for_memory(db_path, days_back=7, max_proposals=15)
+        today = datetime.now(timezone.utc).date()
+        days_back = 7
+        last = None if full else get_watermark(db_path, "events")
+        if last:
+            days_back = max(0, min(7, (today - datetime.strptime(last, "%Y-%m-%d").date()).days))
+        max_proposals = 15
+        summary["event_memory"] = propose_events_for_memory(db_path, days_back=days_back, max_proposals=max_proposals)
+        if summary["event_memory"] < max_proposals:
+            set_watermark(db_path, "events", today.isoformat())
     except Exception:
         pass
 
-    # 3. Propose consolidations (similar memories), max 5 per run
+    # 3. Propose consolidations (similar memories), max 5 per run.
+    # Only memories written (added, reweighted) since the watermark are compared against the rest;
+    # recall on search bumps touched_at, not modified_at, so it doesn't count as a change.
     try:
-        from shared.memory import memory_list, memory_search
-        mems = memory_list(limit=30)
-        mem_by_id = {m.get("id"): m for m in mems if m.get("id")}
+        from shared.memory import memory_search
+        wm = None if full else get_watermark(db_path, "consolidate")
+        mems = _changed_memories(wm)
         seen_pairs = set()
         consolidate_count = 0
+        done: List[dict] = []
         for m in mems:
             if consolidate_count >= 5:
                 break
+            done.append(m)
             mid, text = m.get("id"), m.get("text", "")
             if not text or len(text) < 10:
                 continue
@@ -213,7 +388,7 @@ def run_memory_agent(woody_db_path: Optional[Path] = None) -> dict:
                 seen_pairs.add(pair)
                 # Propose merge: combined text, max weight, long if any is long
                 meta = m.get("metadata", {})
-                smeta = mem_by_id.get(sid, {}).get("metadata", {})
+                smeta = s.get("metadata") or {}
                 w = max(meta.get("weight", 5), smeta.get("weight", 5))
                 t = "long" if meta.get("type") == "long" or smeta.get("type") == "long" else "short"
                 merged = f"{text}. {stext}"[:500]
@@ -232,51 +407,278 @@ def run_memory_agent(woody_db_path: Optional[Path] = None) -> dict:
                 summary["consolidate"] += 1
                 consolidate_count += 1
                 break  # One consolidation per memory
+        if done:
+            set_watermark(db_path, "consolidate", _advance(wm, done))
     except Exception:
         pass
 
-    # 4. Propose promotions (short→long, bump weight for stale important), max 10 per run
+    # 4. Propose promotions, max 10 per run: short→long for memories changed since the
+    # watermark, and bump weight for important memories that went stale (30+ days untouched)
+    # since the last run's cutoff.
     try:
-        from shared.memory import memory_list
-        mems = memory_list(limit=50)
         promote_count = 0
-        for m in mems:
+        wm = None if full else get_watermark(db_path, "promote")
+        changed = _changed_memories(wm)
+        done = []
+        for m in changed:
             if promote_count >= 10:
                 break
-            mid = m.get("id")
+            done.append(m)
             meta = m.get("metadata", {})
-            mtype = meta.get("type", "long")
-            weight = meta.get("weight", 5)
-            touched = meta.get("last_touched", "")
-            if mtype == "short" and weight >= 6:
+            if meta.get("type", "long") == "short" and meta.get("weight", 5) >= 6:
                 create_proposal(
                     db_path,
                     "promote",
-                    {"memory_id": mid, "action": "short_to_long", "text": m.get("text", "")[:80]},
+                    {"memory_id": m.get("id"), "action": "short_to_long", "text": m.get("text", "")[:80]},
                     reason="High-weight short-term memory",
                 )
                 summary["promote"] += 1
                 promote_count += 1
-            elif weight >= 7 and touched and promote_count < 10:
-                try:
-                    dt = datetime.fromisoformat(touched.replace("Z", "+00:00"))
-                    if (datetime.now(timezone.utc) - dt).days > 30:
-                        create_proposal(
-                            db_path,
-                            "promote",
-                            {"memory_id": mid, "action": "bump_weight", "text": m.get("text", "")[:80]},
-                            reason="Important memory not touched in 30+ days",
-                        )
-                        summary["promote"] += 1
-                        promote_count += 1
-                except (ValueError, TypeError):
-                    pass
+        if done:
+            set_watermark(db_path, "promote", _advance(wm, done))
+
+        cutoff = (datetime.now(timezone.utc) - timedelta(days=30)).timestamp()
+        wm = None if full else get_watermark(db_path, "stale")
+        stale = _changed_memories(wm, before=cutoff, field="touched_at")
+        done = []
+        for m in stale:
+            if promote_count >= 10:
+                break
+            done.append(m)
+            if _stamp(m, "touched_at") and m.get("metadata", {}).get("weight", 5) >= 7:
+                create_proposal(
+                    db_path,
+                    "promote",
+                    {"memory_id": m.get("id"), "action": "bump_weight", "text": m.get("text", "")[:80]},
+                    reason="Important memory not touched in 30+ days",
+                )
+                summary["promote"] += 1
+                promote_count += 1
+        new_wm = _advance(wm, done, "touched_at")
+        if len(done) == len(stale) and (new_wm is None or _since(new_wm, "touched_at") < cutoff):
+            new_wm = {"touched_at": cutoff, "ids": []}  # everything up to the cutoff is covered
+        if new_wm != wm:
+            set_watermark(db_path, "stale", new_wm)
     except Exception:
         pass
 
     return summary
 
 
+def _claim(db_path: Path, status: str, proposal_ids: Optional[Sequence[str]]) -> List[dict]:
+    """Mark pending proposals (all, or the given ids) approved/rejected in one transaction; return them."""
+    if proposal_ids is not None and not proposal_ids:
+        return []
+    conn = _get_conn(db_path)
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        sql = "SELECT id, action_type, payload FROM memory_agent_proposals WHERE status = 'pending'"
+        params: list = []
+        if proposal_ids is not None:
+            sql += f" AND id IN ({','.join('?' * len(proposal_ids))})"
+            params = list(proposal_ids)
+        rows = conn.execute(sql + " ORDER BY created_at, rowid", params).fetchall()
+        conn.executemany(
+            "UPDATE memory_agent_proposals SET status = ?, resolved_at = datetime('now') WHERE id = ?",
+            [(status, r[0]) for r in rows],
+        )
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+    return [{"id": r[0], "action_type": r[1], "payload": json.loads(r[2]), "status": status} for r in rows]
+
+
+def _apply(woody_db_path: Path, props: List[dict]) -> List[dict]:
+    """
+    Execute approved proposals as a batch: one vector-store search for all removals, one
+    add, then one delete (consolidation sources only after their merged memory was added),
+    one metadata update, one dashboard transaction for circle adds, and audit rows in one
+    executemany. Returns [{id, ok, message}] in input order.
+    """
+    from shared.memory import memory_add_many, memory_delete_many, memory_search_many, memory_update_many
+
+    results: Dict[str, dict] = {}
+    audits: List[tuple] = []
+    user_actions: List[dict] = []
+    adds: List[tuple] = []  # (proposal, item, audit action, audit details with {id}, message)
+    deletes: List[tuple] = []  # (proposal, memory ids)
+    updates: Dict[str, dict] = {}
+    update_props: List[tuple] = []  # (proposal, memory id, audit details, message)
+    removals: List[dict] = []
+    circle_rows: List[tuple] = []  # (proposal, (circle_id, entity_type, entity_id))
+
+    def done(prop: dict, ok: bool, message: str, audit: Optional[tuple] = None) -> None:
+        results[prop["id"]] = {"id": prop["id"], "ok": ok, "message": message}
+        if ok and audit:
+            audits.append((prop["id"],) + audit)
+
+    for prop in props:
+        action, payload = prop.get("action_type", ""), prop.get("payload") or {}
+        if action == "add":
+            item = {"text": payload.get("fact", ""), "weight": payload.get("weight", 5),
+                    "memory_type": payload.get("memory_type", "long")}
+            adds.append((prop, item, "add", "Added memory {id}", f"Added memory: {payload.get('fact', '')[:60]}..."))
+        elif action == "event_memory":
+            item = {"text": payload.get("text", ""), "weight": payload.get("weight", 5),
+                    "memory_type": payload.get("memory_type", "long")}
+            adds.append((prop, item, "event_memory", f"From event {payload.get('event_id')}",
+                         f"Added event memory: {payload.get('text', '')[:60]}..."))
+        elif action == "remove":
+            removals.append(prop)
+        elif action == "consolidate":
+            source_ids = payload.get("source_ids", [])
+            deletes.append((prop, source_ids))
+            item = {"text": payload.get("merged_text", ""), "weight": payload.get("weight", 5),
+                    "memory_type": payload.get("memory_type", "long")}
+            adds.append((prop, item, "consolidate", f"Merged {source_ids} -> {{id}}",
+                         f"Consolidated {len(source_ids)} memories"))
+        elif action == "promote":
+            mid, act = payload.get("memory_id"), payload.get("action", "")
+            if not mid:
+                done(prop, False, "Missing memory_id")
+            elif act == "short_to_long":
+                updates.setdefault(mid, {})["memory_type"] = "long"
+                update_props.append((prop, mid, f"{mid} short->long", "Promoted to long-term"))
+            elif act == "bump_weight":
+                updates.setdefault(mid, {})["weight_delta"] = updates.get(mid, {}).get("weight_delta", 0) + 1
+                update_props.append((prop, mid, f"{mid} bump weight", "Bumped weight"))
+            else:
+                done(prop, False, "Unknown promote action")
+        elif action == "event_suggestion":
+            from shared.events_agent import create_event
+            title = payload.get("title", "(From email)")
+            ev_date = payload.get("date", "") or date.today().isoformat()
+            try:
+                description = payload.get("description", "")
+                if payload.get("time"):
+                    description = f"At {payload['time']}\n{description}"
+                ev_id = create_event(ev_date, title, description, "event")
+            except Exception as e:
+                done(prop, False, str(e))
+                continue
+            done(prop, True, f"Created event: {title[:50]}...", ("event_suggestion", f"Created event {ev_id}"))
+            user_actions.append({"action": "event_approved", "proposal_id": prop["id"], "title": title,
+                                 "event_date": ev_date[:10], "source": payload.get("description", "")[:100]})
+        elif action == "circle_add":
+            circle_id, entity_id = payload.get("circle_id"), str(payload.get("entity_id", ""))
+            if not circle_id or not entity_id:
+                done(prop, False, "Missing circle_id or entity_id")
+            else:
+                circle_rows.append((prop, (circle_id, payload.get("entity_type", "contact"), entity_id)))
+        else:
+            done(prop, False, f"Unknown action: {action}")
+
+    if removals:
+        try:
+            found = memory_search_many([p["payload"].get("query", "") for p in removals], n=1)
+            for prop, hits in zip(removals, found):
+                if hits:
+                    deletes.append((prop, [hits[0]["id"]]))
+                else:
+                    done(prop, False, "No matching memory found")
+        except Exception as e:
+            for prop in removals:
+                done(prop, False, str(e))
+
+    added: Dict[str, tuple] = {}  # consolidation id -> (merged memory id, audit, message)
+    if adds:
+        try:
+            new_ids = memory_add_many([item for _, item, _, _, _ in adds])
+            for (prop, _, audit_action, details, message), mem_id in zip(adds, new_ids):
+                audit = (audit_action, details.replace("{id}", str(mem_id)))
+                if prop.get("action_type") == "consolidate":
+                    added[prop["id"]] = (mem_id, audit, message)
+                else:
+                    done(prop, True, message, audit)
+        except Exception as e:
+            for prop, *_ in adds:
+                done(prop, False, str(e))
+
+    # Sources go only once their merged memory exists, so a failed add loses nothing.
+    deletes = [(prop, ids) for prop, ids in deletes if prop["id"] not in results]
+    if deletes:
+        try:
+            memory_delete_many([mid for _, ids in deletes for mid in ids])
+        except Exception as e:
+            for prop, _ in deletes:
+                if prop["id"] in added:
+                    done(prop, False, f"Added merged memory {added[prop['id']][0]}, but removing the sources failed: {e}")
+                else:
+                    done(prop, False, str(e))
+        else:
+            for prop, ids in deletes:
+                if prop["id"] in added:
+                    _, audit, message = added[prop["id"]]
+                    done(prop, True, message, audit)
+                else:
+                    done(prop, True, "Removed memory", ("remove", f"Removed {ids[0]}"))
+
+    if updates:
+        try:
+            memory_update_many(updates)
+            for prop, mid, details, message in update_props:
+                done(prop, True, message, ("promote", details))
+        except Exception as e:
+            for prop, *_ in update_props:
+                done(prop, False, str(e))
+
+    if circle_rows:
+        conn = _get_conn(_get_dashboard_db_path())
+        try:
+            conn.executemany(
+                "INSERT OR IGNORE INTO circle_members (circle_id, entity_type, entity_id) VALUES (?, ?, ?)",
+                [row for _, row in circle_rows],
+            )
+            conn.commit()
+            for prop, (circle_id, entity_type, entity_id) in circle_rows:
+                done(prop, True, f"Added to {prop['payload'].get('circle_name', 'circle')}",
+                     ("circle_add", f"Added {entity_type} {entity_id} to circle {circle_id}"))
+        except Exception as e:
+            for prop, _ in circle_rows:
+                done(prop, False, str(e))
+        finally:
+            conn.close()
+
+    if audits:
+        conn = _get_conn(woody_db_path)
+        try:
+            conn.executemany(
+                "INSERT INTO memory_agent_audit (proposal_id, action, details) VALUES (?, ?, ?)", audits
+            )
+            conn.commit()
+        finally:
+            conn.close()
+    if user_actions:
+        from shared.user_actions import log_actions
+        log_actions(user_actions, db_path=woody_db_path)
+    return [results[p["id"]] for p in props]
+
+
+def resolve_proposals(
+    db_path: Path,
+    status: str,
+    proposal_ids: Optional[Sequence[str]] = None,
+) -> List[dict]:
+    """
+    Bulk approve or reject pending proposals (all of them, or the given ids). Statuses
+    change in one transaction; approved ones are then committed as a batch (see _apply).
+    Ids that aren't pending are left out. Returns [{id, ok, message}].
+    """
+    props = _claim(db_path, status, proposal_ids)
+    if status != "approved":
+        from shared.user_actions import log_actions
+        log_actions([
+            {"action": "event_rejected", "proposal_id": p["id"], "title": p["payload"].get("title"),
+             "event_date": (p["payload"].get("date") or "")[:10], "source": p["payload"].get("description", "")[:100]}
+            for p in props if p["action_type"] == "event_suggestion"
+        ], db_path=db_path)
+        return [{"id": p["id"], "ok": True, "message": "Rejected."} for p in props]
+    return _apply(db_path, props)
+
+
 def commit_proposal(woody_db_path: Path, proposal_id: str) -> tuple[bool, str]:
     """
     Execute an approved proposal. Returns (success, message).
@@ -287,103 +689,8 @@ def commit_proposal(woody_db_path: Path, proposal_id: str) -> tuple[bool, str]:
         return False, "Proposal not found"
     if prop.get("status") != "approved":
         return False, "Proposal must be approved first"
-
-    action = prop.get("action_type", "")
-    payload = prop.get("payload", {})
-
     try:
-        from shared.memory import memory_add, memory_delete, memory_update, memory_search
-        if action == "add":
-            mem_id = memory_add(
-                payload.get("fact", ""),
-                weight=payload.get("weight", 5),
-                memory_type=payload.get("memory_type", "long"),
-            )
-            audit_log(woody_db_path, proposal_id, "add", f"Added memory {mem_id}")
-            return True, f"Added memory: {payload.get('fact', '')[:60]}..."
-
-        if action == "remove":
-            results = memory_search(payload.get("query", ""), n=1, with_ids=True)
-            if not results:
-                return False, "No matching memory found"
-            mid = results[0].get("id")
-            memory_delete(mid)
-            audit_log(woody_db_path, proposal_id, "remove", f"Removed {mid}")
-            return True, f"Removed memory"
-
-        if action == "event_memory":
-            mem_id = memory_add(
-                payload.get("text", ""),
-                weight=payload.get("weight", 5),
-                memory_type=payload.get("memory_type", "long"),
-            )
-            audit_log(woody_db_path, proposal_id, "event_memory", f"From event {payload.get('event_id')}")
-            return True, f"Added event memory: {payload.get('text', '')[:60]}..."
-
-        if action == "consolidate":
-            source_ids = payload.get("source_ids", [])
-            merged = payload.get("merged_text", "")
-            weight = payload.get("weight", 5)
-            mtype = payload.get("memory_type", "long")
-            for sid in source_ids:
-                memory_delete(sid)
-            mem_id = memory_add(merged, weight=weight, memory_type=mtype)
-            audit_log(woody_db_path, proposal_id, "consolidate", f"Merged {source_ids} -> {mem_id}")
-            return True, f"Consolidated {len(source_ids)} memories"
-
-        if action == "promote":
-            mid = payload.get("memory_id")
-            act = payload.get("action", "")
-            if act == "short_to_long":
-                memory_update(mid, memory_type="long")
-                audit_log(woody_db_path, proposal_id, "promote", f"{mid} short->long")
-                return True, "Promoted to long-term"
-            if act == "bump_weight":
-                from shared.memory import _get_collection
-                coll = _get_collection()
-                if coll:
-                    data = coll.get(ids=[mid], include=["metadatas"])
-                    metas = data.get("metadatas", [[]])[0]
-                    if metas:
-                        w = min(10, (metas[0].get("weight", 5) + 1))
-                        memory_update(mid, weight=w)
-                audit_log(woody_db_path, proposal_id, "promote", f"{mid} bump weight")
-                return True, "Bumped weight"
-            return False, "Unknown promote action"
-
-        if action == "event_suggestion":
-            from shared.events_agent import create_event
-            from shared.user_actions import log_action
-            title = payload.get("title", "(From email)")
-            desc = payload.get("description", "")
-            ev_date = payload.get("date", "")
-            if not ev_date:
-                from datetime import date
-                ev_date = date.today().isoformat()
-            ev_id = create_event(ev_date, title, desc, "event")
-            audit_log(woody_db_path, proposal_id, "event_suggestion", f"Created event {ev_id}")
-            log_action("event_approved", proposal_id=proposal_id, title=title, event_date=ev_date[:10], source=payload.get("description", "")[:100], db_path=woody_db_path)
-            return True, f"Created event: {title[:50]}..."
-
-        if action == "circle_add":
-            circle_id = payload.get("circle_id")
-            entity_type = payload.get("entity_type", "contact")
-            entity_id = str(payload.get("entity_id", ""))
-            if not circle_id or not entity_id:
-                return False, "Missing circle_id or entity_id"
-            dash_db = _get_dashboard_db_path()
-            conn = _get_conn(dash_db)
-            try:
-                conn.execute(
-                    "INSERT OR IGNORE INTO circle_members (circle_id, entity_type, entity_id) VALUES (?, ?, ?)",
-                    (circle_id, entity_type, entity_id),
-                )
-                conn.commit()
-            finally:
-                conn.close()
-            audit_log(woody_db_path, proposal_id, "circle_add", f"Added {entity_type} {entity_id} to circle {circle_id}")
-            return True, f"Added to {payload.get('circle_name', 'circle')}"
-
-        return False, f"Unknown action: {action}"
+        result = _apply(woody_db_path, [prop])[0]
     except Exception as e:
         return False, str(e)
+    return result["ok"], result["message"]
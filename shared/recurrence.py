@@ -0,0 +1,247 @@
+"""
+Recurrence rules - the subset of RFC 5545 RRULE that household schedules need.
+
+Supported parts: FREQ (DAILY, WEEKLY, MONTHLY, YEARLY), INTERVAL, COUNT, UNTIL,
+BYDAY (MO..SU; with an ordinal such as 1MO or -1FR for MONTHLY/YEARLY), BYMONTHDAY
+(1..31, -1 = last day) and BYMONTH. Anything else is rejected with ValueError.
+
+As in RFC 5545, dates that don't exist are skipped, not clamped: FREQ=MONTHLY from Jan 31
+fires only in months with a 31st. Use BYMONTHDAY=-1 for "last day of the month", or pass
+clamp_month_end=True to move a plain MONTHLY/YEARLY day-of-month that a month lacks to its
+last day (Jan 31 -> Feb 28 -> Mar 31; Feb 29 -> Feb 28), the way bills are due.
+
+Datetimes are naive and compared as-is; the time of day always comes from dtstart.
+"""
+
+from __future__ import annotations
+
+import calendar
+from datetime import date, datetime, timedelta
+from typing import Iterator, List, NamedTuple, Optional, Tuple
+
+FREQS = ("DAILY", "WEEKLY", "MONTHLY", "YEARLY")
+WEEKDAYS = ("MO", "TU", "WE", "TH", "FR", "SA", "SU")
+
+# Shorthands accepted from users / the LLM in addition to full RRULE strings
+SHORTHANDS = {
+    "daily": "FREQ=DAILY",
+    "weekdays": "FREQ=WEEKLY;BYDAY=MO,TU,WE,TH,FR",
+    "weekends": "FREQ=WEEKLY;BYDAY=SA,SU",
+    "weekly": "FREQ=WEEKLY",
+    "biweekly": "FREQ=WEEKLY;INTERVAL=2",
+    "monthly": "FREQ=MONTHLY",
+    "quarterly": "FREQ=MONTHLY;INTERVAL=3",
+    "yearly": "FREQ=YEARLY",
+    "annually": "FREQ=YEARLY",
+}
+
+_MAX_PERIODS = 10000  # give up on rules that never match (e.g. BYMONTHDAY=31;BYMONTH=2)
+
+
+class Rule(NamedTuple):
+    freq: str
+    interval: int = 1
+    count: Optional[int] = None
+    until: Optional[datetime] = None
+    byday: Tuple[Tuple[int, int], ...] = ()  # (ordinal, weekday); ordinal 0 = every such weekday
+    bymonthday: Tuple[int, ...] = ()
+    bymonth: Tuple[int, ...] = ()
+
+
+def _parse_until(value: str) -> datetime:
+    v = value.rstrip("Z")
+    for fmt in ("%Y%m%dT%H%M%S", "%Y%m%d", "%Y-%m-%dT%H:%M:%S", "%Y-%m-%d"):
+        try:
+            return datetime.strptime(v, fmt)
+        except ValueError:
+            continue
+    raise ValueError(f"Invalid UNTIL: {value}")
+
+
+def _parse_byday(value: str) -> Tuple[int, int]:
+    v = value.strip().upper()
+    wd = v[-2:]
+    if wd not in WEEKDAYS:
+        raise ValueError(f"Invalid BYDAY: {value}")
+    ordinal = int(v[:-2]) if v[:-2] not in ("", "+") else 0
+    if ordinal and not -5 <= ordinal <= 5:
+        raise ValueError(f"Invalid BYDAY ordinal: {value}")
+    return ordinal, WEEKDAYS.index(wd)
+
+
+def parse_rule(text: str) -> Rule:
+    """Parse an RRULE string (with or without the 'RRULE:' prefix) or a shorthand like 'weekly'."""
+    s = (text or "").strip()
+    if s.lower() in SHORTHANDS:
+        s = SHORTHANDS[s.lower()]
+    if s.upper().startswith("RRULE:"):
+        s = s[6:]
+    parts = {}
+    for chunk in s.split(";"):
+        if not chunk.strip():
+            continue
+        key, sep, value = chunk.partition("=")
+        if not sep:
+            raise ValueError(f"Invalid rule part: {chunk}")
+        parts[key.strip().upper()] = value.strip()
+    freq = parts.pop("FREQ", "").upper()
+    if freq not in FREQS:
+        raise ValueError(f"FREQ must be one of {', '.join(FREQS)}")
+    try:
+        interval = int(parts.pop("INTERVAL", "1"))
+        count = int(parts["COUNT"]) if "COUNT" in parts else None
+        bymonthday = tuple(int(x) for x in parts.pop("BYMONTHDAY", "").split(",") if x)
+        bymonth = tuple(int(x) for x in parts.pop("BYMONTH", "").split(",") if x)
+    except ValueError:
+        raise ValueError(f"Invalid number in rule: {text}") from None
+    parts.pop("COUNT", None)
+    until = _parse_until(parts.pop("UNTIL")) if "UNTIL" in parts else None
+    byday = tuple(_parse_byday(x) for x in parts.pop("BYDAY", "").split(",") if x)
+    parts.pop("WKST", None)  # weeks always start Monday here
+    if parts:
+        raise ValueError(f"Unsupported rule parts: {', '.join(sorted(parts))}")
+    if interval < 1 or (count is not None and count < 1):
+        raise ValueError("INTERVAL and COUNT must be positive")
+    if count is not None and until is not None:
+        raise ValueError("COUNT and UNTIL can't both be set")
+    if any(d == 0 or not -31 <= d <= 31 for d in bymonthday):
+        raise ValueError("BYMONTHDAY must be 1..31 or -31..-1")
+    if any(not 1 <= m <= 12 for m in bymonth):
+        raise ValueError("BYMONTH must be 1..12")
+    if any(o for o, _ in byday) and freq not in ("MONTHLY", "YEARLY"):
+        raise ValueError("BYDAY ordinals (e.g. 1MO) need FREQ=MONTHLY or YEARLY")
+    if freq == "YEARLY" and byday and not bymonth:
+        raise ValueError("FREQ=YEARLY with BYDAY needs BYMONTH")
+    return Rule(freq, interval, count, until, byday, bymonthday, bymonth)
+
+
+def format_rule(rule: Rule) -> str:
+    """Canonical RRULE string (without the 'RRULE:' prefix) for storage."""
+    out = [f"FREQ={rule.freq}"]
+    if rule.interval != 1:
+        out.append(f"INTERVAL={rule.interval}")
+    if rule.count is not None:
+        out.append(f"COUNT={rule.count}")
+    if rule.until is not None:
+        out.append(f"UNTIL={rule.until.strftime('%Y%m%dT%H%M%S')}")
+    if rule.byday:
+        out.append("BYDAY=" + ",".join(f"{o or ''}{WEEKDAYS[w]}" for o, w in rule.byday))
+    if rule.bymonthday:
+        out.append("BYMONTHDAY=" + ",".join(str(d) for d in rule.bymonthday))
+    if rule.bymonth:
+        out.append("BYMONTH=" + ",".join(str(m) for m in rule.bymonth))
+    return ";".join(out)
+
+
+def _month_days(year: int, month: int, rule: Rule, default_day: int, clamp: bool = False) -> List[date]:
+    """Candidate days within one month for MONTHLY/YEARLY rules."""
+    ndays = calendar.monthrange(year, month)[1]
+    days = set()
+    if rule.bymonthday:
+        for d in rule.bymonthday:
+            day = d if d > 0 else ndays + 1 + d
+            if 1 <= day <= ndays:
+                days.add(day)
+    if rule.byday:
+        by_wd = set()
+        for ordinal, wd in rule.byday:
+            matches = [d for d in range(1, ndays + 1) if calendar.weekday(year, month, d) == wd]
+            if ordinal == 0:
+                by_wd.update(matches)
+            elif abs(ordinal) <= len(matches):
+                by_wd.add(matches[ordinal - 1] if ordinal > 0 else matches[ordinal])
+        days = days & by_wd if rule.bymonthday else by_wd
+    if not rule.bymonthday and not rule.byday and (default_day <= ndays or clamp):
+        days.add(min(default_day, ndays))
+    return [date(year, month, d) for d in sorted(days)]
+
+
+def _period_days(rule: Rule, start: date, n: int, clamp: bool = False) -> List[date]:
+    """Candidate days in the n-th period (0 = the period containing dtstart)."""
+    step = n * rule.interval
+    if rule.freq == "DAILY":
+        d = start + timedelta(days=step)
+        if rule.bymonth and d.month not in rule.bymonth:
+            return []
+        if rule.bymonthday:
+            ndays = calendar.monthrange(d.year, d.month)[1]
+            if d.day not in {x if x > 0 else ndays + 1 + x for x in rule.bymonthday}:
+                return []
+        if rule.byday and d.weekday() not in {w for _, w in rule.byday}:
+            return []
+        return [d]
+    if rule.freq == "WEEKLY":
+        monday = start - timedelta(days=start.weekday()) + timedelta(weeks=step)
+        weekdays = sorted({w for _, w in rule.byday}) or [start.weekday()]
+        days = [monday + timedelta(days=w) for w in weekdays]
+        return [d for d in days if not rule.bymonth or d.month in rule.bymonth]
+    if rule.freq == "MONTHLY":
+        months = start.year * 12 + start.month - 1 + step
+        year, month = divmod(months, 12)
+        if rule.bymonth and month + 1 not in rule.bymonth:
+            return []
+        return _month_days(year, month + 1, rule, start.day, clamp)
+    year = start.year + step
+    out: List[date] = []
+    for month in rule.bymonth or (start.month,):
+        out.extend(_month_days(year, month, rule, start.day, clamp))
+    return sorted(out)
+
+
+def _first_period(rule: Rule, start: date, after: date) -> int:
+    """A period index at or before the one containing `after` (lets us skip ahead without COUNT)."""
+    if rule.count is not None or after <= start:
+        return 0
+    if rule.freq == "DAILY":
+        span = (after - start).days
+    elif rule.freq == "WEEKLY":
+        span = (after - start).days // 7
+    elif rule.freq == "MONTHLY":
+        span = (after.year - start.year) * 12 + after.month - start.month
+    else:
+        span = after.year - start.year
+    return max(0, span // rule.interval - 1)
+
+
+def iter_occurrences(
+    rule: Rule, dtstart: datetime, after: Optional[datetime] = None, clamp_month_end: bool = False
+) -> Iterator[datetime]:
+    """Occurrences at or after dtstart (and strictly after `after`, if given), in order."""
+    start = dtstart.date()
+    at = dtstart.time()
+    n = _first_period(rule, start, after.date()) if after else 0
+    seen = 0
+    for _ in range(_MAX_PERIODS):
+        for d in _period_days(rule, start, n, clamp_month_end):
+            dt = datetime.combine(d, at)
+            if dt < dtstart:
+                continue
+            if rule.until is not None and dt > rule.until:
+                return
+            seen += 1
+            if rule.count is not None and seen > rule.count:
+                return
+            if after is None or dt > after:
+                yield dt
+        n += 1
+
+
+def next_occurrence(
+    rule: Rule, dtstart: datetime, after: datetime, clamp_month_end: bool = False
+) -> Optional[datetime]:
+    """First occurrence strictly after `after`, or None once the rule is exhausted."""
+    return next(iter_occurrences(rule, dtstart, after, clamp_month_end), None)
+
+
+def first_occurrence(rule: Rule, dtstart: datetime) -> Optional[datetime]:
+    """First occurrence at or after dtstart (dtstart itself if it matches the rule)."""
+    return next(iter_occurrences(rule, dtstart), None)
+
+
+def upcoming(rule: Rule, dtstart: datetime, after: datetime, limit: int = 5) -> List[datetime]:
+    out: List[datetime] = []
+    for dt in iter_occurrences(rule, dtstart, after):
+        out.append(dt)
+        if len(out) >= limit:
+            break
+    return out
@@ -0,0 +1,158 @@
+"""
+Retention for Woody's history tables (Woody app.db).
+
+Resolved proposals, audit rows, user actions, resolved approvals and old chat history are
+only needed for a while, but they used to grow forever and every query over the live rows
+paid for them. Each Policy says which rows of a table are old enough to leave the hot
+table; those rows are either moved into retention_archive (zlib-compressed JSON, one
+chunk per batch, readable with iter_archived) or just deleted. Runs daily as the
+`retention` job. Override a table's age with RETENTION_DAYS_<TABLE> (0 = keep forever).
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import zlib
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional
+
+from shared.db_path import get_woody_db_path
+
+BATCH_SIZE = 5000
+
+
+class Policy(NamedTuple):
+    table: str
+    age_column: str  # timestamp (UTC, ISO-ish) the age is measured from
+    keep_days: int
+    where: str = "1"  # which rows may leave at all (e.g. not pending)
+    archive: bool = True  # False = delete without keeping a copy
+
+
+POLICIES: List[Policy] = [
+    Policy("memory_agent_proposals", "resolved_at", 180, "status != 'pending'"),
+    Policy("memory_agent_audit", "created_at", 365),
+    Policy("user_actions", "created_at", 365),
+    Policy("user_rejections", "created_at", 90, archive=False),  # only the last 14 days are read
+    Policy("approvals", "created_at", 90, "status != 'pending'"),
+    Policy("conversation_messages", "created_at", 180),
+    Policy("job_runs", "started_at", 90, "status != 'running'", archive=False),
+    Policy("job_queue", "finished_at", 14, "status IN ('done', 'failed')", archive=False),
+]
+
+
+def _conn(db_path: Optional[Path]) -> sqlite3.Connection:
+    conn = sqlite3.connect(str(db_path or get_woody_db_path()), timeout=30)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def keep_days(policy: Policy) -> int:
+    """Days to keep for this table: RETENTION_DAYS_<TABLE> if set, else the policy default."""
+    raw = os.environ.get(f"RETENTION_DAYS_{policy.table.upper()}", "")
+    try:
+        return int(raw) if raw.strip() else policy.keep_days
+    except ValueError:
+        return policy.keep_days
+
+
+def _cutoff(days: int, now: Optional[datetime] = None) -> str:
+    # Whole days: compares correctly with both 'YYYY-MM-DD HH:MM:SS' and 'YYYY-MM-DDTHH:MM:SS'
+    now = now or datetime.now(timezone.utc)
+    return (now - timedelta(days=days)).strftime("%Y-%m-%d")
+
+
+def apply_policy(db_path: Optional[Path], policy: Policy, now: Optional[datetime] = None) -> int:
+    """Move (or delete) this table's expired rows, BATCH_SIZE per transaction. Returns rows removed."""
+    days = keep_days(policy)
+    if days <= 0:
+        return 0
+    cutoff = _cutoff(days, now)
+    select = (
+        f"SELECT rowid AS _rowid, * FROM {policy.table} "
+        f"WHERE {policy.where} AND {policy.age_column} < ? ORDER BY rowid LIMIT ?"
+    )
+    removed = 0
+    conn = _conn(db_path)
+    try:
+        while True:
+            conn.execute("BEGIN IMMEDIATE")
+            rows = [dict(r) for r in conn.execute(select, (cutoff, BATCH_SIZE))]
+            if not rows:
+                conn.commit()
+                break
+            rowids = [r.pop("_rowid") for r in rows]
+            if policy.archive:
+                conn.execute(
+                    """INSERT INTO retention_archive (table_name, row_count, first_rowid, last_rowid, data)
+                       VALUES (?, ?, ?, ?, ?)""",
+                    (policy.table, len(rows), rowids[0], rowids[-1],
+                     zlib.compress(json.dumps(rows, default=str).encode(), 9)),
+                )
+            conn.executemany(f"DELETE FROM {policy.table} WHERE rowid = ?", [(r,) for r in rowids])
+            conn.commit()
+            removed += len(rows)
+            if len(rows) < BATCH_SIZE:
+                break
+    except Exception:
+        if conn.in_transaction:
+            conn.rollback()
+        raise
+    finally:
+        conn.close()
+    return removed
+
+
+def run_retention(db_path: Optional[Path] = None, now: Optional[datetime] = None) -> Dict[str, int]:
+    """Apply every policy. Returns {table: rows removed} for tables that had any."""
+    out = {}
+    for policy in POLICIES:
+        try:
+            n = apply_policy(db_path, policy, now)
+        except sqlite3.OperationalError as e:  # table missing in an old or dashboard-only DB
+            print(f"[Retention] {policy.table}: {e}")
+            continue
+        if n:
+            out[policy.table] = n
+    return out
+
+
+def iter_archived(db_path: Optional[Path], table: str) -> Iterator[Dict[str, Any]]:
+    """Yield archived rows of a table, oldest first."""
+    conn = _conn(db_path)
+    try:
+        for (data,) in conn.execute(
+            "SELECT data FROM retention_archive WHERE table_name = ? ORDER BY id", (table,)
+        ):
+            yield from json.loads(zlib.decompress(data))
+    finally:
+        conn.close()
+
+
+def retention_stats(db_path: Optional[Path] = None) -> List[Dict[str, Any]]:
+    """Per table: live rows, archived rows, days kept."""
+    conn = _conn(db_path)
+    try:
+        archived = {
+            r[0]: r[1]
+            for r in conn.execute("SELECT table_name, SUM(row_count) FROM retention_archive GROUP BY table_name")
+        }
+        out = []
+        for policy in POLICIES:
+            try:
+                live = conn.execute(f"SELECT COUNT(*) FROM {policy.table}").fetchone()[0]
+            except sqlite3.OperationalError:
+                continue
+            out.append({
+                "table": policy.table,
+                "live_rows": live,
+                "archived_rows": archived.get(policy.table, 0),
+                "keep_days": keep_days(policy),
+                "archive": policy.archive,
+            })
+        return out
+    finally:
+        conn.close()
@@ -0,0 +1,319 @@
+"""
+LLM usage metrics - tokens, prompt-cache hits and latency per OpenAI call, per agent turn
+and per tool call, plus the size of each prompt component (system prompt, history, memories,
+About Me, tool schemas, per-message context). Timestamps are UTC (SQLite datetime('now')). Written by the Woody agent, read by the dashboard. Lives in the Woody DB.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from shared.db_path import get_woody_db_path
+
+
+def _get_conn(db_path: Optional[Path] = None):
+    path = db_path or get_woody_db_path()
+    return sqlite3.connect(str(path))
+
+
+def ensure_tables(conn: sqlite3.Connection) -> None:
+    """Create llm_usage, agent_turns and tool_usage if missing (Woody's init_db, or lazily on first write)."""
+    conn.execute(
+        """CREATE TABLE IF NOT EXISTS llm_usage (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            turn_id INTEGER,
+            chat_id INTEGER,
+            call TEXT NOT NULL,
+            model TEXT NOT NULL,
+            prompt_tokens INTEGER NOT NULL DEFAULT 0,
+            cached_tokens INTEGER NOT NULL DEFAULT 0,
+            completion_tokens INTEGER NOT NULL DEFAULT 0,
+            latency_ms REAL NOT NULL DEFAULT 0,
+            created_at TEXT NOT NULL DEFAULT (datetime('now'))
+        )"""
+    )
+    conn.execute(
+        """CREATE TABLE IF NOT EXISTS agent_turns (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            chat_id INTEGER,
+            model TEXT NOT NULL,
+            llm_calls INTEGER NOT NULL DEFAULT 0,
+            tool_calls INTEGER NOT NULL DEFAULT 0,
+            prompt_tokens INTEGER NOT NULL DEFAULT 0,
+            cached_tokens INTEGER NOT NULL DEFAULT 0,
+            completion_tokens INTEGER NOT NULL DEFAULT 0,
+            total_ms REAL NOT NULL DEFAULT 0,
+            llm_ms REAL NOT NULL DEFAULT 0,
+            tool_ms REAL NOT NULL DEFAULT 0,
+            system_chars INTEGER NOT NULL DEFAULT 0,
+            history_chars INTEGER NOT NULL DEFAULT 0,
+            memories_chars INTEGER NOT NULL DEFAULT 0,
+            about_chars INTEGER NOT NULL DEFAULT 0,
+            tool_schema_chars INTEGER NOT NULL DEFAULT 0,
+            context_chars INTEGER NOT NULL DEFAULT 0,
+            outcome TEXT NOT NULL DEFAULT 'ok',
+            created_at TEXT NOT NULL DEFAULT (datetime('now'))
+        )"""
+    )
+    conn.execute(
+        """CREATE TABLE IF NOT EXISTS tool_usage (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            turn_id INTEGER,
+            chat_id INTEGER,
+            tool TEXT NOT NULL,
+            latency_ms REAL NOT NULL DEFAULT 0,
+            prefetched INTEGER NOT NULL DEFAULT 0,
+            ok INTEGER NOT NULL DEFAULT 1,
+            result_chars INTEGER NOT NULL DEFAULT 0,
+            created_at TEXT NOT NULL DEFAULT (datetime('now'))
+        )"""
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_usage_created ON llm_usage(created_at)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_agent_turns_created ON agent_turns(created_at)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_tool_usage_created ON tool_usage(created_at)")
+    conn.commit()
+
+
+def usage_tokens(usage: Any) -> Dict[str, int]:
+    """Pull prompt/cached/completion token counts off an OpenAI usage object (or None)."""
+    if usage is None:
+        return {"prompt_tokens": 0, "cached_tokens": 0, "completion_tokens": 0}
+    details = getattr(usage, "prompt_tokens_details", None)
+    cached = getattr(details, "cached_tokens", 0) if details is not None else 0
+    return {
+        "prompt_tokens": int(getattr(usage, "prompt_tokens", 0) or 0),
+        "cached_tokens": int(cached or 0),
+        "completion_tokens": int(getattr(usage, "completion_tokens", 0) or 0),
+    }
+
+
+def get_prompt_cache_stats(db_path: Optional[Path] = None, days: int = 7) -> Dict[str, Any]:
+    """
+    Prompt-cache effectiveness over the last `days`.
+    cache_hit_ratio = cached prompt tokens / all prompt tokens.
+    Latency is split by whether the call got any cache hit, so the drop is visible directly.
+    """
+    empty = {"calls": 0, "prompt_tokens": 0, "cached_tokens": 0, "cache_hit_ratio": 0.0,
+             "avg_latency_ms_cached": None, "avg_latency_ms_uncached": None}
+    path = db_path or get_woody_db_path()
+    if not path.exists():
+        return empty
+    since = _since(days)
+    conn = _get_conn(path)
+    try:
+        row = conn.execute(
+            """SELECT COUNT(*), COALESCE(SUM(prompt_tokens), 0), COALESCE(SUM(cached_tokens), 0),
+                      AVG(CASE WHEN cached_tokens > 0 THEN latency_ms END),
+                      AVG(CASE WHEN cached_tokens = 0 THEN latency_ms END)
+               FROM llm_usage WHERE created_at >= ?""",
+            (since,),
+        ).fetchone()
+    except sqlite3.OperationalError:
+        return empty
+    finally:
+        conn.close()
+    calls, prompt, cached, lat_cached, lat_uncached = row
+    return {
+        "calls": calls,
+        "prompt_tokens": prompt,
+        "cached_tokens": cached,
+        "cache_hit_ratio": round(cached / prompt, 3) if prompt else 0.0,
+        "avg_latency_ms_cached": round(lat_cached, 1) if lat_cached is not None else None,
+        "avg_latency_ms_uncached": round(lat_uncached, 1) if lat_uncached is not None else None,
+    }
+
+
+# --- Per-turn accounting ---
+
+# system: static system prompt only; context: the per-message date/time part sent after history
+# (its memories are counted under memories)
+PROMPT_COMPONENTS = ("system", "history", "memories", "about", "tool_schema", "context")
+
+
+class TurnMetrics:
+    """
+    Collects everything one run_agent turn costs, then writes it in a single transaction:
+    one agent_turns row, one llm_usage row per completion and one tool_usage row per tool call.
+    """
+
+    def __init__(self, chat_id: Optional[int], model: str) -> None:
+        self.chat_id = chat_id
+        self.model = model
+        self.outcome = "ok"
+        self.sizes: Dict[str, int] = {k: 0 for k in PROMPT_COMPONENTS}
+        self.llm_calls: List[tuple] = []
+        self.tool_calls: List[tuple] = []
+        self._started = time.perf_counter()
+
+    def prompt_sizes(self, **chars: int) -> None:
+        """Record prompt component sizes in characters, e.g. prompt_sizes(history=1200, memories=300)."""
+        for k, v in chars.items():
+            if k in self.sizes:
+                self.sizes[k] = int(v)
+
+    def llm_call(self, call: str, usage: Any, latency_ms: float) -> None:
+        tokens = usage_tokens(usage)
+        self.llm_calls.append(
+            (call, tokens["prompt_tokens"], tokens["cached_tokens"], tokens["completion_tokens"], round(latency_ms, 1))
+        )
+
+    def tool_call(self, tool: str, latency_ms: float, prefetched: bool = False, ok: bool = True, result_chars: int = 0) -> None:
+        self.tool_calls.append((tool, round(latency_ms, 1), int(prefetched), int(ok), int(result_chars)))
+
+    def save(self, db_path: Optional[Path] = None) -> Optional[int]:
+        """Persist the turn. Returns the agent_turns id, or None on failure. Never raises."""
+        total_ms = round((time.perf_counter() - self._started) * 1000, 1)
+        turn = (
+            self.chat_id, self.model, len(self.llm_calls), len(self.tool_calls),
+            sum(c[1] for c in self.llm_calls), sum(c[2] for c in self.llm_calls), sum(c[3] for c in self.llm_calls),
+            total_ms, round(sum(c[4] for c in self.llm_calls), 1), round(sum(t[1] for t in self.tool_calls), 1),
+            *(self.sizes[k] for k in PROMPT_COMPONENTS), self.outcome,
+        )
+        try:
+            conn = _get_conn(db_path)
+        except Exception:
+            return None
+        try:
+            try:
+                return self._write(conn, turn)
+            except sqlite3.OperationalError:
+                conn.rollback()
+                ensure_tables(conn)
+                return self._write(conn, turn)
+        except Exception:
+            return None
+        finally:
+            conn.close()
+
+    def _write(self, conn: sqlite3.Connection, turn: tuple) -> int:
+        cur = conn.execute(
+            """INSERT INTO agent_turns (chat_id, model, llm_calls, tool_calls, prompt_tokens, cached_tokens,
+                   completion_tokens, total_ms, llm_ms, tool_ms, system_chars, history_chars, memories_chars,
+                   about_chars, tool_schema_chars, context_chars, outcome)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+            turn,
+        )
+        turn_id = cur.lastrowid
+        conn.executemany(
+            """INSERT INTO llm_usage (turn_id, chat_id, model, call, prompt_tokens, cached_tokens, completion_tokens, latency_ms)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+            [(turn_id, self.chat_id, self.model, *c) for c in self.llm_calls],
+        )
+        conn.executemany(
+            """INSERT INTO tool_usage (turn_id, chat_id, tool, latency_ms, prefetched, ok, result_chars)
+               VALUES (?, ?, ?, ?, ?, ?, ?)""",
+            [(turn_id, self.chat_id, *t) for t in self.tool_calls],
+        )
+        conn.commit()
+        return turn_id
+
+
+def _query(db_path: Optional[Path], sql: str, params: tuple) -> List[tuple]:
+    path = db_path or get_woody_db_path()
+    if not path.exists():
+        return []
+    conn = _get_conn(path)
+    try:
+        return conn.execute(sql, params).fetchall()
+    except sqlite3.OperationalError:
+        return []
+    finally:
+        conn.close()
+
+
+def _since(days: int) -> str:
+    """Start of the window as a UTC date, comparable with created_at (UTC datetime('now'))."""
+    return (datetime.now(timezone.utc).date() - timedelta(days=days)).isoformat()
+
+
+def _r(v: Optional[float]) -> Optional[float]:
+    return round(v, 1) if v is not None else None
+
+
+def get_usage_summary(db_path: Optional[Path] = None, days: int = 7) -> Dict[str, Any]:
+    """
+    Turn totals over the last `days`: tokens, average/p95 wall time split into LLM vs tool time,
+    and average prompt size per component (chars; ~4 chars per token).
+    """
+    rows = _query(
+        db_path,
+        f"""SELECT COUNT(*), COALESCE(SUM(prompt_tokens), 0), COALESCE(SUM(cached_tokens), 0),
+                   COALESCE(SUM(completion_tokens), 0), AVG(total_ms), AVG(llm_ms), AVG(tool_ms),
+                   {", ".join(f"AVG({k}_chars)" for k in PROMPT_COMPONENTS)}
+            FROM agent_turns WHERE created_at >= ?""",
+        (_since(days),),
+    )
+    if not rows or not rows[0][0]:
+        return {"turns": 0, "prompt_tokens": 0, "cached_tokens": 0, "completion_tokens": 0,
+                "avg_total_ms": None, "p95_total_ms": None, "avg_llm_ms": None, "avg_tool_ms": None,
+                "avg_prompt_chars": {k: 0 for k in PROMPT_COMPONENTS}}
+    turns, prompt, cached, completion, avg_total, avg_llm, avg_tool, *sizes = rows[0]
+    totals = [r[0] for r in _query(
+        db_path, "SELECT total_ms FROM agent_turns WHERE created_at >= ? ORDER BY total_ms", (_since(days),)
+    )]
+    return {
+        "turns": turns,
+        "prompt_tokens": prompt,
+        "cached_tokens": cached,
+        "completion_tokens": completion,
+        "avg_prompt_tokens": round(prompt / turns, 1),
+        "avg_total_ms": _r(avg_total),
+        "p95_total_ms": totals[min(len(totals) - 1, int(0.95 * len(totals)))] if totals else None,
+        "avg_llm_ms": _r(avg_llm),
+        "avg_tool_ms": _r(avg_tool),
+        "avg_prompt_chars": {k: int(v or 0) for k, v in zip(PROMPT_COMPONENTS, sizes)},
+    }
+
+
+def get_usage_by_chat(db_path: Optional[Path] = None, days: int = 7) -> List[Dict[str, Any]]:
+    """Per-chat turns, tokens and average wall time, heaviest token users first."""
+    rows = _query(
+        db_path,
+        """SELECT chat_id, COUNT(*), SUM(prompt_tokens), SUM(cached_tokens), SUM(completion_tokens), AVG(total_ms)
+           FROM agent_turns WHERE created_at >= ?
+           GROUP BY chat_id ORDER BY SUM(prompt_tokens) + SUM(completion_tokens) DESC""",
+        (_since(days),),
+    )
+    return [
+        {"chat_id": r[0], "turns": r[1], "prompt_tokens": r[2], "cached_tokens": r[3],
+         "completion_tokens": r[4], "avg_total_ms": _r(r[5])}
+        for r in rows
+    ]
+
+
+def get_usage_by_tool(db_path: Optional[Path] = None, days: int = 7) -> List[Dict[str, Any]]:
+    """Per-tool call count, latency, prefetch hits, failures and result size, slowest total first."""
+    rows = _query(
+        db_path,
+        """SELECT tool, COUNT(*), AVG(latency_ms), MAX(latency_ms), SUM(latency_ms),
+                  SUM(prefetched), SUM(1 - ok), AVG(result_chars)
+           FROM tool_usage WHERE created_at >= ?
+           GROUP BY tool ORDER BY SUM(latency_ms) DESC""",
+        (_since(days),),
+    )
+    return [
+        {"tool": r[0], "calls": r[1], "avg_ms": _r(r[2]), "max_ms": _r(r[3]), "total_ms": _r(r[4]),
+         "prefetched": r[5], "errors": r[6], "avg_result_chars": int(r[7] or 0)}
+        for r in rows
+    ]
+
+
+def get_usage_daily(db_path: Optional[Path] = None, days: int = 30) -> List[Dict[str, Any]]:
+    """One row per day: turns, tokens and average wall time - for before/after comparisons."""
+    rows = _query(
+        db_path,
+        """SELECT date(created_at), COUNT(*), SUM(prompt_tokens), SUM(cached_tokens), SUM(completion_tokens),
+                  AVG(total_ms), AVG(llm_ms)
+           FROM agent_turns WHERE created_at >= ?
+           GROUP BY date(created_at) ORDER BY date(created_at)""",
+        (_since(days),),
+    )
+    return [
+        {"date": r[0], "turns": r[1], "prompt_tokens": r[2], "cached_tokens": r[3],
+         "completion_tokens": r[4], "avg_total_ms": _r(r[5]), "avg_llm_ms": _r(r[6])}
+        for r in rows
+    ]
@@ -1,7 +1,9 @@
 """
 User action logging for preference learning.
 Tracks: calendar_added, todo_added, event_deleted, event_approved, event_rejected.
-Used by events agent to influence future recommendations.
+Used by events agent to influence future recommendations. log_action keeps two small
+stats tables current (user_action_daily counts, user_rejections title index) so the
+agent reads preferences with a couple of indexed queries per run (load_preferences).
 """
 
 from __future__ import annotations
@@ -19,8 +21,29 @@ def _get_conn(db_path: Optional[Path] = None):
     return sqlite3.connect(str(path))
 
 
-def _ensure_table(conn: sqlite3.Connection) -> None:
-    """Create user_actions table if missing (lazy migration for dashboard-only usage)."""
+_STATS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS user_action_daily (
+    day TEXT NOT NULL,
+    action TEXT NOT NULL,
+    count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, action)
+);
+CREATE TABLE IF NOT EXISTS user_rejections (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    title_key TEXT NOT NULL,
+    source TEXT NOT NULL DEFAULT '',
+    created_at TEXT NOT NULL DEFAULT (datetime('now'))
+);
+CREATE INDEX IF NOT EXISTS idx_user_rejections_created ON user_rejections(created_at);
+CREATE TABLE IF NOT EXISTS user_action_stats_meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+def ensure_tables(conn: sqlite3.Connection) -> None:
+    """Create user_actions and the preference stats tables if missing (Woody's init_db, or lazily for dashboard-only usage)."""
     conn.execute(
         """CREATE TABLE IF NOT EXISTS user_actions (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -35,9 +58,67 @@ def _ensure_table(conn: sqlite3.Connection) -> None:
     )
     conn.execute("CREATE INDEX IF NOT EXISTS idx_user_actions_action ON user_actions(action)")
     conn.execute("CREATE INDEX IF NOT EXISTS idx_user_actions_created ON user_actions(created_at)")
+    conn.executescript(_STATS_SCHEMA)
     conn.commit()
 
 
+def backfill_stats(conn: sqlite3.Connection) -> None:
+    """
+    Rebuild the stats tables from user_actions once (called by woody's init_db), then leave a
+    marker row. Rebuilt rather than filled-if-empty: actions logged through the lazy
+    ensure_tables path before the first init_db are already counted, and would keep an
+    emptiness check from ever backfilling the older history.
+    """
+    if conn.execute("SELECT 1 FROM user_action_stats_meta WHERE key = 'backfilled'").fetchone():
+        return
+    conn.execute("DELETE FROM user_action_daily")
+    conn.execute("DELETE FROM user_rejections")
+    conn.execute(
+        """INSERT INTO user_action_daily (day, action, count)
+           SELECT date(created_at), action, COUNT(*) FROM user_actions GROUP BY 1, 2"""
+    )
+    conn.executemany(
+        "INSERT INTO user_rejections (title_key, source, created_at) VALUES (?, ?, ?)",
+        [
+            (_title_key(r[0]), (r[1] or "").lower(), r[2])
+            for r in conn.execute("SELECT title, source, created_at FROM user_actions WHERE action = 'event_rejected'")
+            if _title_key(r[0])
+        ],
+    )
+    conn.execute("INSERT INTO user_action_stats_meta (key, value) VALUES ('backfilled', datetime('now'))")
+
+
+def _title_key(title: Optional[str]) -> str:
+    """Normalized title for rejection matching: stripped, lowercase, first 60 chars."""
+    return (title or "").strip().lower()[:60]
+
+
+def _record(conn: sqlite3.Connection, actions: List[Dict[str, Any]]) -> None:
+    """Insert actions and update the preference stats in the current transaction."""
+    conn.executemany(
+        """INSERT INTO user_actions (action, event_id, proposal_id, title, event_date, source, created_at)
+           VALUES (?, ?, ?, ?, ?, ?, datetime('now'))""",
+        [
+            (a["action"], a.get("event_id"), a.get("proposal_id"), (a.get("title") or "")[:200],
+             (a.get("event_date") or "")[:10], a.get("source") or "")
+            for a in actions
+        ],
+    )
+    conn.executemany(
+        """INSERT INTO user_action_daily (day, action, count) VALUES (date('now'), ?, 1)
+           ON CONFLICT(day, action) DO UPDATE SET count = count + 1""",
+        [(a["action"],) for a in actions],
+    )
+    conn.executemany(
+        "INSERT INTO user_rejections (title_key, source) VALUES (?, ?)",
+        [
+            (_title_key(a.get("title")), (a.get("source") or "").lower())
+            for a in actions
+            if a["action"] == "event_rejected" and _title_key(a.get("title"))
+        ],
+    )
+
+
 def log_action(
     action: str,
     event_id: Optional[int] = None,
@@ -49,26 +130,21 @@ def log_action(
 ) -> None:
     """
     Log a user action. Actions: calendar_added, todo_added, event_deleted,
-    event_approved, event_rejected.
+    event_approved, event_rejected. Also updates the daily counts and rejected-title index.
     """
     path = db_path or get_woody_db_path()
     path.parent.mkdir(parents=True, exist_ok=True)
+    actions = [{"action": action, "event_id": event_id, "proposal_id": proposal_id,
+                "title": title, "event_date": event_date, "source": source}]
     conn = _get_conn(path)
     try:
-        conn.execute(
-            """INSERT INTO user_actions (action, event_id, proposal_id, title, event_date, source, created_at)
-               VALUES (?, ?, ?, ?, ?, ?, datetime('now'))""",
-            (action, event_id, proposal_id, (title or "")[:200], (event_date or "")[:10], source or ""),
-        )
+        _record(conn, actions)
         conn.commit()
     except sqlite3.OperationalError:
         try:
-            _ensure_table(conn)
-            conn.execute(
-                """INSERT INTO user_actions (action, event_id, proposal_id, title, event_date, source, created_at)
-                   VALUES (?, ?, ?, ?, ?, ?, datetime('now'))""",
-                (action, event_id, proposal_id, (title or "")[:200], (event_date or "")[:10], source or ""),
-            )
+            conn.rollback()
+            ensure_tables(conn)
+            _record(conn, actions)
             conn.commit()
         except Exception:
             pass
@@ -76,6 +152,20 @@ def log_action(
         conn.close()
 
 
+def log_actions(actions: List[Dict[str, Any]], db_path: Optional[Path] = None) -> None:
+    """Log several actions in one transaction. Each dict takes log_action's keyword arguments."""
+    if not actions:
+        return
+    path = db_path or get_woody_db_path()
+    conn = _get_conn(path)
+    try:
+        ensure_tables(conn)
+        _record(conn, actions)
+        conn.commit()
+    finally:
+        conn.close()
+
+
 def get_recent_rejections(
     db_path: Optional[Path] = None,
     days: int = 30,
@@ -116,8 +206,8 @@ def get_action_counts(
     conn = _get_conn(path)
     try:
         cur = conn.execute(
-            """SELECT action, COUNT(*) FROM user_actions
-               WHERE created_at >= ? AND action IN ('calendar_added', 'todo_added', 'event_deleted', 'event_approved', 'event_rejected')
+            """SELECT action, SUM(count) FROM user_action_daily
+               WHERE day >= ? AND action IN ('calendar_added', 'todo_added', 'event_deleted', 'event_approved', 'event_rejected')
                GROUP BY action""",
             (since,),
         )
@@ -128,6 +218,60 @@ def get_action_counts(
         conn.close()
 
 
+class Preferences:
+    """
+    What the user has been doing, read once per agent run: action counts over the last
+    count_days and titles (+ source) of suggestions rejected in the last rejection_days.
+    """
+
+    def __init__(self, counts: Dict[str, int], rejections: List[tuple]):
+        self.counts = counts
+        self.rejections = rejections  # [(title_key, source lowercased)]
+
+    def was_rejected(self, title: str, source_hint: str = "") -> bool:
+        """Same matching as was_rejected_recently: title contains / is contained, same sender if given."""
+        title_key = _title_key(title)
+        if not title_key:
+            return False
+        hint = (source_hint or "").lower()
+        for r_title, r_source in self.rejections:
+            if r_title and (title_key in r_title or r_title in title_key):
+                if hint and r_source:
+                    if hint in r_source:
+                        return True
+                else:
+                    return True
+        return False
+
+    def suggested_action(self) -> str:
+        """'calendar' or 'todo' if the user clearly prefers one, else ''."""
+        cal = self.counts.get("calendar_added", 0)
+        todo = self.counts.get("todo_added", 0)
+        return "calendar" if cal >= todo and cal > 0 else ("todo" if todo > cal and todo > 0 else "")
+
+
+def load_preferences(
+    db_path: Optional[Path] = None,
+    count_days: int = 30,
+    rejection_days: int = 14,
+) -> Preferences:
+    """Two indexed queries over the stats tables; use the result for a whole run."""
+    path = db_path or get_woody_db_path()
+    if not path.exists():
+        return Preferences({}, [])
+    since = (date.today() - timedelta(days=rejection_days)).isoformat()
+    conn = _get_conn(path)
+    try:
+        rejections = conn.execute(
+            "SELECT title_key, source FROM user_rejections WHERE created_at >= ? ORDER BY id DESC", (since,)
+        ).fetchall()
+    except sqlite3.OperationalError:
+        rejections = []
+    finally:
+        conn.close()
+    return Preferences(get_action_counts(path, days=count_days), [tuple(r) for r in rejections])
+
+
 def was_rejected_recently(
     title: str,
     event_date: str,
@@ -139,17 +283,6 @@ def was_rejected_recently(
     Check if user rejected a similar event recently.
     title: normalized to first 60 chars for matching.
     source_hint: e.g. "From: x@yahoo.com" - we match if rejection had same sender.
+    For many checks in a row, use load_preferences() once and Preferences.was_rejected.
     """
-    rejections = get_recent_rejections(db_path, days=days, limit=50)
-    title_key = (title or "").strip().lower()[:60]
-    if not title_key:
-        return False
-    for r in rejections:
-        r_title = (r.get("title") or "").strip().lower()[:60]
-        if r_title and (title_key in r_title or r_title in title_key):
-            if source_hint and r.get("source"):
-                if source_hint.lower() in str(r.get("source", "")).lower():
-                    return True
-            else:
-                return True
-    return False
+    return load_preferences(db_path, rejection_days=days).was_rejected(title, source_hint)
@@ -0,0 +1,108 @@
+"""Local fake OpenAI-compatible server for gateway tests and the agent benchmark.
+
+Serves POST /v1/chat/completions from a script of canned steps, e.g.:
+
+    with FakeOpenAIServer([
+        {"tool_calls": [{"name": "calendar_today", "arguments": {}}]},
+        {"content": "Nothing today."},
+    ]) as server:
+        os.environ["OPENAI_BASE_URL"] = server.base_url
+
+A step may also carry "status" (HTTP error code), "delay" (seconds before replying),
+"headers" (e.g. {"retry-after": "0"}) and "usage" overrides. When the script runs out the
+server answers with "ok". Every request body is kept in `server.requests`.
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, List, Optional
+
+
+def _completion(step: dict, n: int) -> dict:
+    message: dict[str, Any] = {"role": "assistant", "content": step.get("content")}
+    if step.get("tool_calls"):
+        message["tool_calls"] = [
+            {
+                "id": f"call_{n}_{i}",
+                "type": "function",
+                "function": {"name": tc["name"], "arguments": json.dumps(tc.get("arguments", {}))},
+            }
+            for i, tc in enumerate(step["tool_calls"])
+        ]
+    elif message["content"] is None:
+        message["content"] = "ok"
+    usage = {"prompt_tokens": 1200, "completion_tokens": 20, "total_tokens": 1220,
+             "prompt_tokens_details": {"cached_tokens": 0}}
+    usage.update(step.get("usage", {}))
+    return {
+        "id": f"chatcmpl-fake-{n}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": "gpt-4o-mini",
+        "choices": [{"index": 0, "message": message, "finish_reason": "tool_calls" if step.get("tool_calls") else "stop"}],
+        "usage": usage,
+    }
+
+
+class FakeOpenAIServer:
+    """Threaded HTTP server on 127.0.0.1 with a random port. Use as a context manager."""
+
+    def __init__(self, script: Optional[List[dict]] = None) -> None:
+        self.script: List[dict] = list(script or [])
+        self.requests: List[dict] = []
+        self._lock = threading.Lock()
+        self._count = 0
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", "0"))
+                body = json.loads(self.rfile.read(length) or b"{}")
+                with server._lock:
+                    server.requests.append(body)
+                    server._count += 1
+                    n = server._count
+                    step = server.script.pop(0) if server.script else {}
+                if step.get("delay"):
+                    time.sleep(step["delay"])
+                status = step.get("status", 200)
+                payload = _completion(step, n) if status == 200 else {"error": {"message": "fake error", "type": "server_error"}}
+                data = json.dumps(payload).encode()
+                try:
+                    self.send_response(status)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(data)))
+                    for k, v in step.get("headers", {}).items():
+                        self.send_header(k, v)
+                    self.end_headers()
+                    self.wfile.write(data)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # client gave up (timeout / hedged request won)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def extend(self, steps: List[dict]) -> None:
+        with self._lock:
+            self.script.extend(steps)
+
+    def __enter__(self) -> "FakeOpenAIServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
@@ -0,0 +1,130 @@
+"""Local fake Telegram Bot API for client, polling, webhook and reminder tests.
+
+    with FakeTelegramServer() as tg:
+        os.environ["TELEGRAM_API_BASE"] = tg.base_url
+        tg.push_update(chat_id=1, text="hi")          # served by getUpdates
+        tg.fail("sendMessage", status=429, retry_after=0)  # next sendMessage gets a 429
+        ...
+        tg.sent(chat_id=1)                            # texts delivered via sendMessage
+
+Every call is kept in `tg.calls` as (method, payload, monotonic time).
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+
+class FakeTelegramServer:
+    """Threaded Bot API stand-in on 127.0.0.1 with a random port. Use as a context manager."""
+
+    def __init__(self, max_poll_wait: float = 0.5) -> None:
+        self.calls: List[tuple] = []
+        self.updates: List[dict] = []
+        self.max_poll_wait = max_poll_wait
+        self._failures: Dict[str, List[dict]] = {}
+        self._next_update_id = 1000
+        self._next_message_id = 1
+        self._cond = threading.Condition()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _handle(self):
+                method = self.path.rstrip("/").rsplit("/", 1)[-1].split("?", 1)[0]
+                length = int(self.headers.get("Content-Length", "0") or 0)
+                try:
+                    payload = json.loads(self.rfile.read(length) or b"{}")
+                except ValueError:
+                    payload = {}
+                status, body = server._dispatch(method, payload)
+                data = json.dumps(body).encode()
+                try:
+                    self.send_response(status)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(data)))
+                    self.end_headers()
+                    self.wfile.write(data)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+
+            do_GET = _handle
+            do_POST = _handle
+
+            def log_message(self, format, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self._httpd.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def fail(self, method: str, status: int = 429, retry_after: Optional[float] = None, times: int = 1) -> None:
+        """Make the next `times` calls to `method` fail with `status`."""
+        body: Dict[str, Any] = {"ok": False, "error_code": status, "description": f"fake error {status}"}
+        if retry_after is not None:
+            body["parameters"] = {"retry_after": retry_after}
+        with self._cond:
+            self._failures.setdefault(method, []).extend([{"status": status, "body": body}] * times)
+
+    def push_update(self, chat_id: int, text: str, update_id: Optional[int] = None) -> dict:
+        """Queue a text message update for getUpdates. Returns the update."""
+        with self._cond:
+            if update_id is None:
+                update_id = self._next_update_id
+            self._next_update_id = max(self._next_update_id, update_id + 1)
+            update = {
+                "update_id": update_id,
+                "message": {"message_id": update_id, "chat": {"id": chat_id}, "text": text, "date": int(time.time())},
+            }
+            self.updates.append(update)
+            self._cond.notify_all()
+        return update
+
+    def sent(self, chat_id: Optional[int] = None) -> List[str]:
+        with self._cond:
+            return [p.get("text", "") for m, p, _ in self.calls
+                    if m == "sendMessage" and (chat_id is None or p.get("chat_id") == chat_id)]
+
+    def count(self, method: str) -> int:
+        with self._cond:
+            return sum(1 for m, _, _ in self.calls if m == method)
+
+    def _dispatch(self, method: str, payload: dict) -> tuple:
+        with self._cond:
+            self.calls.append((method, payload, time.monotonic()))
+            failures = self._failures.get(method)
+            if failures:
+                step = failures.pop(0)
+                return step["status"], step["body"]
+            if method == "getUpdates":
+                offset = int(payload.get("offset", 0) or 0)
+                # Telegram semantics: an offset confirms (drops) every earlier update
+                self.updates = [u for u in self.updates if u["update_id"] >= offset]
+                if not self.updates:
+                    self._cond.wait(min(float(payload.get("timeout", 0) or 0), self.max_poll_wait))
+                return 200, {"ok": True, "result": [u for u in self.updates if u["update_id"] >= offset]}
+            if method == "sendMessage":
+                if len(payload.get("text", "")) > 4096:
+                    return 400, {"ok": False, "error_code": 400, "description": "Bad Request: message is too long"}
+                self._next_message_id += 1
+                return 200, {"ok": True, "result": {"message_id": self._next_message_id, "chat": {"id": payload.get("chat_id")},
+                                                    "text": payload.get("text", "")}}
+            return 200, {"ok": True, "result": True}
+
+    def __enter__(self) -> "FakeTelegramServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        with self._cond:
+            self._cond.notify_all()
+        self._httpd.shutdown()
+        self._httpd.server_close()
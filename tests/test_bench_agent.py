@@ -0,0 +1,36 @@
+"""Regression test for the agent hot path: replays the benchmark corpus against the fake OpenAI server."""
+
+import sqlite3
+import sys
+from pathlib import Path
+
+_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(_root))
+sys.path.insert(0, str(_root / "scripts"))
+
+# Generous: catches order-of-magnitude regressions (e.g. a blocking call in the loop), not noise
+OVERHEAD_P95_BUDGET_MS = 1000.0
+
+
+def test_replay_corpus_offline(tmp_path):
+    from bench_agent import DEFAULT_CORPUS, load_corpus, run_benchmark
+    corpus = load_corpus(DEFAULT_CORPUS)
+    n_turns = sum(len(c["turns"]) for c in corpus)
+    n_llm = sum(len(t["llm"]) for c in corpus for t in c["turns"])
+
+    report = run_benchmark(corpus, iterations=1, warmup=0, alloc=True, workdir=tmp_path)
+
+    assert report["turns"] == n_turns
+    assert report["llm_requests"] == 2 * n_llm  # measured pass + allocation pass
+    for stage in ("history", "memory", "about_me", "date_parse", "tool_schema", "tools", "llm", "persist", "metrics"):
+        assert report["stages"][stage]["count"] > 0, stage
+    assert report["stages"]["overhead"]["p95_ms"] < OVERHEAD_P95_BUDGET_MS
+    assert report["alloc_kib"]["peak_p50"] > 0
+
+    conn = sqlite3.connect(str(tmp_path / "woody.db"))
+    turns, errors = conn.execute("SELECT COUNT(*), SUM(outcome != 'ok') FROM agent_turns").fetchone()
+    tool_rows = conn.execute("SELECT COUNT(*) FROM tool_usage").fetchone()[0]
+    conn.close()
+    assert turns == 2 * n_turns
+    assert errors == 0
+    assert tool_rows > 0
@@ -0,0 +1,158 @@
+"""Tests for the local Google Calendar mirror (incremental syncToken sync)."""
+
+import sys
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+
+_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(_root))
+sys.path.insert(0, str(_root / "woody"))
+
+
+class _Gone(Exception):
+    class resp:
+        status = 410
+
+
+class FakeCalendar:
+    """Minimal events().list(...).execute() with paging and sync tokens."""
+
+    def __init__(self, pages):
+        self.pages = pages  # key: syncToken or None (full) -> list of response dicts
+        self.calls = []
+
+    def events(self):
+        return self
+
+    def list(self, **params):
+        self.calls.append(params)
+        self._params = params
+        return self
+
+    def execute(self):
+        token = self._params.get("syncToken")
+        if token == "expired":
+            raise _Gone()
+        pages = self.pages[token]
+        return pages[int(self._params.get("pageToken") or 0)]
+
+
+def _ev(eid, title, start, end=None, **kw):
+    key = "dateTime" if "T" in start else "date"
+    return {"id": eid, "summary": title, "start": {key: start}, "end": {key: end or start}, **kw}
+
+
+def _day(offset=0):
+    return (date.today() + timedelta(days=offset)).isoformat()
+
+
+@pytest.fixture
+def mirror_db(tmp_path, monkeypatch):
+    db = tmp_path / "dashboard.db"
+    monkeypatch.setenv("DASHBOARD_DB_PATH", str(db))
+    return db
+
+
+def test_full_then_incremental_sync(mirror_db):
+    from shared import calendar_mirror as cm
+    service = FakeCalendar({
+        None: [
+            {"items": [_ev("a", "Dentist", f"{_day()}T15:00:00-07:00", f"{_day()}T16:00:00-07:00")], "nextPageToken": "1"},
+            {"items": [_ev("b", "Trip", _day(1), _day(3))], "nextSyncToken": "t1"},
+        ],
+        "t1": [{"items": [
+            _ev("a", "Dentist (moved)", f"{_day(1)}T09:00:00Z", f"{_day(1)}T10:00:00Z"),
+            {"id": "b", "status": "cancelled"},
+            _ev("c", "Piano", _day(5)),
+        ], "nextSyncToken": "t2"}],
+    })
+    assert cm.sync_calendar(service=service) == {"mode": "full", "upserted": 2, "deleted": 0}
+    assert "timeMin" in service.calls[0] and "syncToken" not in service.calls[0]
+    events = cm.get_events_for_dates(date.today(), date.today() + timedelta(days=1))
+    assert [(e["id"], e["date"], e["all_day"]) for e in events] == [("a", _day(), False), ("b", _day(1), True)]
+
+    assert cm.sync_calendar(service=service) == {"mode": "incremental", "upserted": 2, "deleted": 1}
+    assert service.calls[-1]["syncToken"] == "t1" and "timeMin" not in service.calls[-1]
+    assert [e["title"] for e in cm.get_events_for_dates(date.today(), date.today() + timedelta(days=7))] == [
+        "Dentist (moved)", "Piano",
+    ]
+    status = cm.mirror_status()
+    assert status["synced"] and not status["stale"] and status["events"] == 2 and status["last_error"] is None
+
+
+def test_expired_token_falls_back_to_full_sync(mirror_db):
+    import sqlite3
+    from shared import calendar_mirror as cm
+    cm.sync_calendar(service=FakeCalendar({None: [{"items": [_ev("old", "Gone", _day())], "nextSyncToken": "expired"}]}))
+    service = FakeCalendar({None: [{"items": [_ev("new", "Fresh", _day())], "nextSyncToken": "t9"}]})
+    assert cm.sync_calendar(service=service)["mode"] == "full"
+    assert [e["id"] for e in cm.get_events_for_dates(date.today(), date.today())] == ["new"]
+    conn = sqlite3.connect(str(mirror_db))
+    assert conn.execute("SELECT sync_token FROM calendar_sync_state").fetchone()[0] == "t9"
+    conn.close()
+
+
+def test_errors_recorded_and_overlap_query(mirror_db):
+    from shared import calendar_mirror as cm
+    assert cm.mirror_status() == {**cm.mirror_status(), "synced": False, "stale": True, "events": 0}
+
+    class Broken(FakeCalendar):
+        def execute(self):
+            raise RuntimeError("quota exceeded")
+
+    with pytest.raises(RuntimeError):
+        cm.sync_calendar(service=Broken({}))
+    assert cm.mirror_status()["last_error"] == "quota exceeded"
+
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+    ongoing = _ev("x", "Ongoing", (now - timedelta(hours=1)).isoformat(), (now + timedelta(hours=1)).isoformat())
+    cm.sync_calendar(service=FakeCalendar({None: [{"items": [ongoing], "nextSyncToken": "t"}]}))
+    assert [e["id"] for e in cm.get_events_between(now, now + timedelta(minutes=5))] == ["x"]
+    assert cm.get_events_between(now + timedelta(hours=2), now + timedelta(hours=3)) == []
+    assert cm.mirror_status()["last_error"] is None
+
+
+def test_all_events_reads_mirror(mirror_db, monkeypatch):
+    from shared import calendar_mirror as cm
+    from shared.events_agent import get_all_events
+    cm.sync_calendar(service=FakeCalendar({None: [{"items": [_ev("g", "School play", _day(2))], "nextSyncToken": "t"}]}))
+    events = get_all_events()
+    assert [(e["title"], e["source"]) for e in events] == [("School play", "google")]
+
+
+def test_created_event_is_in_mirror_before_next_sync(mirror_db, monkeypatch):
+    from shared import calendar_mirror as cm
+    from app.tools import calendar as calendar_tools
+
+    class Insertable(FakeCalendar):
+        def insert(self, calendarId, body):
+            self._inserted = {"id": f"new{len(self.calls)}", "htmlLink": "https://cal/x", **body}
+            if "dateTime" in body["start"]:
+                for k in ("start", "end"):
+                    self._inserted[k] = {"dateTime": body[k]["dateTime"] + "+00:00"}
+            self.calls.append({"insert": body})
+            return self
+
+        def execute(self):
+            if self.calls and "insert" in self.calls[-1]:
+                return self._inserted
+            return super().execute()
+
+    service = Insertable({None: [{"items": [_ev("old", "Dentist", _day(1))], "nextSyncToken": "t1"}],
+                          "t1": [{"items": [_ev("rec_1", "Piano", _day(1))], "nextSyncToken": "t2"}]})
+    cm.sync_calendar(service=service)
+    monkeypatch.setattr(calendar_tools, "_get_creds", lambda: (object(), None))
+    monkeypatch.setattr(calendar_tools, "build", lambda *a, **kw: service, raising=False)
+
+    out = calendar_tools._calendar_create_event_handler("Soccer", f"{_day(1)}T10:00:00", f"{_day(1)}T11:00:00")
+    assert out.startswith("Created: Soccer")
+    titles = [e["title"] for e in cm.get_events_for_dates(date.fromisoformat(_day(1)), date.fromisoformat(_day(1)))]
+    assert titles == ["Dentist", "Soccer"]
+
+    # Recurring: Google expands instances, so the mirror syncs instead of storing the master event
+    calendar_tools._calendar_create_event_handler("Piano", f"{_day(1)}T15:00:00", f"{_day(1)}T16:00:00", recurrence="FREQ=WEEKLY")
+    assert service.calls[-1].get("syncToken") == "t1"
+    ids = [e["id"] for e in cm.get_events_for_dates(date.fromisoformat(_day(1)), date.fromisoformat(_day(1)))]
+    assert sorted(ids) == ["new1", "old", "rec_1"]
@@ -74,3 +74,16 @@ def test_events_create(client):
     assert data["title"] == "Christmas"
     assert data["date"] == "2025-12-25"
     assert "id" in data
+
+
+def test_scheduled_template_month_end_and_count(client, dashboard_db, monkeypatch):
+    monkeypatch.setenv("DASHBOARD_DB_PATH", str(dashboard_db))  # create_event (schedule-now)
+    r = client.post(
+        "/api/scheduled-templates",
+        json={"title": "Rent", "description": "", "recurrence": "freq=monthly;count=2", "anchor_date": "2026-01-31"},
+    )
+    t = r.json()
+    assert (t["recurrence"], t["dtstart"], t["next_due"]) == ("FREQ=MONTHLY;COUNT=2", "2026-01-31", "2026-02-28")
+    assert client.post(f"/api/scheduled-templates/{t['id']}/schedule-now?date_str=2026-02-28").json()["ok"] is True
+    t = next(x for x in client.get("/api/scheduled-templates").json() if x["id"] == t["id"])
+    assert (t["anchor_date"], t["next_due"]) == ("2026-02-28", "")  # Jan 31 + Feb 28: COUNT used up
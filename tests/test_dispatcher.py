@@ -0,0 +1,138 @@
+"""Tests for the per-chat ordered message dispatcher."""
+
+import sys
+import threading
+import time
+from pathlib import Path
+
+_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(_root))
+sys.path.insert(0, str(_root / "woody"))
+
+
+def test_order_kept_within_chat():
+    from app.dispatcher import ChatDispatcher
+    seen = []
+    lock = threading.Lock()
+
+    def handler(chat_id, text):
+        time.sleep(0.001)
+        with lock:
+            seen.append((chat_id, text))
+
+    d = ChatDispatcher(handler, max_workers=4)
+    for i in range(20):
+        for chat in (1, 2, 3):
+            d.submit(chat, i)
+    d.shutdown(wait=True)
+    for chat in (1, 2, 3):
+        assert [t for c, t in seen if c == chat] == list(range(20))
+    assert d.stats()["processed"] == 60
+
+
+def test_slow_chat_does_not_block_others():
+    from app.dispatcher import ChatDispatcher
+    release = threading.Event()
+    done = {}
+
+    def handler(chat_id, text):
+        if chat_id == 1:
+            release.wait(5)
+        done[chat_id] = time.monotonic()
+
+    d = ChatDispatcher(handler, max_workers=2)
+    d.submit(1, "slow multi-tool turn")
+    d.submit(2, "quick question")
+    deadline = time.monotonic() + 2
+    while 2 not in done and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert 2 in done and 1 not in done
+    release.set()
+    d.shutdown(wait=True)
+    assert 1 in done
+
+
+def test_one_worker_per_chat_and_metrics():
+    from app.dispatcher import ChatDispatcher
+    running = []
+    overlap = []
+    gate = threading.Event()
+
+    def handler(chat_id, text):
+        if chat_id in running:
+            overlap.append(chat_id)
+        running.append(chat_id)
+        gate.wait(5)
+        running.remove(chat_id)
+
+    d = ChatDispatcher(handler, max_workers=4)
+    for text in ("a", "b", "c"):
+        d.submit(7, text)
+    time.sleep(0.05)
+    assert d.pending(7) == 2
+    stats = d.stats()
+    assert stats["active_chats"] == 1
+    assert stats["max_queued"] >= 2
+    gate.set()
+    d.shutdown(wait=True)
+    assert overlap == []
+    stats = d.stats()
+    assert stats["processed"] == 3 and stats["queued"] == 0
+    assert stats["wait"]["count"] == 3
+
+
+def test_handler_error_does_not_stall_chat():
+    from app.dispatcher import ChatDispatcher
+    seen = []
+
+    def handler(chat_id, text):
+        if text == "boom":
+            raise ValueError("boom")
+        seen.append(text)
+
+    d = ChatDispatcher(handler, max_workers=1)
+    for text in ("one", "boom", "two"):
+        d.submit(1, text)
+    d.shutdown(wait=True)
+    assert seen == ["one", "two"]
+    assert d.stats()["errors"] == 1
+
+
+def test_debounce_coalesces_rapid_messages():
+    from app.dispatcher import ChatDispatcher
+    calls = []
+    started = []
+
+    def merge(batch):
+        return ("\n".join(a[0] for a in batch),)
+
+    d = ChatDispatcher(lambda chat_id, text: calls.append((chat_id, text)), max_workers=2,
+                       debounce=0.15, merge=merge, on_batch_start=started.append)
+    for text in ("add eggs", "and milk", "oh and bread"):
+        d.submit(1, text)
+        time.sleep(0.05)
+    d.submit(2, "hello")
+    time.sleep(0.5)
+    assert sorted(calls) == [(1, "add eggs\nand milk\noh and bread"), (2, "hello")]
+    assert started == [1, 2]  # one typing indicator per batch, not per message
+    d.submit(1, "later message")
+    d.shutdown(wait=True)  # flushes the open debounce window immediately
+    assert calls[-1] == (1, "later message")
+    stats = d.stats()
+    assert stats["processed"] == 5 and stats["coalesced"] == 2
+
+
+def test_debounce_max_wait_caps_delay():
+    from app.dispatcher import ChatDispatcher
+    calls = []
+    d = ChatDispatcher(lambda chat_id, text: calls.append(text), max_workers=1,
+                       debounce=0.1, merge=lambda batch: ("|".join(a[0] for a in batch),))
+    deadline = time.monotonic() + 0.6
+    i = 0
+    while time.monotonic() < deadline:  # never quiet for 0.1s
+        d.submit(1, str(i))
+        i += 1
+        time.sleep(0.03)
+    assert calls, "turn must start within DEBOUNCE_MAX_WAIT_FACTOR x debounce"
+    d.shutdown(wait=True)
+    assert "|".join(calls).split("|") == [str(n) for n in range(i)]
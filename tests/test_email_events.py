@@ -0,0 +1,87 @@
+"""Tests for single-pass email event extraction and date resolution."""
+
+import sys
+from datetime import date
+from pathlib import Path
+
+import pytest
+
+_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(_root))
+sys.path.insert(0, str(_root / "scripts"))
+
+SENT = date(2026, 10, 14)  # a Wednesday
+
+
+@pytest.mark.parametrize("text,expected", [
+    ("Dentist appointment Friday at 3pm", ("2026-10-16", "15:00")),
+    ("Reminder: water bill due 10/20", ("2026-10-20", "")),
+    ("Party on Oct 31st, 2026", ("2026-10-31", "")),
+    ("School play 5 January", ("2027-01-05", "")),  # year-less and long past -> next year
+    ("Lunch tomorrow 12:30 pm", ("2026-10-15", "12:30")),
+    ("Call with Bob next Tues at 10:30", ("2026-10-20", "10:30")),
+    ("Invoice 2026-11-02 attached", ("2026-11-02", "")),
+    ("Board meeting notes", ("2026-10-14", "")),  # keyword only: dated when sent
+    ("Team sync Wednesday", ("2026-10-21", "")),  # same weekday = next week
+])
+def test_extract_event_resolves_against_sent_date(text, expected):
+    from shared.email_events import extract_event
+    found = extract_event(text, sent=SENT)
+    assert (found.date, found.time) == expected
+
+
+def test_no_event_and_no_false_weekdays():
+    from shared.email_events import extract_event
+    assert extract_event("We sat in the sun on the deck", sent=SENT) is None
+    assert extract_event("Your weekly digest is here", sent=SENT) is None
+    assert extract_event("Flight 02/30 changed", sent=SENT).date == "2026-10-14"  # invalid date ignored
+
+
+def test_parse_email_date():
+    from shared.email_events import parse_email_date
+    assert parse_email_date("Wed, 14 Oct 2026 23:30:00 -0700") == SENT  # sender's day, not UTC
+    assert parse_email_date("2026-10-14T10:00:00Z") == SENT
+    assert parse_email_date("") is None and parse_email_date("soon") is None
+
+
+def test_suggestions_use_the_mentioned_day(tmp_path, monkeypatch):
+    monkeypatch.setenv("DASHBOARD_DB_PATH", str(tmp_path / "dashboard.db"))
+    from woody.app.db import init_db
+    from shared.events_agent import propose_events_from_emails
+    from shared.memory_agent import list_pending_proposals
+    db = tmp_path / "woody.db"
+    init_db(db)
+    msgs = [
+        {"subject": "Piano recital Saturday 6pm", "snippet": "", "from": "a@x.com", "date": "Wed, 14 Oct 2026 08:00:00 +0000"},
+        {"subject": "Newsletter", "snippet": "Nothing to see here at all", "from": "n@x.com", "date": "Wed, 14 Oct 2026 08:00:00 +0000"},
+    ]
+    assert propose_events_from_emails(msgs, db, today=SENT) == 1
+    payload = list_pending_proposals(db)[0]["payload"]
+    assert (payload["date"], payload["time"]) == ("2026-10-17", "18:00")
+
+
+def test_suggestions_skip_past_dates(tmp_path, monkeypatch):
+    monkeypatch.setenv("DASHBOARD_DB_PATH", str(tmp_path / "dashboard.db"))
+    from woody.app.db import init_db
+    from shared.events_agent import propose_events_from_emails
+    from shared.memory_agent import list_pending_proposals
+    db = tmp_path / "woody.db"
+    init_db(db)
+    sent = "Sun, 25 Oct 2026 08:00:00 +0000"
+    msgs = [
+        {"subject": "Recital recap from Oct 20", "snippet": "", "from": "a@x.com", "date": sent},
+        {"subject": "Board meeting notes", "snippet": "", "from": "b@x.com", "date": sent},
+        {"subject": "Dentist appointment Nov 2", "snippet": "", "from": "c@x.com", "date": sent},
+    ]
+    assert propose_events_from_emails(msgs, db, today=date(2026, 11, 1)) == 2
+    dates = {p["payload"]["title"]: p["payload"]["date"] for p in list_pending_proposals(db)}
+    assert dates == {"Board meeting notes": "2026-11-01", "Dentist appointment Nov 2": "2026-11-02"}
+
+
+def test_benchmark_corpus_accuracy():
+    from bench_email_events import run_benchmark
+    report = run_benchmark(messages=1000, repeat=1)
+    single, legacy = report["single_pass"], report["legacy"]
+    assert single["flagged"] == legacy["flagged"] == single["events"]
+    assert single["false_positives"] == 0
+    assert single["right_day"] == single["events"]
@@ -0,0 +1,108 @@
+"""Tests for near-duplicate event detection (trigram similarity, date blocking)."""
+
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+import pytest
+
+_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(_root))
+
+from shared.event_dedupe import DuplicateIndex, find_duplicates, titles_match  # noqa: E402
+
+
+def test_titles_match_fuzzy():
+    assert titles_match("Dentist - Jack", "Jack dentist appt")
+    assert titles_match("Dr appt: Jack", "Jack doctor appointment")
+    assert titles_match("Water bill due", "Water Bill Due!")
+    assert not titles_match("Soccer practice", "Piano practice")
+    assert not titles_match("Jack", "Jack soccer practice")
+    assert not titles_match("", "")
+
+
+def test_find_duplicates_blocks_by_date():
+    events = [
+        {"id": 1, "date": "2026-10-20", "title": "Dentist - Jack"},
+        {"id": 2, "date": "2026-10-20", "title": "Jack dentist appt"},
+        {"id": 3, "date": "2026-10-21", "title": "Jack's dentist appointment"},
+        {"id": 4, "date": "2026-10-20", "title": "Piano lesson"},
+        {"id": 5, "date": "not a date", "title": "Dentist - Jack"},
+    ]
+    assert [[e["id"] for e in g] for g in find_duplicates(events)] == [[1, 2]]
+    assert [[e["id"] for e in g] for g in find_duplicates(events, window_days=1)] == [[1, 2, 3]]
+
+
+def test_duplicate_index():
+    index = DuplicateIndex(window_days=1)
+    index.add("2026-10-20", "Soccer practice", {"id": 7})
+    index.add("2026-10-20", "Parent-teacher meeting")
+    assert index.find("2026-10-21", "soccer practice!") == {"id": 7}
+    assert ("2026-10-20", "Parent teacher mtg") in index
+    assert ("2026-10-23", "Soccer practice") not in index
+    assert ("2026-10-20", "Piano practice") not in index
+
+
+def _calendar(n, days, seed=3):
+    """n events over `days` days, ~10% with a reworded copy on the same day."""
+    rng = random.Random(seed)
+    what = ["Dentist", "Soccer practice", "Piano lesson", "Parent-teacher meeting", "Water bill due",
+            "School play", "Dinner with", "Birthday party", "Swim meet", "Vet appointment", "Haircut",
+            "Book club", "Oil change", "Flight to", "Field trip", "Yoga class", "Library books due"]
+    who = ["Jack", "Emma", "Sam", "Mia", "Leo", "Grandma", "the Smiths", "Olivia", "Noah", "Boston"]
+    start = date(2020, 1, 1)
+    events = []
+    for i in range(n):
+        d = (start + timedelta(days=rng.randrange(days))).isoformat()
+        title = f"{rng.choice(what)} {rng.choice(who)}"
+        events.append({"id": i, "date": d, "title": title})
+        if rng.random() < 0.1:
+            words = title.split()
+            rng.shuffle(words)
+            events.append({"id": -i - 1, "date": d, "title": " ".join(words) + " appt"})
+    return events
+
+
+def test_find_duplicates_matches_pairwise():
+    events = _calendar(600, 30)
+    for window in (0, 2):
+        groups = find_duplicates(events, window_days=window)
+        group_of = {e["id"]: n for n, g in enumerate(groups) for e in g}
+        for a in events:
+            for b in events:
+                close = abs(date.fromisoformat(a["date"]).toordinal() - date.fromisoformat(b["date"]).toordinal()) <= window
+                if a["id"] != b["id"] and close and titles_match(a["title"], b["title"]):
+                    assert group_of[a["id"]] == group_of[b["id"]]
+
+
+def test_find_duplicates_scales():
+    events = _calendar(100_000, 2500)
+    t0 = time.perf_counter()
+    groups = find_duplicates(events, window_days=1)
+    assert time.perf_counter() - t0 < 15
+    assert groups and all(len(g) >= 2 for g in groups)
+
+
+@pytest.fixture
+def client(monkeypatch):
+    with tempfile.NamedTemporaryFile(suffix=".db", delete=False) as f:
+        path = Path(f.name)
+    monkeypatch.setattr("dashboard.app.db.DB_PATH", path)
+    from dashboard.app.db import init_db
+    init_db()
+    from fastapi.testclient import TestClient
+    from dashboard.app.main import app
+    yield TestClient(app)
+    path.unlink(missing_ok=True)
+
+
+def test_duplicates_endpoint(client):
+    for d, title in [("2026-10-20", "Dentist - Jack"), ("2026-10-20", "Jack dentist appt"), ("2026-10-21", "Dentist Jack")]:
+        client.post("/api/events", json={"date": d, "title": title, "description": "", "event_type": "event"})
+    groups = client.get("/api/events/duplicates").json()["duplicates"]
+    assert [[e["title"] for e in g] for g in groups] == [["Dentist - Jack", "Jack dentist appt"]]
+    groups = client.get("/api/events/duplicates?window_days=1").json()["duplicates"]
+    assert len(groups) == 1 and len(groups[0]) == 3
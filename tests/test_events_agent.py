@@ -33,34 +33,65 @@ def dashboard_db(tmp_path):
             description TEXT,
             recurrence TEXT NOT NULL,
             anchor_date TEXT NOT NULL,
-            created_at TEXT NOT NULL DEFAULT (datetime('now'))
+            created_at TEXT NOT NULL DEFAULT (datetime('now')),
+            next_due TEXT,
+            dtstart TEXT
         );
+        CREATE INDEX idx_scheduled_templates_next_due ON scheduled_templates(next_due);
     """)
     conn.close()
     return db
 
 
-def test_compute_next_due_yearly():
-    from shared.events_agent import _compute_next_due
-    assert _compute_next_due("2024-06-01", "YEARLY") == "2025-06-01"
-    assert _compute_next_due("2024-12-31", "YEARLY") == "2025-12-31"
+def testcompute_next_due_yearly():
+    from shared.events_agent import compute_next_due
+    assert compute_next_due("2024-06-01", "YEARLY") == "2025-06-01"
+    assert compute_next_due("2024-12-31", "YEARLY") == "2025-12-31"
+
+
+def testcompute_next_due_monthly():
+    from shared.events_agent import compute_next_due
+    assert compute_next_due("2024-01-15", "MONTHLY") == "2024-02-15"
+    assert compute_next_due("2024-12-15", "MONTHLY") == "2025-01-15"
+
+
+def testcompute_next_due_weekly():
+    from shared.events_agent import compute_next_due
+    assert compute_next_due("2024-01-15", "WEEKLY") == "2024-01-22"
+
 
+def testcompute_next_due_invalid():
+    from shared.events_agent import compute_next_due
+    assert compute_next_due("invalid", "YEARLY") is None
+    assert compute_next_due("2024-06-01", "FORTNIGHTLY") is None
+    assert compute_next_due("2024-06-01", "FREQ=DAILY;UNTIL=20240601") is None  # exhausted
 
-def test_compute_next_due_monthly():
-    from shared.events_agent import _compute_next_due
-    assert _compute_next_due("2024-01-15", "MONTHLY") == "2024-02-15"
-    assert _compute_next_due("2024-12-15", "MONTHLY") == "2025-01-15"
 
+def testcompute_next_due_rrule():
+    from shared.events_agent import compute_next_due
+    assert compute_next_due("2024-06-01", "DAILY") == "2024-06-02"
+    assert compute_next_due("2024-01-31", "FREQ=MONTHLY;BYMONTHDAY=-1") == "2024-02-29"
+    assert compute_next_due("2024-01-31", "MONTHLY") == "2024-02-29"  # clamped to the month's last day
+    assert compute_next_due("2024-02-13", "FREQ=MONTHLY;BYDAY=2TU") == "2024-03-12"
+    assert compute_next_due("2024-01-15", "QUARTERLY") == "2024-04-15"
 
-def test_compute_next_due_weekly():
-    from shared.events_agent import _compute_next_due
-    assert _compute_next_due("2024-01-15", "WEEKLY") == "2024-01-22"
 
+def testcompute_next_due_keeps_dtstart():
+    from shared.events_agent import compute_next_due
 
-def test_compute_next_due_invalid():
-    from shared.events_agent import _compute_next_due
-    assert _compute_next_due("invalid", "YEARLY") is None
-    assert _compute_next_due("2024-06-01", "DAILY") is None
+    def chain(dtstart, recurrence, n):
+        out, anchor = [], dtstart
+        for _ in range(n):
+            anchor = compute_next_due(anchor, recurrence, dtstart)
+            out.append(anchor)
+        return out
+
+    # Day 29-31 doesn't skip short months, and doesn't drift to the 28th after February
+    assert chain("2026-01-31", "MONTHLY", 4) == ["2026-02-28", "2026-03-31", "2026-04-30", "2026-05-31"]
+    assert chain("2026-01-30", "MONTHLY", 2) == ["2026-02-28", "2026-03-30"]
+    assert chain("2024-02-29", "YEARLY", 4) == ["2025-02-28", "2026-02-28", "2027-02-28", "2028-02-29"]
+    # COUNT counts from dtstart (the first occurrence), not from the last anchor
+    assert chain("2026-01-15", "FREQ=MONTHLY;COUNT=3", 3) == ["2026-02-15", "2026-03-15", None]
 
 
 def test_create_event(dashboard_db, monkeypatch):
@@ -154,6 +185,36 @@ def test_process_scheduled_templates_due(dashboard_db, monkeypatch):
     assert len(bill_events) >= 1
 
 
+def test_process_scheduled_templates_batched(dashboard_db, monkeypatch):
+    """Due templates are handled in one pass: existing events are not duplicated, next_due advances."""
+    monkeypatch.setenv("DASHBOARD_DB_PATH", str(dashboard_db))
+    import sqlite3
+    today = date.today()
+    conn = sqlite3.connect(str(dashboard_db))
+    conn.executemany(
+        "INSERT INTO scheduled_templates (title, description, recurrence, anchor_date) VALUES (?, ?, ?, ?)",
+        [(f"Bill {n}", "", "WEEKLY", (today - timedelta(days=7 + n)).isoformat()) for n in range(5)]
+        + [("Later", "", "YEARLY", today.isoformat()), ("Broken", "", "SOMETIMES", today.isoformat())],
+    )
+    conn.execute("INSERT INTO events (date, title) VALUES (?, 'bill 0')", (today.isoformat(),))
+    conn.commit()
+    conn.close()
+    from shared.events_agent import get_requires_scheduling, process_scheduled_templates
+    created, requires = process_scheduled_templates(dashboard_db_path=dashboard_db)
+    assert created == 4  # Bill 0 already on the calendar
+    assert process_scheduled_templates(dashboard_db_path=dashboard_db)[0] == 0
+    conn = sqlite3.connect(str(dashboard_db))
+    rows = dict(conn.execute("SELECT title, next_due FROM scheduled_templates").fetchall())
+    plan = " ".join(r[-1] for r in conn.execute(
+        "EXPLAIN QUERY PLAN SELECT id FROM scheduled_templates WHERE next_due > '' AND next_due <= '2030-01-01'"
+    ))
+    conn.close()
+    assert rows["Bill 0"] == (today + timedelta(days=7)).isoformat()
+    assert rows["Broken"] == ""
+    assert "idx_scheduled_templates_next_due" in plan
+    assert [r["title"] for r in get_requires_scheduling(days_ahead=7, dashboard_db_path=dashboard_db)][:2] == ["Bill 4", "Bill 3"]
+
+
 def test_list_wishlist(woody_db, monkeypatch):
     monkeypatch.setenv("WOODY_DB_PATH", str(woody_db))
     import sqlite3
@@ -192,3 +253,13 @@ def woody_db(tmp_path):
     return db
 
 
+
+
+def test_email_suggestions_deduped_against_pending(woody_db, dashboard_db, monkeypatch):
+    monkeypatch.setenv("DASHBOARD_DB_PATH", str(dashboard_db))
+    from shared.events_agent import propose_events_from_emails
+    from shared.memory_agent import list_pending_proposals
+    msgs = [{"subject": "Dentist appointment Tuesday", "snippet": "See you then", "from": "a@x.com"}]
+    assert propose_events_from_emails(msgs, woody_db) == 1
+    assert propose_events_from_emails([{**msgs[0], "subject": "dentist  appointment tuesday"}], woody_db) == 0
+    assert len(list_pending_proposals(woody_db)) == 1
@@ -0,0 +1,167 @@
+"""Tests for the durable Telegram inbox and idempotent processing."""
+
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(_root))
+sys.path.insert(0, str(_root / "woody"))
+
+
+@pytest.fixture
+def woody_db(tmp_path):
+    db = tmp_path / "woody.db"
+    from woody.app.db import init_db
+    init_db(db)
+    return db
+
+
+@pytest.fixture
+def fake_bot_api(monkeypatch):
+    from app.telegram_client import reset_clients
+    from tests.fake_telegram import FakeTelegramServer
+    with FakeTelegramServer() as tg:
+        monkeypatch.setenv("TELEGRAM_API_BASE", tg.base_url)
+        reset_clients()
+        yield tg
+        reset_clients()
+
+
+@pytest.fixture
+def processed(monkeypatch, fake_bot_api):
+    """Replace the agent turn with a recorder; no debounce so each message is its own turn."""
+    from app import telegram_loop
+    monkeypatch.setenv("WOODY_DEBOUNCE_SECONDS", "0")
+    calls = []
+    lock = threading.Lock()
+
+    def fake_process(token, db_path, openai_key, chat_id, text):
+        with lock:
+            calls.append((chat_id, text))
+
+    monkeypatch.setattr(telegram_loop, "process_message", fake_process)
+    return calls
+
+
+def _update(update_id, chat_id, text):
+    return {"update_id": update_id, "message": {"chat": {"id": chat_id}, "text": text}}
+
+
+def test_record_and_claim_are_idempotent(woody_db):
+    from app import inbox
+    assert inbox.record_update(woody_db, 10, 1, "hi") is True
+    assert inbox.record_update(woody_db, 10, 1, "hi") is False
+    assert inbox.claim(woody_db, 10) is True
+    assert inbox.claim(woody_db, 10) is False
+    inbox.finish(woody_db, 10)
+    inbox.finish(woody_db, 10, error="late duplicate")  # no-op once done
+    assert inbox.inbox_stats(woody_db) == {"done": 1}
+
+
+def test_offset_persisted(woody_db):
+    from app import inbox
+    assert inbox.get_offset(woody_db) == 0
+    inbox.save_offset(woody_db, 501)
+    inbox.save_offset(woody_db, 502)
+    assert inbox.get_offset(woody_db) == 502
+
+
+def test_recover_after_crash(woody_db):
+    from app import inbox
+    for uid in (1, 2, 3):
+        inbox.record_update(woody_db, uid, 7, f"m{uid}")
+    inbox.claim(woody_db, 1, owner="dead", lease_seconds=-1)  # crashed mid-turn, lease expired
+    inbox.claim(woody_db, 2)
+    inbox.finish(woody_db, 2)         # finished before the crash
+    pending = inbox.recover(woody_db)
+    assert [r["update_id"] for r in pending] == [1, 3]
+    # A row that keeps crashing the process is given up on
+    for _ in range(inbox.MAX_ATTEMPTS):
+        inbox.claim(woody_db, 1, owner="dead", lease_seconds=-1)
+        inbox.recover(woody_db)
+    assert inbox.inbox_stats(woody_db)["failed"] == 1
+
+
+def test_recover_leaves_live_leases_alone(woody_db):
+    from app import inbox
+    inbox.record_update(woody_db, 1, 7, "hi")
+    assert inbox.claim(woody_db, 1, owner="replica-a")  # another replica is mid-turn
+    assert inbox.recover(woody_db) == []
+    assert inbox.finish(woody_db, 1) is False  # not ours
+    assert inbox.renew(woody_db, [1], owner="replica-a")
+    assert inbox.finish(woody_db, 1, owner="replica-a") is True
+    assert inbox.inbox_stats(woody_db) == {"done": 1}
+
+
+def test_restart_replays_backlog_and_skips_redelivery(woody_db, processed):
+    from app import inbox
+    from app.telegram_loop import ingest, make_dispatcher
+    # Previous run: two updates recorded, first one was mid-turn when the process died
+    inbox.record_update(woody_db, 100, 1, "add eggs")
+    inbox.record_update(woody_db, 101, 2, "what's for dinner")
+    inbox.claim(woody_db, 100, owner="previous-run", lease_seconds=-1)
+
+    dispatcher = make_dispatcher("TOKEN", woody_db, "sk-test")
+    # Telegram re-delivers the same updates (offset was not confirmed) plus one new one
+    assert ingest(dispatcher, woody_db, _update(100, 1, "add eggs")) is False
+    assert ingest(dispatcher, woody_db, _update(101, 2, "what's for dinner")) is False
+    assert ingest(dispatcher, woody_db, _update(102, 1, "and milk")) is True
+    assert ingest(dispatcher, woody_db, {"update_id": 103, "edited_message": {}}) is False
+    dispatcher.shutdown(wait=True)
+
+    assert sorted(processed) == sorted([(1, "add eggs"), (2, "what's for dinner"), (1, "and milk")])
+    assert [t for c, t in processed if c == 1] == ["add eggs", "and milk"]
+    assert inbox.inbox_stats(woody_db) == {"done": 3}
+
+
+def test_failed_turn_marked_failed(woody_db, monkeypatch):
+    from app import inbox, telegram_loop
+
+    def boom(*args):
+        raise RuntimeError("telegram down")
+
+    monkeypatch.setattr(telegram_loop, "process_message", boom)
+    inbox.record_update(woody_db, 5, 1, "hi")
+    with pytest.raises(RuntimeError):
+        telegram_loop.handle_update("TOKEN", woody_db, "sk-test", 1, "hi", (5,))
+    assert inbox.inbox_stats(woody_db) == {"failed": 1}
+
+
+def test_lone_message_dispatched_without_debounce(woody_db, processed, monkeypatch):
+    from app.telegram_loop import ingest, make_dispatcher
+    monkeypatch.delenv("WOODY_DEBOUNCE_SECONDS")
+    dispatcher = make_dispatcher("TOKEN", woody_db, "sk-test")
+    assert dispatcher.debounce == 0
+    started = time.monotonic()
+    ingest(dispatcher, woody_db, _update(1, 9, "what's on today"))
+    while not processed and time.monotonic() - started < 1:
+        time.sleep(0.01)
+    assert processed == [(9, "what's on today")]
+    assert time.monotonic() - started < 0.5
+    dispatcher.shutdown(wait=True)
+
+
+def test_coalesced_turn_claims_every_update(woody_db, processed, monkeypatch):
+    from app import inbox
+    from app.telegram_loop import ingest, make_dispatcher
+    monkeypatch.setenv("WOODY_DEBOUNCE_SECONDS", "0.2")
+    dispatcher = make_dispatcher("TOKEN", woody_db, "sk-test")
+    for uid, text in ((1, "add eggs"), (2, "and milk"), (3, "oh and bread")):
+        ingest(dispatcher, woody_db, _update(uid, 9, text))
+    dispatcher.shutdown(wait=True)
+    assert processed == [(9, "add eggs\nand milk\noh and bread")]
+    assert inbox.inbox_stats(woody_db) == {"done": 3}
+
+
+def test_process_message_shows_typing(woody_db, fake_bot_api, monkeypatch):
+    from app import telegram_loop
+    monkeypatch.setattr(telegram_loop, "run_agent", lambda text, key, db, chat_id: f"echo: {text}")
+    telegram_loop.process_message("TOKEN", woody_db, "sk-test", 4, "/chatid\nhi there")
+    assert fake_bot_api.count("sendChatAction") >= 1
+    sent = fake_bot_api.sent(4)
+    assert "Your chat ID: 4" in sent[0]
+    assert sent[1] == "echo: hi there"
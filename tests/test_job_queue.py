@@ -0,0 +1,196 @@
+"""Tests for the durable job queue and the out-of-process worker."""
+
+import os
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(_root))
+sys.path.insert(0, str(_root / "woody"))
+
+
+@pytest.fixture
+def woody_db(tmp_path):
+    db = tmp_path / "woody.db"
+    from woody.app.db import init_db
+    init_db(db)
+    return db
+
+
+def test_priority_order_and_unique(woody_db):
+    from shared import job_queue
+    low = job_queue.enqueue(woody_db, "contact_agent")
+    high = job_queue.enqueue(woody_db, "memory_agent_run", priority=10)
+    assert job_queue.enqueue(woody_db, "contact_agent", unique=True) == low
+    later = job_queue.enqueue(woody_db, "events_agent", delay=60)
+    assert job_queue.lease(woody_db, "w1")["id"] == high
+    assert job_queue.lease(woody_db, "w1")["id"] == low
+    assert job_queue.lease(woody_db, "w1") is None  # the delayed one isn't runnable yet
+    assert job_queue.get_job(woody_db, later)["status"] == "queued"
+
+
+def test_concurrent_workers_never_share_a_job(woody_db):
+    from shared import job_queue
+    ids = {job_queue.enqueue(woody_db, "k", payload={"n": n}) for n in range(40)}
+    got = []
+    lock = threading.Lock()
+
+    def worker(name):
+        while True:
+            job = job_queue.lease(woody_db, name)
+            if job is None:
+                return
+            with lock:
+                got.append(job["id"])
+            job_queue.complete(woody_db, job["id"], name, {"ok": True})
+
+    threads = [threading.Thread(target=worker, args=(f"w{i}",)) for i in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert sorted(got) == sorted(ids)
+    assert job_queue.queue_stats(woody_db)["counts"] == {"done": 40}
+
+
+def test_retry_with_backoff_then_failed(woody_db, monkeypatch):
+    from shared import job_queue
+    monkeypatch.setattr(job_queue, "RETRY_BASE_SECONDS", 0)
+    job_id = job_queue.enqueue(woody_db, "flaky", max_attempts=2)
+    job = job_queue.lease(woody_db, "w1")
+    assert job_queue.fail(woody_db, job_id, "w1", "RuntimeError: quota") is True
+    assert job_queue.get_job(woody_db, job_id)["status"] == "queued"
+    job = job_queue.lease(woody_db, "w1")
+    assert job["attempts"] == 2
+    job_queue.fail(woody_db, job_id, "w1", "RuntimeError: quota")
+    job = job_queue.get_job(woody_db, job_id)
+    assert job["status"] == "failed" and "quota" in job["error"]
+
+
+def test_config_errors_fail_without_retry(woody_db, monkeypatch):
+    import app.communications_agent_loop as loop
+    from app.worker import run_job
+    from shared import communications_agent, job_queue
+    assert isinstance(job_queue.error_for("Google not connected. Complete OAuth at dashboard /integrations"), job_queue.PermanentError)
+    assert not isinstance(job_queue.error_for("Gmail: Rate limit exceeded."), job_queue.PermanentError)
+
+    monkeypatch.setattr(communications_agent, "run_communications_agent", lambda: {"ok": True, "error": "No email provider connected."})
+    job_id = job_queue.enqueue(woody_db, "communications_agent")
+    job = job_queue.lease(woody_db, "w1")
+    handlers = {"communications_agent": lambda db_path, payload: loop._run_communications_agent_once()}
+    assert run_job(woody_db, job, "w1", handlers, lease_seconds=30) is False
+    job = job_queue.get_job(woody_db, job_id)
+    assert job["status"] == "failed" and job["attempts"] == 1 and "No email provider" in job["error"]
+
+
+def test_run_job_reports_lost_lease(woody_db, capsys):
+    from app.worker import run_job
+    from shared import job_queue
+    job_id = job_queue.enqueue(woody_db, "slow")
+    job = job_queue.lease(woody_db, "w1")
+
+    def stolen(db_path, payload):
+        job_queue.lease(woody_db, "w2", lease_seconds=30)  # w1's lease expired meanwhile
+        return {"n": 1}
+
+    with job_queue._conn(woody_db) as conn:
+        conn.execute("UPDATE job_queue SET lease_expires_at = 0 WHERE id = ?", (job_id,))
+    assert run_job(woody_db, job, "w1", {"slow": stolen}, lease_seconds=30) is False
+    assert "lease was lost" in capsys.readouterr().out
+    assert job_queue.get_job(woody_db, job_id)["status"] == "leased"
+
+
+def test_expired_lease_is_reclaimed(woody_db):
+    from shared import job_queue
+    job_id = job_queue.enqueue(woody_db, "slow")
+    job_queue.lease(woody_db, "dead-worker", lease_seconds=0.05)
+    time.sleep(0.1)
+    job = job_queue.lease(woody_db, "w2")
+    assert job["id"] == job_id and job["attempts"] == 2
+    assert job_queue.complete(woody_db, job_id, "dead-worker") is False  # lost its lease
+    assert job_queue.heartbeat(woody_db, job_id, "w2") is True
+    assert job_queue.complete(woody_db, job_id, "w2", {"n": 1}) is True
+    assert job_queue.get_job(woody_db, job_id)["result"] == {"n": 1}
+
+
+def test_run_worker_drains_queue(woody_db):
+    from app.worker import run_worker
+    from shared import job_queue
+    seen = []
+
+    def boom(db_path, payload):
+        raise ValueError("bad input")
+
+    handlers = {"echo": lambda db_path, payload: seen.append(payload["x"]) or {"x": payload["x"]}, "boom": boom}
+    a = job_queue.enqueue(woody_db, "echo", payload={"x": 1})
+    b = job_queue.enqueue(woody_db, "boom", max_attempts=1)
+    c = job_queue.enqueue(woody_db, "nobody_handles_this", max_attempts=1)
+    assert run_worker(woody_db, worker_id="t", handlers=handlers, drain=True) == 3
+    assert seen == [1]
+    assert job_queue.get_job(woody_db, a)["result"] == {"x": 1}
+    assert "bad input" in job_queue.get_job(woody_db, b)["error"]
+    assert "no handler" in job_queue.get_job(woody_db, c)["error"]
+
+
+def test_worker_entry_point_runs_in_separate_process(woody_db):
+    from shared import job_queue
+    job_id = job_queue.enqueue(woody_db, "not_a_real_kind", max_attempts=1)
+    env = {**os.environ, "PYTHONPATH": f"{_root}{os.pathsep}{_root / 'woody'}"}
+    proc = subprocess.run(
+        [sys.executable, str(_root / "woody" / "run.py"), "worker", "--db", str(woody_db), "--drain"],
+        env=env, capture_output=True, text=True, timeout=60,
+    )
+    assert proc.returncode == 0, proc.stderr
+    job = job_queue.get_job(woody_db, job_id)
+    assert job["status"] == "failed" and "no handler" in job["error"]
+    assert job["lease_owner"] is None
+
+
+def test_scheduled_job_waits_for_worker(woody_db, monkeypatch):
+    from app import jobs
+    from app.worker import run_worker
+    from shared import job_queue
+    stop = threading.Event()
+    worker = threading.Thread(
+        target=run_worker,
+        kwargs={"db_path": woody_db, "handlers": {"contact_agent": lambda db, p: {"added": 3}}, "poll": 0.05, "stop": stop},
+    )
+    worker.start()
+    monkeypatch.setattr(job_queue, "wait_for", lambda db, jid, timeout, poll: _wait_fast(db, jid))
+    try:
+        assert jobs._in_worker(woody_db, "contact_agent")() == {"added": 3}
+    finally:
+        stop.set()
+        worker.join()
+
+
+def _wait_fast(db, job_id):
+    from shared.job_queue import get_job
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline:
+        job = get_job(db, job_id)
+        if job["status"] in ("done", "failed"):
+            return job
+        time.sleep(0.02)
+    raise TimeoutError
+
+
+def test_dashboard_run_now_returns_job_id(woody_db, monkeypatch):
+    from fastapi.testclient import TestClient
+    import shared.db_path
+    from dashboard.app.main import app
+    monkeypatch.setattr(shared.db_path, "get_woody_db_path", lambda: woody_db)
+    client = TestClient(app)
+    started = time.monotonic()
+    data = client.post("/api/memory-agent/run").json()
+    assert data["ok"] is True and time.monotonic() - started < 2
+    assert client.post("/api/memory-agent/run").json()["job_id"] == data["job_id"]  # double click
+    job = client.get(f"/api/job-queue/{data['job_id']}").json()
+    assert job["kind"] == "memory_agent_run" and job["status"] == "queued" and job["priority"] == 10
+    assert client.get("/api/job-queue").json()["counts"] == {"queued": 1}
+    assert client.get("/api/job-queue/9999").json()["status"] == "unknown"
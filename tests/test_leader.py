@@ -0,0 +1,149 @@
+"""Tests for leader election between Woody replicas."""
+
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(_root))
+sys.path.insert(0, str(_root / "woody"))
+
+
+@pytest.fixture
+def woody_db(tmp_path):
+    db = tmp_path / "woody.db"
+    from woody.app.db import init_db
+    init_db(db)
+    return db
+
+
+def test_lease_acquire_renew_expire(woody_db):
+    from shared import leader
+    assert leader.try_acquire(woody_db, "a", ttl=0.2) is True
+    first = leader.current_leader(woody_db)
+    assert first["holder"] == "a"
+    assert leader.try_acquire(woody_db, "b", ttl=0.2) is False
+    assert leader.try_acquire(woody_db, "a", ttl=0.2) is True  # renew keeps acquired_at
+    assert leader.current_leader(woody_db)["acquired_at"] == first["acquired_at"]
+    time.sleep(0.25)
+    assert leader.current_leader(woody_db) is None
+    assert leader.try_acquire(woody_db, "b", ttl=30) is True
+    assert leader.try_acquire(woody_db, "a", ttl=30) is False
+    assert leader.release(woody_db, "a") is False
+    assert leader.release(woody_db, "b") is True
+    assert leader.try_acquire(woody_db, "a", ttl=30) is True
+
+
+class _Replica:
+    def __init__(self, db, name, ttl=30):
+        from app.leader import LeaderElector
+        self.events = []
+        self.elector = LeaderElector(
+            db, lambda: self.events.append("elected"), lambda: self.events.append("demoted"), holder=name, ttl=ttl
+        )
+
+
+def test_only_one_replica_leads_and_handover_on_stop(woody_db):
+    a, b = _Replica(woody_db, "a"), _Replica(woody_db, "b")
+    a.elector.start()
+    b.elector.start()
+    try:
+        assert (a.elector.is_leader, b.elector.is_leader) == (True, False)
+        assert b.events == []
+        a.elector.stop()  # clean shutdown releases the lease
+        assert a.events == ["elected", "demoted"]
+        assert b.elector.step() is True
+        assert b.events == ["elected"]
+    finally:
+        b.elector.stop()
+
+
+def test_stalled_leader_is_replaced_and_steps_down(woody_db):
+    a, b = _Replica(woody_db, "a", ttl=0.2), _Replica(woody_db, "b", ttl=0.2)
+    assert a.elector.step() is True
+    assert b.elector.step() is False
+    time.sleep(0.25)  # a missed its heartbeats
+    assert b.elector.step() is True
+    assert a.elector.step() is False
+    assert a.events == ["elected", "demoted"] and b.events == ["elected"]
+    assert a.elector.stats()["demoted"] == 1
+
+
+def test_db_error_keeps_leadership_until_lease_runs_out(woody_db, monkeypatch):
+    from shared import leader
+    a = _Replica(woody_db, "a", ttl=0.3)
+    assert a.elector.step() is True
+
+    def locked(*args, **kwargs):
+        raise RuntimeError("database is locked")
+
+    monkeypatch.setattr(leader, "try_acquire", locked)
+    assert a.elector.step() is True
+    time.sleep(0.35)
+    assert a.elector.step() is False
+    assert a.events == ["elected", "demoted"]
+    assert a.elector.stats()["renew_errors"] == 2
+
+
+def test_only_leader_polls_telegram(woody_db, monkeypatch):
+    """Polling mode: the poller follows leadership, so one replica calls getUpdates at a time."""
+    from app import telegram_loop
+    from app.leader import LeaderElector
+    from app.telegram_client import reset_clients
+    from tests.fake_telegram import FakeTelegramServer
+    monkeypatch.setenv("WOODY_DEBOUNCE_SECONDS", "0")
+    seen = []
+    monkeypatch.setattr(telegram_loop, "process_message", lambda token, db, key, chat_id, text: seen.append(text))
+    with FakeTelegramServer(max_poll_wait=0.1) as tg:
+        monkeypatch.setenv("TELEGRAM_API_BASE", tg.base_url)
+        reset_clients()
+        start = lambda: telegram_loop.start_polling("t", woody_db, "k")  # noqa: E731
+        stop = lambda: telegram_loop.stop_polling(wait=True)  # noqa: E731
+        a = LeaderElector(woody_db, start, stop, holder="a", ttl=30)
+        b = LeaderElector(woody_db, start, stop, holder="b", ttl=30)
+        try:
+            assert a.step() is True and b.step() is False
+            tg.push_update(chat_id=1, text="hello")
+            deadline = time.monotonic() + 3
+            while not seen and time.monotonic() < deadline:
+                time.sleep(0.02)
+            assert seen == ["hello"]
+            a.stop()
+            assert not telegram_loop._poller[0].is_alive()
+            polls = tg.count("getUpdates")
+            time.sleep(0.3)
+            assert tg.count("getUpdates") == polls  # nobody polls between leaders
+            assert b.step() is True
+            assert telegram_loop._poller[0].is_alive()
+        finally:
+            b.stop()
+            reset_clients()
+
+
+def test_restarting_poller_does_not_block_the_caller(woody_db, monkeypatch):
+    """Re-elected during the old loop's long poll: start_polling returns at once, the new loop waits."""
+    from app import telegram_loop
+    from app.telegram_client import reset_clients
+    from tests.fake_telegram import FakeTelegramServer
+    with FakeTelegramServer(max_poll_wait=1.0) as tg:
+        monkeypatch.setenv("TELEGRAM_API_BASE", tg.base_url)
+        reset_clients()
+        try:
+            telegram_loop.start_polling("t", woody_db, "k")
+            deadline = time.monotonic() + 3
+            while not tg.count("getUpdates") and time.monotonic() < deadline:
+                time.sleep(0.02)
+            old = telegram_loop._poller[0]
+            telegram_loop.stop_polling()
+            started = time.monotonic()
+            telegram_loop.start_polling("t", woody_db, "k")
+            assert time.monotonic() - started < 0.2
+            assert old.is_alive()  # still inside its long poll
+            new = telegram_loop._poller[0]
+            old.join(3)
+            assert new.is_alive()
+        finally:
+            telegram_loop.stop_polling(wait=True)
+            reset_clients()
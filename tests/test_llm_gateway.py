@@ -0,0 +1,95 @@
+"""Tests for the LLM gateway against a local fake OpenAI server."""
+
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(_root))
+
+from tests.fake_openai import FakeOpenAIServer
+
+MSGS = [{"role": "user", "content": "hi"}]
+
+
+def _gateway(server, **kw):
+    from shared.llm_gateway import LLMGateway
+    opts = {"timeout": 5.0, "max_retries": 2, "breaker_threshold": 2, "breaker_cooldown": 60.0}
+    opts.update(kw)
+    return LLMGateway(base_url=server.base_url, **opts)
+
+
+def test_success_and_histogram():
+    with FakeOpenAIServer([{"content": "hello"}]) as server:
+        gw = _gateway(server)
+        resp = gw.chat_completion("sk-test", model="gpt-4o-mini", messages=MSGS)
+        assert resp.choices[0].message.content == "hello"
+        stats = gw.stats()
+        assert stats["calls"] == 1
+        assert stats["latency"]["call"]["count"] == 1
+        assert stats["breaker"] == "closed"
+
+
+def test_pooled_client_reused():
+    with FakeOpenAIServer() as server:
+        gw = _gateway(server)
+        assert gw.client("sk-test") is gw.client("sk-test")
+
+
+def test_retries_on_429_and_5xx():
+    script = [
+        {"status": 429, "headers": {"retry-after": "0"}},
+        {"status": 503, "headers": {"retry-after": "0"}},
+        {"content": "third time lucky"},
+    ]
+    with FakeOpenAIServer(script) as server:
+        gw = _gateway(server)
+        resp = gw.chat_completion("sk-test", model="gpt-4o-mini", messages=MSGS)
+        assert resp.choices[0].message.content == "third time lucky"
+        assert gw.stats()["retries"] == 2
+        assert len(server.requests) == 3
+
+
+def test_no_retry_on_400():
+    import openai
+    with FakeOpenAIServer([{"status": 400}]) as server:
+        gw = _gateway(server)
+        with pytest.raises(openai.BadRequestError):
+            gw.chat_completion("sk-test", model="gpt-4o-mini", messages=MSGS)
+        assert len(server.requests) == 1
+        assert gw.breaker.state == "closed"
+
+
+def test_deadline_enforced():
+    from shared.llm_gateway import LLMUnavailable
+    with FakeOpenAIServer([{"delay": 1.0}]) as server:
+        gw = _gateway(server, max_retries=0)
+        started = time.monotonic()
+        with pytest.raises(LLMUnavailable):
+            gw.chat_completion("sk-test", timeout=0.3, model="gpt-4o-mini", messages=MSGS)
+        assert time.monotonic() - started < 0.9
+
+
+def test_hedge_wins_over_slow_primary():
+    with FakeOpenAIServer([{"delay": 0.5, "content": "slow"}, {"content": "fast"}]) as server:
+        gw = _gateway(server, hedge_after=0.05)
+        resp = gw.chat_completion("sk-test", model="gpt-4o-mini", messages=MSGS)
+        assert resp.choices[0].message.content == "fast"
+        assert gw.stats()["hedge_wins"] == 1
+        gw.close()
+
+
+def test_circuit_breaker_opens_and_rejects():
+    from shared.llm_gateway import LLMUnavailable
+    script = [{"status": 500, "headers": {"retry-after": "0"}}] * 2
+    with FakeOpenAIServer(script) as server:
+        gw = _gateway(server, max_retries=0)
+        for _ in range(2):
+            with pytest.raises(LLMUnavailable):
+                gw.chat_completion("sk-test", model="gpt-4o-mini", messages=MSGS)
+        assert gw.breaker.state == "open"
+        with pytest.raises(LLMUnavailable, match="breaker"):
+            gw.chat_completion("sk-test", model="gpt-4o-mini", messages=MSGS)
+        assert len(server.requests) == 2
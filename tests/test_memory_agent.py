@@ -117,3 +117,215 @@ def dashboard_db(tmp_path):
     """)
     conn.close()
     return db
+
+
+@pytest.fixture
+def memory_store(tmp_path, monkeypatch):
+    """Empty Chroma store with the offline hash embedding; no calendar events."""
+    import shared.memory
+    import shared.events_agent
+    monkeypatch.setenv("MEMORY_EMBEDDING", "hash")
+    monkeypatch.setenv("DASHBOARD_DB_PATH", str(tmp_path / "no-dashboard.db"))
+    monkeypatch.setattr(shared.memory, "MEMORY_DB_PATH", tmp_path / "chroma")
+    monkeypatch.setattr(shared.events_agent, "get_all_events", lambda days_back=7, days_ahead=14: [])
+    return shared.memory
+
+
+def _add_approval(db, approval_id, fact, created_at):
+    import sqlite3
+    conn = sqlite3.connect(str(db))
+    conn.execute(
+        "INSERT INTO approvals (id, chat_id, tool_name, tool_args, preview, created_at) VALUES (?, 1, 'memory_store', ?, '', ?)",
+        (approval_id, json.dumps({"fact": fact}), created_at),
+    )
+    conn.commit()
+    conn.close()
+
+
+def test_run_only_processes_new_approvals(woody_db, memory_store):
+    from datetime import datetime, timezone
+    from shared.memory_agent import get_watermark, run_memory_agent
+    now = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+    _add_approval(woody_db, "a1", "Likes tea", now)
+    _add_approval(woody_db, "a2", "Has a dog", now)
+    assert run_memory_agent(woody_db)["add"] == 2
+    assert run_memory_agent(woody_db)["add"] == 0
+    _add_approval(woody_db, "a3", "Lives in Boston", now)  # same second as the watermark
+    assert run_memory_agent(woody_db)["add"] == 1
+    assert get_watermark(woody_db, "approvals") == {"created_at": now, "ids": ["a1", "a2", "a3"]}
+    assert run_memory_agent(woody_db, full=True)["add"] == 3
+
+
+def test_memory_steps_only_look_at_changed_memories(woody_db, memory_store):
+    from shared.memory_agent import run_memory_agent
+    memory_store.memory_add("Grandma birthday is on March 3rd", weight=7, memory_type="short")
+    memory_store.memory_add("Grandma birthday is March 3rd every year", weight=5)
+    memory_store._get_collection().add(
+        ids=["old"], documents=["Passport renewal due in 2027"],
+        metadatas=[{"weight": 8, "type": "long", "last_touched": "2020-01-01T00:00:00Z"}],
+    )
+    (memory_store.MEMORY_DB_PATH / memory_store._TIME_FIELDS_MARKER).unlink()  # stored before touched_at existed
+    first = run_memory_agent(woody_db)
+    assert first["consolidate"] >= 1
+    assert first["promote"] == 2  # short->long and the stale passport memory
+    assert run_memory_agent(woody_db) == {"add": 0, "remove": 0, "event_memory": 0, "consolidate": 0, "promote": 0}
+    memory_store.memory_add("Allergic to peanuts", weight=6, memory_type="short")
+    assert run_memory_agent(woody_db)["promote"] == 1
+
+
+def test_recalled_memories_are_not_changed(woody_db, memory_store):
+    from shared.memory_agent import run_memory_agent
+    memory_store.memory_add("Grandma birthday is on March 3rd", weight=7, memory_type="short")
+    memory_store.memory_add("Grandma birthday is March 3rd every year", weight=5)
+    run_memory_agent(woody_db)
+    assert memory_store.memory_touch_on_search("Grandma birthday") == 2
+    assert memory_store.memory_list_changed(since=0, field="touched_at")
+    assert run_memory_agent(woody_db) == {"add": 0, "remove": 0, "event_memory": 0, "consolidate": 0, "promote": 0}
+
+
+def test_watermark_keeps_ids_sharing_the_last_timestamp():
+    from shared.memory_agent import _advance
+
+    def m(i, ts):
+        return {"id": i, "metadata": {"modified_at": ts}}
+
+    assert _advance(None, []) is None
+    wm = _advance(None, [m("a", 1.0), m("b", 2.0), m("c", 2.0)])
+    assert wm == {"modified_at": 2.0, "ids": ["b", "c"]}
+    assert _advance(wm, [m("d", 2.0)]) == {"modified_at": 2.0, "ids": ["b", "c", "d"]}
+    assert _advance(wm, [m("e", 3.0)]) == {"modified_at": 3.0, "ids": ["e"]}
+    legacy = {"last_touched": "1970-01-01T00:00:02Z", "ids": ["b"]}
+    assert _advance(legacy, [m("c", 2.0)]) == {"modified_at": 2.0, "ids": ["b", "c"]}
+
+
+def test_events_not_reproposed_after_rejection(woody_db, memory_store, monkeypatch):
+    from datetime import date
+    import shared.events_agent
+    from shared.memory_agent import list_pending_proposals, resolve_proposal, run_memory_agent
+    today = date.today().isoformat()
+    monkeypatch.setattr(
+        shared.events_agent, "get_all_events",
+        lambda days_back=7, days_ahead=14: [{"id": 9, "date": today, "title": "Soccer final", "event_type": "event"}],
+    )
+    assert run_memory_agent(woody_db)["event_memory"] == 1
+    resolve_proposal(woody_db, list_pending_proposals(woody_db)[0]["id"], "rejected")
+    assert run_memory_agent(woody_db)["event_memory"] == 0
+
+
+def test_create_proposal_is_idempotent_while_pending(woody_db):
+    from shared.memory_agent import create_proposal, list_pending_proposals, proposal_exists, resolve_proposal
+    pid = create_proposal(woody_db, "add", {"fact": "Likes  Tea"}, "first")
+    assert create_proposal(woody_db, "add", {"fact": "likes tea"}, "again") == pid
+    assert len(list_pending_proposals(woody_db)) == 1
+    assert proposal_exists(woody_db, "add", {"fact": "LIKES TEA"}) is True
+    resolve_proposal(woody_db, pid, "rejected")
+    assert proposal_exists(woody_db, "add", {"fact": "likes tea"}) is False
+    assert proposal_exists(woody_db, "add", {"fact": "likes tea"}, pending_only=False) is True
+    assert create_proposal(woody_db, "add", {"fact": "likes tea"}) != pid
+    # Types without a key are never deduped
+    assert create_proposal(woody_db, "custom", {"x": 1}) != create_proposal(woody_db, "custom", {"x": 1})
+
+
+def test_dedupe_lookup_uses_index(woody_db):
+    import sqlite3
+    conn = sqlite3.connect(str(woody_db))
+    plan = " ".join(r[-1] for r in conn.execute(
+        "EXPLAIN QUERY PLAN SELECT 1 FROM memory_agent_proposals WHERE dedupe_key = ? AND status = 'pending'", ("k",)
+    ))
+    conn.close()
+    assert "idx_memory_agent_dedupe" in plan
+
+
+def test_init_db_backfills_dedupe_keys(tmp_path):
+    import sqlite3
+    from woody.app.db import init_db
+    db = tmp_path / "old.db"
+    conn = sqlite3.connect(str(db))
+    conn.execute(
+        """CREATE TABLE memory_agent_proposals (id TEXT PRIMARY KEY, action_type TEXT NOT NULL,
+           status TEXT NOT NULL DEFAULT 'pending', payload TEXT NOT NULL, reason TEXT,
+           created_at TEXT NOT NULL DEFAULT (datetime('now')), resolved_at TEXT)"""
+    )
+    for pid in ("p1", "p2"):  # duplicates from before dedupe existed
+        conn.execute(
+            "INSERT INTO memory_agent_proposals (id, action_type, payload) VALUES (?, 'promote', ?)",
+            (pid, json.dumps({"memory_id": "m1", "action": "short_to_long"})),
+        )
+    conn.commit()
+    conn.close()
+    init_db(db)
+    conn = sqlite3.connect(str(db))
+    keys = dict(conn.execute("SELECT id, dedupe_key FROM memory_agent_proposals").fetchall())
+    conn.close()
+    assert keys == {"p1": "promote:m1|short_to_long", "p2": None}
+    from shared.memory_agent import create_proposal
+    assert create_proposal(db, "promote", {"memory_id": "m1", "action": "short_to_long"}) == "p1"
+
+
+def test_bulk_approve_batches_memory_writes(woody_db, dashboard_db, memory_store, monkeypatch):
+    import sqlite3
+    import time
+    from shared.memory_agent import create_proposal, list_pending_proposals, resolve_proposals
+    monkeypatch.setenv("DASHBOARD_DB_PATH", str(dashboard_db))
+    conn = sqlite3.connect(str(dashboard_db))
+    conn.execute("INSERT INTO circles (name) VALUES ('Family')")
+    conn.commit()
+    conn.close()
+    short_id = memory_store.memory_add("Prefers window seats", weight=6, memory_type="short")
+    a = memory_store.memory_add("Car is a blue Subaru", weight=5)
+    b = memory_store.memory_add("Drives a blue Subaru Outback", weight=7)
+    memory_store.memory_add("Old gym membership at YMCA", weight=3)
+    for n in range(190):
+        create_proposal(woody_db, "add", {"fact": f"Fact number {n}", "weight": 5})
+    create_proposal(woody_db, "promote", {"memory_id": short_id, "action": "short_to_long"})
+    create_proposal(woody_db, "promote", {"memory_id": short_id, "action": "bump_weight"})
+    create_proposal(woody_db, "consolidate", {"source_ids": [a, b], "merged_text": "Drives a blue Subaru Outback", "weight": 7})
+    create_proposal(woody_db, "remove", {"query": "gym membership YMCA"})
+    create_proposal(woody_db, "circle_add", {"circle_id": 1, "circle_name": "Family", "entity_type": "contact", "entity_id": "4"})
+    create_proposal(woody_db, "promote", {"memory_id": short_id, "action": "sideways"})
+
+    start = time.perf_counter()
+    results = resolve_proposals(woody_db, "approved")
+    assert time.perf_counter() - start < 1.0
+    assert len(results) == 196 and list_pending_proposals(woody_db) == []
+    assert [r["message"] for r in results if not r["ok"]] == ["Unknown promote action"]
+
+    texts = {m["text"]: m["metadata"] for m in memory_store.memory_list(limit=500)}
+    assert len(texts) == 190 + 2  # facts + the promoted memory + the merged one; sources and YMCA gone
+    assert texts["Prefers window seats"]["type"] == "long" and texts["Prefers window seats"]["weight"] == 7
+    conn = sqlite3.connect(str(woody_db))
+    assert conn.execute("SELECT COUNT(*) FROM memory_agent_audit").fetchone()[0] == 195
+    conn.close()
+    conn = sqlite3.connect(str(dashboard_db))
+    assert conn.execute("SELECT entity_id FROM circle_members").fetchall() == [("4",)]
+    conn.close()
+    assert resolve_proposals(woody_db, "approved") == []
+
+
+def test_bulk_reject_logs_event_rejections(woody_db):
+    import sqlite3
+    from shared.memory_agent import create_proposal, get_proposal, resolve_proposals
+    keep = create_proposal(woody_db, "add", {"fact": "keep me"})
+    pid = create_proposal(woody_db, "event_suggestion", {"title": "Dentist", "date": "2026-10-20", "description": "From: a"})
+    results = resolve_proposals(woody_db, "rejected", [pid, "missing"])
+    assert results == [{"id": pid, "ok": True, "message": "Rejected."}]
+    assert get_proposal(woody_db, pid)["status"] == "rejected"
+    assert get_proposal(woody_db, keep)["status"] == "pending"
+    conn = sqlite3.connect(str(woody_db))
+    assert conn.execute("SELECT action, title FROM user_actions").fetchall() == [("event_rejected", "Dentist")]
+    conn.close()
+
+
+def test_consolidation_keeps_sources_when_add_fails(woody_db, memory_store, monkeypatch):
+    import shared.memory
+    from shared.memory_agent import create_proposal, resolve_proposals
+    a = memory_store.memory_add("Car is a blue Subaru", weight=5)
+    b = memory_store.memory_add("Drives a blue Subaru Outback", weight=7)
+    pid = create_proposal(woody_db, "consolidate", {"source_ids": [a, b], "merged_text": "Drives a blue Subaru Outback"})
+
+    def fail(items):
+        raise RuntimeError("store unavailable")
+
+    monkeypatch.setattr(shared.memory, "memory_add_many", fail)
+    assert resolve_proposals(woody_db, "approved") == [{"id": pid, "ok": False, "message": "store unavailable"}]
+    assert {m["id"] for m in memory_store.memory_list(limit=10)} == {a, b}
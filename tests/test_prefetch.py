@@ -0,0 +1,143 @@
+"""Tests for speculative tool prefetch."""
+
+import re
+import sys
+from pathlib import Path
+
+import pytest
+
+_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(_root))
+sys.path.insert(0, str(_root / "woody"))
+
+
+@pytest.fixture
+def fake_tools(monkeypatch):
+    """Register a GREEN read tool and a YELLOW write tool, with rules pointing at both."""
+    from app.tools import registry
+    from app import prefetch
+    calls = []
+
+    def _read(query: str = "in:inbox") -> str:
+        calls.append(("read", query))
+        return f"read:{query}"
+
+    def _write(chat_id: int) -> str:
+        calls.append(("write", chat_id))
+        return "wrote"
+
+    monkeypatch.setitem(registry._registry, "fake_read", registry.ToolDef(
+        name="fake_read", description="", handler=_read, tier=registry.PermissionTier.GREEN,
+        parameters={"properties": {"query": {"type": "string", "default": "in:inbox"}}, "required": []},
+    ))
+    monkeypatch.setitem(registry._registry, "fake_write", registry.ToolDef(
+        name="fake_write", description="", handler=_write, tier=registry.PermissionTier.YELLOW,
+        parameters={"properties": {}, "required": []},
+    ))
+    monkeypatch.setattr(prefetch, "_RULES", [
+        (re.compile(r"\binbox\b", re.I), "fake_read", False),
+        (re.compile(r"\bwrite\b", re.I), "fake_write", True),
+    ])
+    monkeypatch.setenv("WOODY_PREFETCH", "1")
+    prefetch.reset_prefetch_stats()
+    return calls
+
+
+def test_classify_default_rules():
+    from app.prefetch import classify
+    assert classify("What's on today?") == ["calendar_today"]
+    assert "communications_read" in classify("anything from the school?")
+    assert classify("tell me a joke") == []
+
+
+def test_disabled_by_default(monkeypatch):
+    monkeypatch.delenv("WOODY_PREFETCH", raising=False)
+    from app.prefetch import start_prefetch
+    assert start_prefetch("check my inbox", 1) is None
+
+
+def test_prefetch_hit_with_default_args(fake_tools):
+    from app.prefetch import get_prefetch_stats, start_prefetch
+    p = start_prefetch("check my inbox", 1)
+    hit, result = p.take("fake_read", {"query": "in:inbox"})
+    p.finish()
+    assert hit is True
+    assert result == "read:in:inbox"
+    stats = get_prefetch_stats()
+    assert stats["hits"] == 1
+    assert stats["hit_rate"] == 1.0
+
+
+def test_prefetch_miss_on_different_args(fake_tools):
+    from app.prefetch import get_prefetch_stats, start_prefetch
+    p = start_prefetch("check my inbox", 1)
+    hit, _ = p.take("fake_read", {"query": "from:school"})
+    p.finish()
+    assert hit is False
+    assert get_prefetch_stats()["wasted"] == 1
+
+
+def test_prefetch_never_runs_write_tools(fake_tools):
+    from app.prefetch import start_prefetch
+    p = start_prefetch("please write this down", 1)
+    p.finish()
+    assert p.launched == 0
+    assert ("write", 1) not in fake_tools
+
+
+@pytest.fixture
+def agent_env(fake_tools, monkeypatch, tmp_path):
+    """Isolated DBs/memory plus the fake OpenAI server; yields (server, woody db path)."""
+    sys.path.insert(0, str(_root / "scripts"))
+    from bench_agent import isolated_env
+    from shared.llm_gateway import reset_gateway
+    from tests.fake_openai import FakeOpenAIServer
+    with FakeOpenAIServer() as server, isolated_env(tmp_path) as paths:
+        monkeypatch.setenv("OPENAI_BASE_URL", server.base_url)
+        monkeypatch.setenv("WOODY_PREFETCH", "1")
+        reset_gateway()
+        yield server, paths["woody_db"]
+    reset_gateway()
+
+
+def test_run_agent_write_drops_prefetched_read(agent_env, monkeypatch):
+    """fake_write then fake_read in one batch: the read must see the write, not the prefetch."""
+    from app.agent import run_agent
+    from app.prefetch import get_prefetch_stats
+    from app.tools import registry
+    server, db = agent_env
+    items = []
+
+    def _read(query: str = "in:inbox") -> str:
+        return f"items={len(items)}"
+
+    def _write(text: str = "") -> str:
+        items.append(text)
+        return "added"
+
+    monkeypatch.setattr(registry._registry["fake_read"], "handler", _read)
+    monkeypatch.setattr(registry._registry["fake_write"], "handler", _write)
+    server.extend([
+        {"tool_calls": [{"name": "fake_write", "arguments": {"text": "milk"}}, {"name": "fake_read", "arguments": {}}]},
+        {"content": "Done."},
+    ])
+    assert run_agent("add milk and check my inbox", "sk-test", db, 1) == "Done."
+    tool_results = [m["content"] for m in server.requests[1]["messages"] if m["role"] == "tool"]
+    assert tool_results == ["added", "items=1"]
+    stats = get_prefetch_stats()
+    assert stats["launched"] == 1 and stats["hits"] == 0 and stats["wasted"] == 1 and stats["turns"] == 1
+
+
+def test_run_agent_finishes_prefetch_on_llm_error(agent_env, monkeypatch):
+    import app.agent
+    from app.prefetch import get_prefetch_stats
+    _, db = agent_env
+
+    def _boom(*args, **kwargs):
+        raise RuntimeError("bad request")
+
+    monkeypatch.setattr(app.agent, "chat_completion", _boom)
+    with pytest.raises(RuntimeError):
+        app.agent.run_agent("check my inbox", "sk-test", db, 1)
+    stats = get_prefetch_stats()
+    assert stats["turns"] == 1 and stats["wasted"] == 1
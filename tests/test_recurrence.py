@@ -0,0 +1,61 @@
+"""Tests for the RRULE-subset recurrence engine."""
+
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(_root))
+
+
+def _up(rule, start, after, n=4):
+    from shared.recurrence import parse_rule, upcoming
+    return [d.strftime("%Y-%m-%d") for d in upcoming(parse_rule(rule), start, after, n)]
+
+
+def test_shorthands_and_weekly_days():
+    start = datetime(2026, 10, 16, 8, 0)  # Friday
+    assert _up("weekdays", start, start, 3) == ["2026-10-19", "2026-10-20", "2026-10-21"]
+    assert _up("FREQ=WEEKLY;BYDAY=MO,TH", start, datetime(2026, 10, 1), 3) == ["2026-10-19", "2026-10-22", "2026-10-26"]
+    assert _up("biweekly", start, start, 2) == ["2026-10-30", "2026-11-13"]
+
+
+def test_monthly_skips_missing_days_and_last_day():
+    start = datetime(2024, 1, 31, 9, 0)
+    assert _up("monthly", start, datetime(2024, 1, 1)) == ["2024-01-31", "2024-03-31", "2024-05-31", "2024-07-31"]
+    assert _up("FREQ=MONTHLY;BYMONTHDAY=-1", start, datetime(2024, 1, 1), 3) == ["2024-01-31", "2024-02-29", "2024-03-31"]
+
+
+def test_ordinal_weekdays():
+    assert _up("FREQ=MONTHLY;BYDAY=-1FR", datetime(2024, 1, 1, 9), datetime(2024, 1, 1), 3) == ["2024-01-26", "2024-02-23", "2024-03-29"]
+    assert _up("FREQ=YEARLY;BYMONTH=11;BYDAY=4TH", datetime(2024, 1, 1), datetime(2024, 1, 1), 2) == ["2024-11-28", "2025-11-27"]
+
+
+def test_count_until_and_leap_day():
+    start = datetime(2026, 10, 14, 8, 0)
+    assert _up("FREQ=WEEKLY;COUNT=3;BYDAY=MO", start, datetime(2000, 1, 1), 5) == ["2026-10-19", "2026-10-26", "2026-11-02"]
+    assert _up("FREQ=DAILY;UNTIL=20261016", start, datetime(2000, 1, 1), 5) == ["2026-10-14", "2026-10-15"]
+    assert _up("yearly", datetime(2024, 2, 29, 8), datetime(2024, 3, 1), 2) == ["2028-02-29", "2032-02-29"]
+
+
+def test_next_occurrence_skips_ahead_and_keeps_time():
+    from shared.recurrence import next_occurrence, parse_rule
+    rule = parse_rule("FREQ=DAILY;INTERVAL=3")
+    assert next_occurrence(rule, datetime(2020, 1, 1, 7, 30), datetime(2026, 10, 18, 12)) == datetime(2026, 10, 20, 7, 30)
+
+
+def test_format_round_trip():
+    from shared.recurrence import format_rule, parse_rule
+    text = "FREQ=MONTHLY;INTERVAL=2;COUNT=6;BYDAY=1SA;BYMONTH=1,3,5"
+    assert format_rule(parse_rule("RRULE:" + text)) == text
+    assert format_rule(parse_rule("quarterly")) == "FREQ=MONTHLY;INTERVAL=3"
+
+
+@pytest.mark.parametrize("bad", ["", "FREQ=HOURLY", "FREQ=DAILY;BYHOUR=9", "FREQ=WEEKLY;BYDAY=1MO",
+                                 "FREQ=MONTHLY;BYMONTHDAY=32", "FREQ=DAILY;INTERVAL=0", "FREQ=YEARLY;BYDAY=MO"])
+def test_invalid_rules_rejected(bad):
+    from shared.recurrence import parse_rule
+    with pytest.raises(ValueError):
+        parse_rule(bad)
@@ -0,0 +1,255 @@
+"""Tests for the heap-based reminder scheduler."""
+
+import sqlite3
+import sys
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+
+_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(_root))
+sys.path.insert(0, str(_root / "woody"))
+
+
+@pytest.fixture
+def woody_db(tmp_path):
+    db = tmp_path / "woody.db"
+    from woody.app.db import init_db
+    init_db(db)
+    return db
+
+
+def _at(seconds_from_now):
+    dt = datetime.now(timezone.utc) + timedelta(seconds=seconds_from_now)
+    return dt.strftime("%Y-%m-%dT%H:%M:%S.%f")
+
+
+def _insert(db, text, remind_at, chat_id=1):
+    conn = sqlite3.connect(str(db))
+    cur = conn.execute("INSERT INTO reminders (chat_id, text, remind_at) VALUES (?, ?, ?)", (chat_id, text, remind_at))
+    conn.commit()
+    conn.close()
+    return cur.lastrowid
+
+
+def _status(db, rid):
+    conn = sqlite3.connect(str(db))
+    row = conn.execute("SELECT status FROM reminders WHERE id = ?", (rid,)).fetchone()
+    conn.close()
+    return row[0]
+
+
+class Recorder:
+    def __init__(self, ok=True):
+        self.sent = []
+        self.ok = ok
+        self.event = threading.Event()
+
+    def __call__(self, chat_id, text):
+        self.sent.append((chat_id, text, time.time()))
+        self.event.set()
+        return self.ok
+
+
+@pytest.fixture
+def scheduler(woody_db):
+    from app.reminder_scheduler import ReminderScheduler
+    rec = Recorder()
+    s = ReminderScheduler(woody_db, rec, reconcile_seconds=30)
+    yield s, rec
+    s.stop()
+
+
+def test_fires_precisely_at_due_time(woody_db, scheduler):
+    from app.reminder_scheduler import due_timestamp
+    s, rec = scheduler
+    remind_at = _at(0.4)
+    rid = _insert(woody_db, "call the dentist", remind_at)
+    s.start()
+    assert rec.event.wait(3)
+    late = rec.sent[0][2] - due_timestamp(remind_at)
+    assert 0 <= late < 0.3
+    assert rec.sent[0][1] == "⏰ Reminder: call the dentist"
+    time.sleep(0.05)
+    assert _status(woody_db, rid) == "sent"
+
+
+def test_notified_create_and_cancel(woody_db, scheduler):
+    s, rec = scheduler
+    s.start()
+    keep = _insert(woody_db, "water plants", _at(0.3))
+    drop = _insert(woody_db, "cancelled one", _at(0.2))
+    s.add(keep, 1, "water plants", _at(0.3))
+    s.add(drop, 1, "cancelled one", _at(0.2))
+    s.remove(drop)
+    assert rec.event.wait(3)
+    time.sleep(0.3)
+    assert [t for _, t, _ in rec.sent] == ["⏰ Reminder: water plants"]
+
+
+def test_reconcile_picks_up_external_rows(woody_db):
+    from app.reminder_scheduler import ReminderScheduler
+    rec = Recorder()
+    s = ReminderScheduler(woody_db, rec, reconcile_seconds=0.2)
+    s.start()
+    try:
+        _insert(woody_db, "added by another process", _at(0))
+        assert rec.event.wait(3)
+    finally:
+        s.stop()
+
+
+def test_watch_picks_up_rows_from_other_processes(woody_db):
+    from app.reminder_scheduler import ReminderScheduler, due_timestamp
+    rec = Recorder()
+    s = ReminderScheduler(woody_db, rec, reconcile_seconds=300, watch_seconds=0.2)
+    s.start()
+    try:
+        time.sleep(0.3)
+        remind_at = _at(1)
+        _insert(woody_db, "set from dashboard chat", remind_at)  # no notify: another process
+        assert rec.event.wait(3)
+        assert rec.sent[0][2] - due_timestamp(remind_at) < 0.3
+        assert s.stats()["watch_hits"] >= 1
+    finally:
+        s.stop()
+
+
+def test_failed_send_retried(woody_db, monkeypatch):
+    from app import reminder_scheduler
+    monkeypatch.setattr(reminder_scheduler, "SEND_RETRY_SECONDS", 0.2)
+    rec = Recorder(ok=False)
+    s = reminder_scheduler.ReminderScheduler(woody_db, rec, reconcile_seconds=30)
+    rid = _insert(woody_db, "retry me", _at(0))
+    s.start()
+    try:
+        deadline = time.monotonic() + 3
+        while len(rec.sent) < 2 and time.monotonic() < deadline:
+            time.sleep(0.02)
+        assert len(rec.sent) >= 2
+        assert _status(woody_db, rid) == "pending"
+        rec.ok = True
+        deadline = time.monotonic() + 3
+        while _status(woody_db, rid) != "sent" and time.monotonic() < deadline:
+            time.sleep(0.02)
+        assert _status(woody_db, rid) == "sent"
+    finally:
+        s.stop()
+
+
+def test_idle_scheduler_does_not_poll(woody_db, scheduler):
+    s, rec = scheduler
+    _insert(woody_db, "next week", _at(7 * 86400))
+    s.start()
+    time.sleep(0.5)
+    stats = s.stats()
+    assert stats["wakeups"] == 0
+    assert stats["scheduled"] == 1
+    assert stats["next_due_in_s"] > 86400
+
+
+def test_morning_batch_of_500_against_fake_bot_api(woody_db, monkeypatch):
+    from app.reminder_loop import _send_reminder
+    from app.reminder_scheduler import ReminderScheduler
+    from app.telegram_client import reset_clients
+    from tests.fake_telegram import FakeTelegramServer
+    monkeypatch.setenv("TELEGRAM_GLOBAL_RATE", "5000")
+    monkeypatch.setenv("TELEGRAM_CHAT_RATE", "1000")
+    monkeypatch.setenv("REMINDER_SEND_CONCURRENCY", "16")
+    due = _at(0)
+    conn = sqlite3.connect(str(woody_db))
+    conn.executemany(
+        "INSERT INTO reminders (chat_id, text, remind_at) VALUES (?, ?, ?)",
+        [(100 + i % 50, f"task {i}", due) for i in range(500)],
+    )
+    conn.commit()
+    conn.close()
+    with FakeTelegramServer() as tg:
+        monkeypatch.setenv("TELEGRAM_API_BASE", tg.base_url)
+        reset_clients()
+        s = ReminderScheduler(woody_db, lambda chat_id, text: _send_reminder("TOKEN", chat_id, text),
+                              reconcile_seconds=30)
+        s.start()
+        try:
+            deadline = time.monotonic() + 20
+            while s.stats()["sent"] < 500 and time.monotonic() < deadline:
+                time.sleep(0.05)
+        finally:
+            s.stop()
+            reset_clients()
+        texts = tg.sent()
+    assert len(texts) == 500
+    assert len(set(texts)) == 500  # nothing sent twice
+    stats = s.stats()
+    assert stats["sent"] == 500 and stats["failed"] == 0
+    assert stats["batches"] <= 2
+    conn = sqlite3.connect(str(woody_db))
+    assert conn.execute("SELECT status, COUNT(*) FROM reminders GROUP BY status").fetchall() == [("sent", 500)]
+    conn.close()
+
+
+def test_rows_claimed_elsewhere_are_skipped(woody_db):
+    from app.reminder_scheduler import ReminderScheduler
+    rec = Recorder()
+    s = ReminderScheduler(woody_db, rec, reconcile_seconds=30)
+    mine = _insert(woody_db, "mine", _at(0))
+    theirs = _insert(woody_db, "theirs", _at(0))
+    conn = sqlite3.connect(str(woody_db))
+    conn.execute("UPDATE reminders SET status = 'sending' WHERE id = ?", (theirs,))
+    conn.commit()
+    conn.close()
+    s.deliver([(mine, 1, "mine"), (theirs, 1, "theirs")])
+    assert [t for _, t, _ in rec.sent] == ["⏰ Reminder: mine"]
+    assert s.stats()["skipped"] == 1
+    assert _status(woody_db, theirs) == "sending"
+
+
+def test_crash_mid_send_requeued_on_start(woody_db, scheduler):
+    s, rec = scheduler
+    rid = _insert(woody_db, "interrupted", _at(-60))
+    conn = sqlite3.connect(str(woody_db))
+    conn.execute("UPDATE reminders SET status = 'sending', claimed_at = datetime('now') WHERE id = ?", (rid,))
+    conn.commit()
+    conn.close()
+    s.start()
+    assert rec.event.wait(3)
+    time.sleep(0.05)
+    assert _status(woody_db, rid) == "sent"
+
+
+def test_recurring_reminder_advances_after_send(woody_db, scheduler):
+    s, rec = scheduler
+    remind_at = _at(0.2)
+    conn = sqlite3.connect(str(woody_db))
+    rid = conn.execute(
+        "INSERT INTO reminders (chat_id, text, remind_at, rrule, next_fire_at) VALUES (1, 'take vitamins', ?, 'FREQ=DAILY', ?)",
+        (remind_at, remind_at),
+    ).lastrowid
+    conn.commit()
+    conn.close()
+    s.start()
+    assert rec.event.wait(3)
+    time.sleep(0.1)
+    conn = sqlite3.connect(str(woody_db))
+    status, next_fire_at = conn.execute("SELECT status, next_fire_at FROM reminders WHERE id = ?", (rid,)).fetchone()
+    conn.close()
+    assert status == "pending"
+    assert next_fire_at[:10] == (datetime.fromisoformat(remind_at) + timedelta(days=1)).strftime("%Y-%m-%d")
+    assert s.stats()["scheduled"] == 1
+    assert len(rec.sent) == 1
+
+
+def test_reminder_create_with_repeat(woody_db, monkeypatch):
+    from app.tools import reminders
+    monkeypatch.setattr(reminders, "get_db_path", lambda: woody_db)
+    start = (datetime.now(timezone.utc) + timedelta(days=2)).strftime("%Y-%m-%dT09:00:00")
+    out = reminders._reminder_create_handler("bins out", start, chat_id=3, repeat="weekly")
+    assert "repeats FREQ=WEEKLY" in out
+    assert "repeats FREQ=WEEKLY" in reminders._reminder_list_handler(chat_id=3)
+    assert "Could not use repeat" in reminders._reminder_create_handler("x", start, chat_id=3, repeat="FREQ=HOURLY")
+    conn = sqlite3.connect(str(woody_db))
+    assert conn.execute("SELECT rrule, next_fire_at FROM reminders WHERE chat_id = 3").fetchall() == [("FREQ=WEEKLY", start)]
+    conn.close()
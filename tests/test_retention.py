@@ -0,0 +1,107 @@
+"""Tests for retention/archival of Woody's history tables."""
+
+import sqlite3
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pytest
+
+_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(_root))
+sys.path.insert(0, str(_root / "woody"))
+
+NOW = datetime(2026, 10, 18, 12, 0, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def woody_db(tmp_path):
+    db = tmp_path / "woody.db"
+    from woody.app.db import init_db
+    init_db(db)
+    return db
+
+
+def _exec(db, sql, rows):
+    conn = sqlite3.connect(str(db))
+    conn.executemany(sql, rows)
+    conn.commit()
+    conn.close()
+
+
+def _count(db, table):
+    conn = sqlite3.connect(str(db))
+    n = conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+    conn.close()
+    return n
+
+
+def test_old_resolved_rows_are_archived_pending_kept(woody_db):
+    from shared.retention import iter_archived, run_retention
+    _exec(woody_db, "INSERT INTO memory_agent_proposals (id, action_type, status, payload, created_at, resolved_at) VALUES (?, 'add', ?, '{}', ?, ?)", [
+        ("old-approved", "approved", "2025-01-01 00:00:00", "2025-01-02 00:00:00"),
+        ("old-pending", "pending", "2025-01-01 00:00:00", None),
+        ("recent", "rejected", "2026-10-01 00:00:00", "2026-10-02 00:00:00"),
+    ])
+    _exec(woody_db, "INSERT INTO approvals (id, chat_id, tool_name, tool_args, preview, status, created_at) VALUES (?, 1, 't', '{}', '', ?, ?)", [
+        ("a-old", "approved", "2026-01-01 00:00:00"),
+        ("a-pending", "pending", "2026-01-01 00:00:00"),
+    ])
+    _exec(woody_db, "INSERT INTO conversation_messages (chat_id, role, content, created_at) VALUES (1, 'user', ?, ?)", [
+        (f"msg {n}", "2025-06-01 00:00:00") for n in range(30)
+    ] + [("fresh", "2026-10-17 00:00:00")])
+
+    assert run_retention(woody_db, now=NOW) == {
+        "memory_agent_proposals": 1, "approvals": 1, "conversation_messages": 30,
+    }
+    conn = sqlite3.connect(str(woody_db))
+    assert {r[0] for r in conn.execute("SELECT id FROM memory_agent_proposals")} == {"old-pending", "recent"}
+    assert [r[0] for r in conn.execute("SELECT id FROM approvals")] == ["a-pending"]
+    assert [r[0] for r in conn.execute("SELECT content FROM conversation_messages")] == ["fresh"]
+    conn.close()
+    archived = list(iter_archived(woody_db, "memory_agent_proposals"))
+    assert archived[0]["id"] == "old-approved" and archived[0]["status"] == "approved"
+    assert [r["content"] for r in iter_archived(woody_db, "conversation_messages")] == [f"msg {n}" for n in range(30)]
+    assert run_retention(woody_db, now=NOW) == {}
+
+
+def test_batches_and_delete_only_policies(woody_db, monkeypatch):
+    from shared import retention
+    monkeypatch.setattr(retention, "BATCH_SIZE", 7)
+    _exec(woody_db, "INSERT INTO memory_agent_audit (proposal_id, action, created_at) VALUES (?, 'add', '2024-01-01 00:00:00')", [
+        (f"p{n}",) for n in range(20)
+    ])
+    _exec(woody_db, "INSERT INTO job_runs (job, trigger, status, started_at) VALUES ('sync', 'schedule', ?, ?)", [
+        ("ok", "2026-01-01T03:00:00"), ("running", "2026-01-01T03:00:00"), ("ok", "2026-10-18T03:00:00"),
+    ])
+    assert retention.run_retention(woody_db, now=NOW) == {"memory_agent_audit": 20, "job_runs": 1}
+    conn = sqlite3.connect(str(woody_db))
+    chunks = conn.execute("SELECT table_name, row_count FROM retention_archive ORDER BY id").fetchall()
+    conn.close()
+    assert chunks == [("memory_agent_audit", 7), ("memory_agent_audit", 7), ("memory_agent_audit", 6)]
+    assert _count(woody_db, "job_runs") == 2
+    assert len(list(retention.iter_archived(woody_db, "job_runs"))) == 0
+
+
+def test_env_override_and_disable(woody_db, monkeypatch):
+    from shared.retention import retention_stats, run_retention
+    _exec(woody_db, "INSERT INTO user_actions (action, created_at) VALUES ('todo_added', ?)", [
+        ("2026-09-01 00:00:00",), ("2026-10-15 00:00:00",),
+    ])
+    monkeypatch.setenv("RETENTION_DAYS_USER_ACTIONS", "0")
+    assert run_retention(woody_db, now=NOW) == {}
+    monkeypatch.setenv("RETENTION_DAYS_USER_ACTIONS", "30")
+    assert run_retention(woody_db, now=NOW) == {"user_actions": 1}
+    stats = {s["table"]: s for s in retention_stats(woody_db)}
+    assert stats["user_actions"] == {"table": "user_actions", "live_rows": 1, "archived_rows": 1, "keep_days": 30, "archive": True}
+
+
+def test_pending_queries_use_partial_indexes(woody_db):
+    conn = sqlite3.connect(str(woody_db))
+
+    def plan(sql):
+        return " ".join(r[-1] for r in conn.execute("EXPLAIN QUERY PLAN " + sql))
+
+    assert "idx_approvals_pending" in plan("SELECT id FROM approvals WHERE status = 'pending' ORDER BY created_at DESC")
+    assert "idx_memory_agent_pending" in plan("SELECT id FROM memory_agent_proposals WHERE status = 'pending' ORDER BY created_at")
+    conn.close()
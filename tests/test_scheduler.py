@@ -0,0 +1,177 @@
+"""Tests for the background job scheduler and run history."""
+
+import sys
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+
+_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(_root))
+sys.path.insert(0, str(_root / "woody"))
+
+UTC = timezone.utc
+
+
+@pytest.fixture
+def woody_db(tmp_path):
+    db = tmp_path / "woody.db"
+    from woody.app.db import init_db
+    init_db(db)
+    return db
+
+
+def _wait(cond, timeout=3.0):
+    deadline = time.monotonic() + timeout
+    while not cond() and time.monotonic() < deadline:
+        time.sleep(0.02)
+    return cond()
+
+
+def test_cron_next_after():
+    from app.scheduler import Cron
+    assert Cron("0 3 * * *").next_after(datetime(2026, 10, 18, 4, 0, tzinfo=UTC)) == datetime(2026, 10, 19, 3, 0, tzinfo=UTC)
+    # Saturday -> Monday 09:00
+    assert Cron("*/15 9-17 * * 1-5").next_after(datetime(2026, 10, 17, 12, 7, tzinfo=UTC)) == datetime(2026, 10, 19, 9, 0, tzinfo=UTC)
+    # Day-of-month OR day-of-week when both are restricted
+    assert Cron("0 8 1 * 0").next_after(datetime(2026, 10, 20, tzinfo=UTC)) == datetime(2026, 10, 25, 8, 0, tzinfo=UTC)
+    assert Cron("30 6 29 2 *").next_after(datetime(2026, 3, 1, tzinfo=UTC)) == datetime(2028, 2, 29, 6, 30, tzinfo=UTC)
+    with pytest.raises(ValueError):
+        Cron("61 * * * *")
+
+
+def test_plan_catch_up_and_windows():
+    from app.scheduler import Cron, Interval, Job
+    now = datetime(2026, 10, 18, 10, 0, tzinfo=UTC)
+    job = Job("sync", lambda: None, Interval(3600))
+    job.plan(now, None)
+    assert (job.next_run, job.next_reason) == (now, "catch_up")
+    job.plan(now, now - timedelta(minutes=20))
+    assert (job.next_run, job.next_reason) == (now + timedelta(minutes=40), "schedule")
+
+    nightly = Job("nightly", lambda: None, Cron("0 3 * * *"))
+    nightly.plan(now, now - timedelta(days=2))  # missed last night's 03:00
+    assert nightly.next_reason == "catch_up"
+    nightly.plan(now, None)  # never ran: wait for the schedule
+    assert nightly.next_run == datetime(2026, 10, 19, 3, 0, tzinfo=UTC)
+
+    digest = Job("digest", lambda: None, Cron("0 8 * * *"), catch_up=3600)
+    digest.plan(now, now - timedelta(days=1))  # 08:00 was two hours ago: too late
+    assert (digest.next_run, digest.next_reason) == (datetime(2026, 10, 19, 8, 0, tzinfo=UTC), "schedule")
+
+
+def test_runs_recorded_with_duration(woody_db):
+    from app.scheduler import Interval, JobScheduler
+    from shared import job_runs
+    calls = []
+
+    def boom():
+        raise RuntimeError("quota exceeded")
+
+    s = JobScheduler(woody_db, request_poll=30)
+    s.register("tick", lambda: calls.append(1) or {"n": len(calls)}, Interval(0.1))
+    s.register("broken", boom, Interval(3600))
+    s.start()
+    try:
+        assert _wait(lambda: len(calls) >= 3)
+        assert _wait(lambda: s.stats()["errors"] == 1)
+    finally:
+        s.stop()
+    runs = job_runs.list_runs(woody_db, job="tick")
+    assert len(runs) >= 3
+    assert {r["status"] for r in runs} == {"ok"}
+    assert runs[-1]["trigger"] == "catch_up" and runs[0]["trigger"] == "schedule"
+    assert all(r["duration_ms"] is not None for r in runs)
+    broken = job_runs.list_runs(woody_db, job="broken")
+    assert broken[0]["status"] == "error" and "quota exceeded" in broken[0]["error"]
+    jobs = {j["name"]: j for j in job_runs.list_jobs(woody_db)}
+    assert jobs["tick"]["schedule"] == "every 0.1s"
+    assert jobs["broken"]["recent_errors"] == 1
+
+
+def test_no_overlap(woody_db):
+    from app.scheduler import Interval, JobScheduler
+    from shared import job_runs
+    release = threading.Event()
+    active = []
+    overlaps = []
+
+    def slow():
+        if active:
+            overlaps.append(1)
+        active.append(1)
+        release.wait(5)
+        active.pop()
+
+    s = JobScheduler(woody_db, max_workers=4, request_poll=30)
+    s.register("slow", slow, Interval(0.05))
+    s.start()
+    try:
+        assert _wait(lambda: s.stats()["skipped"] >= 2)
+        release.set()
+    finally:
+        s.stop()
+    assert overlaps == []
+    statuses = [r["status"] for r in job_runs.list_runs(woody_db, job="slow")]
+    assert "skipped" in statuses
+
+
+def test_manual_run_requested_from_db(woody_db):
+    from app.scheduler import Cron, JobScheduler
+    from shared import job_runs
+    ran = threading.Event()
+    s = JobScheduler(woody_db, request_poll=0.1)
+    s.register("yearly", ran.set, Cron("0 0 1 1 *"), catch_up=False)
+    s.start()
+    try:
+        assert not ran.wait(0.3)
+        assert job_runs.request_run(woody_db, "yearly") is True
+        assert job_runs.request_run(woody_db, "nope") is False
+        assert ran.wait(3)
+    finally:
+        s.stop()
+    assert job_runs.list_runs(woody_db, job="yearly")[0]["trigger"] == "manual"
+
+
+def test_restart_closes_interrupted_runs(woody_db):
+    from app.scheduler import Interval, JobScheduler
+    from shared import job_runs
+    job_runs.start_run(woody_db, "sync", "schedule")  # process died mid-run
+    s = JobScheduler(woody_db, request_poll=30)
+    s.register("sync", lambda: None, Interval(3600))
+    s.start()
+    s.stop()
+    runs = job_runs.list_runs(woody_db, job="sync")
+    assert runs[-1]["status"] == "error" and "interrupted" in runs[-1]["error"]
+
+
+def test_dashboard_jobs_endpoints(woody_db, monkeypatch):
+    from fastapi.testclient import TestClient
+    import shared.db_path
+    from shared import job_runs
+    from dashboard.app.main import app
+    monkeypatch.setattr(shared.db_path, "get_woody_db_path", lambda: woody_db)
+    job_runs.sync_jobs(woody_db, [{"name": "contact_agent", "schedule": "every 24h", "next_run_at": None, "running": False}])
+    run_id = job_runs.start_run(woody_db, "contact_agent", "schedule")
+    job_runs.finish_run(woody_db, run_id, 1234, result={"added": 2})
+    client = TestClient(app)
+    jobs = client.get("/api/jobs").json()["jobs"]
+    assert jobs[0]["name"] == "contact_agent" and jobs[0]["avg_duration_ms"] == 1234
+    assert client.get("/api/jobs/runs", params={"job": "contact_agent"}).json()["runs"][0]["duration_ms"] == 1234
+    assert client.post("/api/jobs/contact_agent/run").json()["ok"] is True
+    assert client.post("/api/jobs/unknown/run").json()["ok"] is False
+    assert job_runs.pop_requests(woody_db) == ["contact_agent"]
+
+
+def test_zero_intervals_fall_back_to_defaults(woody_db, monkeypatch):
+    from app.jobs import build_scheduler
+    for var in ("EVENTS_AGENT_INTERVAL_MINUTES", "CONTACT_AGENT_INTERVAL_MINUTES",
+                "COMMUNICATIONS_AGENT_INTERVAL_MINUTES", "CALENDAR_SYNC_INTERVAL_MINUTES", "MEMORY_AGENT_INTERVAL_MINUTES"):
+        monkeypatch.setenv(var, "0")
+    scheduler = build_scheduler("token", woody_db)
+    seconds = {name: scheduler._jobs[name].trigger.seconds for name in
+               ("events_agent", "contact_agent", "communications_agent", "calendar_sync")}
+    assert seconds == {"events_agent": 360 * 60, "contact_agent": 1440 * 60,
+                       "communications_agent": 60 * 60, "calendar_sync": 60}
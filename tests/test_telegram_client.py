@@ -0,0 +1,104 @@
+"""Tests for the pooled Telegram client against a local fake Bot API."""
+
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(_root))
+sys.path.insert(0, str(_root / "woody"))
+
+from tests.fake_telegram import FakeTelegramServer
+
+
+@pytest.fixture
+def tg():
+    with FakeTelegramServer() as server:
+        yield server
+
+
+def _client(server, **kw):
+    from app.telegram_client import TelegramClient
+    opts = {"global_rate": 1000.0, "chat_rate": 1000.0, "max_retries": 3}
+    opts.update(kw)
+    return TelegramClient("TEST", base_url=server.base_url, **opts)
+
+
+def test_split_message_prefers_line_breaks():
+    from app.telegram_client import split_message
+    assert split_message("short") == ["short"]
+    text = ("line of text\n" * 600).strip()
+    chunks = split_message(text)
+    assert all(len(c) <= 4096 for c in chunks)
+    assert "\n".join(chunks) == text
+    assert all(not c.endswith("\n") for c in chunks)
+    assert [len(c) for c in split_message("x" * 9000)] == [4096, 4096, 808]
+
+
+def test_split_message_prefers_paragraph_breaks():
+    from app.telegram_client import split_message
+    first = "para one " * 60 + "\n\n" + "para two line\n" * 10
+    text = first + "more text " * 20
+    chunks = split_message(text, limit=len(first) + 50)
+    assert chunks[0] == ("para one " * 60).rstrip()  # paragraph break, not the later line break
+    assert chunks[1].startswith("para two line")
+
+
+def test_send_long_message_chunked(tg):
+    client = _client(tg)
+    text = "word " * 2000
+    assert client.send_message(1, text)
+    sent = tg.sent(1)
+    assert len(sent) == 3
+    assert all(len(t) <= 4096 for t in sent)
+    assert " ".join(sent).split() == text.split()
+
+
+def test_retry_after_honoured(tg):
+    client = _client(tg)
+    tg.fail("sendMessage", status=429, retry_after=0.2)
+    started = time.monotonic()
+    assert client.send_message(1, "hi")
+    assert time.monotonic() - started >= 0.2
+    assert tg.count("sendMessage") == 2
+    assert client.stats()["rate_limited"] == 1
+
+
+def test_retries_5xx_then_gives_up(tg, capsys):
+    client = _client(tg, max_retries=1)
+    tg.fail("sendMessage", status=502, times=5)
+    assert client.send_message(1, "hi") is False
+    assert tg.count("sendMessage") == 2
+    assert "sendMessage to 1 failed" in capsys.readouterr().out
+
+
+def test_no_retry_on_400(tg):
+    from app.telegram_client import TelegramError
+    client = _client(tg)
+    tg.fail("sendMessage", status=400)
+    with pytest.raises(TelegramError) as exc:
+        client.call("sendMessage", {"chat_id": 1, "text": "x"})
+    assert exc.value.status == 400
+    assert tg.count("sendMessage") == 1
+
+
+def test_per_chat_rate_limit(tg):
+    client = _client(tg, chat_rate=10.0)
+    started = time.monotonic()
+    for i in range(6):
+        client.send_message(1, f"m{i}")
+    # burst of 3, then 10/s -> the remaining 3 take ~0.3s
+    assert time.monotonic() - started >= 0.25
+    other = time.monotonic()
+    client.send_message(2, "other chat is not throttled")
+    assert time.monotonic() - other < 0.2
+
+
+def test_get_updates_over_pooled_connection(tg):
+    client = _client(tg)
+    tg.push_update(chat_id=5, text="hello")
+    updates = client.get_updates(0, timeout=1)
+    assert updates[0]["message"]["text"] == "hello"
+    assert client.get_updates(updates[0]["update_id"] + 1, timeout=0) == []
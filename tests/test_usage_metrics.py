@@ -0,0 +1,94 @@
+"""Tests for LLM usage metrics."""
+
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(_root))
+
+
+@pytest.fixture
+def woody_db(tmp_path):
+    db = tmp_path / "woody.db"
+    from woody.app.db import init_db
+    init_db(db)
+    return db
+
+
+def _usage(prompt, cached, completion):
+    return SimpleNamespace(
+        prompt_tokens=prompt,
+        completion_tokens=completion,
+        prompt_tokens_details=SimpleNamespace(cached_tokens=cached),
+    )
+
+
+def test_usage_tokens_handles_missing_details():
+    from shared.usage_metrics import usage_tokens
+    assert usage_tokens(None) == {"prompt_tokens": 0, "cached_tokens": 0, "completion_tokens": 0}
+    bare = SimpleNamespace(prompt_tokens=10, completion_tokens=2, prompt_tokens_details=None)
+    assert usage_tokens(bare)["cached_tokens"] == 0
+
+
+def test_prompt_cache_stats(woody_db):
+    from shared.usage_metrics import TurnMetrics, get_prompt_cache_stats
+    turn = TurnMetrics(1, "gpt-4o-mini")
+    turn.llm_call("initial", _usage(2000, 0, 50), 900.0)
+    turn.llm_call("follow_up", _usage(2000, 1536, 40), 500.0)
+    turn.save(woody_db)
+    stats = get_prompt_cache_stats(db_path=woody_db)
+    assert stats["calls"] == 2
+    assert stats["cache_hit_ratio"] == round(1536 / 4000, 3)
+    assert stats["avg_latency_ms_cached"] == 500.0
+    assert stats["avg_latency_ms_uncached"] == 900.0
+
+
+def test_openai_tools_sorted_by_name():
+    sys.path.insert(0, str(_root / "woody"))
+    from app.agent import _ensure_tools_loaded
+    from app.tools import get_openai_tools
+    _ensure_tools_loaded()
+    names = [t["function"]["name"] for t in get_openai_tools()]
+    assert names == sorted(names)
+
+
+def test_turn_metrics_saved_with_components(woody_db):
+    from shared.usage_metrics import TurnMetrics, get_usage_by_chat, get_usage_by_tool, get_usage_summary
+    turn = TurnMetrics(42, "gpt-4o-mini")
+    turn.prompt_sizes(system=4000, history=1200, memories=300, about=80, tool_schema=9000, context=150)
+    turn.llm_call("initial", _usage(3000, 0, 30), 800.0)
+    turn.tool_call("calendar_today", 120.0, result_chars=55)
+    turn.tool_call("todo_list", 0.0, prefetched=True)
+    turn.llm_call("follow_up", _usage(3100, 2048, 60), 400.0)
+    turn_id = turn.save(woody_db)
+    assert turn_id
+
+    summary = get_usage_summary(db_path=woody_db)
+    assert summary["turns"] == 1
+    assert summary["prompt_tokens"] == 6100
+    assert summary["cached_tokens"] == 2048
+    assert summary["avg_llm_ms"] == 1200.0
+    assert summary["avg_tool_ms"] == 120.0
+    assert summary["avg_prompt_chars"]["tool_schema"] == 9000
+    assert summary["avg_prompt_chars"]["context"] == 150
+
+    assert get_usage_by_chat(db_path=woody_db)[0]["chat_id"] == 42
+    tools = {t["tool"]: t for t in get_usage_by_tool(db_path=woody_db)}
+    assert tools["todo_list"]["prefetched"] == 1
+    assert tools["calendar_today"]["avg_result_chars"] == 55
+
+
+def test_turn_metrics_on_old_db(tmp_path):
+    import sqlite3
+    from shared.usage_metrics import TurnMetrics, get_usage_summary
+    db = tmp_path / "old.db"
+    sqlite3.connect(str(db)).close()  # created before the usage tables existed
+    turn = TurnMetrics(1, "gpt-4o-mini")
+    turn.prompt_sizes(context=90)
+    turn.llm_call("initial", _usage(100, 0, 5), 10.0)
+    assert turn.save(db)
+    summary = get_usage_summary(db_path=db)
+    assert summary["turns"] == 1 and summary["avg_prompt_chars"]["context"] == 90
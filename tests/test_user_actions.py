@@ -0,0 +1,94 @@
+"""Tests for user action logging and the precomputed preference stats."""
+
+import sqlite3
+import sys
+from pathlib import Path
+
+import pytest
+
+_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(_root))
+sys.path.insert(0, str(_root / "woody"))
+
+
+@pytest.fixture
+def woody_db(tmp_path):
+    db = tmp_path / "woody.db"
+    from woody.app.db import init_db
+    init_db(db)
+    return db
+
+
+def test_log_action_updates_counts_and_rejections(woody_db):
+    from shared.user_actions import get_action_counts, load_preferences, log_action, log_actions
+    log_action("calendar_added", title="Soccer practice", db_path=woody_db)
+    log_actions([
+        {"action": "calendar_added", "title": "Piano"},
+        {"action": "todo_added", "title": "Buy milk"},
+        {"action": "event_rejected", "title": "  Weekly SALE at the mall ", "source": "From: Shop@Example.com"},
+    ], db_path=woody_db)
+    assert get_action_counts(woody_db) == {"calendar_added": 2, "todo_added": 1, "event_rejected": 1}
+
+    prefs = load_preferences(woody_db)
+    assert prefs.suggested_action() == "calendar"
+    assert prefs.was_rejected("weekly sale at the mall", "From: shop@example.com")
+    assert prefs.was_rejected("Weekly sale")  # contained in the rejected title, no sender given
+    assert not prefs.was_rejected("weekly sale at the mall", "From: other@example.com")
+    assert not prefs.was_rejected("Dentist")
+
+
+def test_init_db_backfills_stats_from_existing_actions(tmp_path):
+    db = tmp_path / "woody.db"
+    conn = sqlite3.connect(str(db))
+    conn.execute(
+        """CREATE TABLE user_actions (id INTEGER PRIMARY KEY AUTOINCREMENT, action TEXT NOT NULL, event_id INTEGER,
+           proposal_id TEXT, title TEXT, event_date TEXT, source TEXT, created_at TEXT NOT NULL DEFAULT (datetime('now')))"""
+    )
+    conn.executemany("INSERT INTO user_actions (action, title, source) VALUES (?, ?, ?)", [
+        ("todo_added", "a", ""), ("todo_added", "b", ""), ("event_rejected", "Car wash", "From: X@y.com"),
+    ])
+    conn.commit()
+    conn.close()
+    from woody.app.db import init_db
+    from shared.user_actions import get_action_counts, was_rejected_recently
+    init_db(db)
+    init_db(db)  # second run must not double-count
+    assert get_action_counts(db) == {"todo_added": 2, "event_rejected": 1}
+    assert was_rejected_recently("car wash", "", "x@y.com", db_path=db)
+
+
+def test_init_db_backfills_after_dashboard_logged_first(tmp_path):
+    db = tmp_path / "woody.db"
+    conn = sqlite3.connect(str(db))
+    conn.execute(
+        """CREATE TABLE user_actions (id INTEGER PRIMARY KEY AUTOINCREMENT, action TEXT NOT NULL, event_id INTEGER,
+           proposal_id TEXT, title TEXT, event_date TEXT, source TEXT, created_at TEXT NOT NULL DEFAULT (datetime('now')))"""
+    )
+    conn.execute("INSERT INTO user_actions (action, title, source) VALUES ('todo_added', 'a', '')")
+    conn.commit()
+    conn.close()
+    from woody.app.db import init_db
+    from shared.user_actions import get_action_counts, log_action
+    log_action("todo_added", db_path=db)  # lazy ensure_tables path, before Woody's init_db
+    init_db(db)
+    init_db(db)
+    assert get_action_counts(db) == {"todo_added": 2}
+
+
+def test_email_suggestions_load_preferences_once(woody_db, tmp_path, monkeypatch):
+    monkeypatch.setenv("DASHBOARD_DB_PATH", str(tmp_path / "dashboard.db"))
+    from shared import events_agent, user_actions
+    monkeypatch.setattr(events_agent, "_event_exists_in_dashboard", lambda *a: False)
+    user_actions.log_action("todo_added", db_path=woody_db)
+    user_actions.log_action("event_rejected", title="Flash sale on Friday", source="From: shop@x.com", db_path=woody_db)
+    calls = []
+    real = user_actions.load_preferences
+    monkeypatch.setattr(user_actions, "load_preferences", lambda *a, **k: calls.append(1) or real(*a, **k))
+    msgs = [
+        {"subject": f"Meeting {n} on Tuesday", "snippet": "see you", "from": f"p{n}@x.com"} for n in range(4)
+    ] + [{"subject": "Flash sale on Friday", "snippet": "deals", "from": "shop@x.com"}]
+
+    assert events_agent.propose_events_from_emails(msgs, woody_db, max_proposals=10) == 4
+    assert calls == [1]
+    from shared.memory_agent import list_pending_proposals
+    assert {p["payload"]["suggested_action"] for p in list_pending_proposals(woody_db)} == {"todo"}
@@ -0,0 +1,89 @@
+"""Tests for Telegram webhook ingestion."""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(_root))
+sys.path.insert(0, str(_root / "woody"))
+
+from tests.fake_telegram import FakeTelegramServer
+
+SECRET = "s3cret-token"
+
+
+def _update(update_id, chat_id, text):
+    return {"update_id": update_id, "message": {"message_id": update_id, "chat": {"id": chat_id}, "text": text}}
+
+
+@pytest.fixture
+def webhook():
+    from fastapi.testclient import TestClient
+    from app.dispatcher import ChatDispatcher
+    from app.telegram_loop import parse_update
+    from app.webhook import create_webhook_app
+    handled = []
+    dispatcher = ChatDispatcher(lambda chat_id, text: handled.append((chat_id, text)), max_workers=2)
+
+    def submit(update):
+        parsed = parse_update(update)
+        if parsed:
+            dispatcher.submit(*parsed)
+
+    client = TestClient(create_webhook_app(submit, SECRET))
+    yield client, dispatcher, handled
+    dispatcher.shutdown(wait=True)
+
+
+def test_rejects_missing_or_wrong_secret(webhook):
+    client, dispatcher, handled = webhook
+    assert client.post("/telegram/webhook", json=_update(1, 5, "hi")).status_code == 401
+    r = client.post("/telegram/webhook", json=_update(1, 5, "hi"), headers={"X-Telegram-Bot-Api-Secret-Token": "nope"})
+    assert r.status_code == 401
+    dispatcher.shutdown(wait=True)
+    assert handled == []
+
+
+def test_accepts_and_dispatches_in_order(webhook):
+    client, dispatcher, handled = webhook
+    headers = {"X-Telegram-Bot-Api-Secret-Token": SECRET}
+    for i, text in enumerate(["add eggs", "and milk"]):
+        r = client.post("/telegram/webhook", json=_update(100 + i, 5, text), headers=headers)
+        assert r.status_code == 200 and r.json() == {"ok": True}
+    # Non-text updates (edits, stickers) are acknowledged but not processed
+    assert client.post("/telegram/webhook", json={"update_id": 102, "edited_message": {}}, headers=headers).status_code == 200
+    dispatcher.shutdown(wait=True)
+    assert handled == [(5, "add eggs"), (5, "and milk")]
+    assert client.get("/health").json()["received"] == 3
+
+
+def test_register_webhook_against_fake_bot_api():
+    from app.telegram_client import TelegramClient
+    from app.webhook import register_webhook
+    with FakeTelegramServer() as tg:
+        register_webhook(TelegramClient("TEST", base_url=tg.base_url), "https://woody.example.com/", SECRET)
+        method, payload, _ = tg.calls[-1]
+    assert method == "setWebhook"
+    assert payload["url"] == "https://woody.example.com/telegram/webhook"
+    assert payload["secret_token"] == SECRET
+
+
+def test_webhook_secret_is_shared_by_replicas(monkeypatch):
+    from app.webhook import webhook_secret
+    monkeypatch.delenv("TELEGRAM_WEBHOOK_SECRET", raising=False)
+    assert webhook_secret("123:ABC") == webhook_secret("123:ABC") != webhook_secret("456:DEF")
+    assert "123:ABC" not in webhook_secret("123:ABC")
+    monkeypatch.setenv("TELEGRAM_WEBHOOK_SECRET", "configured")
+    assert webhook_secret("123:ABC") == "configured"
+
+
+def test_only_leader_registers_webhook(tmp_path, monkeypatch):
+    import app.main as woody_main
+    calls = []
+    monkeypatch.setattr(woody_main, "start_reminder_loop", lambda *a: None)
+    monkeypatch.setattr(woody_main, "start_jobs", lambda *a: None)
+    monkeypatch.setattr(woody_main, "ensure_webhook", lambda token: calls.append(token))
+    woody_main._start_scheduled_work("TOKEN", tmp_path / "app.db", "sk-test", polling=False)
+    assert calls == ["TOKEN"]
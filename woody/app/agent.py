@@ -4,14 +4,18 @@ from __future__ import annotations
 
 import json
 import os
+import time
 from datetime import datetime
 from pathlib import Path
 from typing import Any
 
-from openai import OpenAI
-
 from app.conversation import add_message, get_messages
+from app.prefetch import start_prefetch
 from app.tools import execute_tool, get_openai_tools, is_write_tool
+from shared.llm_gateway import FALLBACK_REPLY, LLMUnavailable, chat_completion
+from shared.usage_metrics import TurnMetrics
+
+MODEL = "gpt-4o-mini"
 
 SYSTEM_PROMPT = """You are Woody, a personal AI assistant for the Wood family. You're snarky, a little sarcastic, and have a bit of an attitude—but you're funny about it, not mean. You actually care; you just show it with wit.
 
@@ -112,8 +116,24 @@ def run_agent(
     **kwargs: Any,
 ) -> str:
     """Process user message through OpenAI and return response. Write tools execute directly."""
+    turn = TurnMetrics(chat_id, MODEL)
+    try:
+        return _run_turn(user_message, openai_key, db_path, chat_id, turn)
+    except Exception:
+        turn.outcome = "error"
+        raise
+    finally:
+        turn.save(db_path)
+
+
+def _run_turn(
+    user_message: str,
+    openai_key: str,
+    db_path: Path,
+    chat_id: int,
+    turn: TurnMetrics,
+) -> str:
     _ensure_tools_loaded()
-    client = OpenAI(api_key=openai_key)
     tools = get_openai_tools()
 
     # Load conversation history (last 10 exchanges)
@@ -127,7 +147,7 @@ def run_agent(
         from datetime import timezone
         tz = timezone.utc
     now = datetime.now(tz)
-    date_context = f"\n**Today's date:** {now.strftime('%A, %B %d, %Y')} ({now.strftime('%Y-%m-%d')})"
+    date_context = f"**Today's date:** {now.strftime('%A, %B %d, %Y')} ({now.strftime('%Y-%m-%d')})"
     resolved_context, resolved_date_iso = _resolve_date_phrases(user_message, now)
     if resolved_context:
         date_context += "\n" + resolved_context
@@ -140,19 +160,52 @@ def run_agent(
     # Inject About Me (user-provided preferences) when present
     from shared.about_me import get_about_me
     about = get_about_me()
-    about_context = "\n**About the user:**\n" + about if about else ""
-    system = SYSTEM_PROMPT + date_context + mem_context + about_context
-    messages = [{"role": "system", "content": system}] + history + [{"role": "user", "content": user_message}]
-
-    response = client.chat.completions.create(
-        model="gpt-4o-mini",
-        messages=messages,
-        tools=tools if tools else None,
+    about_context = "\n\n**About the user:**\n" + about if about else ""
+    # Byte-stable prefix first (static prompt + About Me, which only changes when edited; tools
+    # are sorted), per-message context last, so provider-side prompt caching can reuse the prefix.
+    system = SYSTEM_PROMPT + about_context
+    context = date_context + mem_context
+    turn.prompt_sizes(
+        system=len(SYSTEM_PROMPT),
+        history=sum(len(m.get("content") or "") for m in history),
+        memories=len(mem_context),
+        about=len(about_context),
+        tool_schema=len(json.dumps(tools)) if tools else 0,
+        context=len(date_context),
     )
+    messages = (
+        [{"role": "system", "content": system}]
+        + history
+        + [{"role": "system", "content": context}, {"role": "user", "content": user_message}]
+    )
+
+    # Speculatively run likely read-only tools while the first completion is in flight
+    prefetcher = start_prefetch(user_message, chat_id)
+
+    started = time.perf_counter()
+    try:
+        response = chat_completion(
+            openai_key,
+            model=MODEL,
+            messages=messages,
+            tools=tools if tools else None,
+        )
+    except LLMUnavailable:
+        if prefetcher:
+            prefetcher.finish()
+        turn.outcome = "llm_unavailable"
+        return FALLBACK_REPLY
+    except Exception:
+        if prefetcher:
+            prefetcher.finish()
+        raise
+    turn.llm_call("initial", response.usage, (time.perf_counter() - started) * 1000)
 
     choice = response.choices[0]
     if not choice.message.tool_calls:
         reply = choice.message.content or ""
+        if prefetcher:
+            prefetcher.finish()
         add_message(db_path, chat_id, "user", user_message)
         add_message(db_path, chat_id, "assistant", reply)
         return reply
@@ -179,7 +232,17 @@ def run_agent(
         if name in ("reminder_create", "reminder_cancel", "todo_add", "todo_complete", "todo_remove", "wishlist_add", "wishlist_remove", "wishlist_list", "reminder_list", "todo_list"):
             args["chat_id"] = chat_id
 
-        result = execute_tool(name, args)
+        started = time.perf_counter()
+        hit, result = prefetcher.take(name, args) if prefetcher else (False, None)
+        if not hit:
+            try:
+                result = execute_tool(name, args)
+            except Exception:
+                turn.tool_call(name, (time.perf_counter() - started) * 1000, ok=False)
+                if prefetcher:
+                    prefetcher.finish()
+                raise
+        turn.tool_call(name, (time.perf_counter() - started) * 1000, prefetched=hit, result_chars=len(str(result)))
         results.append({
             "tool_call_id": tc.id,
             "role": "tool",
@@ -197,11 +260,26 @@ def run_agent(
     })
     for r in results:
         messages.append(r)
+    if prefetcher:
+        prefetcher.finish()
 
-    follow_up = client.chat.completions.create(
-        model="gpt-4o-mini",
-        messages=messages,
-    )
+    # Same tools as the first call (tool_choice=none) keeps the cached prefix identical
+    started = time.perf_counter()
+    try:
+        follow_up = chat_completion(
+            openai_key,
+            model=MODEL,
+            messages=messages,
+            **({"tools": tools, "tool_choice": "none"} if tools else {}),
+        )
+    except LLMUnavailable:
+        # Tools already ran (write tools included); say so rather than pretend nothing happened
+        reply = FALLBACK_REPLY + "\n\nTool results:\n" + "\n".join(r["content"][:300] for r in results)
+        turn.outcome = "llm_unavailable"
+        add_message(db_path, chat_id, "user", user_message)
+        add_message(db_path, chat_id, "assistant", reply)
+        return reply
+    turn.llm_call("follow_up", follow_up.usage, (time.perf_counter() - started) * 1000)
     reply = follow_up.choices[0].message.content or ""
     add_message(db_path, chat_id, "user", user_message)
     add_message(db_path, chat_id, "assistant", reply)
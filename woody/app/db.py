@@ -14,6 +14,32 @@ def init_db(db_path: Path) -> None:
     try:
         conn.executescript(_SCHEMA)
         conn.commit()
+        from shared import usage_metrics
+        usage_metrics.ensure_tables(conn)  # llm_usage / agent_turns / tool_usage
+        for col in ("claimed_at TEXT", "rrule TEXT", "next_fire_at TEXT"):
+            try:
+                conn.execute(f"ALTER TABLE reminders ADD COLUMN {col}")
+                conn.commit()
+            except sqlite3.OperationalError:
+                pass  # column already exists
+        conn.execute("UPDATE reminders SET next_fire_at = remind_at WHERE next_fire_at IS NULL AND status = 'pending'")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_reminders_due ON reminders(status, next_fire_at)")
+        conn.commit()
+        try:
+            conn.execute("ALTER TABLE memory_agent_proposals ADD COLUMN dedupe_key TEXT")
+            from shared.memory_agent import backfill_dedupe_keys
+            backfill_dedupe_keys(conn)
+            conn.commit()
+        except sqlite3.OperationalError:
+            pass  # column already exists
+        conn.execute(
+            """CREATE UNIQUE INDEX IF NOT EXISTS idx_memory_agent_dedupe_pending
+               ON memory_agent_proposals(dedupe_key) WHERE status = 'pending' AND dedupe_key IS NOT NULL"""
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_memory_agent_dedupe ON memory_agent_proposals(dedupe_key)")
+        # Superseded by the partial idx_memory_agent_pending / idx_memory_agent_resolved
+        conn.execute("DROP INDEX IF EXISTS idx_memory_agent_status")
+        conn.commit()
         # Migration: add original_message to approvals if missing
         try:
             conn.execute("ALTER TABLE approvals ADD COLUMN original_message TEXT DEFAULT ''")
@@ -34,24 +60,11 @@ def init_db(db_path: Path) -> None:
             conn.commit()
         except sqlite3.OperationalError:
             pass
-        try:
-            conn.execute(
-                """CREATE TABLE IF NOT EXISTS user_actions (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    action TEXT NOT NULL,
-                    event_id INTEGER,
-                    proposal_id TEXT,
-                    title TEXT,
-                    event_date TEXT,
-                    source TEXT,
-                    created_at TEXT NOT NULL DEFAULT (datetime('now'))
-                )"""
-            )
-            conn.execute("CREATE INDEX IF NOT EXISTS idx_user_actions_action ON user_actions(action)")
-            conn.execute("CREATE INDEX IF NOT EXISTS idx_user_actions_created ON user_actions(created_at)")
-            conn.commit()
-        except sqlite3.OperationalError:
-            pass
+        # user_actions and the preference stats kept current by shared.user_actions.log_action
+        from shared import user_actions
+        user_actions.ensure_tables(conn)
+        user_actions.backfill_stats(conn)
+        conn.commit()
     finally:
         conn.close()
 
@@ -103,6 +116,9 @@ CREATE TABLE IF NOT EXISTS reminders (
     text TEXT NOT NULL,
     remind_at TEXT NOT NULL,
     status TEXT NOT NULL DEFAULT 'pending',
+    claimed_at TEXT,
+    rrule TEXT,
+    next_fire_at TEXT,
     created_at TEXT NOT NULL DEFAULT (datetime('now'))
 );
 
@@ -132,6 +148,12 @@ CREATE TABLE IF NOT EXISTS memory_agent_proposals (
     resolved_at TEXT
 );
 
+CREATE TABLE IF NOT EXISTS memory_agent_watermarks (
+    step TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    updated_at TEXT NOT NULL DEFAULT (datetime('now'))
+);
+
 CREATE TABLE IF NOT EXISTS memory_agent_run (
     run_date TEXT PRIMARY KEY,
     created_at TEXT NOT NULL DEFAULT (datetime('now'))
@@ -145,14 +167,102 @@ CREATE TABLE IF NOT EXISTS memory_agent_audit (
     created_at TEXT NOT NULL DEFAULT (datetime('now'))
 );
 
+CREATE TABLE IF NOT EXISTS telegram_inbox (
+    update_id INTEGER PRIMARY KEY,
+    chat_id INTEGER NOT NULL,
+    text TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    received_at TEXT NOT NULL DEFAULT (datetime('now')),
+    started_at TEXT,
+    finished_at TEXT,
+    processing_by TEXT,
+    lease_expires_at REAL
+);
+
+CREATE TABLE IF NOT EXISTS telegram_state (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+
 CREATE INDEX IF NOT EXISTS idx_approvals_chat_status ON approvals(chat_id, status);
-CREATE INDEX IF NOT EXISTS idx_memory_agent_status ON memory_agent_proposals(status);
+CREATE TABLE IF NOT EXISTS scheduled_jobs (
+    name TEXT PRIMARY KEY,
+    schedule TEXT NOT NULL,
+    next_run_at TEXT,
+    running INTEGER NOT NULL DEFAULT 0,
+    run_requested_at TEXT,
+    updated_at TEXT NOT NULL DEFAULT (datetime('now'))
+);
+
+CREATE TABLE IF NOT EXISTS job_runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    job TEXT NOT NULL,
+    trigger TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'running',
+    started_at TEXT NOT NULL,
+    finished_at TEXT,
+    duration_ms INTEGER,
+    result TEXT,
+    error TEXT
+);
+
+CREATE TABLE IF NOT EXISTS job_queue (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL,
+    payload TEXT NOT NULL DEFAULT '{}',
+    priority INTEGER NOT NULL DEFAULT 0,
+    status TEXT NOT NULL DEFAULT 'queued',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL DEFAULT 3,
+    run_after REAL NOT NULL,
+    lease_owner TEXT,
+    lease_expires_at REAL,
+    result TEXT,
+    error TEXT,
+    enqueued_at TEXT NOT NULL DEFAULT (datetime('now')),
+    started_at TEXT,
+    finished_at TEXT
+);
+
+CREATE TABLE IF NOT EXISTS leader_lease (
+    name TEXT PRIMARY KEY,
+    holder TEXT NOT NULL,
+    expires_at REAL NOT NULL,
+    acquired_at TEXT NOT NULL,
+    renewed_at TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS retention_archive (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    table_name TEXT NOT NULL,
+    row_count INTEGER NOT NULL,
+    first_rowid INTEGER,
+    last_rowid INTEGER,
+    data BLOB NOT NULL,
+    archived_at TEXT NOT NULL DEFAULT (datetime('now'))
+);
+
 CREATE INDEX IF NOT EXISTS idx_reminders_chat_status ON reminders(chat_id, status);
 CREATE INDEX IF NOT EXISTS idx_reminders_remind_at ON reminders(remind_at);
 CREATE INDEX IF NOT EXISTS idx_todos_chat_status ON todos(chat_id, status);
 CREATE INDEX IF NOT EXISTS idx_wishlist_chat ON wishlist(chat_id);
 CREATE INDEX IF NOT EXISTS idx_home_ops_items_list ON home_ops_items(list_id);
 CREATE INDEX IF NOT EXISTS idx_conv_chat ON conversation_messages(chat_id);
+CREATE INDEX IF NOT EXISTS idx_telegram_inbox_status ON telegram_inbox(status, update_id);
+CREATE INDEX IF NOT EXISTS idx_job_runs_job ON job_runs(job, started_at);
+CREATE INDEX IF NOT EXISTS idx_job_queue_runnable ON job_queue(status, priority, id);
+CREATE INDEX IF NOT EXISTS idx_retention_archive_table ON retention_archive(table_name, id);
+-- Live subsets (pending rows) and the retention scans over resolved history
+CREATE INDEX IF NOT EXISTS idx_approvals_pending ON approvals(created_at) WHERE status = 'pending';
+CREATE INDEX IF NOT EXISTS idx_approvals_resolved ON approvals(created_at) WHERE status != 'pending';
+CREATE INDEX IF NOT EXISTS idx_memory_agent_pending ON memory_agent_proposals(created_at) WHERE status = 'pending';
+CREATE INDEX IF NOT EXISTS idx_memory_agent_resolved ON memory_agent_proposals(resolved_at) WHERE status != 'pending';
+CREATE INDEX IF NOT EXISTS idx_memory_agent_audit_created ON memory_agent_audit(created_at);
+CREATE INDEX IF NOT EXISTS idx_conv_chat_id ON conversation_messages(chat_id, id);
+CREATE INDEX IF NOT EXISTS idx_conv_created ON conversation_messages(created_at);
+CREATE INDEX IF NOT EXISTS idx_job_queue_finished ON job_queue(finished_at) WHERE status IN ('done', 'failed');
 """
 
 
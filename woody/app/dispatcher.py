@@ -0,0 +1,193 @@
+"""
+Per-chat ordered dispatch of inbound Telegram messages.
+
+Messages from the same chat run strictly in arrival order, one at a time; different chats
+run concurrently on a bounded worker pool. So one family member's slow multi-tool turn no
+longer blocks everyone else, or the next getUpdates poll.
+
+Optionally, messages are debounced per chat: a chat's turn starts only after `debounce`
+seconds without a new message (capped at DEBOUNCE_MAX_WAIT_FACTOR x debounce), and everything
+queued by then is merged into a single handler call. Messages that arrive while a turn is
+running are merged into the next one.
+
+Config (env):
+  WOODY_WORKERS – max chats processed concurrently (default 4)
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from shared.llm_gateway import LatencyHistogram
+
+DEBOUNCE_MAX_WAIT_FACTOR = 3
+
+
+def _workers() -> int:
+    try:
+        return max(1, int(os.environ.get("WOODY_WORKERS", "4")))
+    except ValueError:
+        return 4
+
+
+class ChatDispatcher:
+    """
+    submit(chat_id, *args) queues handler(chat_id, *args). Each chat has its own FIFO; a chat
+    occupies at most one worker, which drains that chat's queue before releasing the slot.
+
+    With merge set, each handler call gets merge([args, ...]) for every message queued for the
+    chat at that point instead of one message's args. on_batch_start(chat_id) is called when
+    a message arrives for an idle chat (e.g. to show "typing..." during the debounce window).
+    """
+
+    def __init__(
+        self,
+        handler: Callable[..., Any],
+        max_workers: Optional[int] = None,
+        debounce: float = 0.0,
+        merge: Optional[Callable[[List[tuple]], tuple]] = None,
+        on_batch_start: Optional[Callable[[Any], None]] = None,
+    ) -> None:
+        self.handler = handler
+        self.max_workers = max_workers or _workers()
+        self.debounce = debounce
+        self.merge = merge
+        self.on_batch_start = on_batch_start
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="chat")
+        self._queues: Dict[Any, Deque[Tuple[float, tuple]]] = {}
+        self._active: set = set()
+        self._timers: Dict[Any, threading.Timer] = {}
+        self._lock = threading.Lock()
+        self._closed = False
+        self._queued = 0
+        self._max_queued = 0
+        self._counters = {"submitted": 0, "processed": 0, "errors": 0, "coalesced": 0}
+        self.wait_ms = LatencyHistogram()
+        self.run_ms = LatencyHistogram()
+
+    def submit(self, chat_id: Any, *args: Any) -> None:
+        now = time.monotonic()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("dispatcher is shut down")
+            queue = self._queues.setdefault(chat_id, deque())
+            queue.append((now, args))
+            self._queued += 1
+            self._max_queued = max(self._max_queued, self._queued)
+            self._counters["submitted"] += 1
+            if chat_id in self._active:
+                return  # the chat's worker picks it up after the current message
+            first = chat_id not in self._timers
+            old = self._timers.pop(chat_id, None)
+            if old is not None:
+                old.cancel()
+            start_now = self.debounce <= 0 or now - queue[0][0] >= self.debounce * DEBOUNCE_MAX_WAIT_FACTOR
+            if start_now:
+                self._active.add(chat_id)
+            else:
+                timer = threading.Timer(self.debounce, self._debounced_start)
+                timer.args = (chat_id, timer)
+                timer.daemon = True
+                self._timers[chat_id] = timer
+                timer.start()
+        if first and self.on_batch_start is not None:
+            try:
+                self.on_batch_start(chat_id)
+            except Exception as e:
+                print(f"[Dispatcher] on_batch_start error: {e}")
+        if start_now:
+            self._executor.submit(self._drain, chat_id)
+
+    def _debounced_start(self, chat_id: Any, timer: threading.Timer) -> None:
+        with self._lock:
+            if self._timers.get(chat_id) is not timer:
+                return  # superseded by a newer message's timer
+            del self._timers[chat_id]
+            self._active.add(chat_id)
+        try:
+            self._executor.submit(self._drain, chat_id)
+        except RuntimeError:
+            self._drain(chat_id)  # shutdown raced us; finish on the timer thread
+
+    def _drain(self, chat_id: Any) -> None:
+        while True:
+            with self._lock:
+                queue = self._queues.get(chat_id)
+                if not queue:
+                    self._active.discard(chat_id)
+                    self._queues.pop(chat_id, None)
+                    return
+                if self.merge is not None:
+                    batch = list(queue)
+                    queue.clear()
+                else:
+                    batch = [queue.popleft()]
+                self._queued -= len(batch)
+            started = time.monotonic()
+            for enqueued_at, _ in batch:
+                self.wait_ms.observe((started - enqueued_at) * 1000)
+            args = self.merge([a for _, a in batch]) if self.merge is not None else batch[0][1]
+            try:
+                self.handler(chat_id, *args)
+                ok = True
+            except Exception as e:
+                ok = False
+                print(f"[Dispatcher] chat {chat_id} handler error: {e}")
+            self.run_ms.observe((time.monotonic() - started) * 1000)
+            with self._lock:
+                self._counters["processed" if ok else "errors"] += len(batch)
+                self._counters["coalesced"] += len(batch) - 1
+
+    def pending(self, chat_id: Any = None) -> int:
+        """Queued (not yet started) messages, for one chat or overall."""
+        with self._lock:
+            if chat_id is None:
+                return self._queued
+            return len(self._queues.get(chat_id, ()))
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop accepting messages. With wait=True, block until every queued message has been handled."""
+        with self._lock:
+            self._closed = True
+            # Don't wait out debounce windows: start those chats now
+            pending = list(self._timers.items())
+            self._timers.clear()
+            for chat_id, timer in pending:
+                timer.cancel()
+                self._active.add(chat_id)
+        for chat_id, _ in pending:
+            self._executor.submit(self._drain, chat_id)
+        self._executor.shutdown(wait=wait)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            snapshot = {
+                **self._counters,
+                "workers": self.max_workers,
+                "active_chats": len(self._active),
+                "debouncing_chats": len(self._timers),
+                "queued": self._queued,
+                "max_queued": self._max_queued,
+                "queued_by_chat": {str(k): len(q) for k, q in self._queues.items() if q},
+            }
+        snapshot["wait"] = self.wait_ms.snapshot()
+        snapshot["run"] = self.run_ms.snapshot()
+        return snapshot
+
+
+_dispatcher: Optional[ChatDispatcher] = None
+
+
+def set_dispatcher(dispatcher: Optional[ChatDispatcher]) -> None:
+    """Register the running dispatcher so /metrics can report it."""
+    global _dispatcher
+    _dispatcher = dispatcher
+
+
+def get_dispatcher_stats() -> Dict[str, Any]:
+    return _dispatcher.stats() if _dispatcher else {}
@@ -1,4 +1,4 @@
-"""Minimal HTTP server for /health. Runs in a background thread."""
+"""Minimal HTTP server for /health and /metrics. Runs in a background thread."""
 
 from __future__ import annotations
 
@@ -9,6 +9,26 @@ from http.server import BaseHTTPRequestHandler, HTTPServer
 from typing import Optional
 
 
+def _metrics() -> dict:
+    """In-process counters: LLM gateway, tool prefetch, chat dispatch queues, Telegram API calls, reminders, background jobs, leader election."""
+    from app.dispatcher import get_dispatcher_stats
+    from app.leader import get_leader_stats
+    from app.prefetch import get_prefetch_stats
+    from app.reminder_scheduler import get_reminder_scheduler_stats
+    from app.scheduler import get_scheduler_stats
+    from app.telegram_client import get_telegram_stats
+    from shared.llm_gateway import get_gateway_stats
+    return {
+        "llm": get_gateway_stats(),
+        "prefetch": get_prefetch_stats(),
+        "dispatcher": get_dispatcher_stats(),
+        "telegram": get_telegram_stats(),
+        "reminders": get_reminder_scheduler_stats(),
+        "jobs": get_scheduler_stats(),
+        "leader": get_leader_stats(),
+    }
+
+
 def _handler_factory():
     class HealthHandler(BaseHTTPRequestHandler):
         def do_GET(self):
@@ -17,6 +37,11 @@ def _handler_factory():
                 self.send_header("Content-Type", "application/json")
                 self.end_headers()
                 self.wfile.write(json.dumps({"status": "ok"}).encode())
+            elif self.path == "/metrics" or self.path == "/metrics/":
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.end_headers()
+                self.wfile.write(json.dumps(_metrics()).encode())
             else:
                 self.send_response(404)
                 self.end_headers()
@@ -27,7 +52,7 @@ def _handler_factory():
 
 
 def start_health_server(port: Optional[int] = None) -> None:
-    """Start /health server in a daemon thread."""
+    """Start /health + /metrics server in a daemon thread."""
     port = port or int(os.environ.get("WOODY_HEALTH_PORT", "9000"))
     server = HTTPServer(("0.0.0.0", port), _handler_factory())
     thread = threading.Thread(target=server.serve_forever, daemon=True)
@@ -0,0 +1,160 @@
+"""
+Durable inbox for Telegram updates.
+
+Every text update is written to telegram_inbox (keyed by update_id) before it is processed,
+and the getUpdates offset is persisted in telegram_state. Processing claims a row with a
+single conditional UPDATE (pending -> processing), so an update re-delivered after a restart
+or a webhook retry never runs through OpenAI twice. A claim records the replica that holds
+it (processing_by) and a lease the turn renews while it runs; on startup, rows left pending -
+or processing with an expired lease, i.e. their replica died mid-turn - are replayed in
+update_id order. Rows another live replica is working on are left alone.
+
+Status: pending -> processing -> done | failed
+"""
+
+from __future__ import annotations
+
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from app.db import get_conn
+from app.leader import instance_id
+
+MAX_ATTEMPTS = 3
+LEASE_SECONDS = 90.0  # renewed every LEASE_SECONDS / 3 while the turn runs
+_OFFSET_KEY = "polling_offset"
+
+
+def record_update(db_path: Path, update_id: int, chat_id: int, text: str) -> bool:
+    """Store an inbound message. Returns False if this update_id was already recorded."""
+    conn = get_conn(db_path)
+    try:
+        cur = conn.execute(
+            "INSERT OR IGNORE INTO telegram_inbox (update_id, chat_id, text) VALUES (?, ?, ?)",
+            (update_id, chat_id, text),
+        )
+        conn.commit()
+        return cur.rowcount == 1
+    finally:
+        conn.close()
+
+
+def claim(db_path: Path, update_id: int, owner: Optional[str] = None, lease_seconds: float = LEASE_SECONDS) -> bool:
+    """pending -> processing, leased to owner (default: this replica). True only for the one caller that wins the row."""
+    conn = get_conn(db_path)
+    try:
+        cur = conn.execute(
+            """UPDATE telegram_inbox
+               SET status = 'processing', attempts = attempts + 1, started_at = datetime('now'),
+                   processing_by = ?, lease_expires_at = ?
+               WHERE update_id = ? AND status = 'pending'""",
+            (owner or instance_id(), time.time() + lease_seconds, update_id),
+        )
+        conn.commit()
+        return cur.rowcount == 1
+    finally:
+        conn.close()
+
+
+def renew(
+    db_path: Path, update_ids: Iterable[int], owner: Optional[str] = None, lease_seconds: float = LEASE_SECONDS
+) -> bool:
+    """Extend the lease on rows owner is processing. False if it no longer holds all of them."""
+    ids = list(update_ids)
+    conn = get_conn(db_path)
+    try:
+        cur = conn.execute(
+            f"""UPDATE telegram_inbox SET lease_expires_at = ?
+                WHERE update_id IN ({",".join("?" * len(ids))}) AND status = 'processing' AND processing_by = ?""",
+            (time.time() + lease_seconds, *ids, owner or instance_id()),
+        )
+        conn.commit()
+        return cur.rowcount == len(ids)
+    finally:
+        conn.close()
+
+
+def finish(db_path: Path, update_id: int, error: Optional[str] = None, owner: Optional[str] = None) -> bool:
+    """processing -> done (or failed with error), only while owner holds the row. Returns whether it did."""
+    conn = get_conn(db_path)
+    try:
+        cur = conn.execute(
+            """UPDATE telegram_inbox SET status = ?, error = ?, finished_at = datetime('now'), lease_expires_at = NULL
+               WHERE update_id = ? AND status = 'processing' AND processing_by = ?""",
+            ("failed" if error else "done", error, update_id, owner or instance_id()),
+        )
+        conn.commit()
+        return cur.rowcount == 1
+    finally:
+        conn.close()
+
+
+def get_offset(db_path: Path) -> int:
+    conn = get_conn(db_path)
+    try:
+        row = conn.execute("SELECT value FROM telegram_state WHERE key = ?", (_OFFSET_KEY,)).fetchone()
+        return int(row[0]) if row else 0
+    finally:
+        conn.close()
+
+
+def save_offset(db_path: Path, offset: int) -> None:
+    conn = get_conn(db_path)
+    try:
+        conn.execute(
+            "INSERT INTO telegram_state (key, value) VALUES (?, ?) ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            (_OFFSET_KEY, str(offset)),
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def recover(db_path: Path) -> List[Dict[str, Any]]:
+    """
+    Call once at startup, before any worker runs. Rows stuck in 'processing' whose lease has
+    expired (their replica died mid-turn) go back to 'pending' unless they already used
+    MAX_ATTEMPTS; rows under a live lease belong to another replica and are left alone.
+    Returns pending rows, oldest first.
+    """
+    conn = get_conn(db_path)
+    try:
+        conn.execute(
+            """UPDATE telegram_inbox
+               SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END,
+                   error = CASE WHEN attempts >= ? THEN 'gave up after repeated crashes' ELSE error END
+               WHERE status = 'processing' AND (lease_expires_at IS NULL OR lease_expires_at < ?)""",
+            (MAX_ATTEMPTS, MAX_ATTEMPTS, time.time()),
+        )
+        conn.commit()
+        rows = conn.execute(
+            "SELECT update_id, chat_id, text FROM telegram_inbox WHERE status = 'pending' ORDER BY update_id"
+        ).fetchall()
+    finally:
+        conn.close()
+    return [{"update_id": r[0], "chat_id": r[1], "text": r[2]} for r in rows]
+
+
+def prune(db_path: Path, keep_days: int = 7) -> int:
+    """Delete finished rows older than keep_days. Returns rows deleted."""
+    conn = get_conn(db_path)
+    try:
+        cur = conn.execute(
+            "DELETE FROM telegram_inbox WHERE status IN ('done', 'failed') AND received_at < datetime('now', ?)",
+            (f"-{int(keep_days)} days",),
+        )
+        conn.commit()
+        return cur.rowcount
+    finally:
+        conn.close()
+
+
+def inbox_stats(db_path: Path) -> Dict[str, int]:
+    """Row counts by status."""
+    conn = get_conn(db_path)
+    try:
+        rows = conn.execute("SELECT status, COUNT(*) FROM telegram_inbox GROUP BY status").fetchall()
+    finally:
+        conn.close()
+    return {r[0]: r[1] for r in rows}
@@ -0,0 +1,125 @@
+"""
+Registry of Woody's scheduled background jobs (see app.scheduler).
+
+The Google-backed agents (and the calendar mirror sync) are queued (shared.job_queue) and run in a worker process; the
+scheduled job waits for the queued one, so run history, durations and overlap prevention
+still apply. The digest, summary and retention are light and run in-process.
+"""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+from typing import Any, Callable, Optional
+
+from app.communications_agent_loop import _communications_agent_interval_minutes
+from app.contact_agent_loop import _contact_agent_interval_minutes
+from app.events_agent_loop import _events_agent_interval_minutes
+from app.memory_agent_loop import _memory_agent_hour_utc, _memory_agent_interval_minutes
+from app.reminder_loop import (
+    _digest_hour_utc,
+    _reminder_chat_id,
+    _run_once,
+    _run_summary_once,
+    _summary_hour_utc,
+)
+from app.scheduler import Cron, Interval, JobScheduler, set_scheduler
+from shared import job_queue
+from shared.calendar_mirror import sync_interval_minutes as _calendar_sync_interval_minutes
+from shared.retention import run_retention
+
+
+def _jitter_seconds() -> float:
+    """Max random delay added to each run so Google-backed agents don't fire on the same minute."""
+    try:
+        return max(0.0, float(os.environ.get("JOB_JITTER_SECONDS", "120")))
+    except ValueError:
+        return 120.0
+
+
+def _job_wait_timeout() -> float:
+    try:
+        return float(os.environ.get("JOB_WAIT_TIMEOUT_SECONDS", "3600"))
+    except ValueError:
+        return 3600.0
+
+
+def _in_worker(db_path: Path, kind: str) -> Callable[[], Any]:
+    """Scheduled job body: queue `kind` (once) and wait for a worker to finish it."""
+    def run() -> Any:
+        job_id = job_queue.enqueue(db_path, kind, unique=True)
+        job = job_queue.wait_for(db_path, job_id, timeout=_job_wait_timeout(), poll=2.0)
+        if job["status"] == "failed":
+            raise RuntimeError(f"job {job_id} failed: {job.get('error')}")
+        return job.get("result")
+    return run
+
+
+def build_scheduler(token: str, db_path: Path) -> JobScheduler:
+    scheduler = JobScheduler(db_path)
+    jitter = _jitter_seconds()
+    memory_interval = _memory_agent_interval_minutes()
+    scheduler.register(
+        "memory_agent",
+        _in_worker(db_path, "memory_agent"),
+        Interval(memory_interval * 60) if memory_interval else Cron(f"0 {_memory_agent_hour_utc()} * * *"),
+        jitter=jitter,
+    )
+    scheduler.register(
+        "events_agent", _in_worker(db_path, "events_agent"), Interval(_events_agent_interval_minutes() * 60), jitter=jitter
+    )
+    scheduler.register(
+        "contact_agent", _in_worker(db_path, "contact_agent"), Interval(_contact_agent_interval_minutes() * 60), jitter=jitter
+    )
+    scheduler.register(
+        "communications_agent",
+        _in_worker(db_path, "communications_agent"),
+        Interval(_communications_agent_interval_minutes() * 60),
+        jitter=jitter,
+    )
+    scheduler.register(
+        "calendar_sync", _in_worker(db_path, "calendar_sync"), Interval(_calendar_sync_interval_minutes() * 60), jitter=jitter
+    )
+    scheduler.register("retention", lambda: run_retention(db_path), Cron("30 4 * * *"))
+    chat_id = _reminder_chat_id()
+    if chat_id is not None:
+        # Time-of-day messages: only catch up within the hour (both also dedupe on a *_sent table)
+        scheduler.register(
+            "reminder_digest",
+            lambda: _run_once(token, chat_id, db_path),
+            Cron(f"0 {_digest_hour_utc()} * * *"),
+            catch_up=3600,
+        )
+        summary_hour = _summary_hour_utc()
+        if summary_hour is not None:
+            scheduler.register(
+                "daily_summary",
+                lambda: _run_summary_once(token, chat_id, db_path),
+                Cron(f"0 {summary_hour} * * *"),
+                catch_up=3600,
+            )
+    return scheduler
+
+
+_active: Optional[JobScheduler] = None
+
+
+def start_jobs(token: str, db_path: Path) -> JobScheduler:
+    """Build the registry and start the scheduler thread."""
+    global _active
+    stop_jobs()
+    scheduler = build_scheduler(token, db_path)
+    scheduler.start()
+    set_scheduler(scheduler)
+    _active = scheduler
+    return scheduler
+
+
+def stop_jobs() -> None:
+    """Stop scheduling (on losing leadership). Runs already in progress finish in the background."""
+    global _active
+    if _active is not None:
+        _active.stop(wait=False)
+        set_scheduler(None)
+        _active = None
@@ -0,0 +1,133 @@
+"""
+Leader election between Woody replicas (lease row in shared.leader).
+
+All replicas run job-queue workers (and serve the webhook in webhook mode); only the leader
+runs the job scheduler, the reminder scheduler and, in polling mode, the Telegram poller
+(Telegram answers a second getUpdates consumer with 409 Conflict). A daemon thread renews the lease every
+LEADER_LEASE_SECONDS / 3 (default lease 30s). When a replica gains the lease it calls
+on_elected; when it loses it (another replica took over after a stall) it calls on_demoted.
+A single replica simply elects itself at startup.
+"""
+
+from __future__ import annotations
+
+import atexit
+import os
+import socket
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+from shared import leader as lease
+
+
+def _lease_seconds() -> float:
+    try:
+        return max(3.0, float(os.environ.get("LEADER_LEASE_SECONDS", "30")))
+    except ValueError:
+        return 30.0
+
+
+def instance_id() -> str:
+    """This replica's identity for leases (WOODY_INSTANCE_ID, else host:pid)."""
+    return os.environ.get("WOODY_INSTANCE_ID", "").strip() or f"{socket.gethostname()}:{os.getpid()}"
+
+
+class LeaderElector:
+    def __init__(
+        self,
+        db_path: Path,
+        on_elected: Callable[[], None],
+        on_demoted: Callable[[], None],
+        holder: Optional[str] = None,
+        ttl: Optional[float] = None,
+        name: str = lease.DEFAULT_LEASE_NAME,
+    ):
+        self.db_path = db_path
+        self.on_elected = on_elected
+        self.on_demoted = on_demoted
+        self.holder = holder or instance_id()
+        self.ttl = ttl or _lease_seconds()
+        self.name = name
+        self.is_leader = False
+        self.counters = {"elected": 0, "demoted": 0, "renew_errors": 0}
+        self._renewed = 0.0  # monotonic time of the last successful acquire/renew
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def step(self) -> bool:
+        """One acquire/renew attempt plus any leadership change. Returns is_leader."""
+        try:
+            held = lease.try_acquire(self.db_path, self.holder, self.ttl, self.name)
+        except Exception as e:
+            self.counters["renew_errors"] += 1
+            print(f"[Leader] Lease check failed: {e}")
+            # Keep leading until our own lease would have run out; nobody else can take it before then
+            held = self.is_leader and time.monotonic() - self._renewed < self.ttl
+        else:
+            if held:
+                self._renewed = time.monotonic()
+        if held and not self.is_leader:
+            self.is_leader = True
+            self.counters["elected"] += 1
+            print(f"[Leader] {self.holder} is now the leader; starting scheduled work")
+            self._call(self.on_elected)
+        elif not held and self.is_leader:
+            self.is_leader = False
+            self.counters["demoted"] += 1
+            print(f"[Leader] {self.holder} lost the lease; stopping scheduled work")
+            self._call(self.on_demoted)
+        return self.is_leader
+
+    def _call(self, fn: Callable[[], None]) -> None:
+        try:
+            fn()
+        except Exception as e:
+            print(f"[Leader] Callback error: {e}")
+
+    def run(self) -> None:
+        while not self._stop.wait(self.ttl / 3):
+            self.step()
+
+    def start(self) -> None:
+        """Try once synchronously (a lone replica leads right away), then keep renewing in a thread."""
+        self.step()
+        if not self.is_leader:
+            print(f"[Leader] {self.holder} is a follower; scheduled work runs on the leader")
+        self._thread = threading.Thread(target=self.run, name="leader-election", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop renewing; if leading, stop scheduled work and release the lease for a fast handover."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(5)
+        if self.is_leader:
+            self.is_leader = False
+            self._call(self.on_demoted)
+            try:
+                lease.release(self.db_path, self.holder, self.name)
+            except Exception as e:
+                print(f"[Leader] Release failed: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self.counters, "holder": self.holder, "is_leader": self.is_leader}
+
+
+_elector: Optional[LeaderElector] = None
+
+
+def start_leader_election(db_path: Path, on_elected: Callable[[], None], on_demoted: Callable[[], None]) -> LeaderElector:
+    """Start the process-wide elector; the lease is released on interpreter exit."""
+    global _elector
+    if _elector is not None:
+        _elector.stop()
+    _elector = LeaderElector(db_path, on_elected, on_demoted)
+    _elector.start()
+    atexit.register(_elector.stop)
+    return _elector
+
+
+def get_leader_stats() -> Dict[str, Any]:
+    return _elector.stats() if _elector else {}
@@ -1,6 +1,7 @@
 """Entry point for woody."""
 
 import sys
+import time
 from pathlib import Path
 
 _root = Path(__file__).resolve().parent.parent.parent
@@ -14,16 +15,33 @@ from otel_setup import init_tracing
 from app.config import get_db_path, get_openai_key, get_telegram_token
 from app.db import init_db
 from app.health_server import start_health_server
-from app.communications_agent_loop import start_communications_agent_loop
-from app.contact_agent_loop import start_contact_agent_loop
-from app.events_agent_loop import start_events_agent_loop
-from app.memory_agent_loop import start_memory_agent_loop
+from app.jobs import start_jobs, stop_jobs
+from app.leader import start_leader_election
 from app.reminder_loop import start_reminder_loop
-from app.telegram_loop import run_polling_loop
+from app.reminder_scheduler import stop_reminder_scheduler
+from app.telegram_loop import start_polling, stop_polling
+from app.webhook import ensure_webhook, run_webhook_server, webhook_url
+from app.worker import start_worker_processes
+
+
+def _start_scheduled_work(token: str, db_path, openai_key: str, polling: bool) -> None:
+    start_reminder_loop(token, db_path)
+    start_jobs(token, db_path)
+    if polling:
+        start_polling(token, db_path, openai_key)
+    else:
+        ensure_webhook(token)  # one replica registers; all of them check the same secret
+
+
+def _stop_scheduled_work(polling: bool) -> None:
+    if polling:
+        stop_polling()
+    stop_jobs()
+    stop_reminder_scheduler()
 
 
 def main() -> None:
-    """Boot sequence: load config, init DB, start health server, Telegram polling."""
+    """Boot sequence: load config, init DB, start health server, Telegram polling (or webhook)."""
     init_tracing(service_name="woody")
     start_health_server()
     token = get_telegram_token()
@@ -31,12 +49,24 @@ def main() -> None:
     db_path = get_db_path()
 
     init_db(db_path)
-    start_memory_agent_loop(db_path)
-    start_events_agent_loop()
-    start_contact_agent_loop()
-    start_communications_agent_loop()
-    start_reminder_loop(token, db_path)
-    run_polling_loop(token, db_path, openai_key)
+    start_worker_processes(db_path)
+    # Every replica runs queue workers; only the leader schedules work. In webhook mode every
+    # replica serves chat; long polling allows one consumer per bot, so only the leader polls.
+    polling = not webhook_url()
+    start_leader_election(
+        db_path,
+        on_elected=lambda: _start_scheduled_work(token, db_path, openai_key, polling),
+        on_demoted=lambda: _stop_scheduled_work(polling),
+    )
+    if not polling:
+        run_webhook_server(token, db_path, openai_key)
+        return
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        print("\nStopping woody.")
+        stop_polling(wait=True)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,183 @@
+"""Speculative tool prefetch - run likely read-only tools while the first completion is in flight.
+
+Messages like "what's on today?" or "anything from the school?" almost always lead the model
+to call calendar_today / communications_read. When WOODY_PREFETCH is enabled, run_agent
+classifies the message with cheap keyword rules, starts those tools in a small thread pool
+concurrently with the first OpenAI request, and serves the model's tool calls from the
+prefetched results when the (default-filled) arguments match.
+
+Only allowlisted read-only tools registered as GREEN are ever prefetched, so a wasted
+prefetch costs an API read, never a side effect. Once the turn runs any other tool (a write,
+e.g. reminder_create before reminder_list), pending prefetches are dropped so the model never
+sees data from before its own write.
+"""
+
+from __future__ import annotations
+
+import inspect
+import logging
+import os
+import re
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Optional
+
+from app.tools.registry import PermissionTier, execute_tool, get
+
+log = logging.getLogger(__name__)
+
+# (pattern, tool name, needs chat_id). Keep this list to tools without side effects:
+# some GREEN tools (home_ops_add, memory_refresh) still write, so tier alone is not enough.
+_RULES: list[tuple[re.Pattern, str, bool]] = [
+    (re.compile(r"\b(today|tonight|this (morning|afternoon|evening)|agenda|calendar|schedule|what'?s on|whats on)\b", re.I), "calendar_today", False),
+    (re.compile(r"\b(e-?mails?|inbox|mail|school|heard from|anything from|messages? from)\b", re.I), "communications_read", False),
+    (re.compile(r"\b(my|any|pending|list|show)\s+reminders?\b", re.I), "reminder_list", True),
+    (re.compile(r"\b(my|any|pending|list|show)\s+(todos?|to-dos?|tasks)\b", re.I), "todo_list", True),
+    (re.compile(r"\bwish ?list\b", re.I), "wishlist_list", True),
+]
+
+# GREEN tools that still write: running one drops pending prefetches like any YELLOW tool does
+_GREEN_WRITES = frozenset(("home_ops_add", "home_ops_remove", "memory_refresh"))
+
+_MAX_WORKERS = 4
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+_stats_lock = threading.Lock()
+_stats = {"turns": 0, "launched": 0, "hits": 0, "wasted": 0, "saved_ms": 0.0}
+
+
+def prefetch_enabled() -> bool:
+    return os.environ.get("WOODY_PREFETCH", "").lower() in ("1", "true", "yes")
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=_MAX_WORKERS, thread_name_prefix="prefetch")
+        return _executor
+
+
+def classify(text: str) -> list[str]:
+    """Return names of read-only tools the message is likely to need (in rule order, no dupes)."""
+    out: list[str] = []
+    for pat, name, _ in _RULES:
+        if name not in out and pat.search(text or ""):
+            out.append(name)
+    return out
+
+
+def normalize_args(name: str, args: dict[str, Any]) -> dict[str, Any]:
+    """Fill schema defaults and drop params the handler doesn't accept (same filter as execute_tool)."""
+    tool = get(name)
+    if not tool:
+        return dict(args)
+    props = tool.parameters.get("properties", {})
+    merged = {k: v["default"] for k, v in props.items() if isinstance(v, dict) and "default" in v}
+    merged.update(args)
+    allowed = set(inspect.signature(tool.handler).parameters)
+    return {k: v for k, v in merged.items() if k in allowed}
+
+
+def _may_write(name: str) -> bool:
+    tool = get(name)
+    return tool is None or tool.tier != PermissionTier.GREEN or name in _GREEN_WRITES
+
+
+def _run_timed(name: str, args: dict[str, Any]) -> tuple[Any, float]:
+    start = time.perf_counter()
+    result = execute_tool(name, args)
+    return result, (time.perf_counter() - start) * 1000
+
+
+class Prefetcher:
+    """Speculative tool results for one agent turn."""
+
+    def __init__(self, chat_id: int) -> None:
+        self.chat_id = chat_id
+        self._pending: dict[str, tuple[dict[str, Any], Future]] = {}
+        self.launched = 0
+        self.hits = 0
+        self.dropped = 0
+        self._finished = False
+
+    def start(self, user_message: str) -> "Prefetcher":
+        for name in classify(user_message):
+            tool = get(name)
+            if not tool or tool.tier != PermissionTier.GREEN:
+                continue
+            rule_needs_chat = next(needs for _, n, needs in _RULES if n == name)
+            args = normalize_args(name, {"chat_id": self.chat_id} if rule_needs_chat else {})
+            self._pending[name] = (args, _get_executor().submit(_run_timed, name, args))
+            self.launched += 1
+        return self
+
+    def take(self, name: str, args: dict[str, Any]) -> tuple[bool, Any]:
+        """Return (True, result) when a prefetch for name ran with matching args, else (False, None).
+
+        Blocks until the prefetch finishes; a prefetch that raised counts as a miss so the
+        caller executes the tool normally and surfaces the real error. Asking for a tool that
+        may write drops every pending prefetch: reads after it must see the write.
+        """
+        if _may_write(name):
+            self.invalidate()
+            return False, None
+        entry = self._pending.get(name)
+        if not entry or normalize_args(name, args) != entry[0]:
+            return False, None
+        del self._pending[name]
+        wait_start = time.perf_counter()
+        try:
+            result, tool_ms = entry[1].result()
+        except Exception as e:
+            log.info("[Prefetch] %s failed speculatively: %s", name, e)
+            return False, None
+        waited_ms = (time.perf_counter() - wait_start) * 1000
+        self.hits += 1
+        with _stats_lock:
+            _stats["hits"] += 1
+            _stats["saved_ms"] += max(0.0, tool_ms - waited_ms)
+        return True, result
+
+    def invalidate(self) -> None:
+        """Drop pending prefetches (a tool that may write is about to run). They count as wasted."""
+        self.dropped += len(self._pending)
+        self._pending.clear()
+
+    def finish(self) -> None:
+        """Record the turn (once). Unused prefetches are left to finish in the background."""
+        if self._finished:
+            return
+        self._finished = True
+        wasted = len(self._pending) + self.dropped
+        with _stats_lock:
+            _stats["turns"] += 1
+            _stats["launched"] += self.launched
+            _stats["wasted"] += wasted
+        if self.launched:
+            log.info("[Prefetch] chat=%s launched=%d hits=%d wasted=%d", self.chat_id, self.launched, self.hits, wasted)
+        self._pending.clear()
+
+
+def start_prefetch(user_message: str, chat_id: int) -> Optional[Prefetcher]:
+    """Start speculative tool calls for the message, or None when prefetch is disabled."""
+    if not prefetch_enabled():
+        return None
+    return Prefetcher(chat_id).start(user_message)
+
+
+def get_prefetch_stats() -> dict[str, Any]:
+    """Counters since process start: hit_rate = hits / launched, saved_ms = tool time hidden behind the LLM call."""
+    with _stats_lock:
+        out = dict(_stats)
+    out["hit_rate"] = round(out["hits"] / out["launched"], 3) if out["launched"] else 0.0
+    out["saved_ms"] = round(out["saved_ms"], 1)
+    return out
+
+
+def reset_prefetch_stats() -> None:
+    with _stats_lock:
+        for k in _stats:
+            _stats[k] = 0.0 if k == "saved_ms" else 0
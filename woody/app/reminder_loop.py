@@ -1,19 +1,16 @@
-"""Background reminder loop - sends daily digest of upcoming events and end-of-day summary via Telegram."""
+"""Reminders via Telegram - user reminders, daily digest of upcoming events and end-of-day summary."""
 
 from __future__ import annotations
 
 import json
 import os
 import sqlite3
-import threading
-import time
-from datetime import date, datetime, timedelta
+from datetime import date, timedelta
 from pathlib import Path
 from typing import Optional
 
-import httpx
-
-TELEGRAM_API = "https://api.telegram.org/bot{token}"
+from app.reminder_scheduler import start_reminder_scheduler
+from app.telegram_client import get_client
 
 
 def _get_todays_approved_actions(db_path: Path) -> list[dict]:
@@ -95,15 +92,7 @@ def _run_summary_once(token: str, chat_id: int, db_path: Path) -> bool:
 
 
 def _send_reminder(token: str, chat_id: int, text: str) -> bool:
-    try:
-        with httpx.Client(timeout=10.0) as client:
-            r = client.post(
-                f"{TELEGRAM_API.format(token=token)}/sendMessage",
-                json={"chat_id": chat_id, "text": text},
-            )
-            return r.status_code == 200
-    except Exception:
-        return False
+    return get_client(token).send_message(chat_id, text)
 
 
 def _format_digest(events: list, requires_scheduling: list | None = None) -> str:
@@ -167,94 +156,32 @@ def _run_once(token: str, chat_id: int, db_path: Path) -> bool:
     return True
 
 
-def _run_user_reminders(token: str, db_path: Path) -> None:
-    """Check for due user-created reminders and send them."""
-    conn = sqlite3.connect(str(db_path))
+def _reminder_chat_id() -> Optional[int]:
+    """TELEGRAM_REMINDER_CHAT_ID, or None when digest/summary are not configured."""
     try:
-        now_str = datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%S")
-        cur = conn.execute(
-            """
-            SELECT id, chat_id, text
-            FROM reminders
-            WHERE status = 'pending' AND remind_at <= ?
-            """,
-            (now_str,),
-        )
-        rows = cur.fetchall()
-        for rid, rchat_id, text in rows:
-            msg = f"⏰ Reminder: {text}"
-            if _send_reminder(token, int(rchat_id), msg):
-                conn.execute("UPDATE reminders SET status = 'sent' WHERE id = ?", (rid,))
-                conn.commit()
-    except Exception as e:
-        print(f"User reminder error: {e}")
-    finally:
-        conn.close()
+        return int(os.environ.get("TELEGRAM_REMINDER_CHAT_ID", "").strip())
+    except ValueError:
+        return None
 
 
-def _reminder_loop(
-    token: str,
-    chat_id: int,
-    db_path: Path,
-    interval_minutes: int = 30,
-    hour_utc: int = 8,
-    summary_hour_utc: Optional[int] = 5,
-) -> None:
-    """Run reminder check every interval_minutes. Send digest at hour_utc, summary at summary_hour_utc."""
-    user_reminder_interval = 2 * 60  # Check user reminders every 2 min
-    last_user_check = 0.0
-    while True:
-        try:
-            now = datetime.utcnow()
-            if chat_id is not None:
-                if now.hour == hour_utc:
-                    _run_once(token, chat_id, db_path)
-                if summary_hour_utc is not None and now.hour == summary_hour_utc:
-                    _run_summary_once(token, chat_id, db_path)
-            # User reminders: check every 2 min
-            t = time.time()
-            if t - last_user_check >= user_reminder_interval:
-                _run_user_reminders(token, db_path)
-                last_user_check = t
-        except Exception as e:
-            print(f"Reminder error: {e}")
-        time.sleep(min(user_reminder_interval, interval_minutes * 60))
+def _digest_hour_utc() -> int:
+    try:
+        return int(os.environ.get("REMINDER_HOUR_UTC", "8"))
+    except ValueError:
+        return 8
 
 
-def start_reminder_loop(
-    token: str,
-    db_path: Path,
-    interval_minutes: int = 30,
-    hour_utc: Optional[int] = None,
-    summary_hour_utc: Optional[int] = None,
-) -> None:
-    """Start reminder loop in a daemon thread. User reminders work without TELEGRAM_REMINDER_CHAT_ID."""
-    chat_id: Optional[int] = None
-    chat_id_str = os.environ.get("TELEGRAM_REMINDER_CHAT_ID", "").strip()
-    if chat_id_str:
-        try:
-            chat_id = int(chat_id_str)
-        except ValueError:
-            pass
-    if hour_utc is None:
-        try:
-            hour_utc = int(os.environ.get("REMINDER_HOUR_UTC", "8"))
-        except ValueError:
-            hour_utc = 8
-    if summary_hour_utc is None:
-        try:
-            val = os.environ.get("SUMMARY_HOUR_UTC", "5")
-            summary_hour_utc = int(val) if val else None
-        except ValueError:
-            summary_hour_utc = 5
-    thread = threading.Thread(
-        target=_reminder_loop,
-        args=(token, chat_id, db_path),
-        kwargs={
-            "interval_minutes": interval_minutes,
-            "hour_utc": hour_utc,
-            "summary_hour_utc": summary_hour_utc,
-        },
-        daemon=True,
-    )
-    thread.start()
+def _summary_hour_utc() -> Optional[int]:
+    try:
+        val = os.environ.get("SUMMARY_HOUR_UTC", "5")
+        return int(val) if val else None
+    except ValueError:
+        return 5
+
+
+def start_reminder_loop(token: str, db_path: Path) -> None:
+    """
+    Start the user-reminder scheduler (daemon thread). User reminders work without
+    TELEGRAM_REMINDER_CHAT_ID; the digest and summary are jobs in app.jobs.
+    """
+    start_reminder_scheduler(db_path, lambda rchat_id, text: _send_reminder(token, int(rchat_id), text))
@@ -0,0 +1,391 @@
+"""
+Precise scheduler for user reminders.
+
+Pending reminders live in an in-memory min-heap keyed by due time. One daemon thread sleeps
+until the earliest one is due, sends it, and marks it sent. reminder_create / reminder_cancel
+notify the scheduler directly when it runs in the same process. Rows written by other
+processes (dashboard chat, follower replicas) are noticed by a watch query every
+REMINDER_WATCH_SECONDS (default 1): a signature of the pending set (count, max id, earliest
+next_fire_at, read from the status index) that triggers a reconcile when it changes. A full
+reconcile also runs every REMINDER_RECONCILE_SECONDS (default 300) as a backstop.
+
+Reminders that come due together (e.g. a morning batch) are delivered as one batch: claimed
+in a single transaction (pending -> sending), sent concurrently on up to
+REMINDER_SEND_CONCURRENCY threads (default 8; the Telegram client's rate limits still
+apply), then marked sent - or put back to pending for retry - in a single transaction.
+Rows another process already claimed are skipped. Rows left in 'sending' by a crash are
+put back to pending on startup: a reminder may be repeated, but never lost.
+
+Status: pending -> sending -> sent
+
+Recurring reminders carry an RRULE (shared.recurrence) and a precomputed next_fire_at, which
+is what the scheduler loads (index on status, next_fire_at). After a successful send the row
+goes straight from sending back to pending with the next occurrence, in the same transaction
+that marks one-shot reminders sent; missed occurrences while the bot was down are skipped,
+not replayed. A rule that is exhausted (COUNT/UNTIL) ends as sent.
+
+remind_at is stored as naive ISO 8601 and treated as UTC (same as before).
+"""
+
+from __future__ import annotations
+
+import heapq
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from shared.recurrence import next_occurrence, parse_rule
+
+SEND_RETRY_SECONDS = 60
+
+
+def _reconcile_seconds() -> float:
+    try:
+        return max(5.0, float(os.environ.get("REMINDER_RECONCILE_SECONDS", "300")))
+    except ValueError:
+        return 300.0
+
+
+def _watch_seconds() -> float:
+    try:
+        return max(0.2, float(os.environ.get("REMINDER_WATCH_SECONDS", "1")))
+    except ValueError:
+        return 1.0
+
+
+_SIGNATURE_SQL = "SELECT COUNT(*), MAX(id), MIN(next_fire_at) FROM reminders WHERE status = 'pending'"
+
+
+def _send_concurrency() -> int:
+    try:
+        return max(1, int(os.environ.get("REMINDER_SEND_CONCURRENCY", "8")))
+    except ValueError:
+        return 8
+
+
+def due_timestamp(remind_at: str) -> Optional[float]:
+    """Epoch seconds for a stored remind_at (naive = UTC). None if unparseable."""
+    try:
+        dt = datetime.fromisoformat(remind_at.replace("Z", "+00:00"))
+    except (ValueError, AttributeError):
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
+
+class ReminderScheduler:
+    """
+    send(chat_id, text) -> bool delivers one reminder. Entries are (due_ts, chat_id, text) by
+    reminder id; heap items that no longer match their entry (cancelled, rescheduled) are
+    skipped lazily when they reach the top.
+    """
+
+    def __init__(
+        self,
+        db_path: Path,
+        send: Callable[[int, str], bool],
+        reconcile_seconds: Optional[float] = None,
+        watch_seconds: Optional[float] = None,
+    ) -> None:
+        self.db_path = db_path
+        self.send = send
+        self.reconcile_seconds = reconcile_seconds or _reconcile_seconds()
+        self.watch_seconds = watch_seconds or _watch_seconds()
+        self._signature: Optional[tuple] = None
+        self.concurrency = _send_concurrency()
+        self._entries: Dict[int, Tuple[float, int, str]] = {}
+        self._heap: List[Tuple[float, int]] = []
+        self._inflight: set = set()  # popped, being sent; reconcile must not re-add these
+        self._cond = threading.Condition()
+        self._stopped = False
+        self._thread: Optional[threading.Thread] = None
+        self.counters = {"sent": 0, "failed": 0, "skipped": 0, "batches": 0, "reconciles": 0, "wakeups": 0, "watch_hits": 0}
+
+    # --- state changes ---
+
+    def _put(self, reminder_id: int, due: float, chat_id: int, text: str) -> None:
+        self._entries[reminder_id] = (due, chat_id, text)
+        heapq.heappush(self._heap, (due, reminder_id))
+
+    def add(self, reminder_id: int, chat_id: int, text: str, remind_at: str) -> None:
+        due = due_timestamp(remind_at)
+        if due is None:
+            return
+        with self._cond:
+            self._put(reminder_id, due, chat_id, text)
+            self._cond.notify()
+
+    def remove(self, reminder_id: int) -> None:
+        with self._cond:
+            self._entries.pop(reminder_id, None)
+            self._cond.notify()
+
+    def reconcile(self) -> None:
+        """Replace the in-memory set with the table's pending reminders."""
+        conn = sqlite3.connect(str(self.db_path), isolation_level=None)
+        try:
+            conn.execute("BEGIN")  # rows and signature from one snapshot, so no change slips between them
+            rows = conn.execute(
+                """SELECT id, chat_id, text, COALESCE(next_fire_at, remind_at) FROM reminders
+                   WHERE status = 'pending' ORDER BY next_fire_at"""
+            ).fetchall()
+            self._signature = conn.execute(_SIGNATURE_SQL).fetchone()
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+        with self._cond:
+            retry_at = {rid: e[0] for rid, e in self._entries.items()}
+            self._entries.clear()
+            self._heap.clear()
+            for rid, chat_id, text, remind_at in rows:
+                due = due_timestamp(remind_at)
+                if due is None or rid in self._inflight:
+                    continue
+                # Keep a pending send-retry delay rather than re-firing immediately
+                self._put(rid, max(due, retry_at.get(rid, due)), int(chat_id), text)
+            self.counters["reconciles"] += 1
+            self._cond.notify()
+
+    def watch(self) -> bool:
+        """Reconcile if the pending set changed since the last reconcile (e.g. written by another process)."""
+        conn = sqlite3.connect(str(self.db_path))
+        try:
+            signature = conn.execute(_SIGNATURE_SQL).fetchone()
+        finally:
+            conn.close()
+        if signature == self._signature:
+            return False
+        self.counters["watch_hits"] += 1
+        self.reconcile()
+        return True
+
+    # --- run loop ---
+
+    def _pop_due(self, now: float) -> List[Tuple[int, int, str]]:
+        due: List[Tuple[int, int, str]] = []
+        while self._heap and self._heap[0][0] <= now:
+            ts, rid = heapq.heappop(self._heap)
+            entry = self._entries.get(rid)
+            if entry is None or entry[0] != ts:
+                continue  # stale heap item
+            del self._entries[rid]
+            self._inflight.add(rid)
+            due.append((rid, entry[1], entry[2]))
+        return due
+
+    def _next_due(self) -> Optional[float]:
+        while self._heap:
+            ts, rid = self._heap[0]
+            entry = self._entries.get(rid)
+            if entry is not None and entry[0] == ts:
+                return ts
+            heapq.heappop(self._heap)
+        return None
+
+    def recover(self) -> int:
+        """Put rows a crashed process left in 'sending' back to pending. Returns rows reset."""
+        conn = sqlite3.connect(str(self.db_path))
+        try:
+            cur = conn.execute("UPDATE reminders SET status = 'pending', claimed_at = NULL WHERE status = 'sending'")
+            conn.commit()
+            return cur.rowcount
+        finally:
+            conn.close()
+
+    def _claim(self, ids: List[int]) -> Dict[int, Tuple[Optional[str], str]]:
+        """pending -> sending for ids, in one transaction. Returns {id: (rrule, remind_at)} for the ids this call won."""
+        conn = sqlite3.connect(str(self.db_path), isolation_level=None, timeout=30)
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            marks = ",".join("?" * len(ids))
+            won = {r[0]: (r[1], r[2]) for r in conn.execute(
+                f"SELECT id, rrule, remind_at FROM reminders WHERE status = 'pending' AND id IN ({marks})", ids
+            )}
+            if won:
+                conn.execute(
+                    f"UPDATE reminders SET status = 'sending', claimed_at = datetime('now') WHERE id IN ({','.join('?' * len(won))})",
+                    list(won),
+                )
+            conn.execute("COMMIT")
+            return won
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def _send_one(self, item: Tuple[int, int, str]) -> bool:
+        rid, chat_id, text = item
+        try:
+            return bool(self.send(chat_id, f"⏰ Reminder: {text}"))
+        except Exception as e:
+            print(f"[Reminders] Send failed for reminder {rid}: {e}")
+            return False
+
+    def _advance(
+        self, items: List[Tuple[int, int, str]], won: Dict[int, Tuple[Optional[str], str]]
+    ) -> List[Tuple[int, int, str, Optional[str]]]:
+        """Next occurrence after now for sent recurring reminders; None when the rule is exhausted."""
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        out = []
+        for rid, chat_id, text in items:
+            rrule, remind_at = won[rid]
+            try:
+                dtstart = datetime.fromisoformat(remind_at.replace("Z", "+00:00")).replace(tzinfo=None)
+                nxt = next_occurrence(parse_rule(rrule), dtstart, now)
+            except ValueError as e:
+                print(f"[Reminders] Bad rule on reminder {rid} ({rrule}): {e}")
+                nxt = None
+            out.append((rid, chat_id, text, nxt.strftime("%Y-%m-%dT%H:%M:%S") if nxt else None))
+        return out
+
+    def deliver(self, due: List[Tuple[int, int, str]]) -> None:
+        """Claim, send concurrently and record one batch of due reminders; failed sends are retried later."""
+        try:
+            won = self._claim([rid for rid, _, _ in due])
+            batch = [item for item in due if item[0] in won]
+            self.counters["skipped"] += len(due) - len(batch)
+            if not batch:
+                return
+            workers = min(self.concurrency, len(batch))
+            if workers == 1:
+                results = [self._send_one(item) for item in batch]
+            else:
+                with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="reminder-send") as pool:
+                    results = list(pool.map(self._send_one, batch))
+            sent = [(item[0],) for item, ok in zip(batch, results) if ok and not won[item[0]][0]]
+            failed = [item for item, ok in zip(batch, results) if not ok]
+            advanced = self._advance([item for item, ok in zip(batch, results) if ok and won[item[0]][0]], won)
+            conn = sqlite3.connect(str(self.db_path), timeout=30)
+            try:
+                conn.executemany("UPDATE reminders SET status = 'sent' WHERE id = ? AND status = 'sending'", sent)
+                conn.executemany(
+                    """UPDATE reminders SET status = CASE WHEN ? IS NULL THEN 'sent' ELSE 'pending' END,
+                              next_fire_at = COALESCE(?, next_fire_at), claimed_at = NULL
+                       WHERE id = ? AND status = 'sending'""",
+                    [(nxt, nxt, rid) for rid, _, _, nxt in advanced],
+                )
+                conn.executemany(
+                    "UPDATE reminders SET status = 'pending', claimed_at = NULL WHERE id = ? AND status = 'sending'",
+                    [(item[0],) for item in failed],
+                )
+                conn.commit()
+            finally:
+                conn.close()
+            self.counters["batches"] += 1
+            self.counters["sent"] += len(sent) + len(advanced)
+            self.counters["failed"] += len(failed)
+            with self._cond:
+                for rid, chat_id, text, nxt in advanced:
+                    if nxt is not None and rid not in self._entries:
+                        self._put(rid, due_timestamp(nxt), chat_id, text)
+                self._cond.notify()
+            if failed:
+                retry_at = time.time() + SEND_RETRY_SECONDS
+                with self._cond:
+                    for rid, chat_id, text in failed:
+                        if rid not in self._entries:
+                            self._put(rid, retry_at, chat_id, text)
+        finally:
+            with self._cond:
+                for rid, _, _ in due:
+                    self._inflight.discard(rid)
+
+    def run(self) -> None:
+        next_reconcile = time.monotonic() + self.reconcile_seconds
+        next_watch = time.monotonic() + self.watch_seconds
+        while True:
+            with self._cond:
+                if self._stopped:
+                    return
+                now = time.time()
+                due = self._pop_due(now)
+                if not due:
+                    next_due = self._next_due()
+                    timeout = min(next_reconcile, next_watch) - time.monotonic()
+                    if next_due is not None:
+                        timeout = min(timeout, next_due - now)
+                    if timeout > 0:
+                        self._cond.wait(timeout)
+                    self.counters["wakeups"] += 1
+            if due:
+                try:
+                    self.deliver(due)
+                except Exception as e:
+                    print(f"[Reminders] Delivery error: {e}")
+            if time.monotonic() >= next_reconcile:
+                try:
+                    self.reconcile()
+                except Exception as e:
+                    print(f"[Reminders] Reconcile error: {e}")
+                next_reconcile = time.monotonic() + self.reconcile_seconds
+                next_watch = time.monotonic() + self.watch_seconds
+            elif time.monotonic() >= next_watch:
+                try:
+                    self.watch()
+                except Exception as e:
+                    print(f"[Reminders] Watch error: {e}")
+                next_watch = time.monotonic() + self.watch_seconds
+
+    def start(self) -> None:
+        reset = self.recover()
+        if reset:
+            print(f"[Reminders] Re-queued {reset} reminder(s) interrupted mid-send")
+        self.reconcile()
+        self._thread = threading.Thread(target=self.run, name="reminder-scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def stats(self) -> Dict[str, object]:
+        with self._cond:
+            next_due = self._next_due()
+            return {**self.counters, "scheduled": len(self._entries),
+                    "next_due_in_s": round(next_due - time.time(), 1) if next_due is not None else None}
+
+
+_scheduler: Optional[ReminderScheduler] = None
+
+
+def start_reminder_scheduler(db_path: Path, send: Callable[[int, str], bool]) -> ReminderScheduler:
+    """Start the process-wide scheduler (loads pending reminders first)."""
+    global _scheduler
+    if _scheduler is not None:
+        _scheduler.stop()
+    _scheduler = ReminderScheduler(db_path, send)
+    _scheduler.start()
+    return _scheduler
+
+
+def stop_reminder_scheduler() -> None:
+    global _scheduler
+    if _scheduler is not None:
+        _scheduler.stop()
+        _scheduler = None
+
+
+def notify_reminder_created(reminder_id: int, chat_id: int, text: str, remind_at: str) -> None:
+    """Called by reminder_create. No-op when the scheduler isn't running in this process (its watch picks the row up)."""
+    if _scheduler is not None:
+        _scheduler.add(reminder_id, chat_id, text, remind_at)
+
+
+def notify_reminder_cancelled(reminder_id: int) -> None:
+    """Called by reminder_cancel. No-op when the scheduler isn't running in this process (its watch picks it up)."""
+    if _scheduler is not None:
+        _scheduler.remove(reminder_id)
+
+
+def get_reminder_scheduler_stats() -> Dict[str, object]:
+    return _scheduler.stats() if _scheduler else {}
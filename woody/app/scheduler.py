@@ -0,0 +1,331 @@
+"""
+In-process scheduler for Woody's background agents.
+
+One thread owns the schedule for every registered job; runs execute on a small pool
+(JOB_WORKERS, default 2) so at most that many agents hit Google APIs at once.
+
+- Triggers: Interval(seconds) or Cron("m h dom mon dow", UTC; *, lists, ranges, */n).
+- Jitter: each run is pushed back by a random 0..jitter seconds so jobs don't line up
+  on the same minute.
+- Catch-up: at startup a job whose last run (job_runs) is older than its schedule allows
+  runs once immediately; missed runs are not replayed one by one. catch_up may also be a
+  number of seconds: only catch up if the missed run is at most that late.
+- Overlap: a job never runs twice at once; a run that comes due while the previous one is
+  still going is recorded as skipped.
+- History: every run is a job_runs row with trigger, status and duration (shared.job_runs).
+  The dashboard can request a run, picked up within JOB_REQUEST_POLL_SECONDS (default 10).
+"""
+
+from __future__ import annotations
+
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from shared import job_runs
+
+
+def _env_int(key: str, default: int) -> int:
+    try:
+        return int(os.environ.get(key, str(default)))
+    except ValueError:
+        return default
+
+
+def _iso(dt: Optional[datetime]) -> Optional[str]:
+    return dt.strftime("%Y-%m-%dT%H:%M:%S") if dt else None
+
+
+class Interval:
+    def __init__(self, seconds: float) -> None:
+        if seconds <= 0:
+            raise ValueError("interval must be positive")
+        self.seconds = seconds
+
+    def next_after(self, dt: datetime) -> datetime:
+        return dt + timedelta(seconds=self.seconds)
+
+    def describe(self) -> str:
+        if self.seconds % 3600 == 0:
+            return f"every {int(self.seconds // 3600)}h"
+        if self.seconds % 60 == 0:
+            return f"every {int(self.seconds // 60)}m"
+        return f"every {self.seconds:g}s"
+
+
+def _cron_field(spec: str, lo: int, hi: int) -> Set[int]:
+    values: Set[int] = set()
+    for part in spec.split(","):
+        body, _, step_s = part.partition("/")
+        step = int(step_s) if step_s else 1
+        if body == "*":
+            start, end = lo, hi
+        elif "-" in body:
+            a, b = body.split("-", 1)
+            start, end = int(a), int(b)
+        else:
+            start = int(body)
+            end = hi if step_s else start
+        if start < lo or end > hi or start > end or step < 1:
+            raise ValueError(f"cron field out of range: {part}")
+        values.update(range(start, end + 1, step))
+    return values
+
+
+class Cron:
+    """Five-field cron expression evaluated in UTC. Day-of-week 0 or 7 = Sunday."""
+
+    def __init__(self, expr: str) -> None:
+        fields = expr.split()
+        if len(fields) != 5:
+            raise ValueError(f"cron needs 5 fields: {expr!r}")
+        self.expr = expr
+        self.minutes = _cron_field(fields[0], 0, 59)
+        self.hours = _cron_field(fields[1], 0, 23)
+        self.days = _cron_field(fields[2], 1, 31)
+        self.months = _cron_field(fields[3], 1, 12)
+        self.weekdays = {d % 7 for d in _cron_field(fields[4], 0, 7)}
+        self._any_day = fields[2] == "*"
+        self._any_weekday = fields[4] == "*"
+
+    def _day_matches(self, dt: datetime) -> bool:
+        dom = dt.day in self.days
+        dow = (dt.weekday() + 1) % 7 in self.weekdays
+        if self._any_day or self._any_weekday:
+            return dom and dow
+        return dom or dow  # classic cron: either restriction matches
+
+    def next_after(self, dt: datetime) -> datetime:
+        t = dt.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = t + timedelta(days=366 * 5)
+        while t < limit:
+            if t.month not in self.months:
+                t = (t.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+                continue
+            if not self._day_matches(t):
+                t = t.replace(hour=0, minute=0) + timedelta(days=1)
+                continue
+            if t.hour not in self.hours:
+                t = t.replace(minute=0) + timedelta(hours=1)
+                continue
+            if t.minute not in self.minutes:
+                t += timedelta(minutes=1)
+                continue
+            return t
+        raise ValueError(f"cron never fires: {self.expr}")
+
+    def describe(self) -> str:
+        return f"cron {self.expr} UTC"
+
+
+class Job:
+    def __init__(
+        self,
+        name: str,
+        func: Callable[[], Any],
+        trigger: Any,
+        jitter: float = 0.0,
+        catch_up: Any = True,
+    ) -> None:
+        self.name = name
+        self.func = func
+        self.trigger = trigger
+        self.jitter = jitter
+        self.catch_up = catch_up
+        self.next_run: Optional[datetime] = None
+        self.next_reason = "schedule"
+        self.running = False
+
+    def _jittered(self, dt: datetime) -> datetime:
+        return dt + timedelta(seconds=random.uniform(0, self.jitter)) if self.jitter else dt
+
+    def plan(self, now: datetime, last_run: Optional[datetime]) -> None:
+        """Set the first run at startup from the last recorded run."""
+        if isinstance(self.trigger, Interval):
+            due = last_run + timedelta(seconds=self.trigger.seconds) if last_run else now
+        else:
+            due = self.trigger.next_after(last_run) if last_run else self.trigger.next_after(now)
+        if due <= now:
+            late = (now - due).total_seconds()
+            if self.catch_up is True or (self.catch_up and late <= self.catch_up):
+                self.next_run, self.next_reason = self._jittered(now), "catch_up"
+                return
+            due = self.trigger.next_after(now)
+        self.next_run, self.next_reason = self._jittered(due), "schedule"
+
+    def advance(self, now: datetime) -> None:
+        self.next_run, self.next_reason = self._jittered(self.trigger.next_after(now)), "schedule"
+
+    def describe(self) -> str:
+        out = self.trigger.describe()
+        return f"{out} (+0-{self.jitter:g}s jitter)" if self.jitter else out
+
+
+class JobScheduler:
+    def __init__(self, db_path: Path, max_workers: Optional[int] = None, request_poll: Optional[float] = None) -> None:
+        self.db_path = db_path
+        self.max_workers = max_workers or max(1, _env_int("JOB_WORKERS", 2))
+        self.request_poll = request_poll or max(1, _env_int("JOB_REQUEST_POLL_SECONDS", 10))
+        self._jobs: Dict[str, Job] = {}
+        self._cond = threading.Condition()
+        self._stopped = False
+        self._thread: Optional[threading.Thread] = None
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self.counters = {"runs": 0, "errors": 0, "skipped": 0}
+
+    def register(
+        self,
+        name: str,
+        func: Callable[[], Any],
+        trigger: Any,
+        jitter: float = 0.0,
+        catch_up: Any = True,
+    ) -> Job:
+        job = Job(name, func, trigger, jitter=jitter, catch_up=catch_up)
+        with self._cond:
+            self._jobs[name] = job
+        return job
+
+    def job_names(self) -> List[str]:
+        return sorted(self._jobs)
+
+    def trigger(self, name: str) -> bool:
+        """Run a job now (manual). False if unknown."""
+        with self._cond:
+            job = self._jobs.get(name)
+            if job is None:
+                return False
+            job.next_run, job.next_reason = datetime.now(timezone.utc), "manual"
+            self._cond.notify()
+        return True
+
+    # --- running ---
+
+    def _execute(self, job: Job, reason: str) -> None:
+        self._save(job, job.next_run, True)
+        run_id = job_runs.start_run(self.db_path, job.name, reason)
+        start = time.perf_counter()
+        result, error = None, None
+        try:
+            result = job.func()
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            print(f"[Scheduler] {job.name} failed: {error}")
+        duration_ms = int((time.perf_counter() - start) * 1000)
+        try:
+            job_runs.finish_run(self.db_path, run_id, duration_ms, result=result, error=error)
+        except Exception as e:
+            print(f"[Scheduler] Could not record run of {job.name}: {e}")
+        with self._cond:
+            job.running = False
+            self.counters["runs"] += 1
+            if error:
+                self.counters["errors"] += 1
+            next_run = job.next_run
+            self._cond.notify()
+        self._save(job, next_run, False)
+
+    def _save(self, job: Job, next_run: Optional[datetime], running: bool) -> None:
+        try:
+            job_runs.update_job(self.db_path, job.name, _iso(next_run), running)
+        except Exception as e:
+            print(f"[Scheduler] Could not update {job.name}: {e}")
+
+    def _dispatch_due(self, now: datetime) -> None:
+        """Start (or skip) every due job. Called with the lock held."""
+        for job in self._jobs.values():
+            if job.next_run is None or job.next_run > now:
+                continue
+            reason = job.next_reason
+            job.advance(now)
+            if job.running:
+                self.counters["skipped"] += 1
+                threading.Thread(
+                    target=job_runs.record_skipped,
+                    args=(self.db_path, job.name, reason, "previous run still in progress"),
+                    daemon=True,
+                ).start()
+                continue
+            job.running = True
+            self._pool.submit(self._execute, job, reason)
+
+    def _poll_requests(self) -> None:
+        try:
+            names = job_runs.pop_requests(self.db_path)
+        except Exception as e:
+            print(f"[Scheduler] Could not read run requests: {e}")
+            return
+        for name in names:
+            self.trigger(name)
+
+    def run(self) -> None:
+        next_poll = time.monotonic() + self.request_poll
+        while True:
+            with self._cond:
+                if self._stopped:
+                    return
+                now = datetime.now(timezone.utc)
+                self._dispatch_due(now)
+                pending = [j.next_run for j in self._jobs.values() if j.next_run is not None]
+                timeout = next_poll - time.monotonic()
+                if pending:
+                    timeout = min(timeout, (min(pending) - now).total_seconds())
+                if timeout > 0:
+                    self._cond.wait(timeout)
+            if time.monotonic() >= next_poll:
+                self._poll_requests()
+                next_poll = time.monotonic() + self.request_poll
+
+    def start(self) -> None:
+        """Plan each job from its run history, publish the registry, start the scheduler thread."""
+        interrupted = job_runs.close_interrupted(self.db_path)
+        if interrupted:
+            print(f"[Scheduler] Marked {interrupted} interrupted run(s) from the previous process")
+        now = datetime.now(timezone.utc)
+        for job in self._jobs.values():
+            job.plan(now, job_runs.last_started(self.db_path, job.name))
+        job_runs.sync_jobs(self.db_path, [
+            {"name": j.name, "schedule": j.describe(), "next_run_at": _iso(j.next_run), "running": False}
+            for j in self._jobs.values()
+        ])
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="job")
+        self._thread = threading.Thread(target=self.run, name="job-scheduler", daemon=True)
+        self._thread.start()
+        for j in sorted(self._jobs.values(), key=lambda j: j.next_run):
+            print(f"[Scheduler] {j.name}: {j.describe()}, next {j.next_reason} run {_iso(j.next_run)} UTC")
+
+    def stop(self, wait: bool = True) -> None:
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join(5)
+        if self._pool is not None:
+            self._pool.shutdown(wait=wait)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                **self.counters,
+                "jobs": {
+                    j.name: {"next_run_at": _iso(j.next_run), "running": j.running}
+                    for j in self._jobs.values()
+                },
+            }
+
+
+_scheduler: Optional[JobScheduler] = None
+
+
+def set_scheduler(scheduler: Optional[JobScheduler]) -> None:
+    global _scheduler
+    _scheduler = scheduler
+
+
+def get_scheduler_stats() -> Dict[str, Any]:
+    return _scheduler.stats() if _scheduler else {}
@@ -0,0 +1,221 @@
+"""
+Telegram Bot API client shared by the polling loop and the reminder loop.
+
+One keep-alive connection pool per bot token (no TCP+TLS handshake per reply or per poll),
+token-bucket rate limiting (global and per chat, per Telegram's limits), retries with
+backoff that honour `retry_after` on 429, and splitting of replies over 4096 characters.
+
+Config (env):
+  TELEGRAM_API_BASE      – Bot API base URL (default https://api.telegram.org; point at a fake for tests)
+  TELEGRAM_GLOBAL_RATE   – messages per second across all chats (default 30)
+  TELEGRAM_CHAT_RATE     – messages per second per chat (default 1, bursts of 3)
+"""
+
+from __future__ import annotations
+
+import os
+import random
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+MAX_MESSAGE_CHARS = 4096
+
+_BACKOFF_BASE_SECONDS = 0.5
+_BACKOFF_CAP_SECONDS = 30.0
+_CHAT_BURST = 3
+
+
+class TelegramError(Exception):
+    """Raised when a Bot API call fails for good (non-retryable error or retries exhausted)."""
+
+    def __init__(self, message: str, status: Optional[int] = None) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+def _env_float(key: str, default: float) -> float:
+    try:
+        return float(os.environ.get(key, str(default)))
+    except ValueError:
+        return default
+
+
+class TokenBucket:
+    """Classic token bucket: `rate` tokens per second, up to `capacity`. acquire() blocks."""
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Take one token, sleeping until one is available. Returns seconds waited."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+def split_message(text: str, limit: int = MAX_MESSAGE_CHARS) -> List[str]:
+    """Split text into chunks of at most `limit` chars, preferring paragraph, line, then word breaks."""
+    chunks: List[str] = []
+    rest = text
+    while len(rest) > limit:
+        window = rest[:limit]
+        # First separator kind that lands in the second half of the window wins
+        cut = next((c for c in (window.rfind(sep) for sep in ("\n\n", "\n", " ")) if c >= limit // 2), limit)
+        chunks.append(rest[:cut].rstrip())
+        rest = rest[cut:].lstrip()
+    if rest or not chunks:
+        chunks.append(rest)
+    return chunks
+
+
+class TelegramClient:
+    """Pooled Bot API client for one token. Use get_client(token) for the shared instance."""
+
+    def __init__(
+        self,
+        token: str,
+        base_url: Optional[str] = None,
+        global_rate: Optional[float] = None,
+        chat_rate: Optional[float] = None,
+        max_retries: int = 3,
+        timeout: float = 30.0,
+    ) -> None:
+        self.base_url = (base_url or os.environ.get("TELEGRAM_API_BASE", "").strip() or "https://api.telegram.org").rstrip("/")
+        self._url = f"{self.base_url}/bot{token}"
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self._http = httpx.Client(
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=10, keepalive_expiry=120.0),
+        )
+        global_rate = global_rate or _env_float("TELEGRAM_GLOBAL_RATE", 30.0)
+        self._chat_rate = chat_rate or _env_float("TELEGRAM_CHAT_RATE", 1.0)
+        self._global_bucket = TokenBucket(global_rate, global_rate)
+        self._chat_buckets: Dict[Any, TokenBucket] = {}
+        self._buckets_lock = threading.Lock()
+        self._counters = {"calls": 0, "retries": 0, "failures": 0, "rate_limited": 0, "chunks": 0}
+        self._counters_lock = threading.Lock()
+
+    def _count(self, key: str, n: int = 1) -> None:
+        with self._counters_lock:
+            self._counters[key] += n
+
+    def _chat_bucket(self, chat_id: Any) -> TokenBucket:
+        with self._buckets_lock:
+            if chat_id not in self._chat_buckets:
+                self._chat_buckets[chat_id] = TokenBucket(self._chat_rate, _CHAT_BURST)
+            return self._chat_buckets[chat_id]
+
+    def call(self, method: str, payload: Optional[dict] = None, timeout: Optional[float] = None) -> Any:
+        """POST a Bot API method; return its `result`. Retries 429/5xx/network errors. Raises TelegramError."""
+        self._count("calls")
+        last_error = "no attempt"
+        status: Optional[int] = None
+        for attempt in range(self.max_retries + 1):
+            retry_after: Optional[float] = None
+            try:
+                resp = self._http.post(f"{self._url}/{method}", json=payload or {}, timeout=timeout or self.timeout)
+                status = resp.status_code
+                try:
+                    data = resp.json()
+                except ValueError:
+                    data = {}
+                if resp.status_code == 200 and data.get("ok"):
+                    return data.get("result")
+                last_error = data.get("description") or f"HTTP {resp.status_code}"
+                if resp.status_code == 429:
+                    self._count("rate_limited")
+                    retry_after = (data.get("parameters") or {}).get("retry_after")
+                elif resp.status_code < 500:
+                    raise TelegramError(f"{method}: {last_error}", status)
+            except httpx.HTTPError as e:
+                last_error = str(e) or type(e).__name__
+                status = None
+            if attempt >= self.max_retries:
+                break
+            delay = float(retry_after) if retry_after is not None else min(
+                _BACKOFF_CAP_SECONDS, _BACKOFF_BASE_SECONDS * (2 ** attempt)
+            ) * random.uniform(0.5, 1.5)
+            self._count("retries")
+            time.sleep(min(delay, _BACKOFF_CAP_SECONDS))
+        self._count("failures")
+        raise TelegramError(f"{method}: {last_error}", status)
+
+    def get_updates(self, offset: int, timeout: int = 30) -> List[dict]:
+        """Long-poll getUpdates on the pooled connection."""
+        return self.call("getUpdates", {"offset": offset, "timeout": timeout}, timeout=timeout + 10) or []
+
+    def send_message(self, chat_id: int, text: str, **extra: Any) -> bool:
+        """Send text, split into <=4096-char messages, respecting rate limits. False (logged) on failure."""
+        bucket = self._chat_bucket(chat_id)
+        for chunk in split_message(text):
+            bucket.acquire()
+            self._global_bucket.acquire()
+            self._count("chunks")
+            try:
+                self.call("sendMessage", {"chat_id": chat_id, "text": chunk, **extra})
+            except TelegramError as e:
+                print(f"[Telegram] sendMessage to {chat_id} failed: {e}")
+                return False
+        return True
+
+    def send_chat_action(self, chat_id: int, action: str = "typing") -> bool:
+        """Show e.g. 'typing...' in the chat. Best effort, not rate limited, no retries."""
+        try:
+            resp = self._http.post(f"{self._url}/sendChatAction", json={"chat_id": chat_id, "action": action}, timeout=10.0)
+            return resp.status_code == 200
+        except httpx.HTTPError:
+            return False
+
+    def close(self) -> None:
+        self._http.close()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._counters_lock:
+            return dict(self._counters)
+
+
+_clients: Dict[str, TelegramClient] = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(token: str) -> TelegramClient:
+    """Process-wide client per bot token, configured from env on first use."""
+    with _clients_lock:
+        if token not in _clients:
+            _clients[token] = TelegramClient(token)
+        return _clients[token]
+
+
+def reset_clients() -> None:
+    """Close and drop shared clients (tests, or after changing TELEGRAM_* env vars)."""
+    with _clients_lock:
+        for c in _clients.values():
+            c.close()
+        _clients.clear()
+
+
+def get_telegram_stats() -> Dict[str, Any]:
+    with _clients_lock:
+        clients = list(_clients.values())
+    totals: Dict[str, int] = {}
+    for c in clients:
+        for k, v in c.stats().items():
+            totals[k] = totals.get(k, 0) + v
+    return totals
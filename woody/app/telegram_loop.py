@@ -1,21 +1,52 @@
 """Telegram polling loop and message handling."""
 
+import os
+import threading
+from contextlib import contextmanager
 from pathlib import Path
+from typing import Iterator, List, Optional, Sequence, Tuple
 
-import httpx
-
+from app import inbox
 from app.agent import run_agent
+from app.dispatcher import ChatDispatcher, set_dispatcher
+from app.telegram_client import TelegramError, get_client
+
+POLL_ERROR_BACKOFF_SECONDS = 5
+TYPING_REFRESH_SECONDS = 4.0  # Telegram shows a chat action for ~5s
 
-TELEGRAM_API = "https://api.telegram.org/bot{token}"
+
+def _debounce_seconds() -> float:
+    """
+    WOODY_DEBOUNCE_SECONDS: quiet time before a chat's messages become one turn. Off by default,
+    so a lone message starts its turn at once; messages that arrive while a turn runs are still
+    merged into the next one.
+    """
+    try:
+        return max(0.0, float(os.environ.get("WOODY_DEBOUNCE_SECONDS", "0")))
+    except ValueError:
+        return 0.0
 
 
 def _send_message(token: str, chat_id: int, text: str) -> None:
-    with httpx.Client() as client:
-        client.post(
-            f"{TELEGRAM_API.format(token=token)}/sendMessage",
-            json={"chat_id": chat_id, "text": text},
-            timeout=30.0,
-        )
+    get_client(token).send_message(chat_id, text)
+
+
+@contextmanager
+def _typing(token: str, chat_id: int) -> Iterator[None]:
+    """Keep the "typing..." indicator up until the block exits."""
+    client = get_client(token)
+    stop = threading.Event()
+
+    def keep_typing() -> None:
+        while not stop.wait(TYPING_REFRESH_SECONDS):
+            client.send_chat_action(chat_id)
+
+    client.send_chat_action(chat_id)
+    threading.Thread(target=keep_typing, daemon=True).start()
+    try:
+        yield
+    finally:
+        stop.set()
 
 
 def _ensure_tools_loaded() -> None:
@@ -40,46 +71,183 @@ def process_message(
     chat_id: int,
     text: str,
 ) -> None:
-    """Process one inbound message and send response."""
+    """Process one inbound message (possibly several coalesced, one per line) and send response."""
     _ensure_tools_loaded()
 
-    if text.strip().lower() == "/chatid":
+    lines = text.split("\n")
+    if any(line.strip().lower() == "/chatid" for line in lines):
         _send_message(token, chat_id, f"Your chat ID: {chat_id}\nAdd TELEGRAM_REMINDER_CHAT_ID={chat_id} to .env for daily event reminders.")
-        return
+        text = "\n".join(line for line in lines if line.strip().lower() != "/chatid").strip()
+        if not text:
+            return
 
     try:
-        response = run_agent(text, openai_key, db_path, chat_id)
+        with _typing(token, chat_id):
+            response = run_agent(text, openai_key, db_path, chat_id)
         _send_message(token, chat_id, response or "(No response)")
     except Exception as e:
         _send_message(token, chat_id, f"Error: {e}")
 
 
-def run_polling_loop(token: str, db_path: Path, openai_key: str) -> None:
-    """Long-poll Telegram for messages and process them."""
-    url = f"{TELEGRAM_API.format(token=token)}/getUpdates"
-    offset = 0
+def parse_update(upd: dict) -> Optional[Tuple[int, str]]:
+    """(chat_id, text) for a text message update, else None. Shared by polling and webhook."""
+    msg = upd.get("message") or {}
+    text = (msg.get("text") or "").strip()
+    chat_id = (msg.get("chat") or {}).get("id")
+    if not text or chat_id is None:
+        return None
+    return chat_id, text
+
+
+def handle_update(
+    token: str,
+    db_path: Path,
+    openai_key: str,
+    chat_id: int,
+    text: str,
+    update_ids: Sequence[int] = (),
+) -> None:
+    """Claim the inbox rows, process the message, mark them done/failed. Duplicates are skipped."""
+    claimed = [u for u in update_ids if inbox.claim(db_path, u)]
+    if update_ids and not claimed:
+        return
+    done = threading.Event()
+
+    def renew() -> None:
+        # Keep the lease live so another replica's startup recover() leaves these rows alone
+        while not done.wait(inbox.LEASE_SECONDS / 3):
+            if not inbox.renew(db_path, claimed):
+                print(f"[Woody] Lost the inbox lease on update(s) {claimed}")
+                return
+
+    if claimed:
+        threading.Thread(target=renew, daemon=True).start()
+    error = None
+    try:
+        process_message(token, db_path, openai_key, chat_id, text)
+    except Exception as e:
+        error = str(e) or type(e).__name__
+        raise
+    finally:
+        done.set()
+        for update_id in claimed:
+            inbox.finish(db_path, update_id, error)
+
+
+def merge_messages(batch: List[tuple]) -> Tuple[str, Tuple[int, ...]]:
+    """Coalesce queued (text, update_id) messages from one chat into one turn, one line each."""
+    text = "\n".join(args[0] for args in batch)
+    update_ids = tuple(args[1] for args in batch if len(args) > 1 and args[1] is not None)
+    return text, update_ids
+
+
+def ingest(dispatcher: ChatDispatcher, db_path: Path, upd: dict) -> bool:
+    """Persist a text update to the inbox and queue it. False for non-text or already-seen updates."""
+    parsed = parse_update(upd)
+    if parsed is None or "update_id" not in upd:
+        return False
+    chat_id, text = parsed
+    if not inbox.record_update(db_path, upd["update_id"], chat_id, text):
+        return False
+    dispatcher.submit(chat_id, text, upd["update_id"])
+    return True
+
+
+def make_dispatcher(token: str, db_path: Path, openai_key: str) -> ChatDispatcher:
+    """
+    Per-chat ordered dispatcher running handle_update; registered for /metrics. Messages that
+    arrive while a chat's turn runs are coalesced into its next turn; with WOODY_DEBOUNCE_SECONDS
+    set, rapid-fire messages also wait for a quiet window, with "typing..." shown from the first one. Replays inbox rows left unfinished by a previous
+    run (crash, restart) before new updates arrive.
+    """
+    client = get_client(token)
+    dispatcher = ChatDispatcher(
+        lambda chat_id, text, update_ids=(): handle_update(token, db_path, openai_key, chat_id, text, update_ids),
+        debounce=_debounce_seconds(),
+        merge=merge_messages,
+        on_batch_start=lambda chat_id: threading.Thread(
+            target=client.send_chat_action, args=(chat_id,), daemon=True
+        ).start(),
+    )
+    set_dispatcher(dispatcher)
+    print(f"[Woody] Dispatching messages on {dispatcher.max_workers} workers (debounce {dispatcher.debounce}s)")
+    inbox.prune(db_path)
+    backlog = inbox.recover(db_path)
+    if backlog:
+        print(f"[Woody] Replaying {len(backlog)} unprocessed message(s) from the inbox")
+    for row in backlog:
+        dispatcher.submit(row["chat_id"], row["text"], row["update_id"])
+    return dispatcher
+
+
+def run_polling_loop(token: str, db_path: Path, openai_key: str, stop: Optional[threading.Event] = None) -> None:
+    """Long-poll Telegram for messages; process them per chat in order, chats in parallel. Runs until stop is set."""
+    stop = stop or threading.Event()
+    client = get_client(token)
+    offset = inbox.get_offset(db_path)
+    try:
+        client.call("deleteWebhook")  # getUpdates is refused while a webhook is set
+    except TelegramError as e:
+        print(f"deleteWebhook failed: {e}")
+    dispatcher = make_dispatcher(token, db_path, openai_key)
 
     try:
-        while True:
+        while not stop.is_set():
             try:
-                with httpx.Client(timeout=60.0) as client:
-                    resp = client.get(url, params={"offset": offset, "timeout": 30})
-                    data = resp.json()
-            except Exception as e:
+                updates = client.get_updates(offset, timeout=30)
+            except TelegramError as e:
                 print(f"Poll error: {e}")
+                stop.wait(POLL_ERROR_BACKOFF_SECONDS)
                 continue
 
-            if not data.get("ok"):
-                print(f"API error: {data}")
-                continue
-
-            for upd in data.get("result", []):
+            for upd in updates:
                 offset = upd["update_id"] + 1
-                msg = upd.get("message", {})
-                text = msg.get("text", "").strip()
-                chat_id = msg.get("chat", {}).get("id")
-                if not text or chat_id is None:
-                    continue
-                process_message(token, db_path, openai_key, chat_id, text)
+                ingest(dispatcher, db_path, upd)
+            if updates:
+                # After the inbox insert: a crash before this re-fetches updates the inbox dedupes
+                inbox.save_offset(db_path, offset)
     except KeyboardInterrupt:
         print("\nStopping woody.")
+    finally:
+        dispatcher.shutdown(wait=True)
+        set_dispatcher(None)
+
+
+# Telegram allows one getUpdates consumer per bot (others get 409 Conflict), so with several
+# replicas only the leader polls: started from on_elected, stopped from on_demoted.
+_poller: Optional[Tuple[threading.Thread, threading.Event]] = None
+_poller_lock = threading.Lock()
+
+
+def start_polling(token: str, db_path: Path, openai_key: str) -> None:
+    """Run the polling loop in a background thread (no-op if it is already running)."""
+    global _poller
+    with _poller_lock:
+        if _poller is not None and not _poller[1].is_set():
+            return
+        previous = _poller[0] if _poller is not None else None
+        stop = threading.Event()
+
+        def run() -> None:
+            # The previous loop finishes its long poll (<= 30s) before this one starts. Waited for
+            # here, not in the caller: that's the leader-election thread, which must keep renewing.
+            if previous is not None:
+                previous.join()
+            if not stop.is_set():
+                run_polling_loop(token, db_path, openai_key, stop)
+
+        thread = threading.Thread(target=run, name="telegram-polling", daemon=True)
+        _poller = (thread, stop)
+        thread.start()
+    print("[Woody] Polling Telegram on this replica")
+
+
+def stop_polling(wait: bool = False) -> None:
+    """Ask the polling loop to stop after its current long poll; with wait, block until it has."""
+    with _poller_lock:
+        poller = _poller
+    if poller is None:
+        return
+    poller[1].set()
+    if wait:
+        poller[0].join(45)
@@ -25,22 +25,22 @@ def _get_creds():
 
 
 def _calendar_today_handler() -> str:
-    creds, err = _get_creds()
-    if err:
-        return err
+    """Today's remaining events from the local mirror (shared.calendar_mirror), kept current by the calendar_sync job."""
+    from datetime import datetime, timezone
+    from shared import calendar_mirror
     try:
-        from datetime import datetime
-        service = build("calendar", "v3", credentials=creds)
-        now = datetime.utcnow().isoformat() + "Z"
-        end = datetime.utcnow().replace(hour=23, minute=59, second=59).isoformat() + "Z"
-        events = service.events().list(calendarId="primary", timeMin=now, timeMax=end, singleEvents=True).execute()
-        items = events.get("items", [])
-        if not items:
-            return "No events today"
-        lines = []
-        for e in items:
-            start = e.get("start", {}).get("dateTime", e.get("start", {}).get("date", ""))
-            lines.append(f"- {e.get('summary', '(no title)')} @ {start}")
+        status = calendar_mirror.mirror_status()
+        if not status["synced"]:
+            creds, err = _get_creds()
+            if err:
+                return err
+            status = calendar_mirror.ensure_synced()
+        now = datetime.now(timezone.utc)
+        end = now.replace(hour=23, minute=59, second=59)
+        items = calendar_mirror.get_events_between(now, end)
+        lines = [f"- {e['title']} @ {e['start']}" for e in items] or ["No events today"]
+        if status["stale"]:
+            lines.append(f"(Calendar last synced {calendar_mirror.format_age(status['age_seconds'])}; may be out of date)")
         return "\n".join(lines)
     except Exception as e:
         err = str(e).lower()
@@ -125,6 +125,8 @@ def _calendar_create_event_handler(
                 rrule = "RRULE:" + rrule
             body["recurrence"] = [rrule]
         event = service.events().insert(calendarId="primary", body=body).execute()
+        from shared.calendar_mirror import record_event
+        record_event(event, service=service)  # calendar_today reads the mirror
         link = event.get("htmlLink", "")
         start_info = event.get("start", {})
         when = start_info.get("dateTime") or start_info.get("date", "")
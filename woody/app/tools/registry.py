@@ -41,7 +41,11 @@ def get_all() -> list[ToolDef]:
 
 
 def get_openai_tools() -> list[dict[str, Any]]:
-    """Return tools in OpenAI function-calling format."""
+    """Return tools in OpenAI function-calling format, sorted by name.
+
+    The order must not depend on import order: tool schemas are part of the prompt prefix,
+    and any byte change there defeats provider-side prompt caching.
+    """
     return [
         {
             "type": "function",
@@ -55,7 +59,7 @@ def get_openai_tools() -> list[dict[str, Any]]:
                 },
             },
         }
-        for t in _registry.values()
+        for t in sorted(_registry.values(), key=lambda t: t.name)
         if t.tier != PermissionTier.RED
     ]
 
@@ -8,7 +8,9 @@ from datetime import datetime
 from pathlib import Path
 
 from app.config import get_db_path
+from app.reminder_scheduler import notify_reminder_cancelled, notify_reminder_created
 from app.tools.registry import PermissionTier, ToolDef, register
+from shared.recurrence import first_occurrence, format_rule, parse_rule
 
 
 def _get_conn():
@@ -56,29 +58,43 @@ def _parse_remind_at(remind_at: str) -> str | None:
     return None
 
 
-def _reminder_create_handler(text: str, remind_at: str, chat_id: int) -> str:
+def _reminder_create_handler(text: str, remind_at: str, chat_id: int, repeat: str = "") -> str:
     parsed = _parse_remind_at(remind_at)
     if not parsed:
         return f"Could not parse '{remind_at}'. Use ISO format (e.g. 2026-02-23T17:30:00) or natural language (e.g. tomorrow at 5pm)."
-    from datetime import datetime, timezone
+    rrule = None
+    next_fire_at = parsed
+    if (repeat or "").strip():
+        try:
+            rule = parse_rule(repeat)
+        except ValueError as e:
+            return f"Could not use repeat '{repeat}': {e}. Use daily, weekdays, weekly, monthly, yearly or an RRULE like FREQ=WEEKLY;BYDAY=MO,TH."
+        first = first_occurrence(rule, datetime.fromisoformat(parsed))
+        if first is None:
+            return f"Repeat rule '{repeat}' never fires after {parsed}."
+        rrule = format_rule(rule)
+        next_fire_at = first.strftime("%Y-%m-%dT%H:%M:%S")
+    from datetime import timezone
     try:
-        remind_dt = datetime.fromisoformat(parsed.replace("Z", "+00:00"))
+        remind_dt = datetime.fromisoformat(next_fire_at.replace("Z", "+00:00"))
     except ValueError:
         return f"Invalid datetime: {parsed}"
     now = datetime.now(timezone.utc)
     if remind_dt.tzinfo is None:
         remind_dt = remind_dt.replace(tzinfo=timezone.utc)
     if remind_dt < now:
-        return f"Remind time {parsed} is in the past. Use a future date/time."
+        return f"Remind time {next_fire_at} is in the past. Use a future date/time."
     conn = _get_conn()
     try:
         conn.execute(
-            "INSERT INTO reminders (chat_id, text, remind_at, status) VALUES (?, ?, ?, 'pending')",
-            (chat_id, text.strip(), parsed),
+            "INSERT INTO reminders (chat_id, text, remind_at, status, rrule, next_fire_at) VALUES (?, ?, ?, 'pending', ?, ?)",
+            (chat_id, text.strip(), parsed, rrule, next_fire_at),
         )
         conn.commit()
         rowid = conn.execute("SELECT last_insert_rowid()").fetchone()[0]
-        return f"Reminder set for {parsed}: {text[:50]}{'...' if len(text) > 50 else ''}"
+        notify_reminder_created(rowid, chat_id, text.strip(), next_fire_at)
+        every = f" (repeats {rrule})" if rrule else ""
+        return f"Reminder set for {next_fire_at}{every}: {text[:50]}{'...' if len(text) > 50 else ''}"
     finally:
         conn.close()
 
@@ -88,10 +104,10 @@ def _reminder_list_handler(chat_id: int) -> str:
     try:
         cur = conn.execute(
             """
-            SELECT id, text, remind_at
+            SELECT id, text, COALESCE(next_fire_at, remind_at) AS due, rrule
             FROM reminders
             WHERE chat_id = ? AND status = 'pending'
-            ORDER BY remind_at
+            ORDER BY due
             LIMIT 20
             """,
             (chat_id,),
@@ -103,7 +119,8 @@ def _reminder_list_handler(chat_id: int) -> str:
         return "No pending reminders."
     lines = ["⏰ Pending reminders:"]
     for r in rows:
-        lines.append(f"  {r[1]} @ {r[2]} (id: {r[0]})")
+        every = f", repeats {r[3]}" if r[3] else ""
+        lines.append(f"  {r[1]} @ {r[2]} (id: {r[0]}{every})")
     return "\n".join(lines)
 
 
@@ -116,6 +133,7 @@ def _reminder_cancel_handler(reminder_id: int, chat_id: int) -> str:
         )
         conn.commit()
         if cur.rowcount > 0:
+            notify_reminder_cancelled(reminder_id)
             return f"Cancelled reminder {reminder_id}."
         return f"Reminder {reminder_id} not found or already cancelled."
     finally:
@@ -125,11 +143,12 @@ def _reminder_cancel_handler(reminder_id: int, chat_id: int) -> str:
 register(
     ToolDef(
         name="reminder_create",
-        description="Create a reminder - Woody will send a Telegram message at the specified time. Use natural language (e.g. 'tomorrow at 5pm', 'Monday at 9am') or ISO format.",
+        description="Create a reminder - Woody will send a Telegram message at the specified time. Use natural language (e.g. 'tomorrow at 5pm', 'Monday at 9am') or ISO format. For routine reminders set repeat once instead of creating a new reminder each time.",
         parameters={
             "properties": {
                 "text": {"type": "string", "description": "What to remind about"},
-                "remind_at": {"type": "string", "description": "When to remind (e.g. 'tomorrow at 5pm', '2026-02-23T17:30:00')"},
+                "remind_at": {"type": "string", "description": "When to remind (e.g. 'tomorrow at 5pm', '2026-02-23T17:30:00'); first occurrence for repeating reminders"},
+                "repeat": {"type": "string", "description": "Optional: daily, weekdays, weekends, weekly, biweekly, monthly, quarterly, yearly, or an RRULE (e.g. 'FREQ=WEEKLY;BYDAY=MO,TH', 'FREQ=MONTHLY;BYMONTHDAY=-1', 'FREQ=MONTHLY;BYDAY=1SA')"},
             },
             "required": ["text", "remind_at"],
         },
@@ -151,7 +170,7 @@ register(
 register(
     ToolDef(
         name="reminder_cancel",
-        description="Cancel a reminder by ID (from reminder_list)",
+        description="Cancel a reminder by ID (from reminder_list); stops all future occurrences of a repeating reminder",
         parameters={
             "properties": {
                 "reminder_id": {"type": "integer", "description": "ID of reminder to cancel"},
@@ -0,0 +1,115 @@
+"""
+Telegram webhook ingestion - alternative to getUpdates long polling.
+
+Telegram POSTs each update to TELEGRAM_WEBHOOK_URL; we check the secret token header,
+record the message in the durable inbox, hand it to the same per-chat dispatcher the
+polling loop uses, and acknowledge immediately (the agent turn runs after the 200 is sent).
+Every replica serves the endpoint; only the elected leader calls setWebhook (ensure_webhook).
+
+Config (env):
+  TELEGRAM_WEBHOOK_URL      – public HTTPS base URL routed to this server (enables webhook mode);
+                              Telegram calls <base>/telegram/webhook
+  TELEGRAM_WEBHOOK_SECRET   – secret token Telegram echoes back (if unset, derived from the bot
+                              token, so every replica checks the same secret)
+  WOODY_WEBHOOK_HOST/PORT   – where this server listens (default 0.0.0.0:8081)
+"""
+
+from __future__ import annotations
+
+import hashlib
+import hmac
+import os
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+from app.telegram_client import TelegramClient, TelegramError, get_client
+
+WEBHOOK_PATH = "/telegram/webhook"
+SECRET_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+
+
+def webhook_url() -> str:
+    return os.environ.get("TELEGRAM_WEBHOOK_URL", "").strip()
+
+
+def webhook_secret(token: str) -> str:
+    """TELEGRAM_WEBHOOK_SECRET, else an HMAC of the bot token: the same on every replica and across restarts."""
+    configured = os.environ.get("TELEGRAM_WEBHOOK_SECRET", "").strip()
+    if configured:
+        return configured
+    return hmac.new(token.encode(), b"woody-telegram-webhook", hashlib.sha256).hexdigest()
+
+
+def create_webhook_app(submit: Callable[[Any], None], secret: str) -> FastAPI:
+    """
+    ASGI app with POST /telegram/webhook. submit(update) is called for each authenticated
+    update and must not block (enqueue only).
+    """
+    app = FastAPI(title="Woody webhook", docs_url=None, redoc_url=None, openapi_url=None)
+    counters = {"received": 0, "rejected": 0}
+    app.state.counters = counters
+
+    @app.post(WEBHOOK_PATH)
+    async def telegram_webhook(request: Request):
+        if not hmac.compare_digest(request.headers.get(SECRET_HEADER, ""), secret):
+            counters["rejected"] += 1
+            return JSONResponse({"ok": False}, status_code=401)
+        try:
+            update = await request.json()
+        except ValueError:
+            return JSONResponse({"ok": False}, status_code=400)
+        counters["received"] += 1
+        submit(update)
+        return {"ok": True}
+
+    @app.get("/health")
+    def health():
+        return {"status": "ok", **counters}
+
+    return app
+
+
+def register_webhook(client: TelegramClient, url: str, secret: str) -> None:
+    """Point Telegram at our endpoint. Raises TelegramError if Telegram refuses."""
+    client.call("setWebhook", {
+        "url": url.rstrip("/") + WEBHOOK_PATH,
+        "secret_token": secret,
+        "allowed_updates": ["message"],
+    })
+
+
+def ensure_webhook(token: str, url: Optional[str] = None) -> bool:
+    """Register the webhook (leader only: called from on_elected). False if Telegram refused."""
+    try:
+        register_webhook(get_client(token), url or webhook_url(), webhook_secret(token))
+    except TelegramError as e:
+        print(f"[Woody] setWebhook failed: {e}")
+        return False
+    return True
+
+
+def run_webhook_server(token: str, db_path: Path, openai_key: str) -> None:
+    """Serve the webhook; messages go through the same dispatcher as polling. Registration is the leader's job."""
+    import uvicorn
+
+    from app.dispatcher import set_dispatcher
+    from app.telegram_loop import ingest, make_dispatcher
+
+    secret = webhook_secret(token)
+    dispatcher = make_dispatcher(token, db_path, openai_key)
+
+    def submit(update: Any) -> None:
+        if isinstance(update, dict):
+            ingest(dispatcher, db_path, update)  # Telegram retries are deduped by update_id
+
+    host = os.environ.get("WOODY_WEBHOOK_HOST", "0.0.0.0")
+    port = int(os.environ.get("WOODY_WEBHOOK_PORT", "8081"))
+    print(f"[Woody] Webhook mode: listening on {host}:{port}{WEBHOOK_PATH}")
+    try:
+        uvicorn.run(create_webhook_app(submit, secret), host=host, port=port, log_level="warning")
+    finally:
+        dispatcher.shutdown(wait=True)
+        set_dispatcher(None)
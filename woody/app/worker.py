@@ -0,0 +1,212 @@
+"""
+Out-of-process worker for the durable job queue (shared.job_queue).
+
+Heavy agents (contact sync, inbox scans, memory consolidation) run here instead of in the
+Telegram process, so they don't compete with chat turns for the GIL or memory. Run one with
+`python woody/run.py worker` (e.g. as its own container), or let Woody spawn
+JOB_WORKER_PROCESSES (default 1) child processes. Workers run at lower CPU priority
+(JOB_WORKER_NICE, default 10).
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Sequence
+
+_repo = Path(__file__).resolve().parent.parent.parent
+if str(_repo) not in sys.path:
+    sys.path.insert(0, str(_repo))
+
+from shared import job_queue
+
+RESTART_BACKOFF_SECONDS = 5
+
+
+def _memory_agent(db_path: Path, payload: dict) -> Any:
+    from app.memory_agent_loop import _run_memory_agent_once
+    return _run_memory_agent_once(db_path)
+
+
+def _memory_agent_run(db_path: Path, payload: dict) -> Any:
+    from shared.memory_agent import run_memory_agent
+    return run_memory_agent(db_path)
+
+
+def _events_agent(db_path: Path, payload: dict) -> Any:
+    from app.events_agent_loop import _run_events_agent_once
+    return _run_events_agent_once()
+
+
+def _events_agent_run(db_path: Path, payload: dict) -> Any:
+    from shared.events_agent import run_events_agent
+    return run_events_agent(db_path)
+
+
+def _contact_agent(db_path: Path, payload: dict) -> Any:
+    from app.contact_agent_loop import _run_contact_agent_once
+    return _run_contact_agent_once()
+
+
+def _communications_agent(db_path: Path, payload: dict) -> Any:
+    from app.communications_agent_loop import _run_communications_agent_once
+    return _run_communications_agent_once()
+
+
+def _calendar_sync(db_path: Path, payload: dict) -> Any:
+    from shared.calendar_mirror import sync_calendar
+    from shared.google_tokens import get_credentials
+    _, err = get_credentials()
+    if err:
+        raise job_queue.PermanentError(err)  # "Google not connected": retrying won't help
+    return sync_calendar(full=bool(payload.get("full")))
+
+
+# kind -> handler(db_path, payload). memory_agent is the once-a-day nightly run;
+# memory_agent_run / events_agent_run are the dashboard's "run now" buttons.
+HANDLERS: Dict[str, Callable[[Path, dict], Any]] = {
+    "memory_agent": _memory_agent,
+    "memory_agent_run": _memory_agent_run,
+    "events_agent": _events_agent,
+    "events_agent_run": _events_agent_run,
+    "contact_agent": _contact_agent,
+    "communications_agent": _communications_agent,
+    "calendar_sync": _calendar_sync,
+}
+
+
+def _lease_seconds() -> float:
+    try:
+        return max(10.0, float(os.environ.get("JOB_LEASE_SECONDS", str(job_queue.DEFAULT_LEASE_SECONDS))))
+    except ValueError:
+        return float(job_queue.DEFAULT_LEASE_SECONDS)
+
+
+def run_job(db_path: Path, job: Dict[str, Any], worker_id: str, handlers: Dict[str, Callable], lease_seconds: float) -> bool:
+    """Run one leased job with a heartbeat. Returns True if it succeeded."""
+    done = threading.Event()
+
+    def beat():
+        while not done.wait(lease_seconds / 3):
+            if not job_queue.heartbeat(db_path, job["id"], worker_id, lease_seconds):
+                print(f"[Worker] Lost lease on job {job['id']}")
+                return
+
+    threading.Thread(target=beat, daemon=True).start()
+    start = time.perf_counter()
+    try:
+        handler = handlers.get(job["kind"])
+        if handler is None:
+            raise LookupError(f"no handler for job kind {job['kind']!r}")
+        result = handler(db_path, job.get("payload") or {})
+    except Exception as e:
+        done.set()
+        permanent = isinstance(e, job_queue.PermanentError)
+        if not job_queue.fail(db_path, job["id"], worker_id, f"{type(e).__name__}: {e}", retry=not permanent):
+            print(f"[Worker] Job {job['id']} ({job['kind']}) failed, but its lease was lost; not recorded: {e}")
+        else:
+            print(f"[Worker] Job {job['id']} ({job['kind']}) failed on attempt {job['attempts']}"
+                  f"{' (not retried)' if permanent else ''}: {e}")
+        return False
+    done.set()
+    if not job_queue.complete(db_path, job["id"], worker_id, result):
+        print(f"[Worker] Job {job['id']} ({job['kind']}) finished, but its lease was lost; result not recorded")
+        return False
+    print(f"[Worker] Job {job['id']} ({job['kind']}) done in {time.perf_counter() - start:.1f}s")
+    return True
+
+
+def run_worker(
+    db_path: Path,
+    worker_id: Optional[str] = None,
+    handlers: Optional[Dict[str, Callable]] = None,
+    kinds: Optional[Sequence[str]] = None,
+    poll: float = 1.0,
+    drain: bool = False,
+    stop: Optional[threading.Event] = None,
+    parent_pid: Optional[int] = None,
+) -> int:
+    """
+    Lease and run jobs until stopped. drain=True returns once nothing is runnable.
+    With parent_pid, exits when that process goes away. Returns jobs processed.
+    """
+    worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+    handlers = handlers if handlers is not None else HANDLERS
+    lease_seconds = _lease_seconds()
+    stop = stop or threading.Event()
+    processed = 0
+    while not stop.is_set():
+        if parent_pid is not None and os.getppid() != parent_pid:
+            print("[Worker] Parent exited; stopping")
+            break
+        try:
+            job = job_queue.lease(db_path, worker_id, kinds=kinds, lease_seconds=lease_seconds)
+        except Exception as e:
+            print(f"[Worker] Lease error: {e}")
+            job = None
+        if job is None:
+            if drain:
+                break
+            stop.wait(poll)
+            continue
+        run_job(db_path, job, worker_id, handlers, lease_seconds)
+        processed += 1
+    return processed
+
+
+def _worker_processes() -> int:
+    try:
+        return max(0, int(os.environ.get("JOB_WORKER_PROCESSES", "1")))
+    except ValueError:
+        return 1
+
+
+def _supervise(db_path: Path, index: int) -> None:
+    """Keep one child worker process running; restart it if it exits."""
+    run_py = Path(__file__).resolve().parent.parent / "run.py"
+    while True:
+        proc = subprocess.Popen(
+            [sys.executable, str(run_py), "worker", "--db", str(db_path), "--parent-pid", str(os.getpid())]
+        )
+        print(f"[Worker] Started worker process {index} (pid {proc.pid})")
+        code = proc.wait()
+        print(f"[Worker] Worker process {index} exited with {code}; restarting in {RESTART_BACKOFF_SECONDS}s")
+        time.sleep(RESTART_BACKOFF_SECONDS)
+
+
+def start_worker_processes(db_path: Path) -> int:
+    """Spawn JOB_WORKER_PROCESSES supervised worker processes. Returns how many."""
+    n = _worker_processes()
+    for i in range(n):
+        threading.Thread(target=_supervise, args=(db_path, i), name=f"worker-supervisor-{i}", daemon=True).start()
+    return n
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(prog="woody worker", description="Run background jobs from the job queue.")
+    parser.add_argument("--db", help="Woody DB path (default: the configured app.db)")
+    parser.add_argument("--kinds", help="Comma-separated job kinds to take (default: all)")
+    parser.add_argument("--drain", action="store_true", help="Exit once no job is runnable")
+    parser.add_argument("--parent-pid", type=int, help="Exit when this process exits (set by Woody)")
+    args = parser.parse_args(argv)
+
+    from shared.logging_config import setup_logging
+    setup_logging(service="woody-worker", log_dir=_repo / "logs")
+    from app.config import get_db_path
+    from app.db import init_db
+
+    db_path = Path(args.db) if args.db else get_db_path()
+    init_db(db_path)
+    try:
+        os.nice(int(os.environ.get("JOB_WORKER_NICE", "10")))
+    except (AttributeError, OSError, ValueError):
+        pass
+    kinds = [k.strip() for k in args.kinds.split(",") if k.strip()] if args.kinds else None
+    print(f"[Worker] Running jobs from {db_path} (pid {os.getpid()})")
+    run_worker(db_path, kinds=kinds, drain=args.drain, parent_pid=args.parent_pid)
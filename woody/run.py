@@ -1,7 +1,12 @@
 #!/usr/bin/env python3
-"""Run woody from project root."""
+"""Run woody from project root. `python woody/run.py worker` runs a background job worker instead."""
 
-from app.main import main
+import sys
 
 if __name__ == "__main__":
-    main()
+    if sys.argv[1:2] == ["worker"]:
+        from app.worker import main as worker_main
+        worker_main(sys.argv[2:])
+    else:
+        from app.main import main
+        main()